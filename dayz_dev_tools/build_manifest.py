@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import typing
+
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import pbo_writer
+
+
+#: The version of the manifest format. Manifests with a different version are ignored.
+MANIFEST_VERSION = 1
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def manifest_path(pbofile: str) -> str:
+    """Get the location of the build manifest for a PBO file.
+
+    :Parameters:
+      - `pbofile`: The location of the PBO file.
+
+    :Returns:
+      The location of the build manifest, next to the PBO file.
+    """
+    return f"{pbofile}.manifest"
+
+
+def _entry_sha1(entry: pbo_writer._Entry) -> str:
+    digest = hashlib.sha1()
+
+    with entry.open() as infile:
+        while chunk := infile.read(_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """A record of the inputs used to build a PBO file, allowing the PBO file to be rebuilt only
+    when its inputs have changed.
+
+    The manifest records the settings, headers and files used to build the PBO file, along with
+    the size and modification time of each file and of the PBO file itself. Files are compared by
+    size and modification time, and also by SHA1 hash when `checksums` is enabled.
+
+    The manifest also caches the output of converting ``config.cpp`` files, so an unchanged
+    ``config.cpp`` file is not converted again when other files have changed.
+    """
+    def __init__(self, pbofile: str, *, checksums: bool = False) -> None:
+        """Create a new :class:`BuildManifest` instance, loading the manifest of the previous
+        build if there is one.
+
+        :Parameters:
+          - `pbofile`: The location of the PBO file being built. The manifest is stored next to it
+            (see :func:`manifest_path`).
+          - `checksums`: If True, files are also compared by SHA1 hash.
+        """
+        self.pbofile = pbofile
+        self.path = manifest_path(pbofile)
+        self.checksums = checksums
+        self._previous = self._load()
+        self._cached: dict[str, str] = self._previous.get("conversions", {})
+        self._conversions: dict[str, str] = {}
+        self._state: typing.Optional[dict[str, typing.Any]] = None
+
+    def _load(self) -> dict[str, typing.Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logging.warning("Ignoring unreadable build manifest `%s`: %s", self.path, error)
+            return {}
+
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            logging.debug("Ignoring build manifest `%s` with unknown version", self.path)
+            return {}
+
+        return manifest
+
+    def convert(self, cpp_content: bytes, executable: str) -> bytes:
+        """Convert unbinarized config.cpp content to binarized content, reusing the output of a
+        previous build if the same content was converted by the same program.
+
+        :Parameters:
+          - `cpp_content`: Unbinarized content to convert.
+          - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program.
+
+        :Returns:
+          The binarized content.
+        """
+        key = hashlib.sha1(executable.encode("utf8") + b"\x00" + cpp_content).hexdigest()
+
+        if key in self._cached:
+            logging.debug("Reusing cached conversion %s", key)
+            bin_content = base64.b64decode(self._cached[key])
+        else:
+            bin_content = config_cpp.cpp_to_bin(cpp_content, executable)
+
+        self._conversions[key] = base64.b64encode(bin_content).decode("ascii")
+
+        return bin_content
+
+    def _current_state(
+        self, writer: pbo_writer.PBOWriter, settings: dict[str, typing.Any]
+    ) -> dict[str, typing.Any]:
+        if self._state is None:
+            files = []
+
+            for entry in sorted(set(writer.entries), key=lambda e: e.read_path):
+                record = {
+                    "path": str(entry.read_path),
+                    "stored_path": entry.stored_path,
+                    "size": entry.size,
+                    "mtime_ns": entry.mtime_ns
+                }
+
+                if self.checksums:
+                    record["sha1"] = _entry_sha1(entry)
+
+                files.append(record)
+
+            self._state = {
+                "settings": settings,
+                # Header values may be arbitrary bytes, which latin-1 maps to str losslessly
+                "headers": [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in writer.headers
+                ],
+                "files": files
+            }
+
+        return self._state
+
+    def up_to_date(
+        self, writer: pbo_writer.PBOWriter, settings: dict[str, typing.Any]
+    ) -> bool:
+        """Returns True if the PBO file was built from the same inputs as a writer would use.
+
+        :Parameters:
+          - `writer`: The :class:`~dayz_dev_tools.pbo_writer.PBOWriter` that would build the PBO
+            file, after all headers and files have been added to it.
+          - `settings`: Any other settings affecting the contents of the PBO file. They must be
+            serializable to JSON.
+
+        :Returns:
+          True if the inputs are unchanged and the PBO file has not been modified since it was
+          built, or False otherwise.
+        """
+        try:
+            info = os.stat(self.pbofile)
+        except FileNotFoundError:
+            return False
+
+        state = self._current_state(writer, json.loads(json.dumps(settings)))
+
+        return all(self._previous.get(key) == value for key, value in state.items()) \
+            and self._previous.get("output") == {"size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+    def save(self, writer: pbo_writer.PBOWriter, settings: dict[str, typing.Any]) -> None:
+        """Save the manifest after the PBO file has been built.
+
+        Only the conversions used by this build are kept.
+
+        :Parameters:
+          - `writer`: The :class:`~dayz_dev_tools.pbo_writer.PBOWriter` that built the PBO file.
+          - `settings`: Any other settings affecting the contents of the PBO file. They must be
+            serializable to JSON.
+        """
+        info = os.stat(self.pbofile)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            **self._current_state(writer, json.loads(json.dumps(settings))),
+            "output": {"size": info.st_size, "mtime_ns": info.st_mtime_ns},
+            "conversions": self._conversions
+        }
+
+        temp_path = f"{self.path}.{os.getpid()}.partial"
+
+        try:
+            with open(temp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file)
+
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
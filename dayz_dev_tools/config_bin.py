@@ -0,0 +1,505 @@
+import dataclasses
+import math
+import struct
+import typing
+
+from dayz_dev_tools import misc
+
+
+#: The signature at the start of every binarized (rapified) config
+SIGNATURE = b"\x00raP"
+
+# The signature, two values that are always 0 and 8, and the offset of the enumerations. The
+# top-level entries follow the header.
+_HEADER = struct.Struct("<4sIII")
+
+# Entry types
+_CLASS = 0
+_PROPERTY = 1
+_ARRAY = 2
+_EXTERN = 3
+_DELETE = 4
+_ARRAY_APPEND = 5
+
+# Value types
+_STRING = 0
+_FLOAT = 1
+_INT = 2
+_NESTED_ARRAY = 3
+_VARIABLE = 4
+_INT64 = 6
+
+_FLOAT32 = struct.Struct("<f")
+_INT32 = struct.Struct("<i")
+_UINT32 = struct.Struct("<I")
+_INT64_STRUCT = struct.Struct("<q")
+
+#: A config value: a string, integer, float or array of values
+Value = typing.Union[str, int, float, list[typing.Any]]
+
+
+@dataclasses.dataclass
+class ConfigProperty:
+    """A property of a config class, such as ``scope = 2;`` or ``units[] = {};``."""
+    #: The name of the property, without ``[]``
+    name: str
+    #: The value of the property, which is a list for array properties
+    value: Value
+    #: True if the array is appended to an inherited array, i.e. ``units[] += {...};``
+    append: bool = False
+
+
+@dataclasses.dataclass
+class ConfigExtern:
+    """A declaration of a class defined elsewhere, i.e. ``class Name;``."""
+    #: The name of the class
+    name: str
+
+
+@dataclasses.dataclass
+class ConfigDelete:
+    """A deletion of an inherited class, i.e. ``delete Name;``."""
+    #: The name of the class
+    name: str
+
+
+@dataclasses.dataclass
+class ConfigClass:
+    """A class in a config, i.e. ``class Name: Base {...};``."""
+    #: The name of the class
+    name: str
+    #: The name of the class it inherits from, or ``None``
+    base: typing.Optional[str] = None
+    #: The properties, classes, declarations and deletions within the class, in order
+    entries: list["Entry"] = dataclasses.field(default_factory=list)
+
+    def get(self, name: str) -> typing.Optional["Entry"]:
+        """Find an entry within the class by name, ignoring case, as the game does.
+
+        :Parameters:
+          - `name`: The name of the entry.
+
+        :Returns:
+          The last entry with the name, or ``None`` if there is no such entry.
+        """
+        return _find(self.entries, name)
+
+
+#: An entry within a config class
+Entry = typing.Union[ConfigProperty, ConfigClass, ConfigExtern, ConfigDelete]
+
+
+@dataclasses.dataclass
+class Config:
+    """The contents of a ``config.cpp`` or ``config.bin`` file."""
+    #: The properties, classes, declarations and deletions at the top level, in order
+    entries: list[Entry] = dataclasses.field(default_factory=list)
+    #: The names and values of enumeration constants
+    enums: list[tuple[str, int]] = dataclasses.field(default_factory=list)
+
+    def get(self, name: str) -> typing.Optional[Entry]:
+        """Find a top-level entry by name, ignoring case, as the game does.
+
+        :Parameters:
+          - `name`: The name of the entry.
+
+        :Returns:
+          The last entry with the name, or ``None`` if there is no such entry.
+        """
+        return _find(self.entries, name)
+
+
+def _find(entries: list[Entry], name: str) -> typing.Optional[Entry]:
+    lowered = name.lower()
+
+    for entry in reversed(entries):
+        if entry.name.lower() == lowered:
+            return entry
+
+    return None
+
+
+def decode_text(data: bytes) -> str:
+    """Decode text from a config, such as a name or string value.
+
+    Configs are not always encoded in UTF-8, so bytes that are not valid UTF-8 are kept as they
+    are, and are restored by :func:`encode_text`.
+
+    :Parameters:
+      - `data`: The encoded text.
+
+    :Returns:
+      The decoded text.
+    """
+    return data.decode("utf8", "surrogateescape")
+
+
+def encode_text(text: str) -> bytes:
+    """Encode text for a config, as it was before being decoded by :func:`decode_text`.
+
+    :Parameters:
+      - `text`: The text to encode.
+
+    :Returns:
+      The encoded text.
+    """
+    return text.encode("utf8", "surrogateescape")
+
+
+class _Reader:
+    # Reads past the end of the data raise IndexError, ValueError or struct.error, which read()
+    # reports as truncated data, so offsets are not checked before every read
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        # Bodies already read, to reject configs whose classes contain themselves
+        self.visited: set[int] = set()
+
+    def _string(self, offset: int) -> tuple[str, int]:
+        end = self.data.index(b"\x00", offset)
+
+        return decode_text(self.data[offset:end]), end + 1
+
+    def _compressed_int(self, offset: int) -> tuple[int, int]:
+        byte = self.data[offset]
+        if byte < 0x80:
+            return byte, offset + 1
+
+        result = byte & 0x7f
+        shift = 7
+
+        while True:
+            offset += 1
+            byte = self.data[offset]
+            result |= (byte & 0x7f) << shift
+            shift += 7
+
+            if byte < 0x80:
+                return result, offset + 1
+
+    def _value(self, value_type: int, offset: int) -> tuple[Value, int]:
+        if value_type == _STRING or value_type == _VARIABLE:
+            return self._string(offset)
+        elif value_type == _INT:
+            return _INT32.unpack_from(self.data, offset)[0], offset + 4
+        elif value_type == _FLOAT:
+            return _shortest_float(_FLOAT32.unpack_from(self.data, offset)[0]), offset + 4
+        elif value_type == _NESTED_ARRAY:
+            return self._array(offset)
+        elif value_type == _INT64:
+            return _INT64_STRUCT.unpack_from(self.data, offset)[0], offset + 8
+
+        raise Exception(f"Invalid config.bin: unknown value type {value_type}")
+
+    def _array(self, offset: int) -> tuple[list[Value], int]:
+        count, offset = self._compressed_int(offset)
+        items = []
+        data = self.data
+        value = self._value
+
+        for _ in range(count):
+            item, offset = value(data[offset], offset + 1)
+            items.append(item)
+
+        return items, offset
+
+    def body(self, offset: int) -> tuple[typing.Optional[str], list[Entry]]:
+        if offset in self.visited or offset >= len(self.data):
+            raise Exception(f"Invalid config.bin: bad class offset {offset}")
+
+        self.visited.add(offset)
+
+        data = self.data
+        string = self._string
+        base, offset = string(offset)
+        count, offset = self._compressed_int(offset)
+        entries: list[Entry] = []
+
+        for _ in range(count):
+            entry_type = data[offset]
+
+            if entry_type == _PROPERTY:
+                name, end = string(offset + 2)
+                value, offset = self._value(data[offset + 1], end)
+                entries.append(ConfigProperty(name, value))
+            elif entry_type == _CLASS:
+                name, offset = string(offset + 1)
+                body_offset = _UINT32.unpack_from(data, offset)[0]
+                offset += 4
+                class_base, class_entries = self.body(body_offset)
+                entries.append(ConfigClass(name, class_base, class_entries))
+            elif entry_type == _ARRAY:
+                name, offset = string(offset + 1)
+                items, offset = self._array(offset)
+                entries.append(ConfigProperty(name, items))
+            elif entry_type == _ARRAY_APPEND:
+                # The name follows a flag that is always 1
+                name, offset = string(offset + 5)
+                items, offset = self._array(offset)
+                entries.append(ConfigProperty(name, items, append=True))
+            elif entry_type == _EXTERN:
+                name, offset = string(offset + 1)
+                entries.append(ConfigExtern(name))
+            elif entry_type == _DELETE:
+                name, offset = string(offset + 1)
+                entries.append(ConfigDelete(name))
+            else:
+                raise Exception(f"Invalid config.bin: unknown entry type {entry_type}")
+
+        return (base if len(base) > 0 else None), entries
+
+    def enums(self, offset: int) -> list[tuple[str, int]]:
+        if offset == 0 or offset >= len(self.data):
+            return []
+
+        count = _UINT32.unpack_from(self.data, offset)[0]
+        offset += 4
+        enums = []
+
+        for _ in range(count):
+            name, offset = self._string(offset)
+            enums.append((name, _INT32.unpack_from(self.data, offset)[0]))
+            offset += 4
+
+        return enums
+
+
+def _shortest_float(value: float) -> float:
+    # Floats are stored with single precision, so the shortest text that rounds to the same
+    # single precision value is used, e.g. 0.1 rather than 0.10000000149011612
+    for precision in range(1, 10):
+        candidate = float(f"{value:.{precision}g}")
+        if _FLOAT32.pack(candidate) == _FLOAT32.pack(value):
+            return candidate
+
+    return value
+
+
+def is_binarized(data: bytes) -> bool:
+    """Check whether config content is binarized.
+
+    :Parameters:
+      - `data`: The content of a ``config.bin`` or ``config.cpp`` file.
+
+    :Returns:
+      True if the content starts with the binarized config signature, or False otherwise.
+    """
+    return data.startswith(SIGNATURE)
+
+
+def read(data: bytes) -> Config:
+    """Read the content of a binarized (rapified) config, such as a ``config.bin`` file.
+
+    :Parameters:
+      - `data`: The binarized content.
+
+    :Returns:
+      A :class:`Config` instance representing the content.
+
+    :Raises:
+      - `Exception`: If the content is not a valid binarized config.
+    """
+    if len(data) < _HEADER.size or not is_binarized(data):
+        raise Exception("Invalid config.bin: missing signature")
+
+    _, _, _, enum_offset = _HEADER.unpack_from(data)
+    reader = _Reader(data)
+
+    try:
+        with misc.gc_paused():
+            _, entries = reader.body(_HEADER.size)
+            enums = reader.enums(enum_offset)
+    except (IndexError, ValueError, struct.error) as error:
+        raise Exception("Invalid config.bin: unexpected end of data") from error
+
+    return Config(entries, enums)
+
+
+def _compressed_int(value: int) -> bytes:
+    result = bytearray()
+
+    while value >= 0x80:
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    result.append(value)
+
+    return bytes(result)
+
+
+def _encode_string(value: str) -> bytes:
+    return encode_text(value) + b"\x00"
+
+
+def _write_value(value: Value, output: bytearray) -> None:
+    if isinstance(value, str):
+        output.append(_STRING)
+        output += _encode_string(value)
+    elif isinstance(value, list):
+        output.append(_NESTED_ARRAY)
+        _write_array(value, output)
+    elif isinstance(value, float):
+        output.append(_FLOAT)
+        output += _FLOAT32.pack(value)
+    elif -0x80000000 <= value <= 0x7fffffff:
+        output.append(_INT)
+        output += _INT32.pack(value)
+    elif not -0x8000000000000000 <= value <= 0x7fffffffffffffff:
+        raise Exception(f"Integer out of range: {value}")
+    else:
+        output.append(_INT64)
+        output += _INT64_STRUCT.pack(value)
+
+
+def _write_array(items: list[Value], output: bytearray) -> None:
+    output += _compressed_int(len(items))
+
+    for item in items:
+        _write_value(item, output)
+
+
+def _write_body(base: typing.Optional[str], entries: list[Entry], output: bytearray) -> None:
+    output += _encode_string(base or "")
+    output += _compressed_int(len(entries))
+
+    # The offsets of class bodies are filled in once they are written, after this body
+    classes = []
+
+    for entry in entries:
+        if isinstance(entry, ConfigClass):
+            output.append(_CLASS)
+            output += _encode_string(entry.name)
+            classes.append((entry, len(output)))
+            output += b"\x00" * _UINT32.size
+        elif isinstance(entry, ConfigExtern):
+            output.append(_EXTERN)
+            output += _encode_string(entry.name)
+        elif isinstance(entry, ConfigDelete):
+            output.append(_DELETE)
+            output += _encode_string(entry.name)
+        elif isinstance(entry.value, list):
+            if entry.append:
+                output.append(_ARRAY_APPEND)
+                output += _UINT32.pack(1)
+            else:
+                output.append(_ARRAY)
+
+            output += _encode_string(entry.name)
+            _write_array(entry.value, output)
+        else:
+            output.append(_PROPERTY)
+            # The value type precedes the name
+            _write_value(entry.value, value := bytearray())
+            output.append(value[0])
+            output += _encode_string(entry.name)
+            output += value[1:]
+
+    for entry, slot in classes:
+        _UINT32.pack_into(output, slot, len(output))
+        _write_body(entry.base, entry.entries, output)
+
+
+def write(config: Config) -> bytes:
+    """Write a config as binarized (rapified) content, such as a ``config.bin`` file.
+
+    :Parameters:
+      - `config`: A :class:`Config` instance.
+
+    :Returns:
+      The binarized content, which :func:`read` reads back as an equal :class:`Config`, except
+      that floats are stored with single precision.
+
+    :Raises:
+      - `Exception`: If the config contains an integer that does not fit in 64 bits.
+    """
+    output = bytearray(_HEADER.size)
+    _write_body(None, config.entries, output)
+
+    enum_offset = len(output)
+    output += _UINT32.pack(len(config.enums))
+
+    for name, value in config.enums:
+        output += _encode_string(name)
+        output += _INT32.pack(value)
+
+    _HEADER.pack_into(output, 0, SIGNATURE, 0, 8, enum_offset)
+
+    return bytes(output)
+
+
+def _format_value(value: Value) -> str:
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    elif isinstance(value, list):
+        return "{" + ", ".join(_format_value(item) for item in value) + "}"
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            raise Exception(f"Float cannot be written to config.cpp: {value}")
+
+        text = repr(value)
+        # Floats always include a decimal point or exponent, so they are not read back as integers
+        return text if any(c in text for c in ".en") else f"{text}.0"
+
+    return str(value)
+
+
+def _format_entries(entries: list[Entry], indent: str, lines: list[str]) -> None:
+    for entry in entries:
+        if isinstance(entry, ConfigClass):
+            header = f"{indent}class {entry.name}"
+            if entry.base is not None:
+                header += f": {entry.base}"
+
+            lines.append(header)
+            lines.append(f"{indent}{{")
+            _format_entries(entry.entries, indent + "\t", lines)
+            lines.append(f"{indent}}};")
+        elif isinstance(entry, ConfigExtern):
+            lines.append(f"{indent}class {entry.name};")
+        elif isinstance(entry, ConfigDelete):
+            lines.append(f"{indent}delete {entry.name};")
+        elif isinstance(entry.value, list):
+            operator = "+=" if entry.append else "="
+            lines.append(f"{indent}{entry.name}[] {operator} {_format_value(entry.value)};")
+        else:
+            lines.append(f"{indent}{entry.name} = {_format_value(entry.value)};")
+
+
+def format_cpp(config: Config) -> bytes:
+    """Write a config as unbinarized ``config.cpp`` content.
+
+    :Parameters:
+      - `config`: A :class:`Config` instance, such as one returned by :func:`read`.
+
+    :Returns:
+      The unbinarized content, with tab indentation and Windows line endings.
+
+    :Raises:
+      - `Exception`: If the config contains an infinite or NaN float.
+    """
+    lines: list[str] = []
+
+    if len(config.enums) > 0:
+        lines.append("enum")
+        lines.append("{")
+        lines.extend(f"\t{name} = {value}," for name, value in config.enums)
+        lines.append("};")
+
+    _format_entries(config.entries, "", lines)
+
+    return encode_text("".join(f"{line}\r\n" for line in lines))
+
+
+def bin_to_cpp(bin_content: bytes) -> bytes:
+    """Convert binarized config content to unbinarized content, without ``CfgConvert.exe``.
+
+    :Parameters:
+      - `bin_content`: Binarized content to convert.
+
+    :Returns:
+      The unbinarized content.
+
+    :Raises:
+      - `Exception`: If the content is not a valid binarized config, or contains an infinite or
+        NaN float.
+    """
+    return format_cpp(read(bin_content))
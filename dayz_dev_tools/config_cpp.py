@@ -1,56 +1,256 @@
+from concurrent import futures
+import dataclasses
 import enum
+import logging
 import os
 import subprocess
 import tempfile
+import typing
 
+import dayz_dev_tools
+from dayz_dev_tools import config_bin
+from dayz_dev_tools import config_parser
+from dayz_dev_tools import conversion_cache
 
-class _Mode(enum.Enum):
+
+#: Used in place of the location of ``CfgConvert.exe`` to convert configs natively, without
+#: ``CfgConvert.exe``
+NATIVE_CONVERTER = "native"
+
+_SHM_DIR = "/dev/shm"
+
+
+class Mode(enum.Enum):
+    """The direction of a config conversion."""
+    #: Convert unbinarized content to binarized content
     BIN = "-bin"
+    #: Convert binarized content to unbinarized content
     TXT = "-txt"
 
 
-def _run(executable: str, mode: _Mode, in_bytes: bytes) -> bytes:
-    with tempfile.TemporaryDirectory() as tempdir:
+@dataclasses.dataclass(frozen=True)
+class Conversion:
+    """The result of converting one config with :func:`convert_many`."""
+    #: The converted content, or None if the conversion failed
+    content: typing.Optional[bytes]
+    #: Why the conversion failed, or None if it succeeded
+    error: typing.Optional[Exception] = None
+
+
+def default_converter(tools_dir: typing.Optional[str]) -> str:
+    """Choose the converter to use for configs.
+
+    :Parameters:
+      - `tools_dir`: The location of the DayZ Tools directory, or ``None`` if not installed.
+
+    :Returns:
+      The location of the DayZ Tools ``CfgConvert.exe`` program, or :data:`NATIVE_CONVERTER`
+      when DayZ Tools is not installed.
+    """
+    if tools_dir is None:
+        return NATIVE_CONVERTER
+
+    return os.path.join(tools_dir, "bin", "CfgConvert", "CfgConvert.exe")
+
+
+def _converter_identity(executable: str) -> typing.Optional[str]:
+    if executable == NATIVE_CONVERTER:
+        return f"{NATIVE_CONVERTER}-{dayz_dev_tools.version}"
+
+    # Replacing CfgConvert.exe, e.g. by updating DayZ Tools, changes its size or modification time
+    try:
+        info = os.stat(executable)
+    except OSError:
+        return None
+
+    return f"{os.path.abspath(executable)}-{info.st_size}-{info.st_mtime_ns}"
+
+
+def _staging_directory() -> typing.Optional[str]:
+    # Files staged in a RAM-backed directory are never written to disk
+    if os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK | os.X_OK):
+        return _SHM_DIR
+
+    return None
+
+
+def _command(executable: str, mode: Mode, in_path: str, out_path: str) -> list[str]:
+    return [
+        executable,
+        mode.value,
+        "-dst", out_path,
+        in_path
+    ]
+
+
+def _convert(executable: str, mode: Mode, in_bytes: bytes) -> bytes:
+    if executable == NATIVE_CONVERTER:
+        if mode == Mode.TXT:
+            return config_bin.bin_to_cpp(in_bytes)
+
+        return config_parser.cpp_to_bin(in_bytes)
+
+    with tempfile.TemporaryDirectory(dir=_staging_directory()) as tempdir:
         in_path = os.path.join(tempdir, "input.tmp")
         out_path = os.path.join(tempdir, "output.tmp")
 
         with open(in_path, "w+b") as infile:
             infile.write(in_bytes)
 
-        subprocess.run(
-            [
-                executable,
-                mode.value,
-                "-dst", out_path,
-                in_path
-            ],
-            check=True)
+        subprocess.run(_command(executable, mode, in_path, out_path), check=True)
 
         with open(out_path, "rb") as outfile:
             return outfile.read()
 
 
+def _run(executable: str, mode: Mode, in_bytes: bytes) -> bytes:
+    cache = conversion_cache.default_cache()
+    converter = _converter_identity(executable)
+
+    if cache is None or converter is None:
+        return _convert(executable, mode, in_bytes)
+
+    key = conversion_cache.cache_key(in_bytes, mode.value, converter)
+    out_bytes = cache.get(key)
+
+    if out_bytes is None:
+        out_bytes = _convert(executable, mode, in_bytes)
+        cache.put(key, out_bytes)
+    else:
+        logging.debug("Reusing cached conversion %s", key)
+
+    return out_bytes
+
+
 def bin_to_cpp(bin_content: bytes, executable: str) -> bytes:
     """Convert binarized config.cpp content to unbinarized content.
 
+    Conversions are cached in the :func:`dayz_dev_tools.conversion_cache.default_cache`, so
+    content that was converted before by the same converter is not converted again.
+
     :Parameters:
       - `bin_content`: Binarized content to convert.
-      - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program.
+      - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program, or
+        :data:`NATIVE_CONVERTER` to convert it with :func:`dayz_dev_tools.config_bin.bin_to_cpp`.
 
     :Returns:
       The unbinarized content.
     """
-    return _run(executable, _Mode.TXT, bin_content)
+    return _run(executable, Mode.TXT, bin_content)
 
 
 def cpp_to_bin(cpp_content: bytes, executable: str) -> bytes:
     """Convert unbinarized config.cpp content to binarized content.
 
+    Conversions are cached in the :func:`dayz_dev_tools.conversion_cache.default_cache`, so
+    content that was converted before by the same converter is not converted again.
+
     :Parameters:
       - `cpp_content`: Unbinarized content to convert.
-      - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program.
+      - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program, or
+        :data:`NATIVE_CONVERTER` to convert it with
+        :func:`dayz_dev_tools.config_parser.cpp_to_bin`.
 
     :Returns:
       The binarized content.
     """
-    return _run(executable, _Mode.BIN, cpp_content)
+    return _run(executable, Mode.BIN, cpp_content)
+
+
+def _convert_staged(
+    executable: str, mode: Mode, in_bytes: bytes, stagedir: str, name: str
+) -> bytes:
+    if executable == NATIVE_CONVERTER:
+        return _convert(executable, mode, in_bytes)
+
+    in_path = os.path.join(stagedir, f"{name}.in")
+    out_path = os.path.join(stagedir, f"{name}.out")
+
+    try:
+        with open(in_path, "wb") as infile:
+            infile.write(in_bytes)
+
+        # Output is captured, so that the output of concurrent conversions is not interleaved
+        subprocess.run(
+            _command(executable, mode, in_path, out_path), check=True, capture_output=True)
+
+        with open(out_path, "rb") as outfile:
+            return outfile.read()
+    finally:
+        # Staged files are removed as soon as possible, since they may be held in memory
+        for path in (in_path, out_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def convert_many(
+    items: list[bytes],
+    mode: Mode,
+    executable: str,
+    jobs: typing.Optional[int] = None
+) -> list[Conversion]:
+    """Convert many configs concurrently.
+
+    Inputs and outputs of ``CfgConvert.exe`` are staged in a single temporary directory, which is
+    created in ``/dev/shm`` when it is available so that they are held in memory. A conversion
+    that fails does not stop the others. As for :func:`bin_to_cpp` and :func:`cpp_to_bin`,
+    conversions are cached in the :func:`dayz_dev_tools.conversion_cache.default_cache`.
+
+    :Parameters:
+      - `items`: The contents to convert.
+      - `mode`: The direction of the conversions.
+      - `executable`: The location of the DayZ Tools ``CfgConvert.exe`` program, or
+        :data:`NATIVE_CONVERTER` to convert them natively.
+      - `jobs`: The maximum number of configs to convert at once, or ``None`` to use the
+        ``concurrent.futures.ThreadPoolExecutor`` default.
+
+    :Returns:
+      A list of :class:`Conversion` instances, in the same order as `items`.
+    """
+    cache = conversion_cache.default_cache()
+    converter = _converter_identity(executable)
+
+    results: list[typing.Optional[Conversion]] = [None] * len(items)
+    keys: dict[int, str] = {}
+    pending = []
+
+    for index, in_bytes in enumerate(items):
+        if cache is not None and converter is not None:
+            key = conversion_cache.cache_key(in_bytes, mode.value, converter)
+            cached = cache.get(key)
+
+            if cached is not None:
+                results[index] = Conversion(cached)
+                continue
+
+            keys[index] = key
+
+        pending.append(index)
+
+    logging.debug("Converting %d of %d configs", len(pending), len(items))
+
+    if len(pending) > 0:
+        # Each conversion waits on its own process, so threads run conversions in parallel
+        with tempfile.TemporaryDirectory(dir=_staging_directory()) as stagedir, \
+                futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            submitted = [
+                (index, executor.submit(
+                    _convert_staged, executable, mode, items[index], stagedir, str(index)))
+                for index in pending
+            ]
+
+            for index, future in submitted:
+                try:
+                    out_bytes = future.result()
+                except Exception as error:
+                    results[index] = Conversion(None, error)
+                    continue
+
+                if cache is not None and index in keys:
+                    cache.put(keys[index], out_bytes)
+
+                results[index] = Conversion(out_bytes)
+
+    return typing.cast(list[Conversion], results)
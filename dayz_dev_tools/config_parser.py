@@ -0,0 +1,254 @@
+import math
+import re
+import typing
+
+from dayz_dev_tools import config_bin
+from dayz_dev_tools import misc
+
+
+class UnsupportedConfig(Exception):
+    """Raised by :func:`parse` for configs using features that only ``CfgConvert.exe`` supports,
+    such as preprocessor directives."""
+
+
+# Unquoted values may contain spaces, so they are read from the text rather than as tokens
+_TOKEN_RE = re.compile(
+    r'(?:\s+|//[^\n]*|/\*.*?\*/)*'
+    r'(?:(?P<string>"(?:[^"]|"")*")'
+    r'|(?P<name>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|(?P<symbol>\+=|[{}\[\];:,=#])'
+    r'|(?P<other>[^\s{}\[\];:,="#/]+|/)'
+    r'|(?P<end>$)'
+    r'|(?P<invalid>.))',
+    re.DOTALL)
+_INT_RE = re.compile(r"[+-]?(?:0[xX][0-9A-Fa-f]+|[0-9]+)")
+_FLOAT_RE = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+_SCALAR_END_RE = re.compile(r"[^;]*")
+_ITEM_END_RE = re.compile(r"[^,;{}]*")
+
+# The largest magnitude of a binarized float, which is single precision
+_FLOAT32_MAX = 3.4028234663852886e38
+
+
+def _tokenize(text: str) -> list[tuple[str, str, int]]:
+    # Each match is one token, after any spaces and comments before it
+    tokens: list[tuple[str, str, int]] = [
+        (kind, match.group(kind), match.start(kind))
+        for match in _TOKEN_RE.finditer(text)
+        if (kind := typing.cast(str, match.lastgroup))
+    ]
+
+    for kind, value, pos in tokens:
+        if kind == "invalid":
+            line = text.count("\n", 0, pos) + 1
+            raise Exception(f"Invalid config.cpp at line {line}: unexpected `{value}`")
+        elif value == "#" and kind == "symbol":
+            line = text.count("\n", 0, pos) + 1
+            raise UnsupportedConfig(f"Preprocessor directive at line {line} is not supported")
+
+    return tokens
+
+
+def _number(raw: str) -> typing.Optional[typing.Union[int, float]]:
+    if _INT_RE.fullmatch(raw):
+        return int(raw, 16) if "x" in raw.lower() else int(raw)
+    elif _FLOAT_RE.fullmatch(raw):
+        return float(raw)
+
+    return None
+
+
+def _encodable(number: typing.Union[int, float]) -> bool:
+    if isinstance(number, int):
+        return -0x8000000000000000 <= number <= 0x7fffffffffffffff
+
+    return math.isfinite(number) and abs(number) <= _FLOAT32_MAX
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def error(self, message: str) -> Exception:
+        pos = self.tokens[self.index][2]
+        line = self.text.count("\n", 0, pos) + 1
+        return Exception(f"Invalid config.cpp at line {line}: {message}")
+
+    def accept(self, symbol: str) -> bool:
+        if self.tokens[self.index][1] == symbol:
+            self.index += 1
+            return True
+
+        return False
+
+    def expect(self, symbol: str) -> None:
+        if not self.accept(symbol):
+            raise self.error(f"expected `{symbol}`")
+
+    def name(self) -> str:
+        kind, value, _ = self.tokens[self.index]
+        if kind != "name":
+            raise self.error("expected a name")
+
+        self.index += 1
+        return value
+
+    def value(self, end_re: re.Pattern[str]) -> config_bin.Value:
+        kind, value, pos = self.tokens[self.index]
+
+        if kind == "string":
+            self.index += 1
+            return value[1:-1].replace('""', '"')
+
+        # Unquoted values end at the next delimiter, after any number of tokens
+        end = typing.cast(re.Match[str], end_re.match(self.text, pos)).end()
+        raw = self.text[pos:end].strip()
+        number = _number(raw) if kind == "other" else None
+
+        if number is not None and not _encodable(number):
+            raise self.error(f"number out of range `{raw}`")
+
+        while self.tokens[self.index][2] < end:
+            self.index += 1
+
+        return raw if number is None else number
+
+    def array(self) -> list[config_bin.Value]:
+        self.expect("{")
+        items: list[config_bin.Value] = []
+
+        while not self.accept("}"):
+            if self.tokens[self.index][1] == "{":
+                items.append(self.array())
+            else:
+                items.append(self.value(_ITEM_END_RE))
+
+            if not self.accept(","):
+                self.expect("}")
+                break
+
+        return items
+
+    def entries(self, end: typing.Optional[str]) -> list[config_bin.Entry]:
+        entries: list[config_bin.Entry] = []
+
+        while True:
+            kind, value, _ = self.tokens[self.index]
+
+            if kind == "end":
+                if end is not None:
+                    raise self.error(f"expected `{end}`")
+
+                return entries
+            elif value == end:
+                self.index += 1
+                return entries
+            elif kind == "name" and value == "class":
+                self.index += 1
+                entries.append(self.class_entry())
+            elif kind == "name" and value == "delete":
+                self.index += 1
+                entries.append(config_bin.ConfigDelete(self.name()))
+            else:
+                entries.append(self.property())
+
+            self.expect(";")
+
+    def class_entry(self) -> config_bin.Entry:
+        name = self.name()
+        base = self.name() if self.accept(":") else None
+
+        if not self.accept("{"):
+            if base is not None:
+                raise self.error("expected `{`")
+
+            return config_bin.ConfigExtern(name)
+
+        return config_bin.ConfigClass(name, base, self.entries("}"))
+
+    def property(self) -> config_bin.ConfigProperty:
+        name = self.name()
+
+        if self.accept("["):
+            self.expect("]")
+            append = self.accept("+=")
+            if not append:
+                self.expect("=")
+
+            return config_bin.ConfigProperty(name, self.array(), append=append)
+
+        self.expect("=")
+
+        return config_bin.ConfigProperty(name, self.value(_SCALAR_END_RE))
+
+    def enums(self) -> list[tuple[str, int]]:
+        enums = []
+        value = 0
+
+        while self.tokens[self.index][1] == "enum":
+            self.index += 1
+            self.expect("{")
+
+            while not self.accept("}"):
+                name = self.name()
+
+                if self.accept("="):
+                    parsed = self.value(_ITEM_END_RE)
+                    if not isinstance(parsed, int):
+                        raise self.error("expected an integer")
+                    if not -0x80000000 <= parsed <= 0x7fffffff:
+                        raise self.error(f"enum value out of range `{parsed}`")
+                    value = parsed
+
+                enums.append((name, value))
+                value += 1
+
+                if not self.accept(","):
+                    self.expect("}")
+                    break
+
+            self.expect(";")
+
+        return enums
+
+
+def parse(cpp_content: bytes) -> config_bin.Config:
+    """Parse unbinarized config content, such as a ``config.cpp`` file.
+
+    Comments are ignored. Unquoted values are read as numbers if possible, or as strings
+    otherwise. Preprocessor directives, such as ``#include`` and ``#define``, are not supported.
+
+    :Parameters:
+      - `cpp_content`: The unbinarized content.
+
+    :Returns:
+      A :class:`~dayz_dev_tools.config_bin.Config` instance representing the content.
+
+    :Raises:
+      - `UnsupportedConfig`: If the content contains preprocessor directives.
+      - `Exception`: If the content is not a valid config.
+    """
+    text = config_bin.decode_text(cpp_content.removeprefix(b"\xef\xbb\xbf"))
+    with misc.gc_paused():
+        parser = _Parser(text)
+        enums = parser.enums()
+
+        return config_bin.Config(parser.entries(None), enums)
+
+
+def cpp_to_bin(cpp_content: bytes) -> bytes:
+    """Convert unbinarized config content to binarized content, without ``CfgConvert.exe``.
+
+    :Parameters:
+      - `cpp_content`: Unbinarized content to convert.
+
+    :Returns:
+      The binarized content.
+
+    :Raises:
+      - `UnsupportedConfig`: If the content contains preprocessor directives.
+      - `Exception`: If the content is not a valid config.
+    """
+    return config_bin.write(parse(cpp_content))
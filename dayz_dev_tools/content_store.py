@@ -0,0 +1,117 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+def content_key(data: bytes, size: int) -> str:
+    """Get the key identifying the contents of a file contained within a PBO archive.
+
+    The key is derived from the file's data as stored in the PBO archive, so files can be found in
+    a :class:`ContentStore` without first being decompressed.
+
+    :Parameters:
+      - `data`: The stored data of the file, as returned by
+        :meth:`dayz_dev_tools.pbo_file.PBOFile.read_data`.
+      - `size`: The unpacked size of the file (see
+        :meth:`dayz_dev_tools.pbo_file.PBOFile.unpacked_size`).
+
+    :Returns:
+      A string identifying the contents of the file.
+    """
+    return f"{hashlib.sha1(data).hexdigest()}-{size}"
+
+
+class ContentStore:
+    """A directory of previously extracted file contents, keyed by :func:`content_key`.
+
+    Extracted files are hard linked into output directories, so byte-identical files that are
+    extracted repeatedly, such as those shared by different versions of a mod, occupy disk space
+    only once and need not be decompressed or written again. Where hard links are not possible,
+    such as when the store and the output directory are on different file systems, files are
+    copied instead.
+
+    .. warning:: Hard linked files share their contents with the store and with every other
+       output directory they are linked into. Modifying an extracted file in place modifies all of
+       them.
+    """
+    def __init__(self, directory: str) -> None:
+        """Create a new :class:`ContentStore` instance.
+
+        :Parameters:
+          - `directory`: The directory containing the store. It is created if it does not exist.
+        """
+        self.directory = directory
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Get the location of stored contents.
+
+        :Parameters:
+          - `key`: The key identifying the contents.
+
+        :Returns:
+          The location of the file containing the contents within the store.
+        """
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def link(self, key: str, path: str) -> bool:
+        """Provide a file from stored contents, replacing the file if it already exists.
+
+        :Parameters:
+          - `key`: The key identifying the contents of the file.
+          - `path`: The location of the file to provide.
+
+        :Returns:
+          True if the contents were found in the store and the file was provided, or False
+          otherwise.
+        """
+        stored = self.path(key)
+
+        if not os.path.exists(stored):
+            return False
+
+        _remove(path)
+
+        try:
+            os.link(stored, path)
+        except OSError:
+            shutil.copyfile(stored, path)
+
+        return True
+
+    def add(self, key: str, path: str) -> None:
+        """Add the contents of a file to the store, if they are not already stored.
+
+        :Parameters:
+          - `key`: The key identifying the contents of the file.
+          - `path`: The location of the file.
+        """
+        stored = self.path(key)
+
+        os.makedirs(os.path.dirname(stored), exist_ok=True)
+
+        try:
+            os.link(path, stored)
+        except FileExistsError:
+            pass
+        except OSError:
+            # Copies are written to a temporary file first, so that incomplete contents can never
+            # be linked into an output directory
+            fd, temporary = tempfile.mkstemp(dir=os.path.dirname(stored))
+            os.close(fd)
+
+            try:
+                shutil.copyfile(path, temporary)
+                os.replace(temporary, stored)
+            except BaseException:
+                _remove(temporary)
+                raise
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
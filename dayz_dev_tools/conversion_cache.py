@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+import typing
+
+
+#: The environment variable choosing the directory of the default :class:`ConversionCache`. When
+#: it is set to an empty string, conversions are not cached.
+CACHE_ENV_VAR = "DAYZ_DEV_TOOLS_CACHE"
+
+#: The default maximum total size, in bytes, of the converted configs kept in a cache
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+_default_cache: typing.Optional["ConversionCache"] = None
+
+
+def cache_key(in_bytes: bytes, mode: str, converter: str) -> str:
+    """Get the key identifying the result of a config conversion.
+
+    :Parameters:
+      - `in_bytes`: The content to convert.
+      - `mode`: The direction of the conversion, e.g. ``"-bin"`` or ``"-txt"``.
+      - `converter`: A string identifying the converter, which changes when the converter does.
+
+    :Returns:
+      A string identifying the converted content.
+    """
+    digest = hashlib.sha256(f"{mode}\0{converter}\0".encode("utf-8", "surrogateescape"))
+    digest.update(in_bytes)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """A directory of previously converted configs, keyed by :func:`cache_key`.
+
+    When the converted configs in the cache grow larger than the maximum size, the least recently
+    used configs are removed until the cache is no larger than 90% of the maximum size, so that
+    the cache is not scanned again by every addition.
+    """
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Create a new :class:`ConversionCache` instance.
+
+        :Parameters:
+          - `directory`: The directory containing the cache. It is created if it does not exist.
+          - `max_size`: The maximum total size, in bytes, of the converted configs to keep.
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+        # The total size of the cached content is found by the first addition
+        self._size: typing.Optional[int] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Get the location of a cached conversion.
+
+        :Parameters:
+          - `key`: The key identifying the converted content.
+
+        :Returns:
+          The location of the file containing the converted content within the cache.
+        """
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        """Get cached converted content, marking it as recently used.
+
+        :Parameters:
+          - `key`: The key identifying the converted content.
+
+        :Returns:
+          The converted content, or None if it is not in the cache.
+        """
+        path = self.path(key)
+
+        try:
+            with open(path, "rb") as cached:
+                content = cached.read()
+
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            logging.debug("Ignoring unreadable cached conversion `%s`: %s", path, error)
+            return None
+
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        """Add converted content to the cache, then remove the least recently used content if the
+        cache is larger than its maximum size.
+
+        Content that cannot be written to the cache is skipped with a warning.
+
+        :Parameters:
+          - `key`: The key identifying the converted content.
+          - `content`: The converted content.
+        """
+        path = self.path(key)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Content is written to a temporary file first, so that incomplete content can never
+            # be read from the cache
+            fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+
+            try:
+                with os.fdopen(fd, "wb") as out_file:
+                    out_file.write(content)
+
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+
+                os.replace(temporary, path)
+            except BaseException:
+                _remove(temporary)
+                raise
+        except OSError as error:
+            logging.warning("Unable to cache conversion `%s`: %s", path, error)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self.evict()
+            else:
+                self._size += len(content) - replaced
+
+                if self._size > self.max_size:
+                    self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used content until the cache is no larger than 90% of its
+        maximum size, if it is larger than its maximum size."""
+        entries = []
+
+        for subdir in os.scandir(self.directory):
+            if subdir.is_dir():
+                for entry in os.scandir(subdir.path):
+                    try:
+                        info = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    entries.append((info.st_mtime_ns, info.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+
+        if total > self.max_size:
+            for _, size, path in sorted(entries):
+                if total <= self.max_size * 9 // 10:
+                    break
+
+                _remove(path)
+                total -= size
+
+        self._size = total
+
+
+def default_directory() -> typing.Optional[str]:
+    """Get the directory of the default :class:`ConversionCache`.
+
+    The directory is chosen by the :data:`CACHE_ENV_VAR` environment variable, if it is set.
+    Otherwise, it is ``dayz-dev-tools\\conversions`` in the ``%LOCALAPPDATA%`` directory on
+    Windows or ``dayz-dev-tools/conversions`` in the ``$XDG_CACHE_HOME`` (default:
+    ``~/.cache``) directory elsewhere.
+
+    :Returns:
+      The directory of the default cache, or None if conversions are not cached.
+    """
+    directory = os.environ.get(CACHE_ENV_VAR)
+
+    if directory is not None:
+        return directory or None
+
+    if sys.platform == "win32" and "LOCALAPPDATA" in os.environ:
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base, "dayz-dev-tools", "conversions")
+
+
+def default_cache() -> typing.Optional[ConversionCache]:
+    """Get the cache used by :func:`dayz_dev_tools.config_cpp.bin_to_cpp` and
+    :func:`dayz_dev_tools.config_cpp.cpp_to_bin`.
+
+    :Returns:
+      A :class:`ConversionCache` instance in the :func:`default_directory`, or None if
+      conversions are not cached or the directory cannot be created.
+    """
+    global _default_cache
+
+    directory = default_directory()
+
+    if directory is None:
+        return None
+
+    if _default_cache is None or _default_cache.directory != directory:
+        try:
+            _default_cache = ConversionCache(directory)
+        except OSError as error:
+            logging.warning("Unable to create conversion cache `%s`: %s", directory, error)
+            return None
+
+    return _default_cache
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,262 @@
+import argparse
+from concurrent import futures
+import contextlib
+import dataclasses
+import logging
+import os
+import sys
+import typing
+
+import dayz_dev_tools
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import content_store
+from dayz_dev_tools import extract_pbo
+from dayz_dev_tools import extraction_journal
+from dayz_dev_tools import extraction_sink
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import logging_configuration
+from dayz_dev_tools import memory_budget
+from dayz_dev_tools import pbo_reader
+from dayz_dev_tools import tools_directory
+
+
+def _addons_directory(mod_directory: str) -> typing.Optional[str]:
+    with os.scandir(mod_directory) as entries:
+        for entry in entries:
+            if entry.name.lower() == "addons" and entry.is_dir():
+                return entry.path
+
+    return None
+
+
+def find_pbos(directory: str) -> list[str]:
+    """Find the PBO archives in a mod directory (e.g. ``@CF``), or in every mod directory
+    contained in a directory such as the DayZ ``!Workshop`` directory.
+
+    :Parameters:
+      - `directory`: A mod directory or a directory containing mod directories.
+
+    :Returns:
+      A sorted list of the filenames of PBO archives found in the ``addons`` directories of the
+      mods.
+    """
+    addons = _addons_directory(directory)
+
+    if addons is not None:
+        addons_directories = [addons]
+    else:
+        with os.scandir(directory) as entries:
+            addons_directories = [
+                addons for entry in entries
+                if entry.is_dir() and (addons := _addons_directory(entry.path)) is not None
+            ]
+
+    pbos: list[str] = []
+
+    for addons in addons_directories:
+        with os.scandir(addons) as entries:
+            pbos.extend(
+                entry.path for entry in entries
+                if entry.name.lower().endswith(".pbo") and entry.is_file())
+
+    return sorted(pbos)
+
+
+def _extract_one(
+    filename: str,
+    sink: extraction_sink.ExtractionSink,
+    *,
+    verbose: bool,
+    deobfuscate: bool,
+    cfgconvert: typing.Optional[str],
+    matcher: typing.Optional[file_matcher.FileMatcher],
+    store: typing.Optional[content_store.ContentStore],
+    journal: typing.Optional[extraction_journal.ExtractionJournal],
+    budget: typing.Optional[memory_budget.MemoryBudget]
+) -> extract_pbo.ExtractionStatistics:
+    logging.info("Extracting %s", filename)
+
+    with open(filename, "rb") as pbo_file:
+        session = extract_pbo.ExtractionSession(
+            pbo_reader.PBOReader(pbo_file),
+            verbose=verbose, deobfuscate=deobfuscate, cfgconvert=cfgconvert, sink=sink,
+            store=store, journal=journal, budget=budget)
+
+        session.extract([], matcher=matcher)
+
+        return session.statistics
+
+
+def extract_mods(
+    directories: list[str],
+    output_directory: str,
+    *,
+    verbose: bool,
+    deobfuscate: bool,
+    cfgconvert: typing.Optional[str],
+    matcher: typing.Optional[file_matcher.FileMatcher] = None,
+    jobs: typing.Optional[int] = None,
+    store: typing.Optional[content_store.ContentStore] = None,
+    journal: typing.Optional[extraction_journal.ExtractionJournal] = None,
+    max_memory: typing.Optional[int] = None
+) -> extract_pbo.ExtractionStatistics:
+    """Extract the contents of every PBO archive in one or more mods into a single directory tree.
+
+    Each PBO archive's files are extracted beneath a path given by the archive's prefix, in the
+    same way that a ``P:`` drive is populated. Archives are extracted concurrently by a shared pool
+    of worker threads, all writing through one
+    :class:`~dayz_dev_tools.extraction_sink.DirectorySink`.
+
+    :Parameters:
+      - `directories`: Mod directories, or directories containing mod directories (see
+        :func:`find_pbos`).
+      - `output_directory`: The directory where extracted files are to be written.
+      - `verbose`: When `True`, print the paths of the files being extracted to stdout.
+      - `deobfuscate`: When `True`, **attempt** to deobfuscate obfuscated script files.
+      - `cfgconvert`: Location of the DayZ Tools CfgConvert.exe binary,
+        :data:`~dayz_dev_tools.config_cpp.NATIVE_CONVERTER` to convert binarized configs
+        natively, or None if binarized configs should not be converted.
+      - `matcher`: Only extract files selected by this
+        :class:`~dayz_dev_tools.file_matcher.FileMatcher`, or None if all files should be
+        extracted.
+      - `jobs`: The maximum number of PBO archives to extract concurrently, or None to use the
+        ``concurrent.futures.ThreadPoolExecutor`` default.
+      - `store`: A :class:`~dayz_dev_tools.content_store.ContentStore` used to provide previously
+        extracted contents, or None if all files should be written.
+      - `journal`: An :class:`~dayz_dev_tools.extraction_journal.ExtractionJournal` used to resume
+        an interrupted extraction, or None if all files should be extracted. When provided, files
+        are written atomically.
+      - `max_memory`: The maximum number of bytes of file contents to hold in memory at once,
+        across all PBO archives being extracted, or None for no limit.
+
+    :Returns:
+      An :class:`~dayz_dev_tools.extract_pbo.ExtractionStatistics` describing the files extracted
+      from all PBO archives.
+
+    :Raises:
+      Exception if any PBO archive could not be extracted. All other PBO archives are extracted
+      regardless.
+    """
+    filenames = [filename for directory in directories for filename in find_pbos(directory)]
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    sink = extraction_sink.DirectorySink(output_directory, atomic=journal is not None)
+    budget = None if max_memory is None else memory_budget.MemoryBudget(max_memory)
+    totals = extract_pbo.ExtractionStatistics()
+    failures = 0
+
+    with futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = {
+            executor.submit(
+                _extract_one, filename, sink, verbose=verbose, deobfuscate=deobfuscate,
+                cfgconvert=cfgconvert, matcher=matcher, store=store, journal=journal,
+                budget=budget): filename
+            for filename in filenames
+        }
+
+        for future in futures.as_completed(pending):
+            try:
+                statistics = future.result()
+            except Exception as error:
+                logging.debug("Extraction of %s failed", pending[future], exc_info=True)
+                logging.error("Failed to extract %s: %s", pending[future], error)
+                failures += 1
+                continue
+
+            for field in dataclasses.fields(totals):
+                setattr(
+                    totals, field.name,
+                    getattr(totals, field.name) + getattr(statistics, field.name))
+
+    logging.info(
+        "Extracted %d files (%d bytes) from %d PBO archives",
+        totals.extracted, totals.bytes_written, len(filenames) - failures)
+
+    if failures > 0:
+        raise Exception(f"Failed to extract {failures} of {len(filenames)} PBO archives")
+
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Extract every PBO archive in one or more mods into a single directory tree,"
+        " laid out by PBO prefix")
+    parser.register("type", "size", memory_budget.parse_size)
+    parser.add_argument(
+        "-b", "--no-convert", action="store_true",
+        help="Do not convert config.bin files to config.cpp files")
+    parser.add_argument(
+        "-d", "--deobfuscate", action="store_true", help="Attempt to deobfuscate extracted files")
+    parser.add_argument(
+        "-j", "--jobs", type=int, metavar="N", help="Extract up to N PBO archives at once")
+    parser.add_argument(
+        "-m", "--match", action="append", metavar="GLOB",
+        help="Extract only files matching glob pattern (may be repeated)")
+    parser.add_argument(
+        "-x", "--exclude", action="append", metavar="GLOB",
+        help="Do not extract files matching glob pattern (may be repeated)")
+    parser.add_argument(
+        "--match-regex", action="append", metavar="REGEX",
+        help="Extract only files matching regular expression (may be repeated)")
+    parser.add_argument(
+        "--exclude-regex", action="append", metavar="REGEX",
+        help="Do not extract files matching regular expression (may be repeated)")
+    parser.add_argument(
+        "-o", "--output", default=".", metavar="DIR",
+        help="Extract files into directory DIR (default: current directory)")
+    parser.add_argument(
+        "-s", "--store", metavar="DIR",
+        help="Hard link extracted files to identical contents kept in content store DIR, adding"
+        " new contents to the store")
+    parser.add_argument(
+        "--journal", metavar="FILE",
+        help="Record extracted files in journal FILE and skip files already recorded there,"
+        " resuming an interrupted extraction")
+    parser.add_argument(
+        "--max-memory", type="size", metavar="SIZE",
+        help="Hold at most SIZE bytes of file contents in memory at once (e.g. 512M)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
+    parser.add_argument("-D", "--debug", action="store_true", help="Enable debug logs")
+    parser.add_argument("-V", "--version", action="version", version=dayz_dev_tools.version)
+    parser.add_argument(
+        "directories", nargs="+", metavar="DIRECTORY",
+        help="A mod directory, or a directory containing mod directories, such as !Workshop")
+    args = parser.parse_args()
+
+    # Obfuscated files sometimes use characters that are incompatible with the terminal's encoding
+    sys.stdout.reconfigure(errors="replace")  # type: ignore[union-attr]
+    sys.stderr.reconfigure(errors="replace")  # type: ignore[union-attr]
+
+    logging_configuration.configure_logging(debug=args.debug)
+
+    try:
+        cfgconvert = None
+        if args.no_convert is False:
+            cfgconvert = config_cpp.default_converter(tools_directory.tools_directory())
+
+        with contextlib.ExitStack() as stack:
+            journal = None
+            if args.journal is not None:
+                journal = stack.enter_context(extraction_journal.ExtractionJournal(args.journal))
+
+            extract_mods(
+                args.directories, args.output,
+                verbose=args.verbose, deobfuscate=args.deobfuscate, cfgconvert=cfgconvert,
+                matcher=file_matcher.create(
+                    include=args.match, exclude=args.exclude, include_regex=args.match_regex,
+                    exclude_regex=args.exclude_regex),
+                jobs=args.jobs,
+                store=None if args.store is None else content_store.ContentStore(args.store),
+                journal=journal,
+                max_memory=args.max_memory)
+
+    except Exception as error:
+        logging.debug("Uncaught exception in main", exc_info=True)
+        logging.error("%s: %s", type(error).__name__, error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
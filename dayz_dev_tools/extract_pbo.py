@@ -1,11 +1,17 @@
+from concurrent import futures
+import contextlib
+import dataclasses
 import io
-import fnmatch
 import os
-import pathlib
 import re
 import typing
 
 from dayz_dev_tools import config_cpp
+from dayz_dev_tools import content_store
+from dayz_dev_tools import extraction_journal
+from dayz_dev_tools import extraction_sink
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import memory_budget
 from dayz_dev_tools import pbo_file
 from dayz_dev_tools import pbo_reader
 
@@ -14,103 +20,462 @@ OBFUSCATE_RE = re.compile(
     b'^(?:(?://[^\\r\\n]*|/\\*(?:\\*(?!\\/)|[^*])*\\*/)\\r\\n)?#include "([^"]+)"(?:\\r\\n)?$')
 
 
-_deobfs_count = 0
+def _select(
+    files: list[pbo_file.PBOFile],
+    pattern: typing.Optional[str],
+    matcher: typing.Optional[file_matcher.FileMatcher]
+) -> list[pbo_file.PBOFile]:
+    if pattern is not None:
+        files = file_matcher.FileMatcher(include=[pattern]).filter(files)
+
+    if matcher is not None:
+        files = matcher.filter(files)
+
+    return files
+
+
+@dataclasses.dataclass
+class ExtractionStatistics:
+    """Statistics collected by an :class:`ExtractionSession`."""
+    #: The number of files extracted
+    extracted: int = 0
+    #: The number of files skipped
+    skipped: int = 0
+    #: The number of ``config.bin`` files converted to ``config.cpp``
+    converted: int = 0
+    #: The number of script files renamed due to obfuscated filenames
+    renamed: int = 0
+    #: The number of bytes written
+    bytes_written: int = 0
+    #: The number of files provided by a content store instead of being written
+    linked: int = 0
+    #: The number of files not extracted because a journal shows they were already extracted
+    resumed: int = 0
+
+
+class ExtractionSession:
+    """State for extracting the contents of a single PBO archive.
+
+    All state needed while extracting, including the counter used to name deobfuscated files, is
+    held by the session, so separate sessions may safely be used concurrently to extract different
+    PBO archives within the same process.
+    """
+    def __init__(
+        self,
+        reader: pbo_reader.PBOReader,
+        *,
+        verbose: bool,
+        deobfuscate: bool,
+        cfgconvert: typing.Optional[str],
+        output_directory: typing.Optional[str] = None,
+        sink: typing.Optional[extraction_sink.ExtractionSink] = None,
+        store: typing.Optional[content_store.ContentStore] = None,
+        journal: typing.Optional[extraction_journal.ExtractionJournal] = None,
+        budget: typing.Optional[memory_budget.MemoryBudget] = None
+    ) -> None:
+        """Create a new :class:`ExtractionSession` instance.
+
+        :Parameters:
+          - `reader`: A :class:`~dayz_dev_tools.pbo_reader.PBOReader` instance representing the
+            PBO archive containing the file(s) to be extracted.
+          - `verbose`: When `True`, print the paths of the files being extracted to stdout.
+          - `deobfuscate`: When `True`, **attempt** to deobfuscate obfuscated script files.
+          - `cfgconvert`: Location of the DayZ Tools CfgConvert.exe binary,
+            :data:`~dayz_dev_tools.config_cpp.NATIVE_CONVERTER` to convert binarized configs
+            natively, or None if binarized configs should not be converted.
+          - `output_directory`: The directory where extracted files are to be written, or None if
+            they should be written relative to the current working directory. Ignored if `sink`
+            is provided.
+          - `sink`: An :class:`~dayz_dev_tools.extraction_sink.ExtractionSink` where extracted
+            files are to be written, or None if they should be written to `output_directory`.
+          - `store`: A :class:`~dayz_dev_tools.content_store.ContentStore` used to provide
+            previously extracted contents, or None if all files should be written. Files that
+            are converted or deobfuscated are always written.
+          - `journal`: An :class:`~dayz_dev_tools.extraction_journal.ExtractionJournal` used to
+            record extracted files and to skip files already extracted by an earlier, interrupted
+            extraction, or None if all files should be extracted. If no `sink` is provided, files
+            are written atomically.
+          - `budget`: A :class:`~dayz_dev_tools.memory_budget.MemoryBudget` limiting the memory
+            used to hold file contents, or None for no limit. Uncompressed files are copied in
+            chunks when a budget is provided. A budget may be shared by concurrent sessions.
+
+        :Raises:
+          Exception if `store` or `journal` is provided and `sink` is not a
+          :class:`~dayz_dev_tools.extraction_sink.DirectorySink`.
+        """
+        self.reader = reader
+        self.verbose = verbose
+        self.deobfuscate = deobfuscate
+        self.cfgconvert = cfgconvert
+        #: Destination for extracted files
+        self.sink = extraction_sink.DirectorySink(
+            output_directory, atomic=journal is not None) if sink is None else sink
+        #: Store of previously extracted contents, if any
+        self.store = store
+        #: Journal of extracted files, if any
+        self.journal = journal
+        #: Limit on the memory used to hold file contents, if any
+        self.budget = budget
+        #: Counter used to uniquely name deobfuscated script files
+        self.deobfs_count = 0
+        #: Raw filenames of files found to be the targets of obfuscated includes
+        self.ignored: set[bytes] = set()
+        #: Statistics for files extracted using this session
+        self.statistics = ExtractionStatistics()
+
+        if store is not None and not isinstance(self.sink, extraction_sink.DirectorySink):
+            raise Exception("A content store can only be used when extracting to a directory")
+
+        # Files extracted into an archive cannot be kept when extraction is interrupted
+        if journal is not None and not isinstance(self.sink, extraction_sink.DirectorySink):
+            raise Exception("A journal can only be used when extracting to a directory")
+
+    def extract(
+        self,
+        files_to_extract: list[str],
+        *,
+        pattern: typing.Optional[str] = None,
+        matcher: typing.Optional[file_matcher.FileMatcher] = None
+    ) -> None:
+        """Extract one or more files contained in the PBO archive.
+
+        :Parameters:
+          - `files_to_extract`: A list of fully-qualified paths of the files to be extracted, or
+            an empty list if all files should be extracted.
+          - `pattern`: Only extract filenames matching this glob pattern, or None if all files
+            should be extracted. Ignored if `files_to_extract` is not empty.
+          - `matcher`: Only extract files selected by this
+            :class:`~dayz_dev_tools.file_matcher.FileMatcher`, or None if all files should be
+            extracted. Ignored if `files_to_extract` is not empty.
+        """
+        if len(files_to_extract) == 0:
+            for file in _select(self.reader.files(), pattern, matcher):
+                self._extract_file(file, self.ignored)
 
+        else:
+            for file_to_extract in files_to_extract:
+                pbofile = self.reader.file(file_to_extract)
 
-def _deobfuscate(
-    out_file: typing.BinaryIO,
-    pbofile: pbo_file.PBOFile,
-    reader: pbo_reader.PBOReader,
-    prefix: typing.Optional[bytes],
-    verbose: bool,
-    ignored: list[bytes]
-) -> bool:
-    buffer = io.BytesIO()
-    pbofile.unpack(buffer)
-    content = buffer.getvalue()
+                if pbofile is None:
+                    raise Exception(f"File not found: {file_to_extract}")
+
+                self._extract_file(pbofile, set())
+
+    def _deobfuscate(
+        self,
+        out_file: typing.BinaryIO,
+        pbofile: pbo_file.PBOFile,
+        prefix: typing.Optional[bytes],
+        ignored: set[bytes]
+    ) -> bool:
+        content, resolved = self._resolve_includes(pbofile, prefix, ignored)
 
-    if (match := OBFUSCATE_RE.match(content)) is None:
         out_file.write(content)
-        return True
+        self.statistics.bytes_written += len(content)
 
-    target_filename = match.group(1)
+        return resolved
 
-    if prefix is not None:
-        target_filename = target_filename.removeprefix(prefix + b"\\")
+    def _resolve_includes(
+        self,
+        pbofile: pbo_file.PBOFile,
+        prefix: typing.Optional[bytes],
+        ignored: set[bytes]
+    ) -> tuple[bytes, bool]:
+        buffer = io.BytesIO()
+        pbofile.unpack(buffer)
+        content = buffer.getvalue()
 
-    unobfuscated = reader.file(target_filename)
+        if (match := OBFUSCATE_RE.match(content)) is None:
+            return content, True
 
-    if unobfuscated is None:
-        out_file.write(content)
-        return False
+        target_filename = match.group(1)
 
-    ignored.append(unobfuscated.filename)
+        if prefix is not None:
+            target_filename = target_filename.removeprefix(prefix + b"\\")
 
-    return _deobfuscate(out_file, unobfuscated, reader, prefix, verbose, ignored)
+        unobfuscated = self.reader.file(target_filename)
 
+        if unobfuscated is None:
+            return content, False
 
-def _extract_file(
-    reader: pbo_reader.PBOReader, pbofile: pbo_file.PBOFile, verbose: bool, deobfuscate: bool,
-    cfgconvert: typing.Optional[str], ignored: list[bytes]
-) -> None:
-    global _deobfs_count
+        ignored.add(unobfuscated.filename)
 
-    if deobfuscate and (
-            (pbofile.filename in ignored)
-            or (pbofile.invalid() and not pbofile.filename.endswith(b".c"))):
-        if verbose:
-            print(f"Skipping obfuscation file: {pbofile.normalized_filename()}")
-        return
+        return self._resolve_includes(unobfuscated, prefix, ignored)
 
-    prefix = reader.prefix()
+    def _replay_deobfuscation(self, pbofile: pbo_file.PBOFile, ignored: set[bytes]) -> None:
+        # Files extracted before extraction was resumed still number the deobfuscated files after
+        # them and mark the targets of their includes to be skipped, as they did originally
+        if self.cfgconvert is not None and pbofile.split_filename()[-1].lower() == b"config.bin":
+            return
 
-    parts = pbofile.deobfuscated_split(_deobfs_count) if deobfuscate else pbofile.split_filename()
+        if pbofile.obfuscated():
+            self.deobfs_count += 1
 
-    if len(parts) == 0 or len(parts[-1]) == 0 or parts == [pbofile.prefix]:
-        print("Skipping empty obfuscation filename")
-        return
+        self._resolve_includes(pbofile, self.reader.prefix(), ignored)
 
-    if len(parts) > 1:
-        os.makedirs(os.path.join(*parts[:-1]), exist_ok=True)
+    def _extract_file(self, pbofile: pbo_file.PBOFile, ignored: set[bytes]) -> None:
+        if self.journal is not None and self.journal.completed(pbofile):
+            if self.deobfuscate:
+                self._replay_deobfuscation(pbofile, ignored)
 
-    if parts[-1].lower() == b"config.bin" and cfgconvert is not None:
-        converted_filename = os.path.join(
-            os.path.dirname(pbofile.normalized_filename()), "config.cpp")
+            if self.verbose:
+                print(f"Already extracted: {pbofile.normalized_filename()}")
+            self.statistics.resumed += 1
+            return
 
-        if verbose:
-            print(f"Converting {pbofile.normalized_filename()} -> {converted_filename}")
+        extracted = self.statistics.extracted
 
-        buffer = io.BytesIO()
-        pbofile.unpack(buffer)
-        try:
-            cpp_content = config_cpp.bin_to_cpp(buffer.getvalue(), cfgconvert)
-            with open(converted_filename, "w+b") as out_file:
-                out_file.write(cpp_content)
-                return
-        except Exception as error:
-            print(f"Failed to convert {pbofile.normalized_filename()}: {error}")
-
-    renamed_filename: typing.Optional[str] = None
-    normalized = pbofile.normalized_filename()
-
-    if deobfuscate and pbofile.obfuscated():
-        normalized = renamed_filename = pbofile.deobfuscated_filename(_deobfs_count)
-        _deobfs_count += 1
-
-    with open(normalized, "w+b") as out_file:
-        if verbose:
-            if renamed_filename is None:
+        if self.budget is None:
+            self._write_file(pbofile, ignored)
+        else:
+            with self.budget.reserve(self._memory_required(pbofile, self.budget)):
+                self._write_file(pbofile, ignored)
+
+        if self.journal is not None and self.statistics.extracted > extracted:
+            self.journal.record(pbofile)
+
+    def _memory_required(
+        self, pbofile: pbo_file.PBOFile, budget: memory_budget.MemoryBudget
+    ) -> int:
+        size = pbofile.unpacked_size()
+
+        if self.cfgconvert is not None and pbofile.split_filename()[-1].lower() == b"config.bin":
+            # Both the binarized and the converted config are held in memory
+            size *= 2
+        elif not self.deobfuscate and self.store is None and not pbofile.compressed():
+            size = min(size, budget.chunk_size())
+
+        if pbofile.compressed():
+            size += pbofile.data_size
+
+        return size
+
+    def _write_file(self, pbofile: pbo_file.PBOFile, ignored: set[bytes]) -> None:
+        if self.deobfuscate and (
+                (pbofile.filename in ignored)
+                or (pbofile.invalid() and not pbofile.filename.endswith(b".c"))):
+            if self.verbose:
+                print(f"Skipping obfuscation file: {pbofile.normalized_filename()}")
+            self.statistics.skipped += 1
+            return
+
+        prefix = self.reader.prefix()
+
+        if self.deobfuscate:
+            parts = pbofile.deobfuscated_split(self.deobfs_count)
+        else:
+            parts = pbofile.split_filename()
+
+        if len(parts) == 0 or len(parts[-1]) == 0 or (
+                pbofile.prefix is not None and parts == pbo_file.split_path(pbofile.prefix)):
+            print("Skipping empty obfuscation filename")
+            self.statistics.skipped += 1
+            return
+
+        if len(parts) > 1:
+            self.sink.makedirs(parts[:-1])
+
+        if parts[-1].lower() == b"config.bin" and self.cfgconvert is not None:
+            converted_filename = os.path.join(
+                os.path.dirname(pbofile.normalized_filename()), "config.cpp")
+
+            if self.verbose:
+                print(f"Converting {pbofile.normalized_filename()} -> {converted_filename}")
+
+            buffer = io.BytesIO()
+            pbofile.unpack(buffer)
+            bin_content = buffer.getvalue()
+            try:
+                cpp_content = config_cpp.bin_to_cpp(bin_content, self.cfgconvert)
+                with self.sink.open(
+                        converted_filename, mtime=pbofile.time_stamp,
+                        size=len(cpp_content)) as out_file:
+                    out_file.write(cpp_content)
+                    self.statistics.extracted += 1
+                    self.statistics.converted += 1
+                    self.statistics.bytes_written += len(cpp_content)
+                    return
+            except Exception as error:
+                print(f"Failed to convert {pbofile.normalized_filename()}: {error}")
+
+            # The file was already read from the PBO archive, so the unconverted content is
+            # written as it is
+            with self.sink.open(
+                    pbofile.normalized_filename(), mtime=pbofile.time_stamp,
+                    size=len(bin_content)) as out_file:
+                out_file.write(bin_content)
+
+            self.statistics.extracted += 1
+            self.statistics.bytes_written += len(bin_content)
+            return
+
+        renamed_filename: typing.Optional[str] = None
+        normalized = pbofile.normalized_filename()
+
+        if self.deobfuscate and pbofile.obfuscated():
+            normalized = renamed_filename = pbofile.deobfuscated_filename(self.deobfs_count)
+            self.deobfs_count += 1
+            self.statistics.renamed += 1
+
+        if self.store is not None and not self.deobfuscate:
+            if self.verbose:
                 print(f"Extracting {pbofile.normalized_filename()}")
+
+            self._extract_stored(pbofile, normalized, self.store)
+            self.statistics.extracted += 1
+            return
+
+        # Deobfuscated files may be rewritten, so their size is not known in advance
+        size = None if self.deobfuscate else pbofile.unpacked_size()
+
+        with self.sink.open(normalized, mtime=pbofile.time_stamp, size=size) as out_file:
+            if self.verbose:
+                if renamed_filename is None:
+                    print(f"Extracting {pbofile.normalized_filename()}")
+                else:
+                    print(f"Extracting {pbofile.normalized_filename()} -> {renamed_filename}")
+
+            if self.deobfuscate:
+                if not self._deobfuscate(out_file, pbofile, prefix, ignored):
+                    if self.verbose:
+                        print(f"Unable to deobfuscate {pbofile.normalized_filename()}")
+
             else:
-                print(f"Extracting {pbofile.normalized_filename()} -> {renamed_filename}")
+                if self.budget is None:
+                    pbofile.unpack(out_file)
+                else:
+                    pbofile.unpack(out_file, chunk_size=self.budget.chunk_size())
+                self.statistics.bytes_written += pbofile.unpacked_size()
 
-        if deobfuscate:
-            if not _deobfuscate(out_file, pbofile, reader, prefix, verbose, ignored):
-                if verbose:
-                    print(f"Unable to deobfuscate {pbofile.normalized_filename()}")
+        self.statistics.extracted += 1
 
-        else:
-            pbofile.unpack(out_file)
+    def _extract_stored(
+        self,
+        pbofile: pbo_file.PBOFile,
+        filename: str,
+        store: content_store.ContentStore
+    ) -> None:
+        assert isinstance(self.sink, extraction_sink.DirectorySink)
+
+        data = pbofile.read_data()
+        key = content_store.content_key(data, pbofile.unpacked_size())
+        path = self.sink.path(filename)
+
+        if store.link(key, path):
+            self.statistics.linked += 1
+            return
+
+        contents = pbofile.unpack_data(data)
+        del data
+
+        # An existing file may be linked to stored contents, which must not be overwritten
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+        with self.sink.open(filename, mtime=pbofile.time_stamp) as out_file:
+            out_file.write(contents)
+
+        self.statistics.bytes_written += len(contents)
+
+        store.add(key, path)
+
+
+def _unpack_into(
+    pbofile: pbo_file.PBOFile,
+    data: bytes,
+    target: memoryview,
+    budget: memory_budget.MemoryBudget,
+    reserved: int
+) -> None:
+    try:
+        contents = pbofile.unpack_data(data)
+        del data
+        target[:len(contents)] = contents
+    finally:
+        budget.release(reserved)
+
+
+def extract_to_memory(
+    reader: pbo_reader.PBOReader,
+    *,
+    pattern: typing.Optional[str] = None,
+    matcher: typing.Optional[file_matcher.FileMatcher] = None,
+    jobs: typing.Optional[int] = None,
+    max_memory: typing.Optional[int] = None
+) -> dict[str, memoryview]:
+    """Extract files contained in a PBO archive into memory.
+
+    The contents of all extracted files are stored in a single buffer. Compressed files are
+    decompressed in parallel by a pool of worker threads.
+
+    :Parameters:
+      - `reader`: A :class:`~dayz_dev_tools.pbo_reader.PBOReader` instance representing the PBO
+        archive containing the files to be extracted.
+      - `pattern`: Only extract filenames matching this glob pattern, or None if all files should
+        be extracted.
+      - `matcher`: Only extract files selected by this
+        :class:`~dayz_dev_tools.file_matcher.FileMatcher`, or None if all files should be
+        extracted.
+      - `jobs`: The maximum number of worker threads to use for decompression, or None to use the
+        ``concurrent.futures.ThreadPoolExecutor`` default.
+      - `max_memory`: The maximum number of bytes to use for the extracted contents and for data
+        being decompressed, or None for no limit.
+
+    :Returns:
+      A ``dict`` mapping the normalized filename of each extracted file (see
+      :meth:`dayz_dev_tools.pbo_file.PBOFile.normalized_filename`) to a ``memoryview`` of its
+      contents.
+
+    :Raises:
+      Exception if the extracted contents would exceed `max_memory` bytes.
+    """
+    files = _select(reader.files(), pattern, matcher)
+
+    total = sum(file.unpacked_size() for file in files)
+
+    if max_memory is not None and total > max_memory:
+        raise Exception(
+            f"Extracted contents ({total} bytes) would exceed memory limit ({max_memory} bytes)")
+
+    buffer = memoryview(bytearray(total))
+    budget = memory_budget.MemoryBudget(None if max_memory is None else max_memory - total)
+    result: dict[str, memoryview] = {}
+    pending: list[futures.Future[None]] = []
+    offset = 0
+
+    with futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for file in files:
+                target = buffer[offset:offset + file.unpacked_size()]
+                offset += file.unpacked_size()
+                result[file.normalized_filename()] = target
+
+                # The stored data is read on this thread, since reads from the PBO archive
+                # cannot be done concurrently
+                reserved = file.data_size + (file.unpacked_size() if file.compressed() else 0)
+                budget.acquire(reserved)
+
+                try:
+                    data = file.read_data()
+                except BaseException:
+                    budget.release(reserved)
+                    raise
+
+                if file.compressed():
+                    pending.append(
+                        executor.submit(_unpack_into, file, data, target, budget, reserved))
+                else:
+                    _unpack_into(file, data, target, budget, reserved)
+
+            for future in pending:
+                future.result()
+
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return result
 
 
 def extract_pbo(
@@ -120,8 +485,14 @@ def extract_pbo(
     verbose: bool,
     deobfuscate: bool,
     cfgconvert: typing.Optional[str],
-    pattern: typing.Optional[str] = None
-) -> None:
+    pattern: typing.Optional[str] = None,
+    matcher: typing.Optional[file_matcher.FileMatcher] = None,
+    output_directory: typing.Optional[str] = None,
+    sink: typing.Optional[extraction_sink.ExtractionSink] = None,
+    store: typing.Optional[content_store.ContentStore] = None,
+    journal: typing.Optional[extraction_journal.ExtractionJournal] = None,
+    max_memory: typing.Optional[int] = None
+) -> ExtractionStatistics:
     """Extract one or more files contained in a PBO archive.
 
     :Parameters:
@@ -130,30 +501,39 @@ def extract_pbo(
       - `files_to_extract`: A list of fully-qualified paths of the files to be extracted.
       - `verbose`: When `True`, print the paths of the files being extracted to stdout.
       - `deobfuscate`: When `True`, **attempt** to deobfuscate obfuscated script files.
-      - `cfgconvert`: Location of the DayZ Tools CfgConvert.exe binary, or None if binarized
-        configs should not be converted.
+      - `cfgconvert`: Location of the DayZ Tools CfgConvert.exe binary,
+        :data:`~dayz_dev_tools.config_cpp.NATIVE_CONVERTER` to convert binarized configs
+        natively, or None if binarized configs should not be converted.
       - `pattern`: Only extract filenames matching this glob pattern, or None if all files should
         be extracted.
+      - `matcher`: Only extract files selected by this
+        :class:`~dayz_dev_tools.file_matcher.FileMatcher`, or None if all files should be
+        extracted.
+      - `output_directory`: The directory where extracted files are to be written, or None if they
+        should be written relative to the current working directory. Ignored if `sink` is
+        provided.
+      - `sink`: An :class:`~dayz_dev_tools.extraction_sink.ExtractionSink`, such as a
+        :class:`~dayz_dev_tools.extraction_sink.ZipSink`, where extracted files are to be written,
+        or None if they should be written to `output_directory`. The sink is not closed.
+      - `store`: A :class:`~dayz_dev_tools.content_store.ContentStore` used to provide previously
+        extracted contents, or None if all files should be written. Requires extracting to a
+        directory.
+      - `journal`: An :class:`~dayz_dev_tools.extraction_journal.ExtractionJournal` used to resume
+        an interrupted extraction, or None if all files should be extracted. Requires extracting
+        to a directory.
+      - `max_memory`: The maximum number of bytes of file contents to hold in memory at once, or
+        None for no limit. A single file that cannot be copied in chunks may exceed the limit.
+
+    :Returns:
+      An :class:`ExtractionStatistics` describing the extracted files.
 
     .. note:: Deobfuscation may not always work, as obfuscation techniques may evolve over time.
     """
-    global _deobfs_count
-    _deobfs_count = 0
-
-    ignored: list[bytes] = []
-
-    if len(files_to_extract) == 0:
-        for file in reader.files():
-            if pattern is not None and not fnmatch.fnmatch(
-                    pathlib.PurePath(file.normalized_filename()).as_posix(), pattern):
-                continue
-            _extract_file(reader, file, verbose, deobfuscate, cfgconvert, ignored)
-
-    else:
-        for file_to_extract in files_to_extract:
-            pbofile = reader.file(file_to_extract)
+    session = ExtractionSession(
+        reader, verbose=verbose, deobfuscate=deobfuscate, cfgconvert=cfgconvert,
+        output_directory=output_directory, sink=sink, store=store, journal=journal,
+        budget=None if max_memory is None else memory_budget.MemoryBudget(max_memory))
 
-            if pbofile is None:
-                raise Exception(f"File not found: {file_to_extract}")
+    session.extract(files_to_extract, pattern=pattern, matcher=matcher)
 
-            _extract_file(reader, pbofile, verbose, deobfuscate, cfgconvert, [])
+    return session.statistics
@@ -0,0 +1,102 @@
+import json
+import threading
+import types
+import typing
+
+from dayz_dev_tools import pbo_file
+
+
+def _entry_key(pbofile: pbo_file.PBOFile) -> tuple[str, int, int, int]:
+    return (
+        pbofile.normalized_filename(), pbofile.data_size, pbofile.original_size,
+        pbofile.time_stamp)
+
+
+class ExtractionJournal:
+    """A record of the files that have been completely extracted, allowing an interrupted
+    extraction to be resumed.
+
+    The journal is a file containing one JSON object per line. Each line is written as soon as a
+    file has been extracted, so the journal remains valid however the extraction is interrupted.
+    Files are identified by their normalized filename, size and timestamp, so files that have
+    changed since they were recorded are extracted again.
+
+    A journal may be shared by concurrent extractions.
+    """
+    def __init__(self, path: str) -> None:
+        """Create a new :class:`ExtractionJournal` instance, loading any files already recorded.
+
+        :Parameters:
+          - `path`: The location of the journal file. It is created if it does not exist.
+        """
+        self._completed: set[tuple[str, int, int, int]] = set()
+        self._lock = threading.Lock()
+        terminated = True
+
+        try:
+            with open(path, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    terminated = line.endswith("\n")
+
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line may be incomplete if writing it was interrupted
+                        continue
+
+                    self._completed.add((
+                        entry["filename"], entry["data_size"], entry["original_size"],
+                        entry["time_stamp"]))
+        except FileNotFoundError:
+            pass
+
+        self._file = open(path, "a", encoding="utf-8")
+
+        if not terminated:
+            self._file.write("\n")
+
+    def completed(self, pbofile: pbo_file.PBOFile) -> bool:
+        """Returns True if a file is recorded as having been extracted.
+
+        :Parameters:
+          - `pbofile`: The :class:`~dayz_dev_tools.pbo_file.PBOFile` to check.
+
+        :Returns:
+          True if the file has been extracted, or False otherwise.
+        """
+        with self._lock:
+            return _entry_key(pbofile) in self._completed
+
+    def record(self, pbofile: pbo_file.PBOFile) -> None:
+        """Record that a file has been extracted.
+
+        :Parameters:
+          - `pbofile`: The :class:`~dayz_dev_tools.pbo_file.PBOFile` that was extracted.
+        """
+        key = _entry_key(pbofile)
+        line = json.dumps({
+            "filename": key[0],
+            "data_size": key[1],
+            "original_size": key[2],
+            "time_stamp": key[3]
+        })
+
+        with self._lock:
+            self._file.write(f"{line}\n")
+            self._file.flush()
+            self._completed.add(key)
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
+
+    def __enter__(self) -> "ExtractionJournal":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[type[BaseException]],
+        exc_value: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType]
+    ) -> None:
+        self.close()
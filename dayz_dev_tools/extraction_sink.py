@@ -0,0 +1,298 @@
+from collections import abc
+import contextlib
+import datetime
+import io
+import os
+import tarfile
+import threading
+import types
+import typing
+import zipfile
+
+
+_TAR_MODES = {
+    ".tar": "w",
+    ".tar.gz": "w:gz",
+    ".tgz": "w:gz",
+    ".tar.bz2": "w:bz2",
+    ".tbz2": "w:bz2",
+    ".tar.xz": "w:xz",
+    ".txz": "w:xz"
+}
+
+
+# Zip archives cannot represent timestamps prior to 1980; allow a day for time zone offsets
+_MIN_ZIP_TIMESTAMP = 315619200
+
+
+def _archive_name(filename: str) -> str:
+    return filename.replace(os.path.sep, "/")
+
+
+class ExtractionSink:
+    """Base class for destinations of files extracted from a PBO archive."""
+    def makedirs(self, parts: list[bytes]) -> None:
+        """Prepare a directory to receive extracted files.
+
+        :Parameters:
+          - `parts`: A list of path components of the directory.
+        """
+
+    def open(
+        self, filename: str, *, mtime: int = 0, size: typing.Optional[int] = None
+    ) -> typing.ContextManager[typing.BinaryIO]:
+        """Open an extracted file for writing.
+
+        :Parameters:
+          - `filename`: The normalized filename of the extracted file.
+          - `mtime`: The file's modification time as a Unix timestamp.
+          - `size`: The size of the extracted file, if known in advance. Exactly this many bytes
+            must then be written.
+
+        :Returns:
+          A context manager providing a binary file-like object where the contents of the
+          extracted file are to be written.
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Finish writing extracted files."""
+
+    def __enter__(self) -> "ExtractionSink":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[type[BaseException]],
+        exc_value: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType]
+    ) -> None:
+        self.close()
+
+
+class DirectorySink(ExtractionSink):
+    """Write extracted files to a directory.
+
+    Directories created by the sink are remembered, so a single sink can be shared by many
+    extractions, including concurrent ones, without repeatedly creating the same directories.
+    """
+    def __init__(
+        self, output_directory: typing.Optional[str] = None, *, atomic: bool = False
+    ) -> None:
+        """Create a new :class:`DirectorySink` instance.
+
+        :Parameters:
+          - `output_directory`: The directory where extracted files are to be written, or None if
+            they should be written relative to the current working directory.
+          - `atomic`: When `True`, each file is written to a temporary file that is renamed once
+            it is complete, so an interrupted extraction never leaves a partially written file in
+            place of an extracted file.
+        """
+        self.output_directory = output_directory
+        self.atomic = atomic
+        self._directories: set[tuple[bytes, ...]] = set()
+
+    def path(self, filename: str) -> str:
+        """Get the location where an extracted file is to be written.
+
+        :Parameters:
+          - `filename`: The normalized filename of the extracted file.
+
+        :Returns:
+          The location of the extracted file.
+        """
+        if self.output_directory is None:
+            return filename
+
+        return os.path.join(self.output_directory, filename)
+
+    def makedirs(self, parts: list[bytes]) -> None:
+        key = tuple(parts)
+
+        if key in self._directories:
+            return
+
+        if self.output_directory is None:
+            os.makedirs(os.path.join(*parts), exist_ok=True)
+        else:
+            os.makedirs(os.path.join(os.fsencode(self.output_directory), *parts), exist_ok=True)
+
+        self._directories.add(key)
+
+    def open(
+        self, filename: str, *, mtime: int = 0, size: typing.Optional[int] = None
+    ) -> typing.ContextManager[typing.BinaryIO]:
+        if self.atomic:
+            return self._open_atomic(self.path(filename))
+
+        return open(self.path(filename), "w+b")
+
+    @contextlib.contextmanager
+    def _open_atomic(self, path: str) -> abc.Generator[typing.BinaryIO, None, None]:
+        temporary = f"{path}.{os.getpid()}-{threading.get_ident()}.partial"
+
+        try:
+            with open(temporary, "w+b") as out_file:
+                yield out_file
+
+            os.replace(temporary, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temporary)
+            raise
+
+
+class ZipSink(ExtractionSink):
+    """Write extracted files into a zip archive, without writing temporary files."""
+    def __init__(
+        self,
+        file: typing.Union[str, typing.BinaryIO],
+        *,
+        compression: int = zipfile.ZIP_DEFLATED
+    ) -> None:
+        """Create a new :class:`ZipSink` instance.
+
+        :Parameters:
+          - `file`: The filename of the zip archive to create, or a binary file-like object where
+            the archive is to be written.
+          - `compression`: The ``zipfile`` compression method to use for archive members.
+        """
+        self._zip = zipfile.ZipFile(file, "w", compression=compression)
+        self._compression = compression
+
+    @contextlib.contextmanager
+    def open(
+        self, filename: str, *, mtime: int = 0, size: typing.Optional[int] = None
+    ) -> abc.Generator[typing.BinaryIO, None, None]:
+        timestamp = datetime.datetime.fromtimestamp(max(mtime, _MIN_ZIP_TIMESTAMP))
+        info = zipfile.ZipInfo(_archive_name(filename), timestamp.timetuple()[:6])
+        info.compress_type = self._compression
+
+        # Members larger than 2 GiB need zip64 headers, which must be chosen before the member is
+        # written, so they are used for every member of unknown size
+        if size is not None:
+            info.file_size = size
+
+        with self._zip.open(info, "w", force_zip64=size is None) as member:
+            yield typing.cast(typing.BinaryIO, member)
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class TarSink(ExtractionSink):
+    """Write extracted files into a (possibly compressed) tar archive, without writing temporary
+    files."""
+    def __init__(self, file: typing.Union[str, typing.BinaryIO], *, mode: str = "w") -> None:
+        """Create a new :class:`TarSink` instance.
+
+        :Parameters:
+          - `file`: The filename of the tar archive to create, or a binary file-like object where
+            the archive is to be written.
+          - `mode`: The ``tarfile`` mode to use when creating the archive, e.g. ``w:gz`` to create
+            a gzip-compressed archive.
+        """
+        if isinstance(file, str):
+            self._tar = tarfile.open(file, mode)  # type: ignore[call-overload]
+        else:
+            self._tar = tarfile.open(fileobj=file, mode=mode)  # type: ignore[call-overload]
+
+    @contextlib.contextmanager
+    def open(
+        self, filename: str, *, mtime: int = 0, size: typing.Optional[int] = None
+    ) -> abc.Generator[typing.BinaryIO, None, None]:
+        info = tarfile.TarInfo(_archive_name(filename))
+        info.mtime = mtime
+
+        if size is not None:
+            info.size = size
+            with self._stream_member(info) as member:
+                yield member
+            return
+
+        # Tar member headers must contain the member size, so members of unknown size are
+        # buffered in memory until they are complete
+        buffer = io.BytesIO()
+
+        yield buffer
+
+        info.size = buffer.tell()
+        buffer.seek(0)
+        self._tar.addfile(info, buffer)
+
+    @contextlib.contextmanager
+    def _stream_member(
+        self, info: tarfile.TarInfo
+    ) -> abc.Generator[typing.BinaryIO, None, None]:
+        # The header is written first and the contents are written straight to the archive after
+        # it, in the same way as tarfile.TarFile.addfile
+        tar = self._tar
+        header = info.tobuf(tar.format, tar.encoding, tar.errors)
+        tar.fileobj.write(header)
+        tar.offset += len(header)
+
+        member = _TarMemberWriter(tar.fileobj, info.size)
+
+        yield typing.cast(typing.BinaryIO, member)
+
+        if member.written != info.size:
+            raise Exception(f"File size mismatch {member.written} != {info.size}")
+
+        blocks, remainder = divmod(info.size, tarfile.BLOCKSIZE)
+        if remainder > 0:
+            tar.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            blocks += 1
+
+        tar.offset += blocks * tarfile.BLOCKSIZE
+        tar.members.append(info)
+
+    def close(self) -> None:
+        self._tar.close()
+
+
+class _TarMemberWriter:
+    def __init__(self, fileobj: typing.BinaryIO, size: int) -> None:
+        self.fileobj = fileobj
+        self.size = size
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        # Writing past the size in the member's header would corrupt the archive
+        if self.written + len(data) > self.size:
+            raise Exception(f"File size mismatch {self.written + len(data)} > {self.size}")
+
+        self.fileobj.write(data)
+        self.written += len(data)
+        return len(data)
+
+
+def open_sink(output: typing.Optional[str], *, atomic: bool = False) -> ExtractionSink:
+    """Create an :class:`ExtractionSink` for an output location, based on its name.
+
+    Names ending in ``.zip`` create a :class:`ZipSink`, names ending in ``.tar``, ``.tar.gz``,
+    ``.tgz``, ``.tar.bz2``, ``.tbz2``, ``.tar.xz`` or ``.txz`` create a :class:`TarSink` and all
+    other names create a :class:`DirectorySink`.
+
+    :Parameters:
+      - `output`: The name of the output location, or None to write extracted files relative to
+        the current working directory.
+      - `atomic`: Passed to :class:`DirectorySink` when writing to a directory.
+
+    :Returns:
+      An :class:`ExtractionSink` that writes to the output location.
+    """
+    if output is None:
+        return DirectorySink(atomic=atomic)
+
+    lower = output.lower()
+
+    if lower.endswith(".zip"):
+        return ZipSink(output)
+
+    for suffix, mode in _TAR_MODES.items():
+        if lower.endswith(suffix):
+            return TarSink(output, mode=mode)
+
+    os.makedirs(output, exist_ok=True)
+
+    return DirectorySink(output, atomic=atomic)
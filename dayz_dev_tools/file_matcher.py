@@ -0,0 +1,127 @@
+from collections import abc
+import fnmatch
+import os
+import re
+import typing
+
+from dayz_dev_tools import pbo_file
+
+
+# Glob patterns are matched case-insensitively on platforms with case-insensitive filenames, for
+# consistency with ``fnmatch.fnmatch``
+_GLOB_FORMAT = "(?i:{})" if os.path.normcase("A") == "a" else "{}"
+
+
+def _normalize_glob(glob: str) -> str:
+    # Like ``fnmatch.fnmatch``, globs are normalized with ``os.path.normcase``, so on Windows
+    # either ``\\`` or ``/`` may separate directories
+    return os.path.normcase(glob).replace(os.path.sep, "/")
+
+
+class _Patterns:
+    def __init__(self, globs: list[str], regexes: list[str]) -> None:
+        self.glob: typing.Optional[re.Pattern[str]] = None
+
+        if len(globs) > 0:
+            self.glob = re.compile("|".join(
+                _GLOB_FORMAT.format(fnmatch.translate(_normalize_glob(glob))) for glob in globs))
+
+        # Regular expressions are compiled separately, since combining them would renumber their
+        # groups, breaking backreferences, and would reject inline global flags such as ``(?i)``
+        self.regexes = [re.compile(regex) for regex in regexes]
+
+    def matches(self, filename: str) -> bool:
+        if self.glob is not None and self.glob.match(filename) is not None:
+            return True
+
+        # Regular expressions may match anywhere within the filename
+        return any(regex.search(filename) is not None for regex in self.regexes)
+
+
+def _compile(globs: list[str], regexes: list[str]) -> typing.Optional[_Patterns]:
+    if len(globs) == 0 and len(regexes) == 0:
+        return None
+
+    return _Patterns(globs, regexes)
+
+
+class FileMatcher:
+    """Select files by matching their names against include and exclude patterns.
+
+    Glob patterns are compiled once into a single regular expression for includes and another for
+    excludes, and each regular expression is compiled once. Filenames are matched in POSIX form,
+    i.e. with ``/`` as the directory separator.
+    """
+    def __init__(
+        self,
+        *,
+        include: abc.Iterable[str] = (),
+        exclude: abc.Iterable[str] = (),
+        include_regex: abc.Iterable[str] = (),
+        exclude_regex: abc.Iterable[str] = ()
+    ) -> None:
+        """Create a new :class:`FileMatcher` instance.
+
+        :Parameters:
+          - `include`: Glob patterns of files to select. If no include globs or regular
+            expressions are provided, all files not excluded are selected.
+          - `exclude`: Glob patterns of files not to select, even if they match an include
+            pattern.
+          - `include_regex`: Regular expressions matching files to select.
+          - `exclude_regex`: Regular expressions matching files not to select.
+
+        :Raises:
+          ``re.error`` if a regular expression is invalid.
+        """
+        self._include = _compile(list(include), list(include_regex))
+        self._exclude = _compile(list(exclude), list(exclude_regex))
+
+    def matches(self, filename: str) -> bool:
+        """Test whether a filename is selected by the matcher.
+
+        :Parameters:
+          - `filename`: A normalized filename (see
+            :meth:`dayz_dev_tools.pbo_file.PBOFile.normalized_filename`).
+
+        :Returns:
+          True if the filename is selected, or False otherwise.
+        """
+        if os.path.sep != "/":
+            filename = filename.replace(os.path.sep, "/")
+
+        if self._include is not None and not self._include.matches(filename):
+            return False
+
+        return self._exclude is None or not self._exclude.matches(filename)
+
+    def filter(self, files: abc.Iterable[pbo_file.PBOFile]) -> list[pbo_file.PBOFile]:
+        """Select files contained in a PBO archive.
+
+        :Parameters:
+          - `files`: The :class:`~dayz_dev_tools.pbo_file.PBOFile` instances to filter.
+
+        :Returns:
+          A list of the files selected by the matcher.
+        """
+        return [file for file in files if self.matches(file.normalized_filename())]
+
+
+def create(
+    *,
+    include: typing.Optional[list[str]] = None,
+    exclude: typing.Optional[list[str]] = None,
+    include_regex: typing.Optional[list[str]] = None,
+    exclude_regex: typing.Optional[list[str]] = None
+) -> typing.Optional[FileMatcher]:
+    """Create a :class:`FileMatcher` from optional lists of patterns, such as those parsed from
+    command line arguments.
+
+    :Returns:
+      A :class:`FileMatcher`, or None if no patterns were provided.
+    """
+    if not (include or exclude or include_regex or exclude_regex):
+        return None
+
+    return FileMatcher(
+        include=include or [], exclude=exclude or [], include_regex=include_regex or [],
+        exclude_regex=exclude_regex or [])
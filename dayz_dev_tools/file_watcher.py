@@ -0,0 +1,308 @@
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+import types
+import typing
+
+
+#: The number of seconds to wait for further changes after a change is detected
+DEFAULT_DEBOUNCE = 0.25
+
+#: The number of seconds between scans by a :class:`PollingWatcher`
+DEFAULT_POLL_INTERVAL = 1.0
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = \
+    _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+_EVENT = struct.Struct("iIII")
+
+
+class Watcher(typing.Protocol):
+    """Interface for detecting changes to files."""
+    def changes(self, timeout: typing.Optional[float]) -> set[str]:
+        """Wait for files to change.
+
+        :Parameters:
+          - `timeout`: The maximum number of seconds to wait, or ``None`` to wait indefinitely.
+
+        :Returns:
+          The paths of the files and directories that were created, modified or removed, or an
+          empty set if nothing changed before the timeout.
+        """
+
+    def close(self) -> None:
+        """Stop watching for changes."""
+
+
+class _WatcherBase:
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> typing.Any:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[type[BaseException]],
+        exc_value: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType]
+    ) -> None:
+        self.close()
+
+
+class PollingWatcher(_WatcherBase):
+    """A :class:`Watcher` that periodically scans for changes to file sizes and modification
+    times. It works on any platform and filesystem, but is slower to detect changes than
+    :class:`InotifyWatcher`.
+    """
+    def __init__(
+        self, paths: list[str], *, interval: float = DEFAULT_POLL_INTERVAL
+    ) -> None:
+        """Create a new :class:`PollingWatcher` instance.
+
+        :Parameters:
+          - `paths`: The files and directories to watch. Directories are watched recursively.
+          - `interval`: The number of seconds between scans.
+        """
+        self.paths = paths
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+
+        for path in self.paths:
+            if os.path.isdir(path):
+                for dirpath, _, filenames in os.walk(path):
+                    for filename in filenames:
+                        self._stat(os.path.join(dirpath, filename), snapshot)
+            else:
+                self._stat(path, snapshot)
+
+        return snapshot
+
+    def _stat(self, path: str, snapshot: dict[str, tuple[int, int]]) -> None:
+        try:
+            info = os.stat(path)
+        except OSError:
+            return
+
+        snapshot[path] = (info.st_size, info.st_mtime_ns)
+
+    def changes(self, timeout: typing.Optional[float]) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            delay = self.interval if deadline is None \
+                else max(0.0, min(self.interval, deadline - time.monotonic()))
+            time.sleep(delay)
+
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+class InotifyWatcher(_WatcherBase):
+    """A :class:`Watcher` that is notified of changes by the Linux kernel's inotify API."""
+    def __init__(self, paths: list[str]) -> None:
+        """Create a new :class:`InotifyWatcher` instance.
+
+        :Parameters:
+          - `paths`: The files and directories to watch. Directories are watched recursively.
+
+        :Raises:
+          - `OSError`: If inotify is not available, or the limit on the number of watches has been
+            reached.
+        """
+        libc = ctypes.CDLL(None, use_errno=True)
+
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError as error:
+            raise OSError(errno.ENOSYS, "inotify is not available") from error
+
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self.paths = paths
+        self._fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+        # Directories watched by each watch descriptor, and whether they are watched recursively
+        self._directories: dict[int, tuple[str, bool]] = {}
+        # Files that are watched by watching their parent directories
+        self._files: set[str] = set()
+
+        try:
+            for path in paths:
+                if os.path.isdir(path):
+                    self._add_tree(path)
+                else:
+                    self._files.add(os.path.normpath(path))
+                    self._add(os.path.dirname(path) or ".", False)
+        except BaseException:
+            self.close()
+            raise
+
+    def _add(self, directory: str, recursive: bool) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            if error_number in (errno.ENOENT, errno.ENOTDIR):
+                # The directory was removed before it could be watched
+                return
+            raise OSError(error_number, os.strerror(error_number), directory)
+
+        # Watching the same directory again returns the same descriptor
+        _, already_recursive = self._directories.get(wd, (directory, False))
+        self._directories[wd] = (directory, recursive or already_recursive)
+
+    def _add_tree(self, directory: str) -> list[str]:
+        added: list[str] = []
+
+        self._add(directory, True)
+
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for dirname in dirnames:
+                self._add(os.path.join(dirpath, dirname), True)
+            added.extend(os.path.join(dirpath, filename) for filename in filenames)
+
+        return added
+
+    def _read_events(self) -> set[str]:
+        changed: set[str] = set()
+
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + _EVENT.size:offset + _EVENT.size + length]
+                                   .rstrip(b"\x00"))
+                offset += _EVENT.size + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    logging.debug("Too many changes to track; assuming all files changed")
+                    changed.update(self.paths)
+                    continue
+
+                if mask & _IN_IGNORED:
+                    self._directories.pop(wd, None)
+                    continue
+
+                if wd not in self._directories:
+                    continue
+
+                directory, recursive = self._directories[wd]
+                path = os.path.join(directory, name)
+
+                if not recursive and os.path.normpath(path) not in self._files:
+                    continue
+
+                changed.add(path)
+
+                if recursive and mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Directories created after watching began must be watched too
+                    changed.update(self._add_tree(path))
+
+    def changes(self, timeout: typing.Optional[float]) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+
+            if not readable:
+                return set()
+
+            changed = self._read_events()
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(paths: list[str], *, polling: bool = False) -> Watcher:
+    """Create a :class:`Watcher` for a set of files and directories.
+
+    An :class:`InotifyWatcher` is used on Linux, unless inotify is unavailable. Otherwise, a
+    :class:`PollingWatcher` is used.
+
+    :Parameters:
+      - `paths`: The files and directories to watch. Directories are watched recursively.
+      - `polling`: If True, always use a :class:`PollingWatcher`. Polling is required for some
+        network and virtual filesystems, which do not report changes.
+
+    :Returns:
+      A :class:`Watcher` for the files and directories.
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except OSError as error:
+            logging.warning("Unable to use inotify, falling back to polling: %s", error)
+
+    return PollingWatcher(paths)
+
+
+def debounced(
+    watcher: Watcher, *, delay: float = DEFAULT_DEBOUNCE
+) -> typing.Iterator[tuple[set[str], float]]:
+    """Wait for bursts of changes to files.
+
+    Once a change is detected, changes are collected until none are detected for `delay` seconds,
+    so saving many files at once is reported as a single burst of changes.
+
+    :Parameters:
+      - `watcher`: The :class:`Watcher` detecting changes.
+      - `delay`: The number of seconds without changes that ends a burst.
+
+    :Returns:
+      An iterator over each burst of changes, as a tuple containing the set of changed paths and
+      the ``time.monotonic()`` time at which the first change was detected.
+    """
+    while True:
+        changed = watcher.changes(None)
+
+        if not changed:
+            continue
+
+        detected = time.monotonic()
+
+        while more := watcher.changes(delay):
+            changed |= more
+
+        yield changed, detected
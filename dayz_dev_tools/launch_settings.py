@@ -20,6 +20,7 @@ class LaunchSettings:
     _server_mods: list[str]
     _mission: typing.Optional[str]
     _parameters: list[str]
+    _verify_signatures: bool
     _bundles: dict[str, server_config.BundleConfig]
 
     def __init__(self, config: server_config.ServerConfig) -> None:
@@ -39,6 +40,7 @@ class LaunchSettings:
         self._server_mods = []
         self._mission = config.mission_directory
         self._parameters = config.parameters
+        self._verify_signatures = config.verify_signatures
         self._bundles = config.bundles
 
         try:
@@ -208,6 +210,23 @@ class LaunchSettings:
         """
         self._parameters.append(param)
 
+    def verify_signatures(self) -> bool:
+        """Get whether the signatures of mods, not including server mods, are verified before
+        running DayZ Server.
+
+        :Returns:
+          True if the signatures of mods are verified, or False otherwise.
+        """
+        return self._verify_signatures
+
+    def set_verify_signatures(self, verify: bool) -> None:
+        """Set whether the signatures of mods are verified before running DayZ Server.
+
+        :Parameters:
+          - `verify`: True to verify the signatures of mods, or False otherwise.
+        """
+        self._verify_signatures = verify
+
     def load_bundle(self, name: str) -> None:
         """Load a bundle to configure DayZ Server launch settings.
 
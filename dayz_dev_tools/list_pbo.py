@@ -1,16 +1,27 @@
 import datetime
+import typing
 
+from dayz_dev_tools import file_matcher
 from dayz_dev_tools import pbo_reader
 
 
-def list_pbo(reader: pbo_reader.PBOReader, *, verbose: bool) -> None:
+def list_pbo(
+    reader: pbo_reader.PBOReader,
+    *,
+    verbose: bool,
+    matcher: typing.Optional[file_matcher.FileMatcher] = None
+) -> None:
     """Print the contents of a PBO archive to stdout in tabular format.
 
     :Parameters:
       - `reader`: A :class:`~dayz_dev_tools.pbo_reader.PBOReader` instance representing the PBO
         archive to list.
       - `verbose`: When `True`, additional detail will be printed.
+      - `matcher`: Only list files selected by this
+        :class:`~dayz_dev_tools.file_matcher.FileMatcher`, or None if all files should be listed.
     """
+    files = reader.files() if matcher is None else matcher.filter(reader.files())
+
     if verbose:
         print("Headers:")
         print("--------")
@@ -26,7 +37,7 @@ def list_pbo(reader: pbo_reader.PBOReader, *, verbose: bool) -> None:
     total_unpacked = 0
     total_size = 0
 
-    for file in reader.files():
+    for file in files:
         timestamp = datetime.datetime.fromtimestamp(file.time_stamp).strftime("%Y-%m-%d %H:%M")
         total_unpacked += file.unpacked_size()
         total_size += file.data_size
@@ -42,7 +53,7 @@ def list_pbo(reader: pbo_reader.PBOReader, *, verbose: bool) -> None:
         print("---------        ---------                    ---------")
         print(
             f"{total_unpacked:9}        {total_size:9}                    "
-            f"{len(reader.files())} Files")
+            f"{len(files)} Files")
     else:
         print("---------                    ---------")
-        print(f"{total_unpacked:9}                    {len(reader.files())} Files")
+        print(f"{total_unpacked:9}                    {len(files)} Files")
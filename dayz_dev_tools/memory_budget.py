@@ -0,0 +1,97 @@
+import contextlib
+import re
+import threading
+import typing
+
+
+#: The size of the chunks in which large files are copied when memory is limited
+CHUNK_SIZE = 1024 * 1024
+
+SIZE_RE = re.compile(r"^\s*(\d+)\s*([kmgt]?)(?:i?b)?\s*$", re.IGNORECASE)
+
+_MULTIPLIERS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """Parse a number of bytes, optionally followed by a ``K``, ``M``, ``G`` or ``T`` suffix, e.g.
+    ``512M``.
+
+    :Parameters:
+      - `text`: The text to parse.
+
+    :Returns:
+      The number of bytes.
+
+    :Raises:
+      ValueError if the text is not a valid size.
+    """
+    if (match := SIZE_RE.match(text)) is None:
+        raise ValueError(f"Invalid size: {text}")
+
+    return int(match.group(1)) * _MULTIPLIERS[match.group(2).lower()]
+
+
+class MemoryBudget:
+    """A limit on the number of bytes held in memory at once, shared by any number of threads.
+
+    Threads reserve memory before using it and wait while the reservation would exceed the limit.
+    A single reservation larger than the limit is allowed once nothing else is reserved, so that it
+    cannot wait forever.
+    """
+    def __init__(self, limit: typing.Optional[int]) -> None:
+        """Create a new :class:`MemoryBudget` instance.
+
+        :Parameters:
+          - `limit`: The maximum number of bytes to reserve at once, or None for no limit.
+        """
+        #: The maximum number of bytes to reserve at once, or None for no limit
+        self.limit = limit
+        #: The number of bytes currently reserved
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def chunk_size(self) -> int:
+        """Get the size of the chunks in which large files should be copied.
+
+        :Returns:
+          The number of bytes to copy at once.
+        """
+        if self.limit is None:
+            return CHUNK_SIZE
+
+        return max(1, min(CHUNK_SIZE, self.limit))
+
+    def acquire(self, size: int) -> None:
+        """Reserve memory, waiting until enough memory is available.
+
+        :Parameters:
+          - `size`: The number of bytes to reserve.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.limit is None or self.in_use == 0
+                or self.in_use + size <= self.limit)
+            self.in_use += size
+
+    def release(self, size: int) -> None:
+        """Release reserved memory.
+
+        :Parameters:
+          - `size`: The number of bytes to release.
+        """
+        with self._condition:
+            self.in_use -= size
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def reserve(self, size: int) -> typing.Iterator[None]:
+        """Reserve memory for the duration of a ``with`` block.
+
+        :Parameters:
+          - `size`: The number of bytes to reserve.
+        """
+        self.acquire(size)
+        try:
+            yield
+        finally:
+            self.release(size)
@@ -1,5 +1,6 @@
 from collections import abc
 import contextlib
+import gc
 import os
 import typing
 
@@ -10,7 +11,22 @@ def chdir(path: typing.Optional[str]) -> abc.Generator[None, None, None]:
         original_cwd = os.getcwd()
         os.chdir(path)
 
-    yield
+    try:
+        yield
+    finally:
+        if path is not None:
+            os.chdir(original_cwd)
 
-    if path is not None:
-        os.chdir(original_cwd)
+
+@contextlib.contextmanager
+def gc_paused() -> abc.Generator[None, None, None]:
+    # Building large object trees triggers many full garbage collections, although none of the
+    # new objects are garbage
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
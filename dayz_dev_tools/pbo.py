@@ -1,14 +1,20 @@
 import argparse
+import itertools
 import logging
 import os
 import pathlib
-import subprocess
 import sys
+import time
+import typing
 
 import dayz_dev_tools
+from dayz_dev_tools import file_watcher
 from dayz_dev_tools import logging_configuration
+from dayz_dev_tools import memory_budget
 from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_project
 from dayz_dev_tools import pbo_writer
+from dayz_dev_tools import source_collector
 from dayz_dev_tools import tools_directory
 
 
@@ -17,25 +23,201 @@ def _split_header(option: str) -> tuple[str, str]:
     return header, value
 
 
+def _target(args: argparse.Namespace) -> pbo_project.TargetConfig:
+    return pbo_project.TargetConfig(
+        name=args.pbofile,
+        pbofile=args.pbofile,
+        files=args.files,
+        patterns=args.pattern,
+        headers=args.header,
+        sign=args.sign,
+        convert=not args.no_convert,
+        compress=args.compress,
+        compress_match=args.compress_match,
+        compress_exclude=args.compress_exclude,
+        compression_level=args.compression_level,
+        exclude=args.exclude)
+
+
+def _watch_paths(args: argparse.Namespace) -> list[str]:
+    paths = list(args.files)
+
+    for pattern in args.pattern:
+        # Watch the deepest directory that does not contain any wildcards
+        literal = itertools.takewhile(
+            lambda part: not any(c in part for c in "*?["), pathlib.Path(pattern).parts)
+        paths.append(str(pathlib.Path(*literal)))
+
+    return paths
+
+
+def _watch(
+    args: argparse.Namespace,
+    target: pbo_project.TargetConfig,
+    build: typing.Callable[[list[source_collector.SourceFile]], bool]
+) -> None:
+    # The PBO file and the files created alongside it, like its manifest and signature, are not
+    # inputs
+    output_prefix = os.path.abspath(args.pbofile)
+
+    watcher = file_watcher.create_watcher(_watch_paths(args), polling=args.poll)
+
+    try:
+        files = pbo_project.collect_files(target)
+
+        try:
+            build(files)
+        except Exception as error:
+            logging.debug("Build failed", exc_info=True)
+            logging.error("%s: %s", type(error).__name__, error)
+
+        logging.info("Watching for changes (press Ctrl+C to stop)")
+
+        for changed, detected in file_watcher.debounced(watcher):
+            changed = {
+                path for path in changed if not os.path.abspath(path).startswith(output_prefix)
+            }
+
+            if not changed:
+                continue
+
+            logging.debug("Changed: %s", ", ".join(sorted(changed)))
+
+            # Added and removed files change which files belong in the PBO
+            known = {os.path.abspath(file.path) for file in files}
+            if any(os.path.abspath(path) not in known or not os.path.exists(path)
+                   for path in changed):
+                files = pbo_project.collect_files(target)
+            else:
+                # Edited files are stat'ed again when built, so their changes are not missed
+                changed_paths = {os.path.abspath(path) for path in changed}
+                files = [
+                    source_collector.SourceFile(file.path)
+                    if os.path.abspath(file.path) in changed_paths else file
+                    for file in files
+                ]
+
+            try:
+                if build(files):
+                    logging.info(
+                        "Rebuilt `%s` %.2f seconds after change", args.pbofile,
+                        time.monotonic() - detected)
+            except Exception as error:
+                logging.debug("Build failed", exc_info=True)
+                logging.error("%s: %s", type(error).__name__, error)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        watcher.close()
+
+
+def _build_main() -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} build", usage="%(prog)s [options] [targets...]",
+        description="Build the PBO files of the targets in a project file")
+    parser.register("type", "size", memory_budget.parse_size)
+    parser.add_argument(
+        "--checksums", action="store_true",
+        help="Compare file contents, not only sizes and modification times, to find targets that"
+        " are up to date")
+    parser.add_argument(
+        "-c", "--config", default=pbo_project.DEFAULT_PROJECT_FILE, metavar="FILE",
+        help=f"Project file (default: {pbo_project.DEFAULT_PROJECT_FILE})")
+    parser.add_argument("-D", "--debug", action="store_true", help="Enable debug logs")
+    parser.add_argument(
+        "-f", "--force", action="store_true", help="Build targets even if they are up to date")
+    parser.add_argument(
+        "-j", "--jobs", type=int, metavar="N", help="Build up to N targets at once")
+    parser.add_argument(
+        "--max-memory", type="size", metavar="SIZE",
+        help="Hold at most SIZE bytes of file contents in memory at once per target (e.g. 512M)")
+    parser.add_argument("-V", "--version", action="version", version=dayz_dev_tools.version)
+    parser.add_argument(
+        "targets", nargs="*", help="Targets to build (default: all targets in the project)")
+    args = parser.parse_args(sys.argv[2:])
+
+    logging_configuration.configure_logging(debug=args.debug)
+
+    try:
+        project = pbo_project.load(args.config)
+
+        statistics = pbo_project.build_project(
+            project, args.targets or None, tools_dir=tools_directory.tools_directory(),
+            force=args.force, checksums=args.checksums, max_memory=args.max_memory,
+            jobs=args.jobs, debug=args.debug)
+
+        logging.info(
+            "Built %d targets; %d targets were up to date", statistics.built, statistics.skipped)
+
+    except Exception as error:
+        logging.debug("Uncaught exception in main", exc_info=True)
+        logging.error("%s: %s", type(error).__name__, error)
+        sys.exit(1)
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(usage="%(prog)s [options] pbofile [files...]")
+    if sys.argv[1:2] == ["build"]:
+        _build_main()
+        return
+
+    parser = argparse.ArgumentParser(
+        usage="%(prog)s [options] pbofile [files...]\n       %(prog)s build [options] [targets...]")
     parser.register("type", "header", _split_header)
+    parser.register("type", "size", memory_budget.parse_size)
     parser.add_argument(
         "-b", "--no-convert", action="store_true",
         help="Do not convert config.cpp files to config.bin files")
+    parser.add_argument(
+        "--checksums", action="store_true",
+        help="Compare file contents, not only sizes and modification times, when building"
+        " incrementally (implies -i)")
+    parser.add_argument(
+        "--compress-exclude", action="append", metavar="GLOB",
+        help="Do not compress files matching GLOB (implies -z)")
+    parser.add_argument(
+        "--compress-match", action="append", metavar="GLOB",
+        help="Compress files matching GLOB instead of the default source file types (implies -z)")
+    parser.add_argument(
+        "--compression-level", type=int, choices=range(1, 10),
+        default=pbo_writer.DEFAULT_COMPRESSION_LEVEL, metavar="LEVEL",
+        help="LZSS compression level, from 1 (fastest) to 9 (smallest)"
+        f" (default: {pbo_writer.DEFAULT_COMPRESSION_LEVEL})")
     parser.add_argument(
         "-C", "--chdir", metavar="DIR", help="Change to directory DIR before creating PBO")
     parser.add_argument("-D", "--debug", action="store_true", help="Enable debug logs")
+    parser.add_argument(
+        "-x", "--exclude", action="append", default=[], metavar="PATTERN",
+        help="Do not add files matching the gitignore-style PATTERN from directories")
     parser.add_argument(
         "-H", "--header", type="header", action="append", default=[], metavar="HEADER=VALUE",
         help="Add a header to the PBO")
+    parser.add_argument(
+        "-i", "--incremental", action="store_true",
+        help="Only rebuild the PBO if its inputs have changed since it was last built")
+    parser.add_argument(
+        "-j", "--jobs", type=int, metavar="N",
+        help="Compress or convert up to N files at once")
+    parser.add_argument(
+        "--max-memory", type="size", metavar="SIZE",
+        help="Hold at most SIZE bytes of file contents in memory at once (e.g. 512M)")
     parser.add_argument(
         "-P", "--pattern", action="append", default=[], metavar="GLOB",
         help="Add files matching GLOB")
     parser.add_argument(
         "-s", "--sign", metavar="KEYFILE",
         help="Sign the PBO with the provided private key")
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="Poll for changes instead of relying on change notifications (implies -w)")
     parser.add_argument("-V", "--version", action="version", version=dayz_dev_tools.version)
+    parser.add_argument(
+        "-w", "--watch", action="store_true",
+        help="Rebuild the PBO whenever its files change (implies -i)")
+    parser.add_argument(
+        "-z", "--compress", action="store_true",
+        help="Compress source files, such as scripts and layouts")
     parser.add_argument("pbofile", help="The PBO file to create")
     parser.add_argument("files", nargs="*", default=[], help="Files to add to the PBO")
     args = parser.parse_args()
@@ -46,56 +228,18 @@ def main() -> None:
         with misc.chdir(args.chdir or "."):
             tools_dir = tools_directory.tools_directory()
 
-            cfgconvert = None
-            if not args.no_convert and tools_dir is not None:
-                cfgconvert = os.path.join(tools_dir, "bin", "CfgConvert", "CfgConvert.exe")
-
-            writer = pbo_writer.PBOWriter(cfgconvert=cfgconvert)
-
-            writer.add_header(
-                "dayz-dev-tools",
-                f"v{dayz_dev_tools.version} - https://dayz-dev-tools.readthedocs.io/")
-
-            for header in args.header:
-                logging.info("Adding header: `%s` = `%s`", header[0], header[1])
-                writer.add_header(*header)
-
-            for pattern in args.pattern:
-                anchor = pathlib.Path(pathlib.Path(pattern).anchor)
-                rest = pathlib.Path(pattern).relative_to(anchor)
-                for path in anchor.glob(str(rest)):
-                    if not path.is_dir():
-                        logging.info("Adding file `%s`", path)
-                        writer.add_file(path)
-
-            for file in args.files:
-                path = pathlib.Path(file)
-                if path.is_dir():
-                    for subpath in path.glob("**/*"):
-                        if not subpath.is_dir():
-                            logging.info("Adding file `%s`", subpath)
-                            writer.add_file(subpath)
-                else:
-                    logging.info("Adding file `%s`", path)
-                    writer.add_file(path)
-
-            with open(args.pbofile, "wb") as output:
-                logging.info("Writing PBO file `%s`", args.pbofile)
-                writer.write(output)
-
-            if args.sign is not None:
-                if tools_dir is None:
-                    raise Exception("Unable to find DayZ Tools directory!")
-
-                logging.info(
-                    "Signing PBO file `%s` using private key `%s`", args.pbofile, args.sign)
-                subprocess.run(
-                    [
-                        os.path.join(tools_dir, "bin", "DsUtils", "DSSignFile.exe"),
-                        args.sign,
-                        args.pbofile
-                    ],
-                    check=True)
+            target = _target(args)
+
+            def build(files: list[source_collector.SourceFile]) -> bool:
+                return pbo_project.build_target(
+                    target, tools_dir=tools_dir, files=files,
+                    incremental=args.incremental or args.watch or args.poll,
+                    checksums=args.checksums, max_memory=args.max_memory, jobs=args.jobs)
+
+            if args.watch or args.poll:
+                _watch(args, target, build)
+            else:
+                build(pbo_project.collect_files(target))
 
         logging.info("Done!")
 
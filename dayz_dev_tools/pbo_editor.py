@@ -0,0 +1,425 @@
+import contextlib
+import dataclasses
+import errno
+import hashlib
+import io
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import time
+import types
+import typing
+
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import pbo_file
+from dayz_dev_tools import pbo_reader
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Hashing is done in large slices of the memory-mapped archive, since hashlib releases the GIL
+# while hashing them
+_HASH_SLICE_SIZE = 64 * 1024 * 1024
+
+# Errors from os.copy_file_range that mean the kernel cannot copy between the two files, so they
+# must be copied by reading and writing instead
+_COPY_UNSUPPORTED_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+@dataclasses.dataclass
+class _RawEntry:
+    filename: bytes
+    mime_type: bytes
+    original_size: int
+    reserved: int
+    time_stamp: int
+    data_size: int
+    # Where the stored data comes from: a file object and the offset of the data within it, a
+    # file containing only the data, or the data itself
+    source: typing.Union[tuple[typing.BinaryIO, int], pathlib.Path, bytes]
+
+
+def _key(filename: typing.Union[str, bytes]) -> bytes:
+    raw = filename.encode("utf8") if isinstance(filename, str) else filename
+    return b"\\".join(pbo_file.split_path(raw)).lower()
+
+
+def _stored_name(filename: typing.Union[str, bytes]) -> bytes:
+    raw = filename.encode("utf8") if isinstance(filename, str) else filename
+    return b"\\".join(pbo_file.split_path(raw))
+
+
+def _raw_entry(entry: pbo_file.PBOFile) -> _RawEntry:
+    assert entry.content_reader is not None
+    return _RawEntry(
+        filename=entry.filename,
+        mime_type=entry.mime_type,
+        original_size=entry.original_size,
+        reserved=entry.reserved,
+        time_stamp=entry.time_stamp,
+        data_size=entry.data_size,
+        source=(entry.content_reader.content_file, entry.content_reader.offset))
+
+
+def _write_all(output: typing.BinaryIO, data: typing.Union[bytes, memoryview]) -> None:
+    view = memoryview(data)
+    while len(view) > 0:
+        written = output.write(view)
+        view = view[written or 0:]
+
+
+def _copy_with_reads(
+    source: typing.BinaryIO, offset: int, size: int, output: typing.BinaryIO
+) -> None:
+    source.seek(offset)
+
+    while size > 0:
+        chunk = source.read(min(size, _CHUNK_SIZE))
+        if len(chunk) == 0:
+            raise Exception("Unexpected end of file while copying PBO contents")
+
+        _write_all(output, chunk)
+        size -= len(chunk)
+
+
+def _copy(source: typing.BinaryIO, offset: int, size: int, output: typing.BinaryIO) -> None:
+    copy_file_range = getattr(os, "copy_file_range", None)
+
+    try:
+        source_fd = source.fileno() if copy_file_range is not None else None
+    except (AttributeError, io.UnsupportedOperation):
+        source_fd = None
+
+    if copy_file_range is None or source_fd is None:
+        _copy_with_reads(source, offset, size, output)
+        return
+
+    # The data is copied by the kernel, without passing through Python, and may even be shared
+    # with the source file on filesystems that support it
+    while size > 0:
+        try:
+            copied = copy_file_range(source_fd, output.fileno(), size, offset)
+        except OSError as error:
+            if error.errno not in _COPY_UNSUPPORTED_ERRORS:
+                raise
+
+            logging.debug("Unable to copy file range (%s); falling back to reading", error)
+            _copy_with_reads(source, offset, size, output)
+            return
+
+        if copied == 0:
+            raise Exception("Unexpected end of file while copying PBO contents")
+
+        offset += copied
+        size -= copied
+
+
+def _hash_file(output: typing.BinaryIO, size: int) -> bytes:
+    digest = hashlib.sha1()
+
+    if size > 0:
+        with mmap.mmap(output.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for start in range(0, size, _HASH_SLICE_SIZE):
+                    digest.update(view[start:start + _HASH_SLICE_SIZE])
+            finally:
+                view.release()
+
+    return digest.digest()
+
+
+def _write_archive(
+    path: str, headers: list[tuple[bytes, bytes]], entries: list[_RawEntry]
+) -> None:
+    # The output is unbuffered, so the data copied by the kernel and the data written by Python
+    # are never reordered
+    with open(path, "w+b", buffering=0) as output:
+        table = io.BytesIO()
+        table.write(b"\x00sreV\x00" + b"\x00" * 15)
+
+        for name, value in headers:
+            table.write(name + b"\x00" + value + b"\x00")
+
+        table.write(b"\x00")
+
+        for entry in entries:
+            table.write(entry.filename + b"\x00")
+            table.write(entry.mime_type)
+            table.write(struct.pack(
+                "<IIII", entry.original_size, entry.reserved, entry.time_stamp, entry.data_size))
+
+        table.write(b"\x00" * 21)
+
+        typed_output = typing.cast(typing.BinaryIO, output)
+        _write_all(typed_output, table.getvalue())
+
+        for entry in entries:
+            logging.debug("Copying file contents: %s", entry.filename.decode(errors="replace"))
+
+            if isinstance(entry.source, bytes):
+                _write_all(typed_output, entry.source)
+            elif isinstance(entry.source, tuple):
+                _copy(entry.source[0], entry.source[1], entry.data_size, typed_output)
+            else:
+                raise Exception(f"Unopened file: {entry.source}")
+
+        # The footer is a hash of the whole archive, so the copied data must be hashed too, but it
+        # is hashed from the page cache without being copied into Python objects
+        size = output.seek(0, io.SEEK_END)
+        _write_all(typed_output, b"\x00" + _hash_file(typed_output, size))
+
+
+def _save_archive(
+    path: str, headers: list[tuple[bytes, bytes]], entries: list[_RawEntry]
+) -> None:
+    try:
+        _write_archive(path, headers, entries)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _prefix_parts(headers: list[tuple[bytes, bytes]]) -> list[bytes]:
+    for name, value in headers:
+        if name == b"prefix":
+            return pbo_file.split_path(value)
+
+    return []
+
+
+def merge(
+    readers: list[pbo_reader.PBOReader],
+    output_path: str,
+    *,
+    headers: typing.Optional[list[tuple[bytes, bytes]]] = None
+) -> None:
+    """Combine the files of several PBO archives into a new archive.
+
+    The stored contents of each file, whether compressed or not, are copied without being
+    unpacked, along with its size, type and timestamp. Filenames are adjusted when the archives
+    have different prefixes.
+
+    :Parameters:
+      - `readers`: :class:`~dayz_dev_tools.pbo_reader.PBOReader` instances for the archives to
+        combine.
+      - `output_path`: The location of the new archive.
+      - `headers`: The headers of the new archive, or ``None`` to use the headers of the first
+        archive. Every file must be within the new archive's prefix.
+
+    :Raises:
+      - `Exception`: If a file is outside the new archive's prefix, or more than one archive
+        contains a file with the same name.
+    """
+    if headers is None:
+        headers = readers[0].headers() if len(readers) > 0 else []
+
+    prefix = [part.lower() for part in _prefix_parts(headers)]
+    entries: dict[bytes, _RawEntry] = {}
+
+    for reader in readers:
+        for entry in reader.files():
+            parts = entry.split_filename()
+
+            if [part.lower() for part in parts[:len(prefix)]] != prefix:
+                raise Exception(
+                    f"File is outside of the merged PBO prefix: {entry.normalized_filename()}")
+
+            filename = b"\\".join(parts[len(prefix):])
+            if _key(filename) in entries:
+                raise Exception(f"Duplicate file in merged PBOs: {entry.normalized_filename()}")
+
+            entries[_key(filename)] = dataclasses.replace(_raw_entry(entry), filename=filename)
+
+    _save_archive(output_path, headers, list(entries.values()))
+
+
+def split(
+    reader: pbo_reader.PBOReader, outputs: list[tuple[str, file_matcher.FileMatcher]]
+) -> None:
+    """Divide the files of a PBO archive between new archives.
+
+    The stored contents of each file, whether compressed or not, are copied without being
+    unpacked, along with its name, size, type and timestamp. Each new archive has the same headers
+    as the original archive.
+
+    :Parameters:
+      - `reader`: A :class:`~dayz_dev_tools.pbo_reader.PBOReader` for the archive to divide.
+      - `outputs`: A list of tuples containing the location of each new archive and a
+        :class:`~dayz_dev_tools.file_matcher.FileMatcher` selecting the files it contains. Each
+        file is written to the first archive that selects it, and files that no archive selects
+        are left out.
+    """
+    selected: list[list[_RawEntry]] = [[] for _ in outputs]
+
+    for entry in reader.files():
+        for index, (_, matcher) in enumerate(outputs):
+            if matcher.matches(entry.normalized_filename()):
+                selected[index].append(_raw_entry(entry))
+                break
+        else:
+            logging.debug("Leaving out unselected file: %s", entry.normalized_filename())
+
+    for (output_path, _), entries in zip(outputs, selected):
+        _save_archive(output_path, reader.headers(), entries)
+
+
+class PBOEditor:
+    """Interface for modifying an existing PBO archive.
+
+    Files can be added, replaced and removed without extracting and repacking the whole archive.
+    When the archive is saved, the stored contents of unchanged files, whether compressed or not,
+    are copied directly from the original archive, using ``os.copy_file_range`` where it is
+    available.
+    """
+    def __init__(self, path: str) -> None:
+        """Create a new :class:`PBOEditor` instance.
+
+        :Parameters:
+          - `path`: The location of the PBO archive to modify.
+        """
+        self.path = path
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "rb")
+
+        try:
+            reader = pbo_reader.PBOReader(self._file)
+        except BaseException:
+            self._file.close()
+            raise
+
+        self._headers = list(reader.headers())
+        self._entries = {_key(entry.filename): _raw_entry(entry) for entry in reader.files()}
+
+    def filenames(self) -> list[bytes]:
+        """Get the names of the files in the archive, including any changes.
+
+        :Returns:
+          A list of the raw names of the files, in the order they are stored.
+        """
+        return [entry.filename for entry in self._entries.values()]
+
+    def headers(self) -> list[tuple[bytes, bytes]]:
+        """Get the PBO archive headers.
+
+        :Returns:
+          A list of tuples containing the header names and values.
+        """
+        return self._headers
+
+    def remove(self, filename: typing.AnyStr) -> None:
+        """Remove a file from the archive.
+
+        :Parameters:
+          - `filename`: The name of the file, matched case-insensitively. Either ``/`` or ``\\``
+            may separate directories.
+
+        :Raises:
+          - `Exception`: If the archive does not contain the file.
+        """
+        if self._entries.pop(_key(filename), None) is None:
+            raise Exception(f"File not found in PBO: {filename!r}")
+
+    def add_bytes(
+        self, filename: typing.AnyStr, data: bytes, *, time_stamp: typing.Optional[int] = None
+    ) -> None:
+        """Add a file to the archive, replacing any existing file with the same name.
+
+        Replaced files keep their position in the archive, while new files are stored after all
+        existing files.
+
+        :Parameters:
+          - `filename`: The name of the file in the archive. Either ``/`` or ``\\`` may separate
+            directories.
+          - `data`: The contents of the file, which are stored uncompressed.
+          - `time_stamp`: The file's modification time as a Unix timestamp, or ``None`` for the
+            current time.
+        """
+        self._add(filename, data, len(data), time_stamp)
+
+    def add_file(
+        self, path: pathlib.Path, filename: typing.Optional[typing.AnyStr] = None
+    ) -> None:
+        """Add a file from the filesystem to the archive, replacing any existing file with the
+        same name. Its contents are copied when the archive is saved.
+
+        :Parameters:
+          - `path`: The location of the file to add.
+          - `filename`: The name of the file in the archive, or ``None`` to use `path`, as
+            :meth:`dayz_dev_tools.pbo_writer.PBOWriter.add_file` does.
+        """
+        info = path.stat()
+        name: typing.Union[str, bytes] = \
+            "\\".join(path.relative_to(path.anchor).parts) if filename is None else filename
+        self._add(name, path, info.st_size, int(info.st_mtime))
+
+    def _add(
+        self,
+        filename: typing.Union[str, bytes],
+        source: typing.Union[pathlib.Path, bytes],
+        size: int,
+        time_stamp: typing.Optional[int]
+    ) -> None:
+        key = _key(filename)
+        if len(key) == 0:
+            raise Exception(f"Invalid filename: {filename!r}")
+
+        self._entries[key] = _RawEntry(
+            filename=_stored_name(filename),
+            mime_type=b"\x00" * 4,
+            original_size=size,
+            reserved=0,
+            time_stamp=int(time.time() if time_stamp is None else time_stamp),
+            data_size=size,
+            source=source)
+
+    def save(self, output_path: typing.Optional[str] = None) -> None:
+        """Write the modified archive.
+
+        :Parameters:
+          - `output_path`: The location to write the modified archive to, or ``None`` to replace
+            the original archive. The original archive is replaced atomically once the modified
+            archive is complete.
+        """
+        in_place = output_path is None
+        path = f"{self.path}.{os.getpid()}.partial" if in_place else typing.cast(str, output_path)
+
+        with contextlib.ExitStack() as stack:
+            entries = []
+            for entry in self._entries.values():
+                if isinstance(entry.source, pathlib.Path):
+                    added = stack.enter_context(open(entry.source, "rb"))
+                    if os.fstat(added.fileno()).st_size != entry.data_size:
+                        raise Exception(f"File size changed: {entry.source}")
+                    entry = dataclasses.replace(entry, source=(added, 0))
+                entries.append(entry)
+
+            _save_archive(path, self._headers, entries)
+
+        if in_place:
+            # The original archive must be closed before it can be replaced on Windows
+            self._file.close()
+            os.replace(path, self.path)
+            self._open()
+
+    def close(self) -> None:
+        """Close the original archive."""
+        self._file.close()
+
+    def __enter__(self) -> "PBOEditor":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[type[BaseException]],
+        exc_value: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType]
+    ) -> None:
+        self.close()
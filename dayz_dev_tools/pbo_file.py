@@ -1,6 +1,7 @@
 import dataclasses
 import os
 import re
+import struct
 import typing
 
 from dayz_dev_tools import pbo_file_reader
@@ -12,10 +13,25 @@ INVALID_FILENAME_RE = re.compile(b"[\t?*<>:\"|\x80-\xff]")
 RESERVED_FILENAME_RE = re.compile(b"(CON|PRN|AUX|NUL|COM\\d|LPT\\d)\\.?")
 
 
+def split_path(path: bytes) -> list[bytes]:
+    return list(filter(lambda c: len(c) > 0, re.split(b"[\\\\/]", path)))
+
+
 def normalize_filename(parts: list[bytes]) -> str:
     return os.path.sep.encode().join(parts).decode(errors="replace")
 
 
+def _expand(data: bytes, expected_checksum: int, original_size: int) -> bytes:
+    expanded = expand(data, original_size)
+    # The checksum is stored as a 32-bit unsigned integer, so it wraps around for large files
+    actual_checksum = sum(expanded) & 0xffffffff
+
+    if actual_checksum != expected_checksum:
+        raise Exception(f"Checksum mismatch ({actual_checksum:#x} != {expected_checksum:#x})")
+
+    return expanded
+
+
 @dataclasses.dataclass
 class PBOFile:
     """Interface for accessing a file contained within a PBO archive. Instances should be obtained
@@ -31,27 +47,81 @@ class PBOFile:
     #: The size of the file in the PBO archive
     data_size: int
     content_reader: typing.Optional[pbo_file_reader.PBOFileReader] = None
+    _normalized: typing.Optional[tuple[typing.Optional[bytes], bytes, str]] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False)
 
-    def unpack(self, output_file: typing.BinaryIO) -> None:
+    def unpack(
+        self, output_file: typing.BinaryIO, *, chunk_size: typing.Optional[int] = None
+    ) -> None:
         """Write the contents of the file.
 
         :Parameters:
           - `output_file`: A binary file-like object where the contents are to be written.
+          - `chunk_size`: The maximum number of bytes of an uncompressed file to hold in memory at
+            once, or None to read the whole file at once. Compressed files are always expanded in
+            memory.
         """
         assert self.content_reader is not None
 
-        if self.original_size != 0 and self.original_size != self.data_size:
-            expanded = expand(self.content_reader.read(self.data_size - 4), self.original_size)
-            expected_checksum = self.content_reader.readuint()
-            actual_checksum = sum(expanded)
+        if self.compressed():
+            output_file.write(_expand(
+                self.content_reader.read(self.data_size - 4),
+                self.content_reader.readuint(),
+                self.original_size))
+        elif chunk_size is None:
+            output_file.write(self.content_reader.read(self.data_size))
+        else:
+            remaining = self.data_size
+            while remaining > 0:
+                chunk = self.content_reader.read(min(chunk_size, remaining))
+                if len(chunk) == 0:
+                    break
+                output_file.write(chunk)
+                remaining -= len(chunk)
+
+    def read_data(self) -> bytes:
+        """Read the file's data as stored in the PBO archive, without decompressing it.
 
-            if actual_checksum != expected_checksum:
-                raise Exception(
-                    f"Checksum mismatch ({actual_checksum:#x} != {expected_checksum:#x})")
+        The data is read from the PBO archive's underlying file-like object, so this method must
+        not be called concurrently for files in the same PBO archive.
 
-            output_file.write(expanded)
-        else:
-            output_file.write(self.content_reader.read(self.data_size))
+        :Returns:
+          The stored data of the file.
+        """
+        assert self.content_reader is not None
+
+        self.content_reader.seek(0)
+
+        return self.content_reader.read(self.data_size)
+
+    def unpack_data(self, data: bytes) -> bytes:
+        """Get the contents of the file from its stored data, as returned by
+        :meth:`PBOFile.read_data`, decompressing it if necessary.
+
+        Unlike :meth:`PBOFile.unpack`, this method does not access the PBO archive, so it may be
+        called from any thread. The global interpreter lock is released while decompressing.
+
+        :Parameters:
+          - `data`: The stored data of the file.
+
+        :Returns:
+          The contents of the file.
+        """
+        if not self.compressed():
+            return data
+
+        if len(data) < 4:
+            raise pbo_file_reader.InsufficientBytes()
+
+        return _expand(data[:-4], struct.unpack("<I", data[-4:])[0], self.original_size)
+
+    def compressed(self) -> bool:
+        """Returns True if the file is stored compressed in the PBO archive.
+
+        :Returns:
+          True if the file is compressed, or False otherwise.
+        """
+        return self.original_size != 0 and self.original_size != self.data_size
 
     def normalized_filename(self) -> str:
         """Get the normalized version of the file's name.
@@ -62,7 +132,15 @@ class PBOFile:
         :Returns:
           A normalized version of the file's name.
         """
-        return normalize_filename(self.split_filename())
+        # The result is cached, since it is needed repeatedly when filtering or extracting files
+        if self._normalized is not None \
+                and self._normalized[0] is self.prefix and self._normalized[1] is self.filename:
+            return self._normalized[2]
+
+        normalized = normalize_filename(self.split_filename())
+        self._normalized = (self.prefix, self.filename, normalized)
+
+        return normalized
 
     def split_filename(self) -> list[bytes]:
         """Get the file's name as a ``list``, where each element in the list represents a component
@@ -71,10 +149,10 @@ class PBOFile:
         :Returns:
           A list of path components.
         """
-        result = list(filter(lambda c: len(c) > 0, re.split(b"[\\\\/]", self.filename)))
+        result = split_path(self.filename)
 
         if self.prefix is not None:
-            result.insert(0, self.prefix)
+            result[0:0] = split_path(self.prefix)
 
         if len(result) == 0:
             return [b""]
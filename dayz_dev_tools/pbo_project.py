@@ -0,0 +1,369 @@
+from concurrent import futures
+import dataclasses
+import functools
+import logging
+import os
+import pathlib
+import pydantic
+import stat
+import sys
+import typing
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+import dayz_dev_tools
+from dayz_dev_tools import build_manifest
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import logging_configuration
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_writer
+from dayz_dev_tools import signatures
+from dayz_dev_tools import source_collector
+
+
+#: The default name of the project file
+DEFAULT_PROJECT_FILE = "pbo.toml"
+
+
+class _Project(pydantic.BaseModel):
+    output: str = "."
+    sign: typing.Optional[str] = None
+    headers: dict[str, str] = pydantic.Field(default_factory=dict)
+    compress: bool = False
+    compression_level: int = pydantic.Field(
+        default=pbo_writer.DEFAULT_COMPRESSION_LEVEL, ge=1, le=9)
+    exclude: list[str] = pydantic.Field(default_factory=list)
+
+
+class _Target(pydantic.BaseModel):
+    directory: typing.Optional[str] = None
+    pbofile: typing.Optional[str] = None
+    files: list[str] = pydantic.Field(default_factory=list)
+    patterns: list[str] = pydantic.Field(default_factory=list)
+    headers: dict[str, str] = pydantic.Field(default_factory=dict)
+    sign: typing.Optional[str] = None
+    convert: bool = True
+    compress: typing.Optional[bool] = None
+    compress_match: typing.Optional[list[str]] = None
+    compress_exclude: typing.Optional[list[str]] = None
+    compression_level: typing.Optional[int] = pydantic.Field(default=None, ge=1, le=9)
+    exclude: list[str] = pydantic.Field(default_factory=list)
+
+
+class _Config(pydantic.BaseModel):
+    project: _Project = pydantic.Field(default_factory=_Project)
+    target: dict[str, _Target] = pydantic.Field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class TargetConfig:
+    """Settings for building a single PBO file."""
+    #: The name of the target
+    name: str
+    #: The PBO file to create
+    pbofile: str
+    #: Files and directories to add to the PBO, relative to :attr:`directory`
+    files: list[str] = dataclasses.field(default_factory=list)
+    #: Glob patterns of files to add to the PBO, relative to :attr:`directory`
+    patterns: list[str] = dataclasses.field(default_factory=list)
+    #: Directory containing the files to add to the PBO (optional)
+    directory: typing.Optional[str] = None
+    #: Headers to add to the PBO, as (name, value) tuples
+    headers: list[tuple[str, str]] = dataclasses.field(default_factory=list)
+    #: Private key to sign the PBO with (optional)
+    sign: typing.Optional[str] = None
+    #: Whether to convert ``config.cpp`` files to ``config.bin`` files
+    convert: bool = True
+    #: Whether to compress files
+    compress: bool = False
+    #: Glob patterns of files to compress instead of the default source file types (optional)
+    compress_match: typing.Optional[list[str]] = None
+    #: Glob patterns of additional files not to compress (optional)
+    compress_exclude: typing.Optional[list[str]] = None
+    #: LZSS compression level
+    compression_level: int = pbo_writer.DEFAULT_COMPRESSION_LEVEL
+    #: Gitignore-style patterns of files not to add from directories, in addition to
+    #: :data:`~dayz_dev_tools.source_collector.DEFAULT_IGNORE_PATTERNS` and ``.pboignore`` files
+    exclude: list[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class ProjectConfig:
+    """Project file settings."""
+    #: Targets, by name (see :class:`dayz_dev_tools.pbo_project.TargetConfig`)
+    targets: dict[str, TargetConfig]
+
+
+def load(filename: str) -> ProjectConfig:
+    """Read a TOML-syntax PBO project file.
+
+    Relative paths in the project file are relative to the directory containing it.
+
+    :Parameters:
+      - `filename`: The name of the project file to read (e.g. ``pbo.toml``)
+
+    :Returns:
+      A :class:`~dayz_dev_tools.pbo_project.ProjectConfig`.
+    """
+    try:
+        with open(filename, "rb") as toml_file:
+            config = _Config.model_validate(tomllib.load(toml_file))
+    except tomllib.TOMLDecodeError as error:
+        raise Exception(f"Configuration error in {filename}: {error}") from error
+    except pydantic.ValidationError as error:
+        loc = ".".join(str(ll) for ll in error.errors()[0]['loc'])
+        inp = error.errors()[0]['input']
+        msg = error.errors()[0]['msg']
+        raise Exception(f"Configuration error at {loc}: {inp}: {msg}") from error
+
+    base = os.path.dirname(os.path.abspath(filename))
+
+    def resolve(path: typing.Optional[str]) -> typing.Optional[str]:
+        return None if path is None else os.path.join(base, path)
+
+    project = config.project
+
+    return ProjectConfig(
+        targets={
+            name: TargetConfig(
+                name=name,
+                pbofile=os.path.join(base, project.output, target.pbofile or f"{name}.pbo"),
+                files=target.files if target.files or target.patterns else ["."],
+                patterns=target.patterns,
+                directory=resolve(target.directory or name),
+                headers=list({**project.headers, **target.headers}.items()),
+                sign=resolve(target.sign or project.sign),
+                convert=target.convert,
+                compress=project.compress if target.compress is None else target.compress,
+                compress_match=target.compress_match,
+                compress_exclude=target.compress_exclude,
+                compression_level=target.compression_level or project.compression_level,
+                exclude=project.exclude + target.exclude)
+            for name, target in config.target.items()
+        })
+
+
+def collect_files(target: TargetConfig) -> list[source_collector.SourceFile]:
+    """Find the files to add to a target's PBO file.
+
+    Paths are relative to the current directory, which should be the target's
+    :attr:`~TargetConfig.directory`. Directories are searched with
+    :func:`~dayz_dev_tools.source_collector.walk`, skipping files matching the target's
+    :attr:`~TargetConfig.exclude` patterns.
+
+    :Parameters:
+      - `target`: The :class:`TargetConfig` to collect files for.
+
+    :Returns:
+      The files to add to the PBO file, as
+      :class:`~dayz_dev_tools.source_collector.SourceFile` instances.
+    """
+    files = []
+
+    for pattern in target.patterns:
+        anchor = pathlib.Path(pathlib.Path(pattern).anchor)
+        rest = pathlib.Path(pattern).relative_to(anchor)
+        for path in anchor.glob(str(rest)):
+            info = path.stat()
+            if not stat.S_ISDIR(info.st_mode):
+                logging.info("Adding file `%s`", path)
+                files.append(source_collector.SourceFile(path, info))
+
+    for file in target.files:
+        path = pathlib.Path(file)
+        if path.is_dir():
+            for source_file in source_collector.walk(path, exclude=target.exclude):
+                logging.info("Adding file `%s`", source_file.path)
+                files.append(source_file)
+        else:
+            logging.info("Adding file `%s`", path)
+            files.append(source_collector.SourceFile(path))
+
+    return files
+
+
+def build_target(
+    target: TargetConfig,
+    *,
+    tools_dir: typing.Optional[str],
+    files: typing.Optional[list[source_collector.SourceFile]] = None,
+    incremental: bool = False,
+    checksums: bool = False,
+    max_memory: typing.Optional[int] = None,
+    jobs: typing.Optional[int] = None
+) -> bool:
+    """Build a target's PBO file.
+
+    Paths in the target are relative to the current directory, which should be the target's
+    :attr:`~TargetConfig.directory`.
+
+    :Parameters:
+      - `target`: The :class:`TargetConfig` to build.
+      - `tools_dir`: The location of the DayZ Tools directory, or ``None`` if not installed.
+      - `files`: The files to add to the PBO file, or ``None`` to use :func:`collect_files`.
+      - `incremental`: If True, the PBO file is only built if its inputs have changed since it
+        was last built (see :class:`~dayz_dev_tools.build_manifest.BuildManifest`).
+      - `checksums`: If True, file contents are compared when building incrementally.
+      - `max_memory`: The maximum number of bytes of file contents to hold in memory at once, or
+        ``None`` for the default.
+      - `jobs`: The maximum number of files to compress at once, or ``None`` for the default.
+
+    :Returns:
+      True if the PBO file was built, or False if it was up to date.
+    """
+    cfgconvert = None
+    if target.convert:
+        cfgconvert = config_cpp.default_converter(tools_dir)
+
+    compress = None
+    if target.compress or target.compress_match or target.compress_exclude:
+        compress = pbo_writer.compression_policy(
+            include=target.compress_match, exclude=target.compress_exclude)
+
+    manifest = None
+    if incremental or checksums:
+        manifest = build_manifest.BuildManifest(target.pbofile, checksums=checksums)
+
+    writer = pbo_writer.PBOWriter(
+        cfgconvert=cfgconvert, max_memory=max_memory, compress=compress,
+        compression_level=target.compression_level, jobs=jobs, manifest=manifest)
+
+    writer.add_header(
+        "dayz-dev-tools",
+        f"v{dayz_dev_tools.version} - https://dayz-dev-tools.readthedocs.io/")
+
+    for header in target.headers:
+        logging.info("Adding header: `%s` = `%s`", header[0], header[1])
+        writer.add_header(*header)
+
+    for source_file in collect_files(target) if files is None else files:
+        writer.add_file(source_file.path, stat=source_file.stat)
+
+    settings = {
+        "cfgconvert": cfgconvert,
+        "compress": target.compress,
+        "compress_match": target.compress_match,
+        "compress_exclude": target.compress_exclude,
+        "compression_level": target.compression_level,
+        "sign": target.sign
+    }
+
+    if manifest is not None and manifest.up_to_date(writer, settings):
+        logging.info("PBO file `%s` is up to date", target.pbofile)
+        return False
+
+    with open(target.pbofile, "wb") as output:
+        logging.info("Writing PBO file `%s`", target.pbofile)
+        writer.write(output)
+
+    if target.sign is not None:
+        logging.info("Signing PBO file `%s` using private key `%s`", target.pbofile, target.sign)
+        signatures.sign(target.pbofile, signatures.read_private_key(target.sign))
+
+    if manifest is not None:
+        manifest.save(writer, settings)
+
+    return True
+
+
+def _build_in_directory(
+    target: TargetConfig,
+    *,
+    tools_dir: typing.Optional[str],
+    force: bool,
+    checksums: bool,
+    max_memory: typing.Optional[int]
+) -> bool:
+    with misc.chdir(target.directory):
+        # Targets are already built in parallel, so files within a target are compressed one at
+        # a time
+        return build_target(
+            target, tools_dir=tools_dir, incremental=not force, checksums=checksums,
+            max_memory=max_memory, jobs=1)
+
+
+@dataclasses.dataclass
+class BuildStatistics:
+    """Statistics about the targets built by :func:`build_project`."""
+    #: The number of targets that were built
+    built: int = 0
+    #: The number of targets that were up to date
+    skipped: int = 0
+
+
+def build_project(
+    project: ProjectConfig,
+    targets: typing.Optional[list[str]] = None,
+    *,
+    tools_dir: typing.Optional[str],
+    force: bool = False,
+    checksums: bool = False,
+    max_memory: typing.Optional[int] = None,
+    jobs: typing.Optional[int] = None,
+    debug: bool = False
+) -> BuildStatistics:
+    """Build a project's targets concurrently, each in its own process.
+
+    Targets whose inputs have not changed since they were last built are skipped.
+
+    :Parameters:
+      - `project`: The :class:`ProjectConfig` to build.
+      - `targets`: The names of the targets to build, or ``None`` to build all targets.
+      - `tools_dir`: The location of the DayZ Tools directory, or ``None`` if not installed.
+      - `force`: If True, targets are built even if they are up to date.
+      - `checksums`: If True, file contents are compared to determine if targets are up to date.
+      - `max_memory`: The maximum number of bytes of file contents each process may hold in
+        memory at once, or ``None`` for the default.
+      - `jobs`: The maximum number of targets to build at once, or ``None`` to use the
+        ``concurrent.futures.ProcessPoolExecutor`` default.
+      - `debug`: If True, worker processes log debug messages.
+
+    :Returns:
+      A :class:`BuildStatistics` instance.
+
+    :Raises:
+      - `Exception`: If a target does not exist or any target fails to build.
+    """
+    names = list(project.targets) if targets is None else targets
+
+    for name in names:
+        if name not in project.targets:
+            raise Exception(f"Unknown target: {name}")
+
+    statistics = BuildStatistics()
+    failures = 0
+
+    with futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=functools.partial(logging_configuration.configure_logging, debug=debug)
+    ) as executor:
+        pending = {
+            executor.submit(
+                _build_in_directory, project.targets[name], tools_dir=tools_dir, force=force,
+                checksums=checksums, max_memory=max_memory): name
+            for name in names
+        }
+
+        for future in futures.as_completed(pending):
+            name = pending[future]
+
+            try:
+                built = future.result()
+            except Exception as error:
+                logging.debug("Build of target %s failed", name, exc_info=True)
+                logging.error("Failed to build target %s: %s", name, error)
+                failures += 1
+                continue
+
+            if built:
+                statistics.built += 1
+            else:
+                statistics.skipped += 1
+
+    if failures > 0:
+        raise Exception(f"Failed to build {failures} of {len(names)} targets")
+
+    return statistics
@@ -1,11 +1,118 @@
+from concurrent import futures
+import contextlib
 import dataclasses
 import hashlib
+import io
 import logging
+import os
 import pathlib
+import queue
+import re
 import struct
+import threading
+import time
 import typing
+import weakref
 
 from dayz_dev_tools import config_cpp
+from dayz_dev_tools import config_parser
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import memory_budget
+from dayz_dev_tools import pbo_file
+from dayz_dev_tools import pbo_file_reader
+from dayz_dev_tools_rust import compress
+
+if typing.TYPE_CHECKING:
+    from dayz_dev_tools import build_manifest
+
+
+#: Glob patterns of files that are compressed by :func:`compression_policy` by default
+DEFAULT_COMPRESS_PATTERNS = [
+    "*.c", "*.cpp", "*.h", "*.hpp", "*.csv", "*.json", "*.layout", "*.txt", "*.xml"
+]
+
+#: Glob patterns of files that are never compressed by :func:`compression_policy`, since their
+#: contents are already compressed
+DEFAULT_STORE_PATTERNS = ["*.paa", "*.ogg", "*.wss", "*.jpg", "*.png", "*.edds"]
+
+#: The default LZSS compression level, between 1 (fastest) and 9 (smallest)
+DEFAULT_COMPRESSION_LEVEL = 5
+
+# The packing method of compressed entries, "Cprs" as a little-endian integer
+_COMPRESSED_MIME_TYPE = 0x43707273
+
+
+def compression_policy(
+    *,
+    include: typing.Optional[list[str]] = None,
+    exclude: typing.Optional[list[str]] = None
+) -> file_matcher.FileMatcher:
+    """Create a :class:`~dayz_dev_tools.file_matcher.FileMatcher` selecting the files to be
+    compressed by a :class:`PBOWriter`.
+
+    :Parameters:
+      - `include`: Glob patterns of files to compress, or None to compress files matching
+        :data:`DEFAULT_COMPRESS_PATTERNS`.
+      - `exclude`: Glob patterns of files not to compress, in addition to
+        :data:`DEFAULT_STORE_PATTERNS`.
+
+    :Returns:
+      A :class:`~dayz_dev_tools.file_matcher.FileMatcher` matching the files to compress.
+    """
+    return file_matcher.FileMatcher(
+        include=DEFAULT_COMPRESS_PATTERNS if include is None else include,
+        exclude=DEFAULT_STORE_PATTERNS + (exclude or []))
+
+
+# Files in a PBO archive share the archive's file object, so reads of them from different threads
+# must not interleave. Each archive has its own lock, so reads of different archives may.
+_archive_locks: "weakref.WeakKeyDictionary[typing.BinaryIO, threading.Lock]" = \
+    weakref.WeakKeyDictionary()
+_archive_locks_lock = threading.Lock()
+
+
+def _archive_lock(content_file: typing.BinaryIO) -> threading.Lock:
+    with _archive_locks_lock:
+        lock = _archive_locks.get(content_file)
+
+        if lock is None:
+            lock = _archive_locks[content_file] = threading.Lock()
+
+        return lock
+
+
+class _StreamSource:
+    def __init__(self, fileobj: typing.BinaryIO) -> None:
+        self.fileobj = fileobj
+        # The stream is rewound before each read, since the contents may be read more than once,
+        # e.g. for compression and then again for writing
+        self.start = fileobj.tell()
+
+    def open(self) -> typing.ContextManager[typing.BinaryIO]:
+        self.fileobj.seek(self.start)
+        return contextlib.nullcontext(self.fileobj)
+
+
+class _LockedReader:
+    def __init__(self, reader: pbo_file_reader.PBOFileReader, lock: threading.Lock) -> None:
+        self.reader = reader
+        self.lock = lock
+
+    def read(self, size: int) -> bytes:
+        with self.lock:
+            return self.reader.read(size)
+
+
+class _ArchiveSource:
+    def __init__(self, content_reader: pbo_file_reader.PBOFileReader) -> None:
+        self.content_reader = content_reader
+        self.lock = _archive_lock(content_reader.content_file)
+
+    def open(self) -> typing.ContextManager[typing.BinaryIO]:
+        # Each read gets its own position, so the file may be read by several threads
+        reader = self.content_reader.subreader(0, self.content_reader.size)
+        return contextlib.nullcontext(
+            typing.cast(typing.BinaryIO, _LockedReader(reader, self.lock)))
 
 
 @dataclasses.dataclass(eq=True, frozen=True)
@@ -15,33 +122,250 @@ class _Entry:
     size: int
     mtime: int
     contents: typing.Optional[bytes]
+    mtime_ns: int = 0
+    # Where the contents are read from, if not from contents or read_path. Sources compare by
+    # identity, so different sources are never mistaken for duplicates.
+    source: typing.Optional[typing.Union[_StreamSource, _ArchiveSource]] = None
+
+    def open(self) -> typing.ContextManager[typing.BinaryIO]:
+        if self.contents is not None:
+            return contextlib.nullcontext(typing.cast(typing.BinaryIO, io.BytesIO(self.contents)))
+
+        if self.source is not None:
+            return self.source.open()
+
+        return open(self.read_path, "rb")
+
+
+def _stored_path(path: pathlib.Path) -> str:
+    return "\\".join(path.relative_to(path.anchor).parts)
+
+
+def _split_stored_path(stored_path: str) -> list[str]:
+    parts = [part for part in re.split(r"[\\/]", stored_path) if len(part) > 0]
+
+    if len(parts) == 0:
+        raise Exception(f"Invalid filename: {stored_path!r}")
+
+    return parts
+
+
+# The number of chunks that may wait between each stage of writing
+_PIPELINE_DEPTH = 4
+
+# Small writes are collected into blocks of this size before they are passed between stages,
+# since each handoff between threads costs far more than hashing or copying a few bytes
+_BLOCK_SIZE = 1024 * 1024
 
 
 class _HashWriter:
     def __init__(self, output: typing.BinaryIO) -> None:
         self.output = output
         self.hash = hashlib.sha1()
+        # Hashing is done on a separate thread, which runs while the calling thread is writing,
+        # since hashlib releases the GIL when hashing large amounts of data
+        self.queue: queue.Queue[typing.Optional[bytes]] = queue.Queue(maxsize=_PIPELINE_DEPTH)
+        self.pending = bytearray()
+        self.thread = threading.Thread(target=self._hash, daemon=True)
+        self.thread.start()
+
+    def _hash(self) -> None:
+        while (data := self.queue.get()) is not None:
+            self.hash.update(data)
+
+    def _send(self, data: bytes) -> None:
+        self.queue.put(data)
+        self.output.write(data)
+
+    def _flush(self) -> None:
+        if len(self.pending) > 0:
+            self._send(bytes(self.pending))
+            self.pending.clear()
 
     def write(self, data: bytes) -> int:
-        self.hash.update(data)
-        return self.output.write(data)
+        if len(data) >= _BLOCK_SIZE:
+            self._flush()
+            self._send(data)
+        else:
+            self.pending += data
+            if len(self.pending) >= _BLOCK_SIZE:
+                self._flush()
+
+        return len(data)
+
+    def close(self) -> None:
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
 
     def finalize(self) -> int:
+        self._flush()
+        self.close()
         return self.output.write(b"\x00" + self.hash.digest())
 
 
+def _read_chunks(
+    infile: typing.BinaryIO, size: int, chunk_size: int
+) -> typing.Iterator[bytes]:
+    # One byte more than expected is requested at the end to detect files that have grown
+    copied = 0
+
+    while True:
+        request = min(chunk_size, size - copied + 1)
+        chunk = infile.read(request)
+
+        if copied + len(chunk) > size:
+            raise Exception(f"File size mismatch {copied + len(chunk)} != {size}")
+
+        yield chunk
+        copied += len(chunk)
+
+        if len(chunk) < request:
+            break
+
+    if copied != size:
+        raise Exception(f"File size mismatch {copied} != {size}")
+
+
+class _ContentReader:
+    def __init__(
+        self, entries: list[_Entry], chunk_size: int, compressed: dict[_Entry, bytes]
+    ) -> None:
+        self.queue: queue.Queue[typing.Union[bytes, BaseException, None]] = queue.Queue(
+            maxsize=_PIPELINE_DEPTH)
+        self.stop = threading.Event()
+        self.thread = threading.Thread(
+            target=self._read, args=(entries, chunk_size, compressed), daemon=True)
+        self.thread.start()
+
+    def _put(self, item: typing.Union[bytes, BaseException, None]) -> bool:
+        if self.stop.is_set():
+            return False
+
+        self.queue.put(item)
+        return True
+
+    def _read(
+        self, entries: list[_Entry], chunk_size: int, compressed: dict[_Entry, bytes]
+    ) -> None:
+        pending = bytearray()
+
+        def put_block(data: bytes) -> bool:
+            if len(data) < _BLOCK_SIZE:
+                pending.extend(data)
+                if len(pending) < _BLOCK_SIZE:
+                    return True
+
+                data = bytes(pending)
+            elif len(pending) > 0 and not self._put(bytes(pending)):
+                return False
+
+            pending.clear()
+            return self._put(data)
+
+        try:
+            for entry in entries:
+                logging.debug("Writing file content: %s", entry.stored_path)
+
+                if entry in compressed:
+                    if not put_block(compressed[entry]):
+                        return
+                elif entry.contents is None:
+                    with entry.open() as infile:
+                        for chunk in _read_chunks(infile, entry.size, chunk_size):
+                            if not put_block(chunk):
+                                return
+                else:
+                    if len(entry.contents) != entry.size:
+                        raise Exception(
+                            f"File size mismatch {len(entry.contents)} != {entry.size}")
+
+                    if not put_block(entry.contents):
+                        return
+
+            if len(pending) > 0 and not self._put(bytes(pending)):
+                return
+
+            self._put(None)
+        except BaseException as error:
+            self._put(error)
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        while (item := self.queue.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+
+    def close(self) -> None:
+        self.stop.set()
+
+        # Make room for a blocked put, so that the reading thread sees that it must stop
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+        self.thread.join()
+
+
 class PBOWriter:
     """Interface for writing a PBO archive."""
-    def __init__(self, *, cfgconvert: typing.Optional[str]) -> None:
+    def __init__(
+        self,
+        *,
+        cfgconvert: typing.Optional[str],
+        max_memory: typing.Optional[int] = None,
+        compress: typing.Optional[file_matcher.FileMatcher] = None,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        jobs: typing.Optional[int] = None,
+        manifest: typing.Optional["build_manifest.BuildManifest"] = None
+    ) -> None:
         """Create a new :class:`PBOWriter` instance.
 
         :Parameters:
-          - `cfgconvert`: The location of the DayZ Tools ``CfgConvert.exe`` program, or ``None`` if
-            ``config.cpp`` files should not be binarized.
+          - `cfgconvert`: The location of the DayZ Tools ``CfgConvert.exe`` program,
+            :data:`~dayz_dev_tools.config_cpp.NATIVE_CONVERTER` to binarize ``config.cpp`` files
+            natively, or ``None`` if ``config.cpp`` files should not be binarized. Files that
+            cannot be binarized natively, because they use preprocessor directives, are stored
+            unbinarized.
+          - `max_memory`: The maximum number of bytes of file contents to hold in memory at once
+            while writing, or ``None`` for the default. Compressed contents are held in memory
+            until they are written and are not limited.
+          - `compress`: A :class:`~dayz_dev_tools.file_matcher.FileMatcher` selecting the files to
+            be compressed (see :func:`compression_policy`), or ``None`` if no files should be
+            compressed. Files that do not become smaller when compressed are stored uncompressed.
+          - `compression_level`: The LZSS compression level, between 1 (fastest) and 9
+            (smallest).
+          - `jobs`: The maximum number of files to compress, or ``config.cpp`` files to convert,
+            at once, or ``None`` to use the ``concurrent.futures.ThreadPoolExecutor`` default.
+          - `manifest`: A :class:`~dayz_dev_tools.build_manifest.BuildManifest` whose cached
+            conversions are reused when converting ``config.cpp`` files, or ``None``.
         """
         self.cfgconvert = cfgconvert
+        #: Limit on the memory used to hold file contents
+        self.budget = memory_budget.MemoryBudget(max_memory)
+        self.compress = compress
+        self.compression_level = compression_level
+        self.jobs = jobs
+        self.manifest = manifest
         self.headers: list[tuple[bytes, bytes]] = []
-        self.entries: list[_Entry] = []
+        self._entries: list[_Entry] = []
+        # The locations of the files added at each stored path, compared case-insensitively, or
+        # None for files with generated contents. Adding the same file again is ignored.
+        self._stored_paths: dict[str, typing.Optional[pathlib.Path]] = {}
+        # Conversions of config.cpp files that may still be running, and the entries of the
+        # unconverted files, by index in the entries
+        self._conversions: dict[int, tuple[futures.Future[bytes], _Entry]] = {}
+        self._converter: typing.Optional[futures.ThreadPoolExecutor] = None
+
+    @property
+    def entries(self) -> list[_Entry]:
+        """The files added to the archive, after waiting for any ``config.cpp`` conversions that
+        are still running."""
+        self._finish_conversions()
+        return self._entries
 
     def add_header(self, name: typing.Union[str, bytes], value: typing.Union[str, bytes]) -> None:
         """Add a header to the PBO archive.
@@ -55,33 +379,198 @@ class PBOWriter:
             value.encode("utf8") if hasattr(value, "encode") else value
         ))
 
-    def add_file(self, path: pathlib.Path) -> None:
+    def add_file(
+        self, path: pathlib.Path, *, stat: typing.Optional[os.stat_result] = None
+    ) -> None:
         """Add a file to the PBO archive.
 
         :Parameters:
           - `path`: A ``pathlib.Path`` instance containing the location of the file to be added.
+          - `stat`: The status of the file, if already known (e.g. from
+            :func:`dayz_dev_tools.source_collector.walk`), or ``None`` to retrieve it.
+
+        :Raises:
+          - `Exception`: If a different file was already added at the same stored path.
         """
-        info = path.stat()
-        size = info.st_size
+        convert = self.cfgconvert is not None and path.name.lower() == "config.cpp"
+        bin_path = path.with_suffix(".bin")
+        self._reserve_stored_path(_stored_path(bin_path if convert else path), path)
 
-        if self.cfgconvert is not None and path.name.lower() == "config.cpp":
+        info = path.stat() if stat is None else stat
+        entry = _Entry(
+            read_path=path,
+            stored_path=_stored_path(path),
+            size=info.st_size,
+            mtime=int(info.st_mtime),
+            contents=None,
+            mtime_ns=info.st_mtime_ns)
+
+        if self.cfgconvert is not None and convert:
             with open(path, "rb") as infile:
-                logging.debug("Converting %s to %s", path, path.with_suffix(".bin"))
-                contents = config_cpp.cpp_to_bin(infile.read(), self.cfgconvert)
+                cpp_content = infile.read()
+
+            logging.debug("Converting %s to %s", path, bin_path)
+
+            self._conversions[len(self._entries)] = (
+                self._convert(cpp_content, self.cfgconvert), entry)
+
+            # The size is known once the conversion is finished
+            self._entries.append(dataclasses.replace(
+                entry,
+                read_path=bin_path,
+                stored_path=_stored_path(bin_path),
+                size=0))
+        else:
+            self._entries.append(entry)
 
-            path = path.with_suffix(".bin")
-            size = len(contents)
+    def add_bytes(
+        self, stored_path: str, data: bytes, mtime: typing.Optional[int] = None
+    ) -> None:
+        """Add a file with generated contents to the PBO archive.
 
+        :Parameters:
+          - `stored_path`: The name of the file in the archive. Either ``/`` or ``\\`` may separate
+            directories.
+          - `data`: The contents of the file.
+          - `mtime`: The file's modification time as a Unix timestamp, or ``None`` for the current
+            time.
+
+        :Raises:
+          - `Exception`: If a file was already added at the same stored path.
+        """
+        self._add_virtual(stored_path, len(data), mtime, contents=data)
+
+    def add_stream(
+        self,
+        stored_path: str,
+        fileobj: typing.BinaryIO,
+        size: int,
+        mtime: typing.Optional[int] = None
+    ) -> None:
+        """Add a file whose contents are read from a binary file-like object, such as a file
+        opened from a zip archive, when the PBO archive is written.
+
+        :Parameters:
+          - `stored_path`: The name of the file in the archive. Either ``/`` or ``\\`` may separate
+            directories.
+          - `fileobj`: The binary file-like object, positioned at the start of the contents. If it
+            is not seekable, the contents are read immediately. It must not be used for anything
+            else until the PBO archive has been written.
+          - `size`: The number of bytes of contents to read from `fileobj`.
+          - `mtime`: The file's modification time as a Unix timestamp, or ``None`` for the current
+            time.
+
+        :Raises:
+          - `Exception`: If a file was already added at the same stored path.
+        """
+        if fileobj.seekable():
+            self._add_virtual(stored_path, size, mtime, source=_StreamSource(fileobj))
         else:
-            contents = None
+            self._add_virtual(
+                stored_path, size, mtime,
+                contents=b"".join(_read_chunks(fileobj, size, memory_budget.CHUNK_SIZE)))
+
+    def add_from_pbo(
+        self, entry: pbo_file.PBOFile, stored_path: typing.Optional[str] = None
+    ) -> None:
+        """Add a file contained within another PBO archive, keeping its modification time.
+
+        Uncompressed files are copied from the other archive when the PBO archive is written, so
+        the other archive must remain open, and must not be read elsewhere, until then.
+        Compressed files are expanded immediately.
+
+        :Parameters:
+          - `entry`: A :class:`~dayz_dev_tools.pbo_file.PBOFile` instance, as returned by
+            :meth:`dayz_dev_tools.pbo_reader.PBOReader.files`.
+          - `stored_path`: The name of the file in the archive, or ``None`` to use the name it has
+            in the other archive.
+
+        :Raises:
+          - `Exception`: If a file was already added at the same stored path.
+        """
+        assert entry.content_reader is not None
+
+        # Names that are not valid UTF-8, such as obfuscated names, are stored exactly as they are
+        name = entry.filename.decode("utf8", "surrogateescape") if stored_path is None \
+            else stored_path
 
-        self.entries.append(
+        if entry.compressed():
+            self._add_virtual(
+                name, entry.original_size, entry.time_stamp,
+                contents=entry.unpack_data(entry.read_data()))
+        else:
+            self._add_virtual(
+                name, entry.data_size, entry.time_stamp,
+                source=_ArchiveSource(entry.content_reader))
+
+    def _add_virtual(
+        self,
+        stored_path: str,
+        size: int,
+        mtime: typing.Optional[int],
+        *,
+        contents: typing.Optional[bytes] = None,
+        source: typing.Optional[typing.Union[_StreamSource, _ArchiveSource]] = None
+    ) -> None:
+        parts = _split_stored_path(stored_path)
+        self._reserve_stored_path("\\".join(parts), None)
+
+        timestamp = int(time.time() if mtime is None else mtime)
+
+        self._entries.append(
             _Entry(
-                read_path=path,
-                stored_path="\\".join(path.relative_to(path.anchor).parts),
+                # Files without a location are sorted as if they were at their stored path
+                read_path=pathlib.Path(*parts),
+                stored_path="\\".join(parts),
                 size=size,
-                mtime=int(info.st_mtime),
-                contents=contents))
+                mtime=timestamp,
+                contents=contents,
+                mtime_ns=timestamp * 1_000_000_000,
+                source=source))
+
+    def _reserve_stored_path(
+        self, stored_path: str, read_path: typing.Optional[pathlib.Path]
+    ) -> None:
+        # The game finds files by case-insensitive name, so which of two files with the same name
+        # it would load is undefined
+        key = stored_path.lower()
+
+        if key in self._stored_paths \
+                and (read_path is None or self._stored_paths[key] != read_path):
+            raise Exception(f"Duplicate filename: {stored_path!r}")
+
+        self._stored_paths[key] = read_path
+
+    def _convert(self, cpp_content: bytes, cfgconvert: str) -> futures.Future[bytes]:
+        # CfgConvert runs in a separate process, so conversions run in parallel while more files
+        # are added, and only the results still running when they are needed are waited for
+        if self._converter is None:
+            self._converter = futures.ThreadPoolExecutor(max_workers=self.jobs)
+
+        if self.manifest is not None:
+            return self._converter.submit(self.manifest.convert, cpp_content, cfgconvert)
+
+        return self._converter.submit(config_cpp.cpp_to_bin, cpp_content, cfgconvert)
+
+    def _finish_conversions(self) -> None:
+        try:
+            for index, (conversion, original) in self._conversions.items():
+                try:
+                    contents = conversion.result()
+                except config_parser.UnsupportedConfig as error:
+                    # Only CfgConvert can convert these configs, so they are stored unconverted
+                    logging.warning("Storing %s unconverted: %s", original.read_path, error)
+                    self._entries[index] = original
+                    continue
+
+                self._entries[index] = dataclasses.replace(
+                    self._entries[index], size=len(contents), contents=contents)
+        finally:
+            self._conversions.clear()
+
+            if self._converter is not None:
+                self._converter.shutdown(cancel_futures=True)
+                self._converter = None
 
     def write(self, output: typing.BinaryIO) -> None:
         """Create the PBO archive.
@@ -90,6 +579,18 @@ class PBOWriter:
           - `output`: A binary file-like object to receive the PBO archive contents.
         """
         writer = _HashWriter(output)
+
+        # The hashing thread must be stopped if writing fails at any point, or it waits forever
+        try:
+            self._write_contents(writer)
+
+            logging.debug("Finalizing PBO")
+            writer.finalize()
+        except BaseException:
+            writer.close()
+            raise
+
+    def _write_contents(self, writer: _HashWriter) -> None:
         writer.write(b"\x00")
         writer.write(b"sreV\x00")
         writer.write(b"\x00" * 15)
@@ -101,26 +602,81 @@ class PBOWriter:
         writer.write(b"\x00")
 
         entries = sorted(set(self.entries), key=lambda e: e.read_path)
+        compressed = self._compress_entries(entries)
 
         for entry in entries:
             logging.debug("Writing file entry: %s", entry.stored_path)
-            writer.write(entry.stored_path.encode("utf8") + b"\x00")
-            writer.write(struct.pack("<IIIII", 0, entry.size, 0, int(entry.mtime), entry.size))
+            writer.write(entry.stored_path.encode("utf8", "surrogateescape") + b"\x00")
+
+            if entry in compressed:
+                writer.write(struct.pack(
+                    "<IIIII", _COMPRESSED_MIME_TYPE, entry.size, 0, int(entry.mtime),
+                    len(compressed[entry])))
+            else:
+                writer.write(struct.pack("<IIIII", 0, entry.size, 0, int(entry.mtime), entry.size))
 
         writer.write(b"\x00" * 21)
 
-        for entry in entries:
+        # File contents are read in chunks on a separate thread, so reading, hashing and writing
+        # all overlap while only a bounded number of chunks is held in memory
+        reader = _ContentReader(entries, self._chunk_size(), compressed)
+
+        try:
+            for chunk in reader:
+                writer.write(chunk)
+        finally:
+            reader.close()
+
+    def _compress_entries(self, entries: list[_Entry]) -> dict[_Entry, bytes]:
+        if self.compress is None:
+            return {}
+
+        selected = [
+            entry for entry in entries
+            if entry.size > 0
+            and self.compress.matches(os.path.join(*entry.stored_path.split("\\")))
+        ]
+
+        if len(selected) == 0:
+            return {}
+
+        # Compression releases the GIL, so files are compressed in parallel by a pool of threads.
+        # All compression must finish before the entry table, which contains the compressed
+        # sizes, can be written.
+        with futures.ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            results = list(executor.map(self._compress_entry, selected))
+
+        return {
+            entry: result for entry, result in zip(selected, results) if result is not None
+        }
+
+    def _compress_entry(self, entry: _Entry) -> typing.Optional[bytes]:
+        # The contents and the compressed contents are both held while compressing
+        with self.budget.reserve(2 * entry.size):
             if entry.contents is None:
-                with open(entry.read_path, "rb") as infile:
-                    contents = infile.read()
+                with entry.open() as infile:
+                    contents = b"".join(_read_chunks(infile, entry.size, entry.size))
             else:
                 contents = entry.contents
 
-            if len(contents) != entry.size:
-                raise Exception(f"File size mismatch {len(contents)} != {entry.size}")
+            result = compress(contents, self.compression_level)
+
+        # Files that do not become smaller are stored uncompressed, which also ensures that
+        # compressed files are never mistaken for uncompressed ones when read
+        if len(result) >= entry.size:
+            logging.debug("Storing uncompressible file: %s", entry.stored_path)
+            return None
+
+        logging.debug(
+            "Compressed %s from %d to %d bytes", entry.stored_path, entry.size, len(result))
+
+        return result
 
-            logging.debug("Writing file content: %s", entry.stored_path)
-            writer.write(contents)
+    def _chunk_size(self) -> int:
+        if self.budget.limit is None:
+            return memory_budget.CHUNK_SIZE
 
-        logging.debug("Finalizing PBO")
-        writer.finalize()
+        # Chunks may be waiting between both pairs of stages, as well as being read, hashed and
+        # written
+        return max(
+            1, min(memory_budget.CHUNK_SIZE, self.budget.limit // (2 * _PIPELINE_DEPTH + 3)))
@@ -13,6 +13,7 @@ from dayz_dev_tools import logging_configuration
 from dayz_dev_tools import misc
 from dayz_dev_tools import script_logs
 from dayz_dev_tools import server_config
+from dayz_dev_tools import signature_check
 
 
 DEFAULT_CONFIG_FILE = "server.toml"
@@ -35,12 +36,22 @@ def _copy_keys(mod_dirs: list[str], keys_dir: str) -> None:
         keys.copy_keys(mod_dir, keys_dir)
 
 
-def _mod_parameter(option: str, mods: list[str], workshop_directory: str) -> str:
-    mods = [_resolve_mod(mod, workshop_directory) for mod in mods]
+def _resolve_mods(mods: list[str], workshop_directory: str) -> list[str]:
+    mod_dirs = [_resolve_mod(mod, workshop_directory) for mod in mods]
 
-    _copy_keys(mods, "keys")
+    _copy_keys(mod_dirs, "keys")
 
-    return f"-{option}={';'.join(mods)}"
+    return mod_dirs
+
+
+def _verify_signatures(mod_dirs: list[str]) -> None:
+    failures = signature_check.check_mods(mod_dirs, "keys")
+
+    for failure in failures:
+        logging.error("Unverified signature for `%s`: %s", failure.pbofile, failure.reason)
+
+    if len(failures) > 0:
+        raise Exception(f"Signatures of {len(failures)} PBO files could not be verified")
 
 
 def run_server(
@@ -58,15 +69,23 @@ def run_server(
     if settings.mission_directory() is not None:
         args.append(f"-mission={settings.mission_directory()}")
 
+    mod_dirs = []
+
     if len(settings.mods()) > 0:
-        args.append(_mod_parameter("mod", settings.mods(), settings.workshop_directory()))
+        mod_dirs = _resolve_mods(settings.mods(), settings.workshop_directory())
+        args.append(f"-mod={';'.join(mod_dirs)}")
 
     if len(settings.server_mods()) > 0:
-        args.append(
-            _mod_parameter("servermod", settings.server_mods(), settings.workshop_directory()))
+        server_mods = _resolve_mods(settings.server_mods(), settings.workshop_directory())
+        args.append(f"-servermod={';'.join(server_mods)}")
 
     args.extend(settings.parameters())
 
+    # A mismatched signature would otherwise only be noticed when players are kicked. Server mods
+    # are not loaded by clients, so they are usually unsigned and are not verified.
+    if settings.verify_signatures() and len(mod_dirs) > 0:
+        _verify_signatures(mod_dirs)
+
     logging.info("Running server with: %s", args)
 
     if wait:
@@ -30,6 +30,7 @@ class _ServerConfig(pydantic.BaseModel):
     mission_directory: typing.Optional[str] = None
     parameters: list[str] = pydantic.Field(default_factory=list)
     bundles: str = "bundles.py"
+    verify_signatures: bool = False
 
 
 class _WorkshopConfig(pydantic.BaseModel):
@@ -99,6 +100,9 @@ class ServerConfig:
     mission_directory: typing.Optional[str] = None
     #: Extra server command line parameters to add
     parameters: list[str] = dataclasses.field(default_factory=list)
+    #: Whether to verify the signatures of mods, not including server mods, before running DayZ
+    #: Server
+    verify_signatures: bool = False
 
 
 def _parse_mods(mods: typing.Union[str, list[str]]) -> list[str]:
@@ -140,6 +144,7 @@ def load(filename: str) -> ServerConfig:
         workshop_directory=config.workshop.directory,
         bundle_path=config.server.bundles,
         parameters=config.server.parameters,
+        verify_signatures=config.server.verify_signatures,
         bundles={
             name: BundleConfig(
                 executable=bundle.executable,
@@ -0,0 +1,220 @@
+from concurrent import futures
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import typing
+
+from dayz_dev_tools import signatures
+
+
+#: The default name of the file caching the results of earlier checks
+DEFAULT_CACHE_FILE = ".signature-cache.json"
+
+_CACHE_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class Failure:
+    """A PBO archive whose signature could not be verified by :func:`check_mods`."""
+    #: The location of the PBO archive
+    pbofile: str
+    #: Why the signature could not be verified
+    reason: str
+
+
+def load_keys(keys_dir: str) -> list[signatures.PublicKey]:
+    """Read the ``.bikey`` files in a directory, such as a server's ``keys`` directory.
+
+    Files that do not contain valid public keys are skipped with a warning.
+
+    :Parameters:
+      - `keys_dir`: The directory containing the ``.bikey`` files.
+
+    :Returns:
+      A list of :class:`~dayz_dev_tools.signatures.PublicKey` instances, which is empty if the
+      directory does not exist.
+    """
+    keys: list[signatures.PublicKey] = []
+
+    try:
+        names = sorted(os.listdir(keys_dir))
+    except FileNotFoundError:
+        logging.warning("Keys directory `%s` does not exist", keys_dir)
+        return keys
+
+    for name in names:
+        if name.lower().endswith(".bikey"):
+            try:
+                keys.append(signatures.read_public_key(os.path.join(keys_dir, name)))
+            except Exception as error:
+                logging.warning("Skipping key `%s`: %s", name, error)
+
+    return keys
+
+
+def _find_pbos(mod_dir: str) -> list[tuple[str, list[str]]]:
+    pbos = []
+
+    for root, _, files in os.walk(mod_dir):
+        lowered = {name.lower(): name for name in files}
+
+        for name in sorted(files):
+            if name.lower().endswith(".pbo"):
+                # Signature files are named after the PBO file and the key, e.g.
+                # mymod.pbo.mykey.bisign
+                prefix = f"{name.lower()}."
+                signature_files = sorted(
+                    os.path.join(root, original) for lower, original in lowered.items()
+                    if lower.startswith(prefix) and lower.endswith(".bisign"))
+                pbos.append((os.path.join(root, name), signature_files))
+
+    return pbos
+
+
+def check_pbo(
+    pbofile: str, signature_files: list[str], keys: list[signatures.PublicKey]
+) -> typing.Optional[str]:
+    """Check that at least one of a PBO archive's signatures is verified by a key.
+
+    :Parameters:
+      - `pbofile`: The location of the PBO archive.
+      - `signature_files`: The locations of the archive's ``.bisign`` files.
+      - `keys`: The :class:`~dayz_dev_tools.signatures.PublicKey` instances that may verify the
+        signatures.
+
+    :Returns:
+      None if a signature was verified, or the reason no signature was verified.
+    """
+    if len(signature_files) == 0:
+        return "No signature found"
+
+    keys_by_modulus = {key.n: key for key in keys}
+    reasons = []
+
+    for signature_file in signature_files:
+        try:
+            signature = signatures.read_signature(signature_file)
+        except Exception as error:
+            reasons.append(str(error))
+            continue
+
+        key = keys_by_modulus.get(signature.key.n)
+
+        if key is None:
+            reasons.append(f"No key found for signature `{os.path.basename(signature_file)}`")
+        elif signatures.verify(pbofile, signature_file, key):
+            return None
+        else:
+            reasons.append(f"Signature `{os.path.basename(signature_file)}` does not match")
+
+    return "; ".join(reasons)
+
+
+def _state(
+    pbofile: str, signature_files: list[str], keys_digest: str
+) -> dict[str, typing.Any]:
+    info = os.stat(pbofile)
+
+    return {
+        "size": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "signatures": [
+            [path, os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in signature_files
+        ],
+        "keys": keys_digest
+    }
+
+
+def _load_cache(cache_file: str) -> dict[str, typing.Any]:
+    try:
+        with open(cache_file, "r", encoding="utf-8") as cache:
+            data = json.load(cache)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as error:
+        logging.warning("Ignoring unreadable signature cache `%s`: %s", cache_file, error)
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+        return {}
+
+    return typing.cast(dict[str, typing.Any], data.get("verified", {}))
+
+
+def _save_cache(cache_file: str, verified: dict[str, typing.Any]) -> None:
+    temp_path = f"{cache_file}.{os.getpid()}.partial"
+
+    try:
+        with open(temp_path, "w", encoding="utf-8") as cache:
+            json.dump({"version": _CACHE_VERSION, "verified": verified}, cache)
+
+        os.replace(temp_path, cache_file)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def check_mods(
+    mod_dirs: list[str],
+    keys_dir: str,
+    *,
+    cache_file: typing.Optional[str] = DEFAULT_CACHE_FILE,
+    jobs: typing.Optional[int] = None
+) -> list[Failure]:
+    """Verify the signatures of all PBO archives in some mod directories concurrently.
+
+    Archives that were verified by an earlier check are skipped, unless the archive, its
+    signatures or the keys have changed size or modification time since then.
+
+    :Parameters:
+      - `mod_dirs`: The mod directories to search for ``*.pbo`` files.
+      - `keys_dir`: The directory containing the ``.bikey`` files that may verify the signatures.
+      - `cache_file`: The location of the file recording archives that were verified, or ``None``
+        to verify every archive.
+      - `jobs`: The maximum number of archives to verify at once, or ``None`` to use the
+        ``concurrent.futures.ThreadPoolExecutor`` default.
+
+    :Returns:
+      A list of :class:`Failure` instances, which is empty if all signatures were verified.
+    """
+    keys = load_keys(keys_dir)
+    keys_digest = hashlib.sha1(
+        json.dumps(sorted([key.n, key.e] for key in keys)).encode()).hexdigest()
+
+    verified = {} if cache_file is None else _load_cache(cache_file)
+    failures = []
+    pending = []
+
+    for mod_dir in mod_dirs:
+        for pbofile, signature_files in _find_pbos(mod_dir):
+            state = _state(pbofile, signature_files, keys_digest)
+            key = os.path.abspath(pbofile)
+
+            if verified.get(key) == state:
+                logging.debug("Signature of `%s` was already verified", pbofile)
+            else:
+                verified.pop(key, None)
+                pending.append((pbofile, signature_files, state))
+
+    logging.info("Verifying signatures of %d PBO files", len(pending))
+
+    # Hashing releases the global interpreter lock, so threads verify archives in parallel
+    with futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            lambda item: check_pbo(item[0], item[1], keys), pending)
+
+        for (pbofile, _, state), reason in zip(pending, results):
+            if reason is None:
+                verified[os.path.abspath(pbofile)] = state
+            else:
+                failures.append(Failure(pbofile, reason))
+
+    if cache_file is not None:
+        _save_cache(cache_file, verified)
+
+    return failures
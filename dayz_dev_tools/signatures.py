@@ -0,0 +1,524 @@
+from concurrent import futures
+import dataclasses
+import functools
+import hashlib
+import logging
+import math
+import os
+import secrets
+import struct
+import typing
+
+from dayz_dev_tools import pbo_reader
+
+
+#: The default signature version, which covers the contents of all files except textures, models,
+#: sounds and other binary data
+DEFAULT_VERSION = 2
+
+#: The default size of generated keys, in bits
+DEFAULT_KEY_BITS = 1024
+
+# File extensions whose contents are not covered by version 2 signatures
+_V2_EXCLUDED_EXTENSIONS = {
+    b"paa", b"jpg", b"p3d", b"tga", b"rvmat", b"lip", b"ogg", b"wss", b"png", b"rtm", b"pac",
+    b"fxy", b"wrp"
+}
+
+# File extensions whose contents are covered by version 3 signatures
+_V3_INCLUDED_EXTENSIONS = {
+    b"sqf", b"inc", b"bikb", b"ext", b"fsm", b"sqm", b"hpp", b"cfg", b"sqs", b"h"
+}
+
+# Microsoft CryptoAPI key blob header: type, version, reserved, algorithm (CALG_RSA_SIGN), magic,
+# bit length and public exponent
+_BLOB_HEADER = struct.Struct("<BBHI4sII")
+_PUBLIC_KEY_BLOB = 0x06
+_PRIVATE_KEY_BLOB = 0x07
+_CALG_RSA_SIGN = 0x2400
+
+# ASN.1 DigestInfo prefix of a SHA1 hash, as used by PKCS #1 v1.5 signatures
+_SHA1_DIGEST_INFO = bytes.fromhex("3021300906052b0e03021a05000414")
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class PublicKey:
+    """An RSA public key, as stored in a ``.bikey`` file."""
+    #: The name of the key (also called the authority)
+    name: str
+    #: The modulus
+    n: int
+    #: The public exponent
+    e: int
+
+    def bits(self) -> int:
+        """Get the size of the key.
+
+        :Returns:
+          The size of the modulus, in bits.
+        """
+        return (self.n.bit_length() + 7) // 8 * 8
+
+
+@dataclasses.dataclass(frozen=True)
+class PrivateKey(PublicKey):
+    """An RSA private key, as stored in a ``.biprivatekey`` file."""
+    #: The first prime factor of the modulus
+    p: int
+    #: The second prime factor of the modulus
+    q: int
+    #: The private exponent
+    d: int
+
+    def public_key(self) -> PublicKey:
+        """Get the public key corresponding to the private key.
+
+        :Returns:
+          A :class:`PublicKey`.
+        """
+        return PublicKey(self.name, self.n, self.e)
+
+    def _sign(self, message: int) -> int:
+        # The Chinese remainder theorem makes signing about four times faster
+        m1 = pow(message, self.d % (self.p - 1), self.p)
+        m2 = pow(message, self.d % (self.q - 1), self.q)
+        h = pow(self.q, -1, self.p) * (m1 - m2) % self.p
+        return m2 + h * self.q
+
+
+@dataclasses.dataclass(frozen=True)
+class Signature:
+    """The contents of a ``.bisign`` file."""
+    #: The public key that verifies the signature
+    key: PublicKey
+    #: The signature version (2 or 3)
+    version: int
+    #: The signatures of the three hashes of the PBO archive
+    signatures: tuple[int, int, int]
+
+
+def _to_bytes(value: int, size: int) -> bytes:
+    return value.to_bytes(size, "little")
+
+
+def _from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+
+def _read_name(data: bytes, path: str) -> tuple[str, int]:
+    end = data.find(b"\x00")
+    if end < 0:
+        raise Exception(f"Invalid key file: {path}")
+
+    return data[:end].decode("utf-8"), end + 1
+
+
+def _read_blob(data: bytes, offset: int, blob_type: int, path: str) -> tuple[PublicKey, int, int]:
+    # The blob is preceded by its length
+    try:
+        kind, _, _, algorithm, magic, bits, e = _BLOB_HEADER.unpack_from(data, offset + 4)
+    except struct.error as error:
+        raise Exception(f"Invalid key file: {path}") from error
+
+    offset += 4 + _BLOB_HEADER.size
+    expected_magic = b"RSA1" if blob_type == _PUBLIC_KEY_BLOB else b"RSA2"
+
+    if kind != blob_type or algorithm != _CALG_RSA_SIGN or magic != expected_magic \
+            or bits % 16 != 0 or offset + bits // 8 > len(data):
+        raise Exception(f"Invalid key file: {path}")
+
+    return PublicKey("", _from_bytes(data[offset:offset + bits // 8]), e), bits, offset + bits // 8
+
+
+def _public_blob(key: PublicKey) -> bytes:
+    bits = key.bits()
+    blob = _BLOB_HEADER.pack(_PUBLIC_KEY_BLOB, 2, 0, _CALG_RSA_SIGN, b"RSA1", bits, key.e) \
+        + _to_bytes(key.n, bits // 8)
+    return struct.pack("<I", len(blob)) + blob
+
+
+def read_public_key(path: str) -> PublicKey:
+    """Read a ``.bikey`` file.
+
+    :Parameters:
+      - `path`: The location of the ``.bikey`` file.
+
+    :Returns:
+      A :class:`PublicKey`.
+
+    :Raises:
+      - `Exception`: If the file does not contain a valid public key.
+    """
+    with open(path, "rb") as key_file:
+        data = key_file.read()
+
+    name, offset = _read_name(data, path)
+    key, _, _ = _read_blob(data, offset, _PUBLIC_KEY_BLOB, path)
+
+    return dataclasses.replace(key, name=name)
+
+
+def write_public_key(key: PublicKey, path: str) -> None:
+    """Write a ``.bikey`` file.
+
+    :Parameters:
+      - `key`: The :class:`PublicKey` to write.
+      - `path`: The location of the ``.bikey`` file.
+    """
+    with open(path, "wb") as key_file:
+        key_file.write(key.name.encode("utf-8") + b"\x00" + _public_blob(key))
+
+
+def read_private_key(path: str) -> PrivateKey:
+    """Read a ``.biprivatekey`` file.
+
+    :Parameters:
+      - `path`: The location of the ``.biprivatekey`` file.
+
+    :Returns:
+      A :class:`PrivateKey`.
+
+    :Raises:
+      - `Exception`: If the file does not contain a valid private key.
+    """
+    with open(path, "rb") as key_file:
+        data = key_file.read()
+
+    name, offset = _read_name(data, path)
+    key, bits, offset = _read_blob(data, offset, _PRIVATE_KEY_BLOB, path)
+
+    # The primes, the CRT exponents and coefficient are half the size of the modulus
+    half = bits // 16
+    if offset + 5 * half + 2 * half > len(data):
+        raise Exception(f"Invalid key file: {path}")
+
+    p = _from_bytes(data[offset:offset + half])
+    q = _from_bytes(data[offset + half:offset + 2 * half])
+    d = _from_bytes(data[offset + 5 * half:offset + 7 * half])
+
+    if p * q != key.n:
+        raise Exception(f"Invalid key file: {path}")
+
+    return PrivateKey(name, key.n, key.e, p, q, d)
+
+
+def write_private_key(key: PrivateKey, path: str) -> None:
+    """Write a ``.biprivatekey`` file.
+
+    :Parameters:
+      - `key`: The :class:`PrivateKey` to write.
+      - `path`: The location of the ``.biprivatekey`` file.
+    """
+    bits = key.bits()
+    blob = _BLOB_HEADER.pack(_PRIVATE_KEY_BLOB, 2, 0, _CALG_RSA_SIGN, b"RSA2", bits, key.e) \
+        + b"".join([
+            _to_bytes(key.n, bits // 8),
+            _to_bytes(key.p, bits // 16),
+            _to_bytes(key.q, bits // 16),
+            _to_bytes(key.d % (key.p - 1), bits // 16),
+            _to_bytes(key.d % (key.q - 1), bits // 16),
+            _to_bytes(pow(key.q, -1, key.p), bits // 16),
+            _to_bytes(key.d, bits // 8)
+        ])
+
+    with open(path, "wb") as key_file:
+        key_file.write(key.name.encode("utf-8") + b"\x00" + struct.pack("<I", len(blob)) + blob)
+
+
+def _probably_prime(candidate: int) -> bool:
+    for small in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if candidate % small == 0:
+            return candidate == small
+
+    # Miller-Rabin test
+    d = candidate - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for _ in range(40):
+        x = pow(secrets.randbelow(candidate - 3) + 2, d, candidate)
+        if x in (1, candidate - 1):
+            continue
+
+        for _ in range(s - 1):
+            x = pow(x, 2, candidate)
+            if x == candidate - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def _generate_prime(bits: int, e: int) -> int:
+    while True:
+        # The two highest bits are set so the product of two primes has exactly twice as many bits
+        candidate = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+        if math.gcd(candidate - 1, e) == 1 and _probably_prime(candidate):
+            return candidate
+
+
+def generate_private_key(name: str, *, bits: int = DEFAULT_KEY_BITS) -> PrivateKey:
+    """Generate a new key pair for signing PBO archives.
+
+    :Parameters:
+      - `name`: The name of the key (also called the authority), which becomes part of the names
+        of signature files.
+      - `bits`: The size of the key, in bits.
+
+    :Returns:
+      A :class:`PrivateKey`. Use :meth:`PrivateKey.public_key` to get the corresponding
+      :class:`PublicKey`.
+    """
+    e = 65537
+
+    while True:
+        p = _generate_prime(bits // 2, e)
+        q = _generate_prime(bits // 2, e)
+        if p != q:
+            break
+
+    return PrivateKey(name, p * q, e, p, q, pow(e, -1, (p - 1) * (q - 1)))
+
+
+def signature_path(pbofile: str, key_name: str) -> str:
+    """Get the location of a PBO archive's signature file.
+
+    :Parameters:
+      - `pbofile`: The location of the PBO archive.
+      - `key_name`: The name of the key.
+
+    :Returns:
+      The location of the ``.bisign`` file, next to the PBO archive.
+    """
+    return f"{pbofile}.{key_name}.bisign"
+
+
+def read_signature(path: str) -> Signature:
+    """Read a ``.bisign`` file.
+
+    :Parameters:
+      - `path`: The location of the ``.bisign`` file.
+
+    :Returns:
+      A :class:`Signature`.
+
+    :Raises:
+      - `Exception`: If the file does not contain a valid signature.
+    """
+    with open(path, "rb") as signature_file:
+        data = signature_file.read()
+
+    name, offset = _read_name(data, path)
+    key, bits, offset = _read_blob(data, offset, _PUBLIC_KEY_BLOB, path)
+    size = bits // 8
+
+    try:
+        (length1,) = struct.unpack_from("<I", data, offset)
+        sig1 = data[offset + 4:offset + 4 + size]
+        offset += 4 + size
+        version, length2 = struct.unpack_from("<II", data, offset)
+        sig2 = data[offset + 8:offset + 8 + size]
+        offset += 8 + size
+        (length3,) = struct.unpack_from("<I", data, offset)
+        sig3 = data[offset + 4:offset + 4 + size]
+    except struct.error as error:
+        raise Exception(f"Invalid signature file: {path}") from error
+
+    if {length1, length2, length3, len(sig3)} != {size} or version not in (2, 3):
+        raise Exception(f"Invalid signature file: {path}")
+
+    return Signature(
+        dataclasses.replace(key, name=name), version,
+        (_from_bytes(sig1), _from_bytes(sig2), _from_bytes(sig3)))
+
+
+def write_signature(signature: Signature, path: str) -> None:
+    """Write a ``.bisign`` file.
+
+    :Parameters:
+      - `signature`: The :class:`Signature` to write.
+      - `path`: The location of the ``.bisign`` file.
+    """
+    size = signature.key.bits() // 8
+    sig1, sig2, sig3 = (_to_bytes(value, size) for value in signature.signatures)
+
+    with open(path, "wb") as signature_file:
+        signature_file.write(b"".join([
+            signature.key.name.encode("utf-8") + b"\x00",
+            _public_blob(signature.key),
+            struct.pack("<I", size), sig1,
+            struct.pack("<II", signature.version, size), sig2,
+            struct.pack("<I", size), sig3
+        ]))
+
+
+class _HashOutput:
+    def __init__(self, content_hash: typing.Any) -> None:
+        self.content_hash = content_hash
+
+    def write(self, data: bytes) -> int:
+        self.content_hash.update(data)
+        return len(data)
+
+
+def _archive_hash(pbo_file: typing.BinaryIO) -> bytes:
+    size = pbo_file.seek(0, os.SEEK_END) - 21
+    pbo_file.seek(0)
+
+    archive_hash = hashlib.sha1()
+    remaining = size
+    while remaining > 0:
+        chunk = pbo_file.read(min(_CHUNK_SIZE, remaining))
+        if len(chunk) == 0:
+            break
+        archive_hash.update(chunk)
+        remaining -= len(chunk)
+
+    footer = pbo_file.read(21)
+    if size < 0 or footer != b"\x00" + archive_hash.digest():
+        raise Exception("PBO checksum mismatch")
+
+    return archive_hash.digest()
+
+
+def _signed_content(extension: bytes, version: int) -> bool:
+    if version == 2:
+        return extension not in _V2_EXCLUDED_EXTENSIONS
+
+    return extension in _V3_INCLUDED_EXTENSIONS
+
+
+def _hashes(pbofile: str, version: int) -> tuple[bytes, bytes, bytes]:
+    with open(pbofile, "rb") as pbo_file:
+        archive_hash = _archive_hash(pbo_file)
+
+        reader = pbo_reader.PBOReader(pbo_file)
+        files = reader.files()
+
+        name_hash = hashlib.sha1()
+        for name in sorted(f.filename.lower() for f in files if f.data_size > 0):
+            name_hash.update(name)
+
+        content_hash = hashlib.sha1()
+        covered = False
+        for file in files:
+            extension = file.filename.rsplit(b".", 1)[-1].lower() if b"." in file.filename else b""
+            if _signed_content(extension, version):
+                file.unpack(
+                    typing.cast(typing.BinaryIO, _HashOutput(content_hash)),
+                    chunk_size=_CHUNK_SIZE)
+                covered = True
+
+        if not covered:
+            content_hash.update(b"nothing" if version == 2 else b"gnihton")
+
+        prefix = reader.prefix()
+        if prefix:
+            prefix = prefix if prefix.endswith(b"\\") else prefix + b"\\"
+        else:
+            prefix = b""
+
+    return (
+        archive_hash,
+        hashlib.sha1(archive_hash + name_hash.digest() + prefix).digest(),
+        hashlib.sha1(content_hash.digest() + name_hash.digest() + prefix).digest()
+    )
+
+
+def _pad(digest: bytes, size: int) -> int:
+    # PKCS #1 v1.5 signature padding
+    return int.from_bytes(
+        b"\x00\x01" + b"\xff" * (size - len(_SHA1_DIGEST_INFO) - len(digest) - 3) + b"\x00"
+        + _SHA1_DIGEST_INFO + digest,
+        "big")
+
+
+def sign(pbofile: str, key: PrivateKey, *, version: int = DEFAULT_VERSION) -> str:
+    """Sign a PBO archive, creating a ``.bisign`` file next to it.
+
+    The archive is read in chunks, so its size does not affect memory usage, except for
+    compressed files, which are expanded in memory.
+
+    :Parameters:
+      - `pbofile`: The location of the PBO archive.
+      - `key`: The :class:`PrivateKey` to sign the archive with.
+      - `version`: The signature version (2 or 3).
+
+    :Returns:
+      The location of the ``.bisign`` file.
+
+    :Raises:
+      - `Exception`: If the archive's checksum does not match its contents.
+    """
+    if version not in (2, 3):
+        raise Exception(f"Unsupported signature version: {version}")
+
+    size = key.bits() // 8
+    signature = Signature(
+        key.public_key(), version,
+        typing.cast(
+            tuple[int, int, int],
+            tuple(key._sign(_pad(digest, size)) for digest in _hashes(pbofile, version))))
+
+    path = signature_path(pbofile, key.name)
+    write_signature(signature, path)
+
+    return path
+
+
+def verify(pbofile: str, signature_file: str, key: PublicKey) -> bool:
+    """Verify a PBO archive's signature.
+
+    :Parameters:
+      - `pbofile`: The location of the PBO archive.
+      - `signature_file`: The location of the archive's ``.bisign`` file.
+      - `key`: The :class:`PublicKey` that should verify the signature.
+
+    :Returns:
+      True if the signature was made with the key's private key and matches the archive's
+      contents, or False otherwise.
+    """
+    try:
+        signature = read_signature(signature_file)
+        hashes = _hashes(pbofile, signature.version)
+    except Exception as error:
+        logging.debug("Unable to verify `%s`: %s", signature_file, error)
+        return False
+
+    if (signature.key.n, signature.key.e) != (key.n, key.e):
+        logging.debug("Signature `%s` was not made with key `%s`", signature_file, key.name)
+        return False
+
+    size = key.bits() // 8
+
+    return all(
+        pow(value, key.e, key.n) == _pad(digest, size)
+        for value, digest in zip(signature.signatures, hashes))
+
+
+def sign_all(
+    pbofiles: list[str],
+    key: PrivateKey,
+    *,
+    version: int = DEFAULT_VERSION,
+    jobs: typing.Optional[int] = None
+) -> list[str]:
+    """Sign several PBO archives concurrently, each in its own process.
+
+    :Parameters:
+      - `pbofiles`: The locations of the PBO archives.
+      - `key`: The :class:`PrivateKey` to sign the archives with.
+      - `version`: The signature version (2 or 3).
+      - `jobs`: The maximum number of archives to sign at once, or ``None`` to use the
+        ``concurrent.futures.ProcessPoolExecutor`` default.
+
+    :Returns:
+      The locations of the ``.bisign`` files, in the same order as `pbofiles`.
+    """
+    with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(functools.partial(sign, key=key, version=version), pbofiles))
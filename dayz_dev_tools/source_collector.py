@@ -0,0 +1,169 @@
+from collections import abc
+import dataclasses
+import logging
+import os
+import pathlib
+import re
+import typing
+
+
+#: The name of files containing ignore rules for the directory they are in and its subdirectories
+IGNORE_FILE = ".pboignore"
+
+#: Ignore rules applied to every directory by default: version control metadata, editor
+#: temporary files and build outputs
+DEFAULT_IGNORE_PATTERNS = [
+    ".git/", ".hg/", ".svn/", ".idea/", ".vs/", ".vscode/",
+    "*~", "*.swp", ".#*", "#*#", ".DS_Store", "Thumbs.db", "desktop.ini",
+    "*.pbo", "*.pbo.*", IGNORE_FILE
+]
+
+# Ignore rules are matched case-insensitively on platforms with case-insensitive filenames
+_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+
+@dataclasses.dataclass(frozen=True)
+class SourceFile:
+    """A file to add to a PBO archive, such as one found by :func:`walk`."""
+    #: The location of the file
+    path: pathlib.Path
+    #: The status of the file, as returned by ``os.stat``, or ``None`` if not yet known
+    stat: typing.Optional[os.stat_result] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class _Rule:
+    regex: re.Pattern[str]
+    negated: bool
+    directory_only: bool
+    # The directory containing the rule, relative to the walked directory, with a trailing "/"
+    base: str
+
+    def matches(self, relative: str, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+
+        return relative.startswith(self.base) \
+            and self.regex.fullmatch(relative[len(self.base):]) is not None
+
+
+def _translate(pattern: str) -> str:
+    result = []
+    index = 0
+
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            result.append("(?:.*/)?")
+            index += 3
+        elif pattern == "**" or (pattern.endswith("/**") and index == len(pattern) - 2):
+            result.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            result.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            result.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2:]:
+            end = pattern.index("]", index + 2)
+            members = pattern[index + 1:end]
+            if members.startswith("!"):
+                members = "^" + members[1:]
+            result.append("[" + members.replace("\\", "\\\\") + "]")
+            index = end + 1
+        elif pattern[index] == "\\" and index + 1 < len(pattern):
+            result.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            result.append(re.escape(pattern[index]))
+            index += 1
+
+    return "".join(result)
+
+
+def _parse_rules(lines: abc.Iterable[str], base: str = "") -> list[_Rule]:
+    rules = []
+
+    for line in lines:
+        pattern = line.rstrip()
+        if pattern == "" or pattern.startswith("#"):
+            continue
+
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+
+        directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Like gitignore, patterns containing a slash are relative to the directory containing
+        # them, while other patterns match names at any depth
+        regex = _translate(pattern.lstrip("/"))
+        if "/" not in pattern:
+            regex = "(?:.*/)?" + regex
+
+        rules.append(_Rule(re.compile(regex, _FLAGS), negated, directory_only, base))
+
+    return rules
+
+
+def _ignored(rules: list[_Rule], relative: str, is_dir: bool) -> bool:
+    ignored = False
+
+    # The last matching rule decides whether a file is ignored, so later rules can re-include
+    # files ignored by earlier rules
+    for rule in rules:
+        if rule.matches(relative, is_dir):
+            ignored = not rule.negated
+
+    return ignored
+
+
+def _walk(directory: str, relative: str, rules: list[_Rule]) -> abc.Iterator[SourceFile]:
+    with os.scandir(directory) as scanner:
+        entries = sorted(scanner, key=lambda e: e.name)
+
+    for entry in entries:
+        if entry.name == IGNORE_FILE and entry.is_file():
+            with open(entry.path, "r", encoding="utf-8") as ignore_file:
+                rules = rules + _parse_rules(ignore_file, relative)
+
+    for entry in entries:
+        path = relative + entry.name
+        is_dir = entry.is_dir()
+
+        if _ignored(rules, path, is_dir):
+            logging.debug("Ignoring `%s`", entry.path)
+        elif is_dir:
+            # Ignored directories are never scanned, so large build or version control
+            # directories cost nothing
+            yield from _walk(entry.path, path + "/", rules)
+        else:
+            yield SourceFile(pathlib.Path(entry.path), entry.stat())
+
+
+def walk(
+    directory: typing.Union[str, pathlib.Path],
+    *,
+    exclude: abc.Iterable[str] = (),
+    default_excludes: bool = True
+) -> abc.Iterator[SourceFile]:
+    """Find the files in a directory and its subdirectories, in a single pass.
+
+    Files and directories are ignored according to gitignore-style rules, which are taken from
+    :data:`DEFAULT_IGNORE_PATTERNS`, `exclude` and any :data:`IGNORE_FILE` files found along the
+    way, in that order. Ignored directories are not descended into. The status of each file is
+    obtained while scanning its directory, so it does not need to be retrieved again.
+
+    :Parameters:
+      - `directory`: The directory to search.
+      - `exclude`: Additional gitignore-style patterns of files and directories to ignore. Patterns
+        starting with ``!`` include files that were ignored by earlier patterns.
+      - `default_excludes`: If False, :data:`DEFAULT_IGNORE_PATTERNS` is not used.
+
+    :Returns:
+      An iterator of :class:`SourceFile` instances, with paths starting with `directory`.
+    """
+    rules = _parse_rules([*(DEFAULT_IGNORE_PATTERNS if default_excludes else []), *exclude])
+
+    return _walk(str(directory), "", rules)
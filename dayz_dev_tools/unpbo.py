@@ -1,12 +1,18 @@
 import argparse
+import contextlib
 import logging
-import os
 import sys
 
 import dayz_dev_tools
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import content_store
 from dayz_dev_tools import extract_pbo
+from dayz_dev_tools import extraction_journal
+from dayz_dev_tools import extraction_sink
+from dayz_dev_tools import file_matcher
 from dayz_dev_tools import list_pbo
 from dayz_dev_tools import logging_configuration
+from dayz_dev_tools import memory_budget
 from dayz_dev_tools import pbo_reader
 from dayz_dev_tools import tools_directory
 
@@ -15,6 +21,7 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="View or extract a PBO archive",
         epilog="See also: https://community.bistudio.com/wiki/PBO_File_Format")
+    parser.register("type", "size", memory_budget.parse_size)
     parser.add_argument(
         "-l", "--list", action="store_true", help="List contents of the PBO archive")
     parser.add_argument(
@@ -22,7 +29,33 @@ def main() -> None:
         help="Do not convert config.bin files to config.cpp files")
     parser.add_argument(
         "-d", "--deobfuscate", action="store_true", help="Attempt to deobfuscate extracted files")
-    parser.add_argument("-m", "--match", help="Extract files matching glob pattern")
+    parser.add_argument(
+        "-m", "--match", action="append", metavar="GLOB",
+        help="Extract or list only files matching glob pattern (may be repeated)")
+    parser.add_argument(
+        "-x", "--exclude", action="append", metavar="GLOB",
+        help="Do not extract or list files matching glob pattern (may be repeated)")
+    parser.add_argument(
+        "--match-regex", action="append", metavar="REGEX",
+        help="Extract or list only files matching regular expression (may be repeated)")
+    parser.add_argument(
+        "--exclude-regex", action="append", metavar="REGEX",
+        help="Do not extract or list files matching regular expression (may be repeated)")
+    parser.add_argument(
+        "-o", "--output", metavar="PATH",
+        help="Extract files into directory or archive PATH (.zip, .tar, .tar.gz, .tar.bz2 or"
+        " .tar.xz) instead of the current directory")
+    parser.add_argument(
+        "-s", "--store", metavar="DIR",
+        help="Hard link extracted files to identical contents kept in content store DIR, adding"
+        " new contents to the store")
+    parser.add_argument(
+        "--journal", metavar="FILE",
+        help="Record extracted files in journal FILE and skip files already recorded there,"
+        " resuming an interrupted extraction")
+    parser.add_argument(
+        "--max-memory", type="size", metavar="SIZE",
+        help="Hold at most SIZE bytes of file contents in memory at once (e.g. 512M)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("-D", "--debug", action="store_true", help="Enable debug logs")
     parser.add_argument("-V", "--version", action="version", version=dayz_dev_tools.version)
@@ -37,22 +70,38 @@ def main() -> None:
     logging_configuration.configure_logging(debug=args.debug)
 
     try:
+        matcher = file_matcher.create(
+            include=args.match, exclude=args.exclude, include_regex=args.match_regex,
+            exclude_regex=args.exclude_regex)
+
         with open(args.pbofile, "rb") as pbo_file:
             reader = pbo_reader.PBOReader(pbo_file)
 
             if args.list:
-                list_pbo.list_pbo(reader, verbose=args.verbose)
+                list_pbo.list_pbo(reader, verbose=args.verbose, matcher=matcher)
             else:
                 cfgconvert = None
                 if args.no_convert is False:
-                    tools_dir = tools_directory.tools_directory()
-                    if tools_dir is not None:
-                        cfgconvert = os.path.join(tools_dir, "bin", "CfgConvert", "CfgConvert.exe")
-
-                extract_pbo.extract_pbo(
-                    reader, args.files,
-                    verbose=args.verbose, deobfuscate=args.deobfuscate, cfgconvert=cfgconvert,
-                    pattern=args.match)
+                    cfgconvert = config_cpp.default_converter(tools_directory.tools_directory())
+
+                store = None
+                if args.store is not None:
+                    store = content_store.ContentStore(args.store)
+
+                with contextlib.ExitStack() as stack:
+                    journal = None
+                    if args.journal is not None:
+                        journal = stack.enter_context(
+                            extraction_journal.ExtractionJournal(args.journal))
+
+                    sink = stack.enter_context(
+                        extraction_sink.open_sink(args.output, atomic=journal is not None))
+
+                    extract_pbo.extract_pbo(
+                        reader, args.files,
+                        verbose=args.verbose, deobfuscate=args.deobfuscate,
+                        cfgconvert=cfgconvert, matcher=matcher, sink=sink, store=store,
+                        journal=journal, max_memory=args.max_memory)
     except Exception as error:
         logging.debug("Uncaught exception in main", exc_info=True)
         logging.error("%s: %s", type(error).__name__, error)
@@ -1,2 +1,6 @@
+def compress(inbuffer: bytes, level: int = 5) -> bytes:
+    ...
+
+
 def expand(inbuffer: bytes, capacity: int) -> bytes:
     ...
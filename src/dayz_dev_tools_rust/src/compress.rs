@@ -0,0 +1,282 @@
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::{pyfunction, PyResult, Python};
+use pyo3::types::{PyBytes, PyBytesMethods};
+use pyo3::Bound;
+use std::cmp::min;
+
+pub const MIN_LEVEL: u32 = 1;
+pub const MAX_LEVEL: u32 = 9;
+pub const DEFAULT_LEVEL: u32 = 5;
+
+// Back-references can reach at most 4095 bytes back and copy 3 to 18 bytes
+const WINDOW_SIZE: usize = 4095;
+const MIN_MATCH: usize = 3;
+const MAX_MATCH: usize = 18;
+
+const HASH_BITS: u32 = 14;
+const CHAIN_MASK: usize = 4095;
+const NONE: usize = usize::MAX;
+
+// Levels from this one up defer a match by one byte when a longer match starts there
+const LAZY_LEVEL: u32 = 7;
+
+struct MatchFinder<'a> {
+    input: &'a [u8],
+    head: Vec<usize>,
+    prev: Vec<usize>,
+    max_chain: usize,
+}
+
+impl<'a> MatchFinder<'a> {
+    fn new(input: &'a [u8], level: u32) -> MatchFinder<'a> {
+        MatchFinder {
+            input,
+            head: vec![NONE; 1 << HASH_BITS],
+            prev: vec![NONE; CHAIN_MASK + 1],
+            max_chain: 1 << (level - MIN_LEVEL),
+        }
+    }
+
+    fn hash(&self, i: usize) -> usize {
+        let value = (self.input[i] as u32)
+            | ((self.input[i + 1] as u32) << 8)
+            | ((self.input[i + 2] as u32) << 16);
+        (value.wrapping_mul(2654435761) >> (32 - HASH_BITS)) as usize
+    }
+
+    fn insert(&mut self, i: usize) {
+        if i + MIN_MATCH <= self.input.len() {
+            let h = self.hash(i);
+            self.prev[i & CHAIN_MASK] = self.head[h];
+            self.head[h] = i;
+        }
+    }
+
+    // Returns the length and distance of the longest match for the bytes at `i`, searching
+    // positions that have been inserted
+    fn find(&self, i: usize) -> (usize, usize) {
+        if i + MIN_MATCH > self.input.len() {
+            return (0, 0);
+        }
+
+        let max_len = min(MAX_MATCH, self.input.len() - i);
+        let mut best = (0, 0);
+        let mut candidate = self.head[self.hash(i)];
+        let mut chain = self.max_chain;
+
+        while candidate != NONE && chain > 0 && i - candidate <= WINDOW_SIZE {
+            let mut len = 0;
+            while len < max_len && self.input[candidate + len] == self.input[i + len] {
+                len += 1;
+            }
+
+            if len > best.0 {
+                best = (len, i - candidate);
+                if len == max_len {
+                    break;
+                }
+            }
+
+            // Entries in the chain are reused once they leave the window, so a stale link never
+            // points backwards
+            let next = self.prev[candidate & CHAIN_MASK];
+            if next == NONE || next >= candidate {
+                break;
+            }
+
+            candidate = next;
+            chain -= 1;
+        }
+
+        best
+    }
+}
+
+pub fn compress_impl(inbytes: &[u8], level: u32) -> Vec<u8> {
+    let mut finder = MatchFinder::new(inbytes, level);
+    let mut output = Vec::with_capacity(inbytes.len() + inbytes.len() / 8 + 5);
+    let mut i = 0;
+
+    while i < inbytes.len() {
+        let flag_index = output.len();
+        output.push(0u8);
+
+        for bit in 0..8 {
+            if i >= inbytes.len() {
+                break;
+            }
+
+            let (mut len, dist) = finder.find(i);
+            let mut inserted = false;
+
+            if level >= LAZY_LEVEL && len >= MIN_MATCH && len < MAX_MATCH {
+                finder.insert(i);
+                inserted = true;
+
+                if finder.find(i + 1).0 > len {
+                    len = 0;
+                }
+            }
+
+            if len >= MIN_MATCH {
+                output.push((dist & 0xff) as u8);
+                output.push((((dist >> 4) & 0xf0) | (len - MIN_MATCH)) as u8);
+
+                for p in i..i + len {
+                    if p != i || !inserted {
+                        finder.insert(p);
+                    }
+                }
+
+                i += len;
+            } else {
+                output[flag_index] |= 1 << bit;
+                output.push(inbytes[i]);
+
+                if !inserted {
+                    finder.insert(i);
+                }
+
+                i += 1;
+            }
+        }
+    }
+
+    let checksum = inbytes
+        .iter()
+        .fold(0u32, |sum, &b| sum.wrapping_add(b as u32));
+    output.extend_from_slice(&checksum.to_le_bytes());
+
+    output
+}
+
+#[pyfunction]
+#[pyo3(signature = (input, level = DEFAULT_LEVEL))]
+pub fn compress<'p>(
+    py: Python<'p>,
+    input: &'p Bound<'p, PyBytes>,
+    level: u32,
+) -> PyResult<Bound<'p, PyBytes>> {
+    if !(MIN_LEVEL..=MAX_LEVEL).contains(&level) {
+        return Err(PyValueError::new_err(format!(
+            "Compression level must be between {MIN_LEVEL} and {MAX_LEVEL}"
+        )));
+    }
+
+    let inbytes = input.as_bytes();
+    let output = py.detach(|| compress_impl(inbytes, level));
+
+    Ok(PyBytes::new(py, &output))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::expand::expand_impl;
+    use std::time::Instant;
+
+    fn round_trip(input: &[u8], level: u32) {
+        let compressed = compress_impl(input, level);
+        let (data, checksum) = compressed.split_at(compressed.len() - 4);
+
+        assert_eq!(expand_impl(data, input.len()), input);
+        assert_eq!(
+            u32::from_le_bytes(checksum.try_into().unwrap()),
+            input
+                .iter()
+                .fold(0u32, |sum, &b| sum.wrapping_add(b as u32))
+        );
+    }
+
+    fn sample(size: usize) -> Vec<u8> {
+        let words: [&[u8]; 6] = [
+            b"class ",
+            b"override ",
+            b"void ",
+            b"int ",
+            b"{\r\n",
+            b";\r\n",
+        ];
+        let mut state = 12345u32;
+        let mut result = Vec::with_capacity(size);
+        while result.len() < size {
+            state = state.wrapping_mul(1103515245).wrapping_add(12345);
+            if state >> 28 == 0 {
+                result.push((state >> 16) as u8);
+            } else {
+                result.extend_from_slice(words[(state >> 16) as usize % words.len()]);
+            }
+        }
+        result.truncate(size);
+        result
+    }
+
+    #[test]
+    fn test_compress_empty_input_produces_only_checksum() {
+        assert_eq!(compress_impl(b"", DEFAULT_LEVEL), b"\0\0\0\0");
+    }
+
+    #[test]
+    fn test_compress_stores_literals_when_nothing_repeats() {
+        assert_eq!(compress_impl(b"ABCDEFGH", 1), b"\xffABCDEFGH\x24\x02\0\0");
+    }
+
+    #[test]
+    fn test_compress_refers_to_previous_data() {
+        assert_eq!(
+            compress_impl(b"ABCDABCDABCD", 1),
+            b"\x0fABCD\x04\x05\x1e\x03\0\0"
+        );
+    }
+
+    #[test]
+    fn test_compress_round_trips_at_every_level() {
+        let input = sample(100_000);
+        for level in MIN_LEVEL..=MAX_LEVEL {
+            round_trip(&input, level);
+        }
+    }
+
+    #[test]
+    fn test_compress_round_trips_runs_and_window_boundaries() {
+        let mut input = vec![b'A'; 5000];
+        input.extend(sample(4096));
+        input.extend_from_slice(&input[..4200].to_vec());
+        for level in [MIN_LEVEL, DEFAULT_LEVEL, MAX_LEVEL] {
+            round_trip(&input, level);
+        }
+    }
+
+    #[test]
+    fn test_higher_levels_do_not_compress_worse() {
+        let input = sample(100_000);
+        assert!(compress_impl(&input, MAX_LEVEL).len() <= compress_impl(&input, MIN_LEVEL).len());
+    }
+
+    // Run with `cargo test --release -- --ignored --nocapture`
+    #[test]
+    #[ignore]
+    fn benchmark_round_trip_throughput() {
+        let input = sample(64 * 1024 * 1024);
+        let megabytes = input.len() as f64 / (1024.0 * 1024.0);
+
+        for level in [MIN_LEVEL, DEFAULT_LEVEL, MAX_LEVEL] {
+            let start = Instant::now();
+            let compressed = compress_impl(&input, level);
+            let compressed_secs = start.elapsed().as_secs_f64();
+
+            let start = Instant::now();
+            let expanded = expand_impl(&compressed[..compressed.len() - 4], input.len());
+            let expanded_secs = start.elapsed().as_secs_f64();
+
+            assert_eq!(expanded, input);
+
+            println!(
+                "level {level}: ratio {:.3}, compress {:.1} MiB/s, expand {:.1} MiB/s",
+                compressed.len() as f64 / input.len() as f64,
+                megabytes / compressed_secs,
+                megabytes / expanded_secs
+            );
+        }
+    }
+}
@@ -57,7 +57,7 @@ impl<'a> InBuffer<'a> {
     }
 }
 
-fn expand_impl(inbytes: &[u8], capacity: usize) -> Vec<u8> {
+pub fn expand_impl(inbytes: &[u8], capacity: usize) -> Vec<u8> {
     let mut raw = InBuffer::new(inbytes);
     let mut output = Vec::with_capacity(capacity);
     'outer: while !raw.end() && output.len() < capacity {
@@ -108,7 +108,8 @@ pub fn expand<'p>(
     input: &'p Bound<'p, PyBytes>,
     capacity: usize,
 ) -> PyResult<Bound<'p, PyBytes>> {
-    let output = expand_impl(input.as_bytes(), capacity);
+    let inbytes = input.as_bytes();
+    let output = py.detach(|| expand_impl(inbytes, capacity));
 
     Ok(PyBytes::new(py, &output))
 }
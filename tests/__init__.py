@@ -0,0 +1,7 @@
+import os
+
+from dayz_dev_tools import conversion_cache
+
+
+# Conversions made by tests must not be cached in the user's cache directory
+os.environ[conversion_cache.CACHE_ENV_VAR] = ""
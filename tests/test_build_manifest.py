@@ -0,0 +1,203 @@
+import io
+import json
+import os
+import pathlib
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import build_manifest
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_writer
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        chdir = misc.chdir(self.tempdir.name)
+        chdir.__enter__()
+        self.addCleanup(chdir.__exit__, None, None, None)
+
+        self.settings = {"compress": False}
+
+        self.write_file("one.c", b"ONE")
+        self.write_file("two.c", b"TWO")
+
+    def write_file(self, name: str, data: bytes, mtime_ns: int = 1_000_000_000) -> None:
+        with open(name, "wb") as out_file:
+            out_file.write(data)
+
+        os.utime(name, ns=(mtime_ns, mtime_ns))
+
+    def build(
+        self,
+        manifest: build_manifest.BuildManifest,
+        *,
+        files: tuple[str, ...] = ("one.c", "two.c"),
+        cfgconvert: str = "CFGCONVERT"
+    ) -> pbo_writer.PBOWriter:
+        writer = pbo_writer.PBOWriter(cfgconvert=cfgconvert, manifest=manifest)
+        writer.add_header("prefix", "mod")
+
+        for name in files:
+            writer.add_file(pathlib.Path(name))
+
+        return writer
+
+    def build_and_save(self, **kwargs: typing.Any) -> None:
+        manifest = build_manifest.BuildManifest("output.pbo", **kwargs)
+        writer = self.build(manifest)
+
+        with open("output.pbo", "wb") as output:
+            writer.write(output)
+
+        manifest.save(writer, self.settings)
+
+    def test_manifest_path_is_next_to_pbo_file(self) -> None:
+        assert build_manifest.manifest_path(os.path.join("addons", "mod.pbo")) == \
+            os.path.join("addons", "mod.pbo.manifest")
+
+    def test_up_to_date_returns_false_without_previous_build(self) -> None:
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    def test_up_to_date_returns_true_when_inputs_are_unchanged(self) -> None:
+        self.build_and_save()
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is True
+
+    def test_up_to_date_returns_false_when_file_is_modified(self) -> None:
+        self.build_and_save()
+        self.write_file("two.c", b"TWO", mtime_ns=2_000_000_000)
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    def test_up_to_date_returns_false_when_files_are_removed(self) -> None:
+        self.build_and_save()
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest, files=("one.c",)), self.settings) is False
+
+    def test_up_to_date_returns_false_when_settings_are_changed(self) -> None:
+        self.build_and_save()
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), {"compress": True}) is False
+
+    def test_up_to_date_returns_false_when_pbo_file_is_modified(self) -> None:
+        self.build_and_save()
+
+        with open("output.pbo", "ab") as output:
+            output.write(b"X")
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    def test_up_to_date_compares_checksums_when_enabled(self) -> None:
+        self.build_and_save(checksums=True)
+
+        manifest = build_manifest.BuildManifest("output.pbo", checksums=True)
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is True
+
+        # Same size and modification time, but different contents
+        self.write_file("two.c", b"2WO")
+
+        manifest = build_manifest.BuildManifest("output.pbo", checksums=True)
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    def test_ignores_manifest_with_different_version(self) -> None:
+        self.build_and_save()
+
+        with open("output.pbo.manifest", "r") as manifest_file:
+            data = json.load(manifest_file)
+
+        data["version"] = build_manifest.MANIFEST_VERSION + 1
+
+        with open("output.pbo.manifest", "w") as manifest_file:
+            json.dump(data, manifest_file)
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    def test_ignores_unreadable_manifest(self) -> None:
+        with open("output.pbo.manifest", "w") as manifest_file:
+            manifest_file.write("{not json")
+
+        with open("output.pbo", "wb"):
+            pass
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+
+        assert manifest.up_to_date(self.build(manifest), self.settings) is False
+
+    @mock.patch("dayz_dev_tools.config_cpp.cpp_to_bin")
+    def test_reuses_cached_conversion_of_unchanged_config_cpp(
+        self, mock_cpp_to_bin: mock.Mock
+    ) -> None:
+        mock_cpp_to_bin.return_value = b"CONFIG-BIN"
+        self.write_file("config.cpp", b"CONFIG-CPP")
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+        writer = self.build(manifest, files=("config.cpp", "one.c"))
+        writer.write(io.BytesIO())
+
+        with open("output.pbo", "wb"):
+            pass
+
+        manifest.save(writer, self.settings)
+
+        mock_cpp_to_bin.assert_called_once_with(b"CONFIG-CPP", "CFGCONVERT")
+        mock_cpp_to_bin.reset_mock()
+
+        self.write_file("one.c", b"CHANGED", mtime_ns=2_000_000_000)
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+        writer = self.build(manifest, files=("config.cpp", "one.c"))
+
+        assert manifest.up_to_date(writer, self.settings) is False
+        mock_cpp_to_bin.assert_not_called()
+        assert [e.contents for e in writer.entries if e.stored_path == "config.bin"] == \
+            [b"CONFIG-BIN"]
+
+        self.write_file("config.cpp", b"CHANGED-CPP")
+
+        self.build(manifest, files=("config.cpp",))
+
+        mock_cpp_to_bin.assert_called_once_with(b"CHANGED-CPP", "CFGCONVERT")
+
+    @mock.patch("dayz_dev_tools.config_cpp.cpp_to_bin")
+    def test_does_not_reuse_conversion_by_different_program(
+        self, mock_cpp_to_bin: mock.Mock
+    ) -> None:
+        mock_cpp_to_bin.return_value = b"CONFIG-BIN"
+        self.write_file("config.cpp", b"CONFIG-CPP")
+
+        manifest = build_manifest.BuildManifest("output.pbo")
+        writer = self.build(manifest, files=("config.cpp",))
+
+        with open("output.pbo", "wb"):
+            pass
+
+        manifest.save(writer, self.settings)
+
+        self.build(
+            build_manifest.BuildManifest("output.pbo"), files=("config.cpp",),
+            cfgconvert="OTHER-CFGCONVERT")
+
+        assert mock_cpp_to_bin.call_count == 2
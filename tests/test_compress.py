@@ -0,0 +1,29 @@
+import os
+import struct
+import unittest
+
+from dayz_dev_tools_rust import compress
+from dayz_dev_tools_rust import expand
+
+
+class TestCompress(unittest.TestCase):
+    def test_compressed_data_can_be_expanded(self) -> None:
+        data = b"class Foo { void Bar(); void Baz(); };\r\n" * 100 + os.urandom(1000)
+
+        for level in range(1, 10):
+            compressed = compress(data, level)
+
+            assert len(compressed) < len(data)
+            assert expand(compressed[:-4], len(data)) == data
+
+    def test_appends_checksum_of_uncompressed_data(self) -> None:
+        data = b"\xff" * 20000000
+
+        compressed = compress(data)
+
+        assert struct.unpack("<I", compressed[-4:])[0] == sum(data) & 0xffffffff
+
+    def test_raises_if_level_is_invalid(self) -> None:
+        for level in [0, 10]:
+            with self.assertRaises(ValueError):
+                compress(b"data", level)
@@ -0,0 +1,158 @@
+import struct
+import unittest
+
+from dayz_dev_tools import config_bin
+
+
+def class_entry(name: bytes, offset: int) -> bytes:
+    return b"\x00" + name + b"\x00" + struct.pack("<I", offset)
+
+
+def body(base: bytes, entries: list[bytes]) -> bytes:
+    return base + b"\x00" + bytes([len(entries)]) + b"".join(entries)
+
+
+def rapified(root: list[bytes], bodies: list[bytes], enums: bytes = b"\x00\x00\x00\x00") -> bytes:
+    data = body(b"", root) + b"".join(bodies)
+    return config_bin.SIGNATURE + struct.pack("<III", 0, 8, 16 + len(data)) + data + enums
+
+
+def mod_config() -> bytes:
+    # The class bodies follow the root body, so their offsets depend on the sizes before them
+    version = b"\x01\x02version\x00" + struct.pack("<i", -7)
+    root_size = len(body(b"", [class_entry(b"CfgPatches", 0), version]))
+    patches_offset = 16 + root_size
+    mymod_offset = patches_offset + len(body(b"", [class_entry(b"MyMod", 0)]))
+
+    return rapified(
+        [class_entry(b"CfgPatches", patches_offset), version],
+        [
+            body(b"", [class_entry(b"MyMod", mymod_offset)]),
+            body(b"Base", [
+                b"\x02units\x00\x00",
+                b"\x02requiredAddons\x00\x01\x00DZ_Data\x00",
+                b"\x01\x01requiredVersion\x00" + struct.pack("<f", 0.1),
+                b"\x01\x00name\x00My \"Mod\"\x00",
+                b"\x02pos\x00\x02\x03\x02\x02" + struct.pack("<i", 1) + b"\x01"
+                + struct.pack("<f", 2.0) + b"\x00x\x00",
+                b"\x05\x01\x00\x00\x00extra\x00\x01\x02" + struct.pack("<i", 3),
+                b"\x03Other\x00",
+                b"\x04Old\x00"
+            ])
+        ])
+
+
+class TestConfigBin(unittest.TestCase):
+    def test_read_returns_config_tree(self) -> None:
+        config = config_bin.read(mod_config())
+
+        assert config == config_bin.Config([
+            config_bin.ConfigClass("CfgPatches", None, [
+                config_bin.ConfigClass("MyMod", "Base", [
+                    config_bin.ConfigProperty("units", []),
+                    config_bin.ConfigProperty("requiredAddons", ["DZ_Data"]),
+                    config_bin.ConfigProperty("requiredVersion", 0.1),
+                    config_bin.ConfigProperty("name", "My \"Mod\""),
+                    config_bin.ConfigProperty("pos", [[1, 2.0], "x"]),
+                    config_bin.ConfigProperty("extra", [3], append=True),
+                    config_bin.ConfigExtern("Other"),
+                    config_bin.ConfigDelete("Old")
+                ])
+            ]),
+            config_bin.ConfigProperty("version", -7)
+        ])
+
+    def test_get_finds_entries_ignoring_case(self) -> None:
+        config = config_bin.read(mod_config())
+
+        patches = config.get("cfgpatches")
+        assert isinstance(patches, config_bin.ConfigClass)
+        assert isinstance(mymod := patches.get("MYMOD"), config_bin.ConfigClass)
+        assert mymod.get("requiredversion") == config_bin.ConfigProperty("requiredVersion", 0.1)
+        assert config.get("missing") is None
+
+    def test_read_includes_enums(self) -> None:
+        config = config_bin.read(rapified(
+            [], [], struct.pack("<I", 2) + b"First\x00" + struct.pack("<i", 1)
+            + b"Second\x00" + struct.pack("<i", -2)))
+
+        assert config.enums == [("First", 1), ("Second", -2)]
+
+    def test_read_keeps_strings_that_are_not_utf8(self) -> None:
+        config = config_bin.read(rapified([b"\x01\x00name\x00caf\xe9\x00"], []))
+
+        assert config_bin.format_cpp(config) == b"name = \"caf\xe9\";\r\n"
+
+    def test_read_raises_when_signature_is_missing(self) -> None:
+        with self.assertRaisesRegex(Exception, r"^Invalid config.bin: missing signature$"):
+            config_bin.read(b"class CfgPatches {};")
+
+    def test_read_raises_when_data_is_truncated(self) -> None:
+        with self.assertRaisesRegex(Exception, r"^Invalid config.bin: unexpected end of data$"):
+            config_bin.read(mod_config()[:60])
+
+    def test_read_raises_when_class_contains_itself(self) -> None:
+        with self.assertRaisesRegex(Exception, r"^Invalid config.bin: bad class offset 16$"):
+            config_bin.read(rapified([class_entry(b"Loop", 16)], []))
+
+    def test_write_reproduces_config_bin_content(self) -> None:
+        assert config_bin.write(config_bin.read(mod_config())) == mod_config()
+
+    def test_write_stores_large_integers_with_64_bits(self) -> None:
+        config = config_bin.Config([
+            config_bin.ConfigProperty("big", 2 ** 40),
+            config_bin.ConfigProperty("small", -2 ** 31)
+        ])
+
+        data = config_bin.write(config)
+
+        assert b"\x01\x06big\x00" + struct.pack("<q", 2 ** 40) in data
+        assert b"\x01\x02small\x00" + struct.pack("<i", -2 ** 31) in data
+        assert config_bin.read(data) == config
+
+    def test_write_raises_on_integers_larger_than_64_bits(self) -> None:
+        config = config_bin.Config([config_bin.ConfigProperty("huge", 2 ** 63)])
+
+        with self.assertRaisesRegex(Exception, r"^Integer out of range: 9223372036854775808$"):
+            config_bin.write(config)
+
+    def test_write_includes_enums(self) -> None:
+        config = config_bin.Config([], [("First", 1), ("Second", -2)])
+
+        assert config_bin.read(config_bin.write(config)) == config
+
+    def test_format_cpp_writes_config_cpp_content(self) -> None:
+        assert config_bin.format_cpp(config_bin.read(mod_config())) == (
+            b"class CfgPatches\r\n"
+            b"{\r\n"
+            b"\tclass MyMod: Base\r\n"
+            b"\t{\r\n"
+            b"\t\tunits[] = {};\r\n"
+            b"\t\trequiredAddons[] = {\"DZ_Data\"};\r\n"
+            b"\t\trequiredVersion = 0.1;\r\n"
+            b"\t\tname = \"My \"\"Mod\"\"\";\r\n"
+            b"\t\tpos[] = {{1, 2.0}, \"x\"};\r\n"
+            b"\t\textra[] += {3};\r\n"
+            b"\t\tclass Other;\r\n"
+            b"\t\tdelete Old;\r\n"
+            b"\t};\r\n"
+            b"};\r\n"
+            b"version = -7;\r\n")
+
+    def test_format_cpp_writes_enums_first(self) -> None:
+        config = config_bin.Config(
+            [config_bin.ConfigProperty("value", 1)], [("First", 1), ("Second", 2)])
+
+        assert config_bin.format_cpp(config) == (
+            b"enum\r\n{\r\n\tFirst = 1,\r\n\tSecond = 2,\r\n};\r\nvalue = 1;\r\n")
+
+    def test_format_cpp_raises_on_floats_that_are_not_finite(self) -> None:
+        for value in [float("inf"), float("-inf"), float("nan")]:
+            config = config_bin.Config([config_bin.ConfigProperty("x", [value])])
+
+            with self.assertRaisesRegex(Exception, r"^Float cannot be written to config.cpp: "):
+                config_bin.format_cpp(config)
+
+    def test_bin_to_cpp_converts_config_bin_to_config_cpp(self) -> None:
+        assert config_bin.bin_to_cpp(mod_config()) == \
+            config_bin.format_cpp(config_bin.read(mod_config()))
@@ -1,9 +1,14 @@
 import io
 import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest import mock
 
 from dayz_dev_tools import config_cpp
+from dayz_dev_tools import config_parser
+from dayz_dev_tools import conversion_cache
 
 
 class TestConfigCPP(unittest.TestCase):
@@ -24,6 +29,11 @@ class TestConfigCPP(unittest.TestCase):
         self.mock_run = run_patcher.start()
         self.addCleanup(run_patcher.stop)
 
+        staging_patcher = mock.patch(
+            "dayz_dev_tools.config_cpp._staging_directory", return_value="STAGING-DIR")
+        staging_patcher.start()
+        self.addCleanup(staging_patcher.stop)
+
     def test_bin_to_cpp_converts_config_bin_to_config_cpp(self) -> None:
         temp_bin_file = io.BytesIO()
         temp_cpp_file = io.BytesIO(b"CPP-CONTENT")
@@ -39,7 +49,7 @@ class TestConfigCPP(unittest.TestCase):
 
         assert out_content == b"CPP-CONTENT"
 
-        self.mock_temporary_directory_class.assert_called_once_with()
+        self.mock_temporary_directory_class.assert_called_once_with(dir="STAGING-DIR")
 
         assert self.mock_open.call_count == 2
         assert self.mock_open.call_args_list == [
@@ -71,7 +81,7 @@ class TestConfigCPP(unittest.TestCase):
 
         assert out_content == b"BIN-CONTENT"
 
-        self.mock_temporary_directory_class.assert_called_once_with()
+        self.mock_temporary_directory_class.assert_called_once_with(dir="STAGING-DIR")
 
         assert self.mock_open.call_count == 2
         assert self.mock_open.call_args_list == [
@@ -87,3 +97,231 @@ class TestConfigCPP(unittest.TestCase):
                 os.path.join("TEMP-DIR", "input.tmp")
             ],
             check=True)
+
+    def test_bin_to_cpp_converts_natively_when_using_native_converter(self) -> None:
+        with mock.patch(
+            "dayz_dev_tools.config_bin.bin_to_cpp", return_value=b"CPP-CONTENT"
+        ) as mock_bin_to_cpp:
+            out_content = config_cpp.bin_to_cpp(b"BIN-CONTENT", config_cpp.NATIVE_CONVERTER)
+
+        assert out_content == b"CPP-CONTENT"
+
+        mock_bin_to_cpp.assert_called_once_with(b"BIN-CONTENT")
+        self.mock_run.assert_not_called()
+
+    def test_cpp_to_bin_converts_natively_when_using_native_converter(self) -> None:
+        with mock.patch(
+            "dayz_dev_tools.config_parser.cpp_to_bin", return_value=b"BIN-CONTENT"
+        ) as mock_cpp_to_bin:
+            out_content = config_cpp.cpp_to_bin(b"CPP-CONTENT", config_cpp.NATIVE_CONVERTER)
+
+        assert out_content == b"BIN-CONTENT"
+
+        mock_cpp_to_bin.assert_called_once_with(b"CPP-CONTENT")
+        self.mock_run.assert_not_called()
+
+    def cache(self) -> mock.Mock:
+        # Files are mocked, so conversions are cached in memory
+        cached: dict[str, bytes] = {}
+
+        cache = mock.Mock(spec=conversion_cache.ConversionCache)
+        cache.get.side_effect = cached.get
+        cache.put.side_effect = cached.__setitem__
+
+        return cache
+
+    def test_reuses_cached_conversion_of_same_content(self) -> None:
+        with mock.patch(
+            "dayz_dev_tools.conversion_cache.default_cache", return_value=self.cache()
+        ), mock.patch(
+            "dayz_dev_tools.config_parser.cpp_to_bin", return_value=b"BIN-CONTENT"
+        ) as mock_cpp_to_bin:
+            first = config_cpp.cpp_to_bin(b"CPP-CONTENT", config_cpp.NATIVE_CONVERTER)
+            second = config_cpp.cpp_to_bin(b"CPP-CONTENT", config_cpp.NATIVE_CONVERTER)
+
+        assert first == b"BIN-CONTENT"
+        assert second == b"BIN-CONTENT"
+
+        mock_cpp_to_bin.assert_called_once_with(b"CPP-CONTENT")
+
+    def test_does_not_reuse_cached_conversion_in_other_direction(self) -> None:
+        with mock.patch(
+            "dayz_dev_tools.conversion_cache.default_cache", return_value=self.cache()
+        ), mock.patch(
+            "dayz_dev_tools.config_parser.cpp_to_bin", return_value=b"BIN-CONTENT"
+        ), mock.patch(
+            "dayz_dev_tools.config_bin.bin_to_cpp", return_value=b"CPP-CONTENT"
+        ) as mock_bin_to_cpp:
+            config_cpp.cpp_to_bin(b"CONTENT", config_cpp.NATIVE_CONVERTER)
+            out_content = config_cpp.bin_to_cpp(b"CONTENT", config_cpp.NATIVE_CONVERTER)
+
+        assert out_content == b"CPP-CONTENT"
+
+        mock_bin_to_cpp.assert_called_once_with(b"CONTENT")
+
+    def test_reuses_cached_conversion_until_cfgconvert_changes(self) -> None:
+        cache = self.cache()
+
+        self.mock_temporary_directory_context.__enter__.return_value = "TEMP-DIR"
+        self.mock_open.return_value.__enter__.side_effect = [
+            io.BytesIO(),
+            io.BytesIO(b"BIN-CONTENT"),
+            io.BytesIO(),
+            io.BytesIO(b"NEW-BIN-CONTENT")
+        ]
+
+        with mock.patch("dayz_dev_tools.conversion_cache.default_cache", return_value=cache), \
+                mock.patch("os.stat") as mock_stat:
+            mock_stat.return_value.st_size = 1234
+            mock_stat.return_value.st_mtime_ns = 1000
+
+            assert config_cpp.cpp_to_bin(b"CPP-CONTENT", "cfgconvert.exe") == b"BIN-CONTENT"
+            assert config_cpp.cpp_to_bin(b"CPP-CONTENT", "cfgconvert.exe") == b"BIN-CONTENT"
+
+            mock_stat.return_value.st_mtime_ns = 2000
+
+            assert config_cpp.cpp_to_bin(b"CPP-CONTENT", "cfgconvert.exe") == \
+                b"NEW-BIN-CONTENT"
+
+        assert self.mock_run.call_count == 2
+
+    def test_does_not_cache_conversion_when_converter_cannot_be_identified(self) -> None:
+        cache = mock.Mock(spec=conversion_cache.ConversionCache)
+
+        self.mock_temporary_directory_context.__enter__.return_value = "TEMP-DIR"
+        self.mock_open.return_value.__enter__.side_effect = [
+            io.BytesIO(),
+            io.BytesIO(b"BIN-CONTENT")
+        ]
+
+        with mock.patch("dayz_dev_tools.conversion_cache.default_cache", return_value=cache):
+            out_content = config_cpp.cpp_to_bin(b"CPP-CONTENT", "path/to/missing.exe")
+
+        assert out_content == b"BIN-CONTENT"
+
+        cache.get.assert_not_called()
+        cache.put.assert_not_called()
+
+
+class TestDefaultConverter(unittest.TestCase):
+    def test_returns_cfgconvert_in_tools_directory(self) -> None:
+        assert config_cpp.default_converter("TOOLS") == \
+            os.path.join("TOOLS", "bin", "CfgConvert", "CfgConvert.exe")
+
+    def test_returns_native_converter_when_tools_are_not_installed(self) -> None:
+        assert config_cpp.default_converter(None) == config_cpp.NATIVE_CONVERTER
+
+
+class TestStagingDirectory(unittest.TestCase):
+    def test_returns_dev_shm_when_it_is_writable(self) -> None:
+        with mock.patch("os.path.isdir", return_value=True) as mock_isdir, \
+                mock.patch("os.access", return_value=True) as mock_access:
+            assert config_cpp._staging_directory() == "/dev/shm"
+
+        mock_isdir.assert_called_once_with("/dev/shm")
+        mock_access.assert_called_once_with("/dev/shm", os.W_OK | os.X_OK)
+
+    def test_returns_none_when_dev_shm_does_not_exist(self) -> None:
+        with mock.patch("os.path.isdir", return_value=False):
+            assert config_cpp._staging_directory() is None
+
+    def test_returns_none_when_dev_shm_is_not_writable(self) -> None:
+        with mock.patch("os.path.isdir", return_value=True), \
+                mock.patch("os.access", return_value=False):
+            assert config_cpp._staging_directory() is None
+
+
+# The stub converter upper-cases its input, failing for inputs containing "fail"
+STUB_CONVERTER = f"""#!{sys.executable}
+import sys
+mode, _, out_path, in_path = sys.argv[1:]
+with open(in_path, "rb") as infile:
+    content = infile.read()
+if b"fail" in content:
+    sys.exit("conversion failed")
+with open(out_path, "wb") as outfile:
+    outfile.write(mode.encode() + b":" + content.upper())
+"""
+
+
+@unittest.skipIf(sys.platform == "win32", "The stub converter is a Python script")
+class TestConvertMany(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.executable = os.path.join(self.tempdir.name, "cfgconvert")
+        with open(self.executable, "w") as stub:
+            stub.write(STUB_CONVERTER)
+        os.chmod(self.executable, 0o755)
+
+        self.stagedir = os.path.join(self.tempdir.name, "staging")
+        os.mkdir(self.stagedir)
+
+        staging_patcher = mock.patch(
+            "dayz_dev_tools.config_cpp._staging_directory", return_value=self.stagedir)
+        staging_patcher.start()
+        self.addCleanup(staging_patcher.stop)
+
+    def test_converts_items_in_order(self) -> None:
+        results = config_cpp.convert_many(
+            [b"one", b"two", b"three"], config_cpp.Mode.BIN, self.executable, jobs=2)
+
+        assert results == [
+            config_cpp.Conversion(b"-bin:ONE"),
+            config_cpp.Conversion(b"-bin:TWO"),
+            config_cpp.Conversion(b"-bin:THREE")
+        ]
+
+    def test_collects_errors_without_stopping_other_conversions(self) -> None:
+        results = config_cpp.convert_many(
+            [b"one", b"fail", b"three"], config_cpp.Mode.TXT, self.executable, jobs=2)
+
+        assert results[0] == config_cpp.Conversion(b"-txt:ONE")
+        assert results[1].content is None
+        assert isinstance(results[1].error, subprocess.CalledProcessError)
+        assert results[1].error.stderr == b"conversion failed\n"
+        assert results[2] == config_cpp.Conversion(b"-txt:THREE")
+
+    def test_stages_files_in_staging_directory_and_removes_them(self) -> None:
+        with mock.patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            config_cpp.convert_many([b"one", b"fail"], config_cpp.Mode.BIN, self.executable)
+
+        for call in mock_run.call_args_list:
+            assert os.path.dirname(os.path.dirname(call.args[0][-1])) == self.stagedir
+
+        assert os.listdir(self.stagedir) == []
+
+    def test_returns_empty_list_when_there_are_no_items(self) -> None:
+        assert config_cpp.convert_many([], config_cpp.Mode.BIN, self.executable) == []
+
+    def test_converts_natively_when_using_native_converter(self) -> None:
+        results = config_cpp.convert_many(
+            [b"class CfgPatches {};", b"#include \"x.hpp\""], config_cpp.Mode.BIN,
+            config_cpp.NATIVE_CONVERTER)
+
+        assert results[0] == config_cpp.Conversion(
+            config_parser.cpp_to_bin(b"class CfgPatches {};"))
+        assert isinstance(results[1].error, config_parser.UnsupportedConfig)
+
+    def test_reuses_and_caches_conversions(self) -> None:
+        cache = conversion_cache.ConversionCache(os.path.join(self.tempdir.name, "cache"))
+
+        with mock.patch("dayz_dev_tools.conversion_cache.default_cache", return_value=cache):
+            config_cpp.convert_many([b"one"], config_cpp.Mode.BIN, self.executable)
+
+            with mock.patch("subprocess.run", wraps=subprocess.run) as mock_run:
+                results = config_cpp.convert_many(
+                    [b"one", b"two", b"fail"], config_cpp.Mode.BIN, self.executable)
+
+            assert config_cpp.convert_many(
+                [b"two"], config_cpp.Mode.BIN, self.executable
+            ) == [config_cpp.Conversion(b"-bin:TWO")]
+
+        assert results[:2] == [
+            config_cpp.Conversion(b"-bin:ONE"),
+            config_cpp.Conversion(b"-bin:TWO")
+        ]
+        assert mock_run.call_count == 2
@@ -0,0 +1,148 @@
+import unittest
+
+from dayz_dev_tools import config_bin
+from dayz_dev_tools import config_parser
+
+
+CONFIG_CPP = b"""\xef\xbb\xbf// A typical mod config
+class CfgPatches
+{
+    class MyMod
+    {
+        units[] = {};
+        weapons[]={};
+        requiredVersion = 0.1;
+        requiredAddons[] = {"DZ_Data", "DZ_Scripts"};
+    };
+};
+/* Mods are defined
+   in CfgMods */
+class CfgMods
+{
+    class MyMod
+    {
+        dir = "MyMod";
+        name = "My ""Quoted"" Mod";
+        type = mod;
+        hex = 0x10;
+        negative = -3;
+        exponent = 1e3;
+        dependencies[] += {"Game", "World"};
+        class defs
+        {
+            class gameScriptModule
+            {
+                files[] = {"MyMod/scripts/3_Game"};
+            };
+        };
+    };
+};
+class BaseItem;
+class MyItem: BaseItem
+{
+    position[] = {{1, 2.5}, {-3, .5}, unquoted};
+    delete Attachments;
+};
+"""
+
+
+class TestConfigParser(unittest.TestCase):
+    def test_parse_returns_config_tree(self) -> None:
+        config = config_parser.parse(CONFIG_CPP)
+
+        assert config == config_bin.Config([
+            config_bin.ConfigClass("CfgPatches", None, [
+                config_bin.ConfigClass("MyMod", None, [
+                    config_bin.ConfigProperty("units", []),
+                    config_bin.ConfigProperty("weapons", []),
+                    config_bin.ConfigProperty("requiredVersion", 0.1),
+                    config_bin.ConfigProperty("requiredAddons", ["DZ_Data", "DZ_Scripts"])
+                ])
+            ]),
+            config_bin.ConfigClass("CfgMods", None, [
+                config_bin.ConfigClass("MyMod", None, [
+                    config_bin.ConfigProperty("dir", "MyMod"),
+                    config_bin.ConfigProperty("name", "My \"Quoted\" Mod"),
+                    config_bin.ConfigProperty("type", "mod"),
+                    config_bin.ConfigProperty("hex", 16),
+                    config_bin.ConfigProperty("negative", -3),
+                    config_bin.ConfigProperty("exponent", 1000.0),
+                    config_bin.ConfigProperty("dependencies", ["Game", "World"], append=True),
+                    config_bin.ConfigClass("defs", None, [
+                        config_bin.ConfigClass("gameScriptModule", None, [
+                            config_bin.ConfigProperty("files", ["MyMod/scripts/3_Game"])
+                        ])
+                    ])
+                ])
+            ]),
+            config_bin.ConfigExtern("BaseItem"),
+            config_bin.ConfigClass("MyItem", "BaseItem", [
+                config_bin.ConfigProperty("position", [[1, 2.5], [-3, 0.5], "unquoted"]),
+                config_bin.ConfigDelete("Attachments")
+            ])
+        ])
+
+    def test_parse_reads_enums(self) -> None:
+        config = config_parser.parse(b"enum { First, Second = 5, Third };\nvalue = 1;")
+
+        assert config.enums == [("First", 0), ("Second", 5), ("Third", 6)]
+        assert config.entries == [config_bin.ConfigProperty("value", 1)]
+
+    def test_parse_raises_unsupported_config_for_preprocessor_directives(self) -> None:
+        with self.assertRaisesRegex(
+            config_parser.UnsupportedConfig,
+            r"^Preprocessor directive at line 2 is not supported$"
+        ):
+            config_parser.parse(b"class CfgPatches {};\n#include \"other.hpp\"\n")
+
+    def test_parse_raises_on_syntax_errors(self) -> None:
+        with self.assertRaisesRegex(Exception, r"^Invalid config.cpp at line 4: expected `;`$"):
+            config_parser.parse(b"class CfgPatches\n{\n}\nclass CfgMods {};\n")
+
+        with self.assertRaisesRegex(Exception, r"^Invalid config.cpp at line 1: expected `}`$"):
+            config_parser.parse(b"class CfgPatches { value = 1;")
+
+        with self.assertRaisesRegex(Exception, r"^Invalid config.cpp at line 1: expected `{`$"):
+            config_parser.parse(b"class Foo: Bar;")
+
+    def test_parse_raises_on_numbers_that_cannot_be_binarized(self) -> None:
+        assert config_parser.parse(b"a = 9223372036854775807;\nb = -9223372036854775808;") == \
+            config_bin.Config([
+                config_bin.ConfigProperty("a", 2 ** 63 - 1),
+                config_bin.ConfigProperty("b", -2 ** 63)
+            ])
+
+        with self.assertRaisesRegex(
+            Exception, r"^Invalid config.cpp at line 2: number out of range `99999999999999999999`$"
+        ):
+            config_parser.parse(b"class A {\nx = 99999999999999999999;\n};")
+
+        with self.assertRaisesRegex(
+            Exception, r"^Invalid config.cpp at line 1: number out of range `1e999`$"
+        ):
+            config_parser.parse(b"x[] = {1, 1e999};")
+
+        with self.assertRaisesRegex(
+            Exception, r"^Invalid config.cpp at line 1: number out of range `1e39`$"
+        ):
+            config_parser.parse(b"x = 1e39;")
+
+        with self.assertRaisesRegex(
+            Exception, r"^Invalid config.cpp at line 1: enum value out of range `2147483648`$"
+        ):
+            config_parser.parse(b"enum { A = 0x80000000 };")
+
+    def test_parse_keeps_strings_that_are_not_utf8(self) -> None:
+        config = config_parser.parse(b"name = \"caf\xe9\";")
+
+        assert config_bin.read(config_bin.write(config)) == config
+        assert config_bin.format_cpp(config) == b"name = \"caf\xe9\";\r\n"
+
+    def test_cpp_to_bin_round_trips_through_native_reader(self) -> None:
+        config = config_parser.parse(CONFIG_CPP)
+        bin_content = config_parser.cpp_to_bin(CONFIG_CPP)
+
+        assert bin_content.startswith(config_bin.SIGNATURE)
+        assert config_bin.read(bin_content) == config
+        assert config_parser.parse(config_bin.bin_to_cpp(bin_content)) == config
+        assert config_parser.cpp_to_bin(config_bin.bin_to_cpp(bin_content)) == bin_content
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import content_store
+
+
+class TestContentKey(unittest.TestCase):
+    def test_returns_hash_of_data_and_size(self) -> None:
+        assert content_store.content_key(b"data", 4) == \
+            "a17c9aaa61e80a1bf71d0d850af4e5baa9800bbd-4"
+
+    def test_returns_different_keys_for_different_sizes(self) -> None:
+        assert content_store.content_key(b"data", 4) != content_store.content_key(b"data", 10)
+
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.store = content_store.ContentStore(os.path.join(self.tempdir.name, "store"))
+
+    def write_file(self, name: str, contents: bytes) -> str:
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, "wb") as out_file:
+            out_file.write(contents)
+        return path
+
+    def read_file(self, path: str) -> bytes:
+        with open(path, "rb") as in_file:
+            return in_file.read()
+
+    def test_creates_store_directory(self) -> None:
+        assert os.path.isdir(os.path.join(self.tempdir.name, "store"))
+
+    def test_path_returns_location_of_contents_in_store(self) -> None:
+        assert self.store.path("abcdef-1") == \
+            os.path.join(self.tempdir.name, "store", "ab", "cdef-1")
+
+    def test_link_returns_false_when_contents_are_not_stored(self) -> None:
+        assert self.store.link("abcdef-1", os.path.join(self.tempdir.name, "output")) is False
+
+        assert not os.path.exists(os.path.join(self.tempdir.name, "output"))
+
+    def test_link_hard_links_stored_contents(self) -> None:
+        self.store.add("abcdef-8", self.write_file("original", b"contents"))
+        output = os.path.join(self.tempdir.name, "output")
+
+        assert self.store.link("abcdef-8", output) is True
+
+        assert self.read_file(output) == b"contents"
+        assert os.path.samefile(output, self.store.path("abcdef-8"))
+
+    def test_link_replaces_existing_file(self) -> None:
+        self.store.add("abcdef-8", self.write_file("original", b"contents"))
+        output = self.write_file("output", b"old")
+
+        assert self.store.link("abcdef-8", output) is True
+
+        assert self.read_file(output) == b"contents"
+
+    def test_link_copies_stored_contents_when_hard_link_fails(self) -> None:
+        self.store.add("abcdef-8", self.write_file("original", b"contents"))
+        output = os.path.join(self.tempdir.name, "output")
+
+        with mock.patch("os.link", side_effect=OSError("cross-device link")):
+            assert self.store.link("abcdef-8", output) is True
+
+        assert self.read_file(output) == b"contents"
+        assert not os.path.samefile(output, self.store.path("abcdef-8"))
+
+    def test_add_hard_links_file_into_store(self) -> None:
+        original = self.write_file("original", b"contents")
+
+        self.store.add("abcdef-8", original)
+
+        assert os.path.samefile(original, self.store.path("abcdef-8"))
+
+    def test_add_keeps_existing_contents(self) -> None:
+        self.store.add("abcdef-8", self.write_file("first", b"contents"))
+
+        self.store.add("abcdef-8", self.write_file("second", b"contents"))
+
+        assert os.path.samefile(
+            os.path.join(self.tempdir.name, "first"), self.store.path("abcdef-8"))
+
+    def test_add_copies_file_into_store_when_hard_link_fails(self) -> None:
+        original = self.write_file("original", b"contents")
+
+        with mock.patch("os.link", side_effect=OSError("cross-device link")):
+            self.store.add("abcdef-8", original)
+
+        assert self.read_file(self.store.path("abcdef-8")) == b"contents"
+        assert not os.path.samefile(original, self.store.path("abcdef-8"))
+        assert os.listdir(os.path.dirname(self.store.path("abcdef-8"))) == ["cdef-8"]
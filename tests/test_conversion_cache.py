@@ -0,0 +1,195 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import conversion_cache
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_returns_sha256_hash_of_mode_converter_and_content(self) -> None:
+        key = conversion_cache.cache_key(b"content", "-bin", "converter")
+
+        assert len(key) == 64
+        assert key == conversion_cache.cache_key(b"content", "-bin", "converter")
+
+    def test_returns_different_keys_for_different_content(self) -> None:
+        assert conversion_cache.cache_key(b"content", "-bin", "converter") != \
+            conversion_cache.cache_key(b"other", "-bin", "converter")
+
+    def test_returns_different_keys_for_different_modes(self) -> None:
+        assert conversion_cache.cache_key(b"content", "-bin", "converter") != \
+            conversion_cache.cache_key(b"content", "-txt", "converter")
+
+    def test_returns_different_keys_for_different_converters(self) -> None:
+        assert conversion_cache.cache_key(b"content", "-bin", "converter") != \
+            conversion_cache.cache_key(b"content", "-bin", "other")
+
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.cache = conversion_cache.ConversionCache(
+            os.path.join(self.tempdir.name, "cache"), max_size=10)
+
+    def set_mtime(self, key: str, mtime: int) -> None:
+        os.utime(self.cache.path(key), (mtime, mtime))
+
+    def test_creates_cache_directory(self) -> None:
+        assert os.path.isdir(os.path.join(self.tempdir.name, "cache"))
+
+    def test_path_returns_location_of_content_in_cache(self) -> None:
+        assert self.cache.path("abcdef") == \
+            os.path.join(self.tempdir.name, "cache", "ab", "cdef")
+
+    def test_get_returns_none_when_content_is_not_cached(self) -> None:
+        assert self.cache.get("abcdef") is None
+
+    def test_get_returns_content_added_by_put(self) -> None:
+        self.cache.put("abcdef", b"converted")
+
+        assert self.cache.get("abcdef") == b"converted"
+
+    def test_put_replaces_existing_content(self) -> None:
+        self.cache.put("abcdef", b"old")
+        self.cache.put("abcdef", b"new")
+
+        assert self.cache.get("abcdef") == b"new"
+        assert os.listdir(os.path.dirname(self.cache.path("abcdef"))) == ["cdef"]
+
+    def test_put_removes_least_recently_used_content_when_cache_is_too_large(self) -> None:
+        self.cache.put("aa0001", b"1234")
+        self.set_mtime("aa0001", 1000)
+        self.cache.put("bb0002", b"1234")
+        self.set_mtime("bb0002", 2000)
+
+        self.cache.put("cc0003", b"1234")
+
+        assert self.cache.get("aa0001") is None
+        assert self.cache.get("bb0002") == b"1234"
+        assert self.cache.get("cc0003") == b"1234"
+
+    def test_get_marks_content_as_recently_used(self) -> None:
+        self.cache.put("aa0001", b"1234")
+        self.set_mtime("aa0001", 1000)
+        self.cache.put("bb0002", b"1234")
+        self.set_mtime("bb0002", 2000)
+
+        assert self.cache.get("aa0001") == b"1234"
+
+        self.cache.put("cc0003", b"1234")
+
+        assert self.cache.get("aa0001") == b"1234"
+        assert self.cache.get("bb0002") is None
+
+    def test_put_removes_content_larger_than_maximum_size(self) -> None:
+        self.cache.put("aa0001", b"12345678901")
+
+        assert self.cache.get("aa0001") is None
+
+    def test_put_removes_content_until_cache_is_no_larger_than_90_percent_of_maximum(
+        self
+    ) -> None:
+        cache = conversion_cache.ConversionCache(
+            os.path.join(self.tempdir.name, "cache"), max_size=100)
+
+        for index, mtime in enumerate([1000, 2000, 3000, 4000]):
+            cache.put(f"aa000{index}", b"x" * 25)
+            os.utime(cache.path(f"aa000{index}"), (mtime, mtime))
+
+        cache.put("bb0004", b"x" * 25)
+
+        assert cache.get("aa0000") is None
+        assert cache.get("aa0001") is None
+        assert cache.get("aa0002") is not None
+        assert cache.get("aa0003") is not None
+        assert cache.get("bb0004") is not None
+
+    def test_put_scans_cache_only_when_it_grows_too_large(self) -> None:
+        cache = conversion_cache.ConversionCache(
+            os.path.join(self.tempdir.name, "cache"), max_size=100)
+
+        with mock.patch.object(cache, "evict", wraps=cache.evict) as mock_evict:
+            for index in range(10):
+                cache.put(f"aa000{index}", b"x" * 10)
+
+            assert mock_evict.call_count == 1
+
+            cache.put("bb0000", b"x" * 10)
+
+            assert mock_evict.call_count == 2
+
+    def test_put_counts_size_of_replaced_content(self) -> None:
+        cache = conversion_cache.ConversionCache(
+            os.path.join(self.tempdir.name, "cache"), max_size=100)
+
+        with mock.patch.object(cache, "evict", wraps=cache.evict) as mock_evict:
+            for _ in range(20):
+                cache.put("aa0000", b"x" * 10)
+
+            assert mock_evict.call_count == 1
+
+    def test_put_logs_warning_when_content_cannot_be_written(self) -> None:
+        with mock.patch("tempfile.mkstemp", side_effect=PermissionError("denied")), \
+                self.assertLogs(level="WARNING") as logs:
+            self.cache.put("abcdef", b"converted")
+
+        assert self.cache.get("abcdef") is None
+        assert logs.output == [
+            f"WARNING:root:Unable to cache conversion `{self.cache.path('abcdef')}`: denied"
+        ]
+
+
+class TestDefaultDirectory(unittest.TestCase):
+    def test_returns_directory_from_environment_variable(self) -> None:
+        with mock.patch.dict(os.environ, {conversion_cache.CACHE_ENV_VAR: "/path/to/cache"}):
+            assert conversion_cache.default_directory() == "/path/to/cache"
+
+    def test_returns_none_when_environment_variable_is_empty(self) -> None:
+        with mock.patch.dict(os.environ, {conversion_cache.CACHE_ENV_VAR: ""}):
+            assert conversion_cache.default_directory() is None
+
+    def test_returns_directory_in_localappdata_on_windows(self) -> None:
+        with mock.patch.dict(os.environ, {"LOCALAPPDATA": "C:\\Users\\me\\AppData\\Local"}), \
+                mock.patch("sys.platform", "win32"):
+            del os.environ[conversion_cache.CACHE_ENV_VAR]
+
+            assert conversion_cache.default_directory() == os.path.join(
+                "C:\\Users\\me\\AppData\\Local", "dayz-dev-tools", "conversions")
+
+    def test_returns_directory_in_xdg_cache_home_elsewhere(self) -> None:
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": "/home/me/.xdg-cache"}), \
+                mock.patch("sys.platform", "linux"):
+            del os.environ[conversion_cache.CACHE_ENV_VAR]
+
+            assert conversion_cache.default_directory() == os.path.join(
+                "/home/me/.xdg-cache", "dayz-dev-tools", "conversions")
+
+    def test_returns_directory_in_home_cache_directory_by_default(self) -> None:
+        with mock.patch.dict(os.environ, {"HOME": "/home/me"}), \
+                mock.patch("sys.platform", "linux"):
+            del os.environ[conversion_cache.CACHE_ENV_VAR]
+            os.environ.pop("XDG_CACHE_HOME", None)
+
+            assert conversion_cache.default_directory() == os.path.join(
+                "/home/me", ".cache", "dayz-dev-tools", "conversions")
+
+
+class TestDefaultCache(unittest.TestCase):
+    def test_returns_none_when_conversions_are_not_cached(self) -> None:
+        with mock.patch.dict(os.environ, {conversion_cache.CACHE_ENV_VAR: ""}):
+            assert conversion_cache.default_cache() is None
+
+    def test_returns_cache_in_default_directory(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir, \
+                mock.patch.dict(os.environ, {conversion_cache.CACHE_ENV_VAR: tempdir}):
+            cache = conversion_cache.default_cache()
+
+            assert cache is not None
+            assert cache.directory == tempdir
+            assert cache.max_size == conversion_cache.DEFAULT_MAX_SIZE
+            assert conversion_cache.default_cache() is cache
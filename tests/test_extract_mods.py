@@ -0,0 +1,172 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import extract_mods
+from dayz_dev_tools import extract_pbo
+from tests import helpers
+
+
+def write_pbo(path: str, prefix: bytes, files: dict[bytes, bytes]) -> None:
+    with open(path, "wb") as pbo:
+        pbo.write(b"\0sreV" + b"\0" * 16 + b"prefix\0" + prefix + b"\0\0")
+
+        for filename, contents in files.items():
+            pbo.write(
+                filename + b"\0" + struct.pack("<4sIIII", b"\0\0\0\0", 0, 0, 0, len(contents)))
+
+        pbo.write(b"\0" * 21)
+
+        for contents in files.values():
+            pbo.write(contents)
+
+
+class TestExtractMods(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.indir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.indir.cleanup)
+
+        self.outdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.outdir.cleanup)
+
+    def create_mod(self, name: str, pbos: dict[str, tuple[bytes, dict[bytes, bytes]]]) -> str:
+        addons = os.path.join(self.indir.name, name, "Addons")
+        os.makedirs(addons)
+
+        for pbo_name, (prefix, files) in pbos.items():
+            write_pbo(os.path.join(addons, pbo_name), prefix, files)
+
+        return os.path.join(self.indir.name, name)
+
+    def read_output(self, *parts: str) -> bytes:
+        with open(os.path.join(self.outdir.name, *parts), "rb") as output:
+            return output.read()
+
+    def test_find_pbos_returns_pbos_in_mod_directory(self) -> None:
+        mod = self.create_mod("@mod", {"b.pbo": (b"b", {}), "a.PBO": (b"a", {})})
+        with open(os.path.join(mod, "Addons", "a.pbo.bisign"), "wb"):
+            pass
+
+        assert extract_mods.find_pbos(mod) == [
+            os.path.join(mod, "Addons", "a.PBO"),
+            os.path.join(mod, "Addons", "b.pbo")
+        ]
+
+    def test_find_pbos_returns_pbos_in_all_mods_in_directory(self) -> None:
+        mod1 = self.create_mod("@mod1", {"one.pbo": (b"one", {})})
+        mod2 = self.create_mod("@mod2", {"two.pbo": (b"two", {})})
+        os.makedirs(os.path.join(self.indir.name, "not-a-mod"))
+
+        assert extract_mods.find_pbos(self.indir.name) == [
+            os.path.join(mod1, "Addons", "one.pbo"),
+            os.path.join(mod2, "Addons", "two.pbo")
+        ]
+
+    def test_extracts_all_pbos_by_prefix(self) -> None:
+        mod1 = self.create_mod("@mod1", {
+            "one.pbo": (b"mod1\\one", {b"config.cpp": b"one config", b"data\\a.paa": b"AAAA"}),
+            "two.pbo": (b"mod1\\two", {b"config.cpp": b"two config"})
+        })
+        mod2 = self.create_mod("@mod2", {
+            "three.pbo": (b"mod2", {b"scripts\\3_game\\x.c": b"class X {}"})
+        })
+
+        statistics = extract_mods.extract_mods(
+            [mod1, mod2], self.outdir.name, verbose=False, deobfuscate=False, cfgconvert=None,
+            jobs=2)
+
+        assert statistics == extract_pbo.ExtractionStatistics(extracted=4, bytes_written=34)
+
+        assert self.read_output("mod1", "one", "config.cpp") == b"one config"
+        assert self.read_output("mod1", "one", "data", "a.paa") == b"AAAA"
+        assert self.read_output("mod1", "two", "config.cpp") == b"two config"
+        assert self.read_output("mod2", "scripts", "3_game", "x.c") == b"class X {}"
+
+    def test_extracts_only_matching_files(self) -> None:
+        mod = self.create_mod("@mod", {
+            "one.pbo": (b"one", {b"config.cpp": b"config", b"data\\a.paa": b"AAAA"})
+        })
+
+        extract_mods.extract_mods(
+            [mod], self.outdir.name, verbose=False, deobfuscate=False, cfgconvert=None,
+            matcher=mock.Mock(filter=lambda files: files[1:]))
+
+        assert not os.path.exists(os.path.join(self.outdir.name, "one", "config.cpp"))
+        assert self.read_output("one", "data", "a.paa") == b"AAAA"
+
+    def test_raises_after_extracting_remaining_pbos_when_a_pbo_fails(self) -> None:
+        mod = self.create_mod("@mod", {
+            "good.pbo": (b"good", {b"config.cpp": b"config"})
+        })
+        with open(os.path.join(mod, "Addons", "bad.pbo"), "wb") as bad:
+            bad.write(b"bad\0\0\0\0\0\0\0\0\0\0\0\0\0\0\0\0\0\xff\xff\0\0\0\0")
+
+        with self.assertRaisesRegex(Exception, r"^Failed to extract 1 of 2 PBO archives$"):
+            extract_mods.extract_mods(
+                [mod], self.outdir.name, verbose=False, deobfuscate=False, cfgconvert=None)
+
+        assert self.read_output("good", "config.cpp") == b"config"
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        extract_mods_patcher = mock.patch("dayz_dev_tools.extract_mods.extract_mods")
+        self.mock_extract_mods = extract_mods_patcher.start()
+        self.addCleanup(extract_mods_patcher.stop)
+
+        tools_directory_patcher = mock.patch("dayz_dev_tools.tools_directory.tools_directory")
+        self.mock_tools_directory = tools_directory_patcher.start()
+        self.mock_tools_directory.return_value = "TOOLS"
+        self.addCleanup(tools_directory_patcher.stop)
+
+        self.main = helpers.call_main(extract_mods)
+
+    def test_extracts_mods_into_current_directory_by_default(self) -> None:
+        self.main(["extract-mods", "@mod1", "!Workshop"])
+
+        self.mock_extract_mods.assert_called_once_with(
+            ["@mod1", "!Workshop"], ".", verbose=False, deobfuscate=False,
+            cfgconvert=os.path.join("TOOLS", "bin", "CfgConvert", "CfgConvert.exe"),
+            matcher=None, jobs=None, store=None, journal=None,
+            max_memory=None)
+
+    def test_converts_configs_natively_when_tools_directory_is_not_found(self) -> None:
+        self.mock_tools_directory.return_value = None
+
+        self.main(["extract-mods", "@mod"])
+
+        self.mock_extract_mods.assert_called_once_with(
+            ["@mod"], ".", verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER, matcher=None, jobs=None, store=None,
+            journal=None, max_memory=None)
+
+    def test_accepts_options(self) -> None:
+        with mock.patch("dayz_dev_tools.file_matcher.create") as mock_create:
+            self.main([
+                "extract-mods", "-o", "P:\\", "-j", "4", "-b", "-d", "-v", "-m", "*.c",
+                "-x", "*.paa", "--match-regex", "a", "--exclude-regex", "b", "--max-memory", "1G",
+                "@mod"
+            ])
+
+        mock_create.assert_called_once_with(
+            include=["*.c"], exclude=["*.paa"], include_regex=["a"], exclude_regex=["b"])
+
+        self.mock_extract_mods.assert_called_once_with(
+            ["@mod"], "P:\\", verbose=True, deobfuscate=True, cfgconvert=None,
+            matcher=mock_create.return_value, jobs=4, store=None,
+            journal=None, max_memory=1024 * 1024 * 1024)
+
+    def test_exits_with_error_when_extraction_fails(self) -> None:
+        self.mock_extract_mods.side_effect = Exception("failed")
+
+        with self.assertRaises(SystemExit) as error:
+            self.main(["extract-mods", "@mod"])
+
+        assert error.exception.code == 1
@@ -1,10 +1,19 @@
+import io
 import os
+import tempfile
 import typing
 import unittest
 from unittest import mock
+import zipfile
 
+from dayz_dev_tools import config_cpp
+from dayz_dev_tools import content_store
 from dayz_dev_tools import extract_pbo
+from dayz_dev_tools import extraction_journal
+from dayz_dev_tools import extraction_sink
+from dayz_dev_tools import memory_budget
 from dayz_dev_tools import pbo_file
+from dayz_dev_tools import pbo_file_reader
 
 
 class TestExtractPbo(unittest.TestCase):
@@ -579,3 +588,424 @@ class TestExtractPbo(unittest.TestCase):
         mock_print.assert_called_once_with(
             f"Converting {os.path.join('dir1', 'config.bin')}"
             f" -> {os.path.join('dir1', 'config.cpp')}")
+
+    def test_writes_files_to_output_directory_when_specified(self) -> None:
+        mock_open = mock.mock_open()
+        self.mock_pboreader.files.return_value = [
+            self.create_mock_file(None, b"dir1\\filename.ext", b"1111"),
+            self.create_mock_file(None, b"filename.ext", b"2222")
+        ]
+
+        with mock.patch("builtins.open", mock_open):
+            extract_pbo.extract_pbo(
+                self.mock_pboreader, [], verbose=False, deobfuscate=False, cfgconvert=None,
+                output_directory="OUTPUT")
+
+        self.mock_makedirs.assert_called_once_with(
+            os.path.join(b"OUTPUT", b"dir1"), exist_ok=True)
+
+        assert mock_open.call_count == 2
+        mock_open.assert_has_calls([
+            mock.call(os.path.join("OUTPUT", "dir1", "filename.ext"), "w+b"),
+            mock.call(os.path.join("OUTPUT", "filename.ext"), "w+b")
+        ], any_order=True)
+
+    def test_writes_files_to_sink_when_specified(self) -> None:
+        self.mock_bin_to_cpp.return_value = b"CPP-CONTENT"
+        self.mock_pboreader.files.return_value = [
+            self.create_mock_file(None, b"dir1\\filename.ext", b"1111"),
+            self.create_mock_file(None, b"dir1\\config.bin", b"2222")
+        ]
+        output = io.BytesIO()
+
+        with extraction_sink.ZipSink(output) as sink:
+            extract_pbo.extract_pbo(
+                self.mock_pboreader, [], verbose=False, deobfuscate=False,
+                cfgconvert="cppconvert.exe", sink=sink)
+
+        self.mock_makedirs.assert_not_called()
+
+        with zipfile.ZipFile(output) as archive:
+            assert archive.namelist() == ["dir1/filename.ext", "dir1/config.cpp"]
+            assert archive.read("dir1/filename.ext") == b"1111"
+            assert archive.read("dir1/config.cpp") == b"CPP-CONTENT"
+
+    def test_returns_extraction_statistics(self) -> None:
+        self.mock_bin_to_cpp.return_value = b"CPP-CONTENT"
+        self.mock_pboreader.files.return_value = [
+            self.create_mock_file(None, b"dir1\\config.bin", b"1111"),
+            self.create_mock_file(None, b"dir\\obfus\xcccated.c", b"contents1"),
+            self.create_mock_file(None, b"*.*", b"")
+        ]
+
+        with mock.patch("builtins.open", mock.mock_open()):
+            statistics = extract_pbo.extract_pbo(
+                self.mock_pboreader, [], verbose=False, deobfuscate=True,
+                cfgconvert="cppconvert.exe")
+
+        assert statistics == extract_pbo.ExtractionStatistics(
+            extracted=2, skipped=1, converted=1, renamed=1, bytes_written=20)
+
+
+class TestExtractionSession(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        makedirs_patcher = mock.patch("os.makedirs")
+        self.mock_makedirs = makedirs_patcher.start()
+        self.addCleanup(makedirs_patcher.stop)
+
+    def create_mock_reader(self, files: list[pbo_file.PBOFile]) -> mock.Mock:
+        mock_pboreader = mock.Mock()
+        mock_pboreader.prefix.return_value = None
+        mock_pboreader.files.return_value = files
+        return mock_pboreader
+
+    def create_mock_file(self, filename: bytes, contents: bytes) -> pbo_file.PBOFile:
+        def unpack(dest: typing.BinaryIO) -> None:
+            dest.write(contents)
+
+        mock_file = pbo_file.PBOFile(None, filename, b"", 0, 0, 0, 0)
+        mock.patch.object(mock_file, "unpack", side_effect=unpack).start()
+
+        return mock_file
+
+    def test_sessions_number_deobfuscated_files_independently(self) -> None:
+        mock_open = mock.mock_open()
+        session1 = extract_pbo.ExtractionSession(
+            self.create_mock_reader([
+                self.create_mock_file(b"dir\\obfus\xcccated.c", b"contents1"),
+                self.create_mock_file(b"dir\\trashy?file.c", b"contents2")
+            ]),
+            verbose=False, deobfuscate=True, cfgconvert=None, output_directory="OUTPUT1")
+        session2 = extract_pbo.ExtractionSession(
+            self.create_mock_reader([
+                self.create_mock_file(b"dir\\gar\tbage.c", b"contents3")
+            ]),
+            verbose=False, deobfuscate=True, cfgconvert=None, output_directory="OUTPUT2")
+
+        with mock.patch("builtins.open", mock_open):
+            session1.extract([])
+            session2.extract([])
+
+        assert mock_open.call_args_list == [
+            mock.call(os.path.join("OUTPUT1", "dir", "deobfs00000.c"), "w+b"),
+            mock.call(os.path.join("OUTPUT1", "dir", "deobfs00001.c"), "w+b"),
+            mock.call(os.path.join("OUTPUT2", "dir", "deobfs00000.c"), "w+b")
+        ]
+
+        assert session1.deobfs_count == 2
+        assert session2.deobfs_count == 1
+
+    def test_collects_statistics_across_calls_to_extract(self) -> None:
+        files = [
+            self.create_mock_file(b"file1", b"1111"),
+            self.create_mock_file(b"file2", b"2222")
+        ]
+        reader = self.create_mock_reader(files)
+        reader.file.side_effect = files
+
+        session = extract_pbo.ExtractionSession(
+            reader, verbose=False, deobfuscate=True, cfgconvert=None)
+
+        with mock.patch("builtins.open", mock.mock_open()):
+            session.extract(["file1"])
+            session.extract(["file2"])
+
+        assert session.statistics.extracted == 2
+        assert session.statistics.bytes_written == 8
+
+    def test_raises_if_store_is_used_without_directory_sink(self) -> None:
+        with self.assertRaisesRegex(
+                Exception, r"^A content store can only be used when extracting to a directory$"):
+            extract_pbo.ExtractionSession(
+                self.create_mock_reader([]), verbose=False, deobfuscate=False, cfgconvert=None,
+                sink=extraction_sink.ZipSink(io.BytesIO()), store=mock.Mock())
+
+
+class TestExtractWithMemoryBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def create_file(self, filename: bytes, data: bytes, original_size: int = 0) -> pbo_file.PBOFile:
+        pbofile = pbo_file.PBOFile(None, filename, b"", original_size, 0, 0, len(data))
+        pbofile.content_reader = pbo_file_reader.PBOFileReader(io.BytesIO(data), 0, len(data))
+        return pbofile
+
+    def test_copies_uncompressed_files_in_chunks_within_budget(self) -> None:
+        mock_pboreader = mock.Mock()
+        mock_pboreader.prefix.return_value = None
+        mock_pboreader.files.return_value = [
+            self.create_file(b"large.ext", b"0123456789"),
+            self.create_file(b"compressed.ext", b"\xffABCDEFGH\x24\x02\0\0", 8)
+        ]
+        budget = memory_budget.MemoryBudget(4)
+        reservations: list[int] = []
+        acquire = budget.acquire
+
+        def record_acquire(size: int) -> None:
+            reservations.append(size)
+            acquire(size)
+
+        with mock.patch.object(budget, "acquire", side_effect=record_acquire):
+            session = extract_pbo.ExtractionSession(
+                mock_pboreader, verbose=False, deobfuscate=False, cfgconvert=None,
+                output_directory=self.tempdir.name, budget=budget)
+            session.extract([])
+
+        assert reservations == [4, 21]
+        assert budget.in_use == 0
+
+        with open(os.path.join(self.tempdir.name, "large.ext"), "rb") as in_file:
+            assert in_file.read() == b"0123456789"
+        with open(os.path.join(self.tempdir.name, "compressed.ext"), "rb") as in_file:
+            assert in_file.read() == b"ABCDEFGH"
+
+
+class TestExtractUnconvertibleConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def extract(self, data: bytes, original_size: int) -> extract_pbo.ExtractionStatistics:
+        pbofile = pbo_file.PBOFile(None, b"config.bin", b"", original_size, 0, 0, len(data))
+        pbofile.content_reader = pbo_file_reader.PBOFileReader(io.BytesIO(data), 0, len(data))
+
+        mock_pboreader = mock.Mock()
+        mock_pboreader.prefix.return_value = None
+        mock_pboreader.files.return_value = [pbofile]
+
+        with mock.patch("builtins.print"):
+            return extract_pbo.extract_pbo(
+                mock_pboreader, [], verbose=False, deobfuscate=False,
+                cfgconvert=config_cpp.NATIVE_CONVERTER, output_directory=self.tempdir.name)
+
+    def read_config_bin(self) -> bytes:
+        with open(os.path.join(self.tempdir.name, "config.bin"), "rb") as in_file:
+            return in_file.read()
+
+    def test_extracts_config_bin_that_fails_to_convert(self) -> None:
+        statistics = self.extract(b"NOT-A-CONFIG", 0)
+
+        assert self.read_config_bin() == b"NOT-A-CONFIG"
+        assert statistics == extract_pbo.ExtractionStatistics(extracted=1, bytes_written=12)
+
+    def test_extracts_compressed_config_bin_that_fails_to_convert(self) -> None:
+        statistics = self.extract(b"\xffABCDEFGH\x24\x02\0\0", 8)
+
+        assert self.read_config_bin() == b"ABCDEFGH"
+        assert statistics == extract_pbo.ExtractionStatistics(extracted=1, bytes_written=8)
+
+
+class TestExtractWithContentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.store = content_store.ContentStore(os.path.join(self.tempdir.name, "store"))
+
+    def create_reader(self, files: dict[bytes, bytes]) -> mock.Mock:
+        pbofiles = []
+        for filename, data in files.items():
+            pbofile = pbo_file.PBOFile(None, filename, b"", 0, 0, 0, len(data))
+            pbofile.content_reader = pbo_file_reader.PBOFileReader(io.BytesIO(data), 0, len(data))
+            pbofiles.append(pbofile)
+
+        mock_pboreader = mock.Mock()
+        mock_pboreader.prefix.return_value = None
+        mock_pboreader.files.return_value = pbofiles
+        return mock_pboreader
+
+    def extract(self, output: str, files: dict[bytes, bytes]) -> extract_pbo.ExtractionStatistics:
+        os.makedirs(os.path.join(self.tempdir.name, output), exist_ok=True)
+
+        return extract_pbo.extract_pbo(
+            self.create_reader(files), [], verbose=False, deobfuscate=False, cfgconvert=None,
+            output_directory=os.path.join(self.tempdir.name, output), store=self.store)
+
+    def test_writes_new_contents_and_adds_them_to_store(self) -> None:
+        statistics = self.extract("out1", {b"dir\\file1": b"1111", b"file2": b"22"})
+
+        assert statistics == extract_pbo.ExtractionStatistics(extracted=2, bytes_written=6)
+
+        path = os.path.join(self.tempdir.name, "out1", "dir", "file1")
+        with open(path, "rb") as in_file:
+            assert in_file.read() == b"1111"
+        assert os.path.samefile(
+            path, self.store.path(content_store.content_key(b"1111", 4)))
+
+    def test_links_previously_extracted_contents(self) -> None:
+        self.extract("out1", {b"file1": b"1111", b"file2": b"22"})
+
+        statistics = self.extract("out2", {b"file1": b"1111", b"file3": b"333"})
+
+        assert statistics == extract_pbo.ExtractionStatistics(
+            extracted=2, bytes_written=3, linked=1)
+        assert os.path.samefile(
+            os.path.join(self.tempdir.name, "out1", "file1"),
+            os.path.join(self.tempdir.name, "out2", "file1"))
+
+    def test_does_not_overwrite_stored_contents_when_replacing_linked_file(self) -> None:
+        self.extract("out1", {b"file1": b"1111"})
+
+        self.extract("out1", {b"file1": b"2222"})
+
+        with open(self.store.path(content_store.content_key(b"1111", 4)), "rb") as in_file:
+            assert in_file.read() == b"1111"
+        with open(os.path.join(self.tempdir.name, "out1", "file1"), "rb") as in_file:
+            assert in_file.read() == b"2222"
+
+
+class TestExtractWithJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.journal = extraction_journal.ExtractionJournal(
+            os.path.join(self.tempdir.name, "journal"))
+        self.addCleanup(self.journal.close)
+
+    def create_reader(self, files: dict[bytes, bytes]) -> mock.Mock:
+        pbofiles = []
+        for filename, data in files.items():
+            pbofile = pbo_file.PBOFile(None, filename, b"", 0, 0, 0, len(data))
+            pbofile.content_reader = pbo_file_reader.PBOFileReader(io.BytesIO(data), 0, len(data))
+            pbofiles.append(pbofile)
+
+        mock_pboreader = mock.Mock()
+        mock_pboreader.prefix.return_value = None
+        mock_pboreader.files.return_value = pbofiles
+        return mock_pboreader
+
+    def test_records_extracted_files_and_skips_them_when_resumed(self) -> None:
+        reader = self.create_reader({b"file1": b"1111", b"file2": b"22"})
+        file1, file2 = reader.files.return_value
+
+        extract_pbo.extract_pbo(
+            self.create_reader({b"file1": b"1111"}), [], verbose=False, deobfuscate=False,
+            cfgconvert=None, output_directory=self.tempdir.name, journal=self.journal)
+
+        with mock.patch.object(file1, "unpack") as mock_unpack:
+            statistics = extract_pbo.extract_pbo(
+                reader, [], verbose=False, deobfuscate=False, cfgconvert=None,
+                output_directory=self.tempdir.name, journal=self.journal)
+
+        mock_unpack.assert_not_called()
+
+        assert statistics == extract_pbo.ExtractionStatistics(
+            extracted=1, bytes_written=2, resumed=1)
+        assert self.journal.completed(file2)
+
+    def test_numbers_deobfuscated_files_consistently_when_resumed(self) -> None:
+        reader = self.create_reader({b"obfs?1.c": b"1111", b"obfs?2.c": b"2222"})
+        self.journal.record(reader.files.return_value[0])
+
+        extract_pbo.extract_pbo(
+            reader, [], verbose=False, deobfuscate=True, cfgconvert=None,
+            output_directory=self.tempdir.name, journal=self.journal)
+
+        assert sorted(os.listdir(self.tempdir.name)) == ["deobfs00001.c", "journal"]
+
+    def test_skips_include_targets_of_previously_extracted_files_when_resumed(self) -> None:
+        reader = self.create_reader({
+            b"scripts\\obfs?1.c": b'#include "scripts\\target.c"',
+            b"scripts\\target.c": b"TARGET",
+            b"scripts\\obfs?2.c": b"2222"
+        })
+        files = {pbofile.filename: pbofile for pbofile in reader.files.return_value}
+        reader.file.side_effect = files.get
+        self.journal.record(files[b"scripts\\obfs?1.c"])
+
+        statistics = extract_pbo.extract_pbo(
+            reader, [], verbose=False, deobfuscate=True, cfgconvert=None,
+            output_directory=self.tempdir.name, journal=self.journal)
+
+        assert os.listdir(os.path.join(self.tempdir.name, "scripts")) == ["deobfs00001.c"]
+        assert statistics == extract_pbo.ExtractionStatistics(
+            extracted=1, renamed=1, skipped=1, bytes_written=4, resumed=1)
+
+    def test_raises_if_journal_is_used_without_directory_sink(self) -> None:
+        with self.assertRaisesRegex(
+                Exception, r"^A journal can only be used when extracting to a directory$"):
+            extract_pbo.extract_pbo(
+                self.create_reader({}), [], verbose=False, deobfuscate=False, cfgconvert=None,
+                sink=extraction_sink.ZipSink(io.BytesIO()), journal=self.journal)
+
+
+class TestExtractToMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.mock_pboreader = mock.Mock()
+
+    def create_file(self, filename: bytes, data: bytes, original_size: int = 0) -> pbo_file.PBOFile:
+        pbofile = pbo_file.PBOFile(None, filename, b"", original_size, 0, 0, len(data))
+        pbofile.content_reader = pbo_file_reader.PBOFileReader(io.BytesIO(data), 0, len(data))
+        return pbofile
+
+    def test_returns_contents_of_all_files(self) -> None:
+        self.mock_pboreader.files.return_value = [
+            self.create_file(b"dir1\\filename.ext", b"1111"),
+            self.create_file(b"compressed.ext", b"\xffABCDEFGH\x24\x02\0\0", 8),
+            self.create_file(b"filename.ext", b"333333")
+        ]
+
+        result = extract_pbo.extract_to_memory(self.mock_pboreader, jobs=2)
+
+        assert {name: bytes(contents) for name, contents in result.items()} == {
+            os.path.join("dir1", "filename.ext"): b"1111",
+            "compressed.ext": b"ABCDEFGH",
+            "filename.ext": b"333333"
+        }
+
+    def test_returns_contents_of_files_matching_pattern(self) -> None:
+        self.mock_pboreader.files.return_value = [
+            self.create_file(b"dir1\\filename.c", b"1111"),
+            self.create_file(b"dir1\\filename.ext", b"2222")
+        ]
+
+        result = extract_pbo.extract_to_memory(self.mock_pboreader, pattern="**/*.c")
+
+        assert list(result.keys()) == [os.path.join("dir1", "filename.c")]
+        assert bytes(result[os.path.join("dir1", "filename.c")]) == b"1111"
+
+    def test_extracts_within_memory_limit(self) -> None:
+        self.mock_pboreader.files.return_value = [
+            self.create_file(b"compressed1.ext", b"\xffABCDEFGH\x24\x02\0\0", 8),
+            self.create_file(b"compressed2.ext", b"\xffABCDEFGH\x24\x02\0\0", 8)
+        ]
+
+        result = extract_pbo.extract_to_memory(self.mock_pboreader, max_memory=20)
+
+        assert bytes(result["compressed1.ext"]) == b"ABCDEFGH"
+        assert bytes(result["compressed2.ext"]) == b"ABCDEFGH"
+
+    def test_raises_if_contents_would_exceed_memory_limit(self) -> None:
+        self.mock_pboreader.files.return_value = [
+            self.create_file(b"filename1.ext", b"1111"),
+            self.create_file(b"filename2.ext", b"2222")
+        ]
+
+        with self.assertRaises(Exception) as error:
+            extract_pbo.extract_to_memory(self.mock_pboreader, max_memory=7)
+
+        assert str(error.exception) == \
+            "Extracted contents (8 bytes) would exceed memory limit (7 bytes)"
+
+    def test_raises_if_decompression_fails(self) -> None:
+        self.mock_pboreader.files.return_value = [
+            self.create_file(b"compressed.ext", b"\xffABCDEFGH\x23\x02\0\0", 8)
+        ]
+
+        with self.assertRaises(Exception) as error:
+            extract_pbo.extract_to_memory(self.mock_pboreader)
+
+        assert str(error.exception) == "Checksum mismatch (0x224 != 0x223)"
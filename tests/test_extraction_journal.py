@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from dayz_dev_tools import extraction_journal
+from dayz_dev_tools import pbo_file
+
+
+class TestExtractionJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.path = os.path.join(self.tempdir.name, "journal")
+
+    def test_files_are_not_completed_in_new_journal(self) -> None:
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            assert journal.completed(pbo_file.PBOFile(b"prefix", b"file", b"", 0, 0, 0, 4)) \
+                is False
+
+    def test_recorded_files_are_completed(self) -> None:
+        pbofile = pbo_file.PBOFile(b"prefix", b"file", b"", 0, 0, 0, 4)
+
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            journal.record(pbofile)
+
+            assert journal.completed(pbofile) is True
+
+    def test_loads_files_recorded_in_existing_journal(self) -> None:
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            journal.record(pbo_file.PBOFile(b"prefix", b"file1", b"", 0, 0, 1234, 4))
+            journal.record(pbo_file.PBOFile(None, b"dir\\file2", b"", 10, 0, 5678, 8))
+
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            assert journal.completed(pbo_file.PBOFile(b"prefix", b"file1", b"", 0, 0, 1234, 4))
+            assert journal.completed(pbo_file.PBOFile(None, b"dir/file2", b"", 10, 0, 5678, 8))
+            assert not journal.completed(
+                pbo_file.PBOFile(b"prefix", b"file1", b"", 0, 0, 1235, 4))
+            assert not journal.completed(
+                pbo_file.PBOFile(None, b"dir\\file2", b"", 10, 0, 5678, 9))
+
+    def test_ignores_incomplete_last_line(self) -> None:
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            journal.record(pbo_file.PBOFile(None, b"file1", b"", 0, 0, 0, 4))
+
+        with open(self.path, "a") as journal_file:
+            journal_file.write('{"filename": "fi')
+
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            assert journal.completed(pbo_file.PBOFile(None, b"file1", b"", 0, 0, 0, 4))
+            journal.record(pbo_file.PBOFile(None, b"file2", b"", 0, 0, 0, 4))
+
+        with extraction_journal.ExtractionJournal(self.path) as journal:
+            assert journal.completed(pbo_file.PBOFile(None, b"file2", b"", 0, 0, 0, 4))
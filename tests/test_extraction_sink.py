@@ -0,0 +1,221 @@
+import io
+import os
+import struct
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+import zipfile
+
+from dayz_dev_tools import extraction_sink
+
+
+class TestDirectorySink(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.outdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.outdir.cleanup)
+
+    def test_writes_files_to_output_directory(self) -> None:
+        sink = extraction_sink.DirectorySink(self.outdir.name)
+
+        sink.makedirs([b"dir1", b"dir2"])
+        with sink.open(os.path.join("dir1", "dir2", "filename.ext")) as out_file:
+            out_file.write(b"CONTENT")
+
+        with open(os.path.join(self.outdir.name, "dir1", "dir2", "filename.ext"), "rb") as f:
+            assert f.read() == b"CONTENT"
+
+    def test_creates_each_directory_only_once(self) -> None:
+        sink = extraction_sink.DirectorySink(self.outdir.name)
+
+        with mock.patch("os.makedirs") as mock_makedirs:
+            sink.makedirs([b"dir1", b"dir2"])
+            sink.makedirs([b"dir1"])
+            sink.makedirs([b"dir1", b"dir2"])
+
+        assert mock_makedirs.call_args_list == [
+            mock.call(os.path.join(os.fsencode(self.outdir.name), b"dir1", b"dir2"), exist_ok=True),
+            mock.call(os.path.join(os.fsencode(self.outdir.name), b"dir1"), exist_ok=True)
+        ]
+
+    def test_replaces_files_only_once_complete_when_atomic(self) -> None:
+        sink = extraction_sink.DirectorySink(self.outdir.name, atomic=True)
+        path = os.path.join(self.outdir.name, "filename.ext")
+
+        with open(path, "wb") as existing:
+            existing.write(b"OLD")
+
+        with sink.open("filename.ext") as out_file:
+            out_file.write(b"CONTENT")
+
+            with open(path, "rb") as f:
+                assert f.read() == b"OLD"
+
+        with open(path, "rb") as f:
+            assert f.read() == b"CONTENT"
+
+        assert os.listdir(self.outdir.name) == ["filename.ext"]
+
+    def test_removes_incomplete_file_when_atomic_write_fails(self) -> None:
+        sink = extraction_sink.DirectorySink(self.outdir.name, atomic=True)
+
+        with self.assertRaisesRegex(Exception, r"^failed$"):
+            with sink.open("filename.ext") as out_file:
+                out_file.write(b"CONTENT")
+                raise Exception("failed")
+
+        assert os.listdir(self.outdir.name) == []
+
+    def test_path_is_relative_to_current_directory_when_output_directory_is_none(self) -> None:
+        sink = extraction_sink.DirectorySink()
+
+        assert sink.path(os.path.join("dir1", "filename.ext")) == os.path.join(
+            "dir1", "filename.ext")
+
+
+class TestZipSink(unittest.TestCase):
+    def test_writes_files_into_zip_archive(self) -> None:
+        output = io.BytesIO()
+
+        with extraction_sink.ZipSink(output) as sink:
+            sink.makedirs([b"dir1"])
+            with sink.open(os.path.join("dir1", "filename.ext"), mtime=1600000000) as out_file:
+                out_file.write(b"CONTENT1")
+            with sink.open("other.ext") as out_file:
+                out_file.write(b"CONTENT2")
+
+        with zipfile.ZipFile(output) as archive:
+            assert archive.namelist() == ["dir1/filename.ext", "other.ext"]
+            assert archive.read("dir1/filename.ext") == b"CONTENT1"
+            assert archive.read("other.ext") == b"CONTENT2"
+            assert archive.getinfo("dir1/filename.ext").compress_type == zipfile.ZIP_DEFLATED
+
+    def test_uses_zip64_headers_for_large_and_unknown_sizes(self) -> None:
+        output = io.BytesIO()
+
+        with extraction_sink.ZipSink(output, compression=zipfile.ZIP_STORED) as sink:
+            with sink.open("small", size=7) as out_file:
+                out_file.write(b"CONTENT")
+            with mock.patch.object(zipfile, "ZIP64_LIMIT", 4):
+                with sink.open("large", size=7) as out_file:
+                    out_file.write(b"CONTENT")
+            with sink.open("unknown") as out_file:
+                out_file.write(b"CONTENT")
+
+        def local_extra(name: str) -> bytes:
+            offset = archive.getinfo(name).header_offset
+            name_length, extra_length = struct.unpack_from("<HH", output.getvalue(), offset + 26)
+            start = offset + 30 + name_length
+            return output.getvalue()[start:start + extra_length]
+
+        with zipfile.ZipFile(output) as archive:
+            assert local_extra("small") == b""
+            # The zip64 extra field has the ID 1
+            assert local_extra("large").startswith(b"\x01\x00")
+            assert local_extra("unknown").startswith(b"\x01\x00")
+            assert [archive.read(name) for name in archive.namelist()] == [b"CONTENT"] * 3
+
+
+class TestTarSink(unittest.TestCase):
+    def test_writes_files_into_tar_archive(self) -> None:
+        output = io.BytesIO()
+
+        with extraction_sink.TarSink(output, mode="w:gz") as sink:
+            with sink.open(os.path.join("dir1", "filename.ext"), mtime=1600000000) as out_file:
+                out_file.write(b"CONTENT1")
+            with sink.open("other.ext") as out_file:
+                out_file.write(b"CONTENT2")
+
+        output.seek(0)
+
+        with tarfile.open(fileobj=output, mode="r:gz") as archive:
+            assert archive.getnames() == ["dir1/filename.ext", "other.ext"]
+            assert archive.getmember("dir1/filename.ext").mtime == 1600000000
+            member = archive.extractfile("dir1/filename.ext")
+            assert member is not None
+            assert member.read() == b"CONTENT1"
+
+    def test_does_not_add_member_when_writing_fails(self) -> None:
+        output = io.BytesIO()
+
+        with extraction_sink.TarSink(output) as sink:
+            with self.assertRaises(Exception):
+                with sink.open("filename.ext") as out_file:
+                    out_file.write(b"CONTENT")
+                    raise Exception("failed")
+
+        output.seek(0)
+
+        with tarfile.open(fileobj=output) as archive:
+            assert archive.getnames() == []
+
+    def test_streams_files_of_known_size_into_tar_archive(self) -> None:
+        output = io.BytesIO()
+
+        with extraction_sink.TarSink(output) as sink:
+            with sink.open("first.ext", mtime=1600000000, size=1000) as out_file:
+                out_file.write(b"A" * 600)
+                # The contents are written to the archive as they are written, not buffered
+                assert output.getvalue().endswith(b"A" * 600)
+                out_file.write(b"A" * 400)
+            with sink.open("second.ext", size=8) as out_file:
+                out_file.write(b"CONTENT2")
+            with sink.open("empty.ext", size=0):
+                pass
+
+        output.seek(0)
+
+        with tarfile.open(fileobj=output) as archive:
+            assert archive.getnames() == ["first.ext", "second.ext", "empty.ext"]
+            assert archive.getmember("first.ext").mtime == 1600000000
+            for name, contents in [("first.ext", b"A" * 1000), ("second.ext", b"CONTENT2")]:
+                member = archive.extractfile(name)
+                assert member is not None
+                assert member.read() == contents
+
+    def test_raises_when_streamed_file_does_not_match_known_size(self) -> None:
+        with extraction_sink.TarSink(io.BytesIO()) as sink:
+            with self.assertRaisesRegex(Exception, r"^File size mismatch 7 != 8$"):
+                with sink.open("short.ext", size=8) as out_file:
+                    out_file.write(b"CONTENT")
+
+            with self.assertRaisesRegex(Exception, r"^File size mismatch 9 > 8$"):
+                with sink.open("long.ext", size=8) as out_file:
+                    out_file.write(b"CONTENT2!")
+
+
+class TestOpenSink(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.outdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.outdir.cleanup)
+
+    def test_returns_directory_sink_for_current_directory_when_output_is_none(self) -> None:
+        sink = extraction_sink.open_sink(None)
+
+        assert isinstance(sink, extraction_sink.DirectorySink)
+        assert sink.output_directory is None
+
+    def test_creates_output_directory(self) -> None:
+        output = os.path.join(self.outdir.name, "output")
+
+        sink = extraction_sink.open_sink(output)
+
+        assert isinstance(sink, extraction_sink.DirectorySink)
+        assert sink.output_directory == output
+        assert os.path.isdir(output)
+
+    def test_returns_archive_sinks_based_on_output_extension(self) -> None:
+        for name, sink_type in [
+            ("output.zip", extraction_sink.ZipSink),
+            ("output.ZIP", extraction_sink.ZipSink),
+            ("output.tar", extraction_sink.TarSink),
+            ("output.tar.gz", extraction_sink.TarSink),
+            ("output.tgz", extraction_sink.TarSink),
+            ("output.tar.xz", extraction_sink.TarSink)
+        ]:
+            with extraction_sink.open_sink(os.path.join(self.outdir.name, name)) as sink:
+                assert isinstance(sink, sink_type)
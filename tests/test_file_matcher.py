@@ -0,0 +1,92 @@
+import os
+import re
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import pbo_file
+
+
+class TestFileMatcher(unittest.TestCase):
+    def test_matches_all_filenames_when_no_patterns_are_provided(self) -> None:
+        matcher = file_matcher.FileMatcher()
+
+        assert matcher.matches("filename.ext") is True
+        assert matcher.matches(os.path.join("dir1", "dir2", "filename.ext")) is True
+
+    def test_matches_filenames_matching_any_include_glob(self) -> None:
+        matcher = file_matcher.FileMatcher(include=["**/*.c", "*.cpp"])
+
+        assert matcher.matches(os.path.join("dir1", "dir2", "filename.c")) is True
+        assert matcher.matches("config.cpp") is True
+        assert matcher.matches("filename.c") is False
+        assert matcher.matches(os.path.join("dir1", "filename.ext")) is False
+
+    def test_matches_filenames_matching_any_include_regex(self) -> None:
+        matcher = file_matcher.FileMatcher(include_regex=["\\.xml$", "^scripts/"])
+
+        assert matcher.matches(os.path.join("dir1", "layout.xml")) is True
+        assert matcher.matches(os.path.join("scripts", "filename.c")) is True
+        assert matcher.matches(os.path.join("dir1", "layout.xmlx")) is False
+        assert matcher.matches(os.path.join("dir1", "scripts", "filename.c")) is False
+
+    def test_does_not_match_filenames_matching_exclude_patterns(self) -> None:
+        matcher = file_matcher.FileMatcher(
+            include=["**/*.c"], exclude=["*/skip/*"], exclude_regex=["obfuscated"])
+
+        assert matcher.matches(os.path.join("dir1", "filename.c")) is True
+        assert matcher.matches(os.path.join("dir1", "skip", "filename.c")) is False
+        assert matcher.matches(os.path.join("dir1", "obfuscated.c")) is False
+
+    def test_matches_all_filenames_not_excluded_when_no_include_patterns_are_provided(
+        self
+    ) -> None:
+        matcher = file_matcher.FileMatcher(exclude=["*.paa"])
+
+        assert matcher.matches(os.path.join("dir1", "filename.c")) is True
+        assert matcher.matches(os.path.join("dir1", "texture.paa")) is False
+
+    def test_matches_regexes_with_backreferences_and_inline_flags(self) -> None:
+        matcher = file_matcher.FileMatcher(include_regex=["^(\\w+)/\\1\\.c$", "(?i)\\.XML$"])
+
+        assert matcher.matches(os.path.join("dir1", "dir1.c")) is True
+        assert matcher.matches(os.path.join("dir1", "layout.xml")) is True
+        assert matcher.matches(os.path.join("dir1", "dir2.c")) is False
+
+    @mock.patch("os.path.normcase", side_effect=lambda path: path.lower().replace("/", "\\"))
+    @mock.patch("os.path.sep", "\\")
+    def test_normalizes_globs_like_fnmatch_on_windows(self, mock_normcase: mock.Mock) -> None:
+        matcher = file_matcher.FileMatcher(include=["Scripts\\*.C", "data/*.xml"])
+
+        assert matcher.matches("scripts\\filename.c") is True
+        assert matcher.matches("data\\layout.xml") is True
+        assert matcher.matches("other\\filename.c") is False
+
+    def test_raises_for_invalid_regex(self) -> None:
+        with self.assertRaises(re.error):
+            file_matcher.FileMatcher(include_regex=["("])
+
+    def test_filter_returns_selected_files(self) -> None:
+        files = [
+            pbo_file.PBOFile(b"PREFIX", b"dir1\\filename.c", b"", 0, 0, 0, 0),
+            pbo_file.PBOFile(b"PREFIX", b"dir1\\filename.ext", b"", 0, 0, 0, 0),
+            pbo_file.PBOFile(None, b"filename.c", b"", 0, 0, 0, 0)
+        ]
+
+        matcher = file_matcher.FileMatcher(include=["PREFIX/*.c"])
+
+        assert matcher.filter(files) == [files[0]]
+
+
+class TestCreate(unittest.TestCase):
+    def test_returns_none_when_no_patterns_are_provided(self) -> None:
+        assert file_matcher.create() is None
+        assert file_matcher.create(include=[], exclude=None) is None
+
+    def test_returns_matcher_when_patterns_are_provided(self) -> None:
+        matcher = file_matcher.create(include=["*.c"], exclude_regex=["skip"])
+
+        assert matcher is not None
+        assert matcher.matches("filename.c") is True
+        assert matcher.matches("skip.c") is False
+        assert matcher.matches("filename.ext") is False
@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import file_watcher
+
+
+class WatcherTests:
+    tempdir: tempfile.TemporaryDirectory[str]
+
+    def create_watcher(self, paths: list[str]) -> typing.Any:
+        raise NotImplementedError
+
+    def path(self, *names: str) -> str:
+        return os.path.join(self.tempdir.name, *names)
+
+    def write_file(self, path: str, data: bytes, mtime_ns: int = 1_000_000_000) -> None:
+        with open(path, "wb") as out_file:
+            out_file.write(data)
+
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def setUp(self) -> None:
+        super().setUp()  # type: ignore[misc]
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)  # type: ignore[attr-defined]
+
+        os.makedirs(self.path("source", "scripts"))
+        self.write_file(self.path("source", "scripts", "file.c"), b"ORIGINAL")
+        self.write_file(self.path("config.cpp"), b"CONFIG")
+        self.write_file(self.path("unwatched.txt"), b"UNWATCHED")
+
+    def watcher(self) -> typing.Any:
+        watcher = self.create_watcher([self.path("source"), self.path("config.cpp")])
+        self.addCleanup(watcher.close)  # type: ignore[attr-defined]
+        return watcher
+
+    def test_changes_returns_empty_set_when_nothing_changes(self) -> None:
+        watcher = self.watcher()
+
+        assert watcher.changes(0.05) == set()
+
+    def test_changes_reports_modified_files_in_watched_directories(self) -> None:
+        watcher = self.watcher()
+
+        self.write_file(self.path("source", "scripts", "file.c"), b"MODIFIED", 2_000_000_000)
+
+        assert watcher.changes(5) == {self.path("source", "scripts", "file.c")}
+
+    def test_changes_reports_created_and_removed_files(self) -> None:
+        watcher = self.watcher()
+
+        os.unlink(self.path("source", "scripts", "file.c"))
+        self.write_file(self.path("source", "new.c"), b"NEW")
+
+        changed = watcher.changes(5)
+        changed |= watcher.changes(0.2)
+
+        assert {self.path("source", "scripts", "file.c"), self.path("source", "new.c")} <= changed
+
+    def test_changes_reports_files_in_new_directories(self) -> None:
+        watcher = self.watcher()
+
+        os.makedirs(self.path("source", "new"))
+        self.write_file(self.path("source", "new", "file.c"), b"NEW")
+
+        changed = watcher.changes(5)
+        changed |= watcher.changes(0.2)
+
+        assert self.path("source", "new", "file.c") in changed
+
+    def test_changes_reports_watched_files(self) -> None:
+        watcher = self.watcher()
+
+        self.write_file(self.path("unwatched.txt"), b"MODIFIED", 2_000_000_000)
+        self.write_file(self.path("config.cpp"), b"MODIFIED", 2_000_000_000)
+
+        assert watcher.changes(5) == {self.path("config.cpp")}
+
+
+class TestPollingWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, paths: list[str]) -> typing.Any:
+        return file_watcher.PollingWatcher(paths, interval=0.01)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on Linux")
+class TestInotifyWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, paths: list[str]) -> typing.Any:
+        return file_watcher.InotifyWatcher(paths)
+
+
+class TestCreateWatcher(unittest.TestCase):
+    def test_creates_polling_watcher_when_polling_is_requested(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir:
+            watcher = file_watcher.create_watcher([tempdir], polling=True)
+
+        assert isinstance(watcher, file_watcher.PollingWatcher)
+
+    @mock.patch("sys.platform", "linux")
+    @mock.patch("dayz_dev_tools.file_watcher.InotifyWatcher", side_effect=OSError("too many"))
+    def test_falls_back_to_polling_when_inotify_fails(self, mock_inotify: mock.Mock) -> None:
+        with tempfile.TemporaryDirectory() as tempdir:
+            watcher = file_watcher.create_watcher([tempdir])
+
+        mock_inotify.assert_called_once_with([tempdir])
+
+        assert isinstance(watcher, file_watcher.PollingWatcher)
+
+
+class TestDebounced(unittest.TestCase):
+    def test_collects_changes_until_no_more_are_detected(self) -> None:
+        watcher = mock.Mock()
+        watcher.changes.side_effect = [set(), {"a"}, {"b"}, {"a", "c"}, set(), {"d"}, set()]
+
+        with mock.patch("time.monotonic", side_effect=[10.0, 20.0]):
+            bursts = file_watcher.debounced(watcher, delay=0.5)
+
+            assert next(bursts) == ({"a", "b", "c"}, 10.0)
+            assert next(bursts) == ({"d"}, 20.0)
+
+        assert watcher.changes.call_args_list == [
+            mock.call(None), mock.call(None), mock.call(0.5), mock.call(0.5), mock.call(0.5),
+            mock.call(None), mock.call(0.5)
+        ]
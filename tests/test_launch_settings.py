@@ -169,6 +169,21 @@ class TestLaunchSettings(unittest.TestCase):
 
         assert settings.parameters() == ["-extraParam", "-opt1", "-opt2=value"]
 
+    def test_verify_signatures_returns_setting_from_config(self) -> None:
+        self.config.verify_signatures = True
+        settings = launch_settings.LaunchSettings(self.config)
+
+        assert settings.verify_signatures() is True
+
+    def test_verify_signatures_returns_setting_set_with_set_verify_signatures(self) -> None:
+        settings = launch_settings.LaunchSettings(self.config)
+
+        assert settings.verify_signatures() is False
+
+        settings.set_verify_signatures(True)
+
+        assert settings.verify_signatures() is True
+
     def test_load_bundle_loads_bundle_from_config_when_present_in_config(self) -> None:
         settings = launch_settings.LaunchSettings(self.config)
 
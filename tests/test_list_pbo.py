@@ -3,6 +3,7 @@ import typing
 import unittest
 from unittest import mock
 
+from dayz_dev_tools import file_matcher
 from dayz_dev_tools import list_pbo
 from dayz_dev_tools import pbo_file
 
@@ -95,3 +96,18 @@ class TestListPbo(unittest.TestCase):
             mock.call("---------        ---------                    ---------"),
             mock.call("    72342            65210                    5 Files")
         ])
+
+    def test_prints_only_files_selected_by_matcher(self) -> None:
+        matcher = file_matcher.FileMatcher(include=["dir1/*/filename.ext"])
+
+        with mock.patch("builtins.print") as mock_print:
+            list_pbo.list_pbo(self.mock_pboreader, verbose=False, matcher=matcher)
+
+        assert mock_print.call_args_list == [
+            mock.call(" Original     Date    Time   Name"),
+            mock.call("---------  ---------- -----  ----"),
+            self.expected_call(10000, self.timestamps[0], self.pbo_files[0].normalized_filename()),
+            self.expected_call(54321, self.timestamps[2], self.pbo_files[2].normalized_filename()),
+            mock.call("---------                    ---------"),
+            mock.call("    64321                    2 Files")
+        ]
@@ -0,0 +1,60 @@
+import threading
+import unittest
+
+from dayz_dev_tools import memory_budget
+
+
+class TestParseSize(unittest.TestCase):
+    def test_parses_plain_number_of_bytes(self) -> None:
+        assert memory_budget.parse_size("1234") == 1234
+
+    def test_parses_sizes_with_suffixes(self) -> None:
+        assert memory_budget.parse_size("64k") == 64 * 1024
+        assert memory_budget.parse_size("512M") == 512 * 1024 * 1024
+        assert memory_budget.parse_size("2GiB") == 2 * 1024 * 1024 * 1024
+        assert memory_budget.parse_size("1 TB") == 1024 * 1024 * 1024 * 1024
+
+    def test_raises_if_size_is_invalid(self) -> None:
+        with self.assertRaisesRegex(ValueError, r"^Invalid size: 12X$"):
+            memory_budget.parse_size("12X")
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_chunk_size_is_limited_by_budget(self) -> None:
+        assert memory_budget.MemoryBudget(None).chunk_size() == memory_budget.CHUNK_SIZE
+        assert memory_budget.MemoryBudget(1 << 30).chunk_size() == memory_budget.CHUNK_SIZE
+        assert memory_budget.MemoryBudget(1000).chunk_size() == 1000
+
+    def test_reserve_tracks_memory_in_use(self) -> None:
+        budget = memory_budget.MemoryBudget(100)
+
+        with budget.reserve(60):
+            assert budget.in_use == 60
+
+        assert budget.in_use == 0
+
+    def test_allows_reservation_larger_than_limit_when_nothing_else_is_reserved(self) -> None:
+        budget = memory_budget.MemoryBudget(100)
+
+        with budget.reserve(1000):
+            assert budget.in_use == 1000
+
+    def test_acquire_waits_until_memory_is_released(self) -> None:
+        budget = memory_budget.MemoryBudget(100)
+        acquired = threading.Event()
+
+        def acquire() -> None:
+            budget.acquire(50)
+            acquired.set()
+
+        budget.acquire(60)
+        thread = threading.Thread(target=acquire)
+        thread.start()
+
+        assert not acquired.wait(0.05)
+
+        budget.release(60)
+        thread.join()
+
+        assert acquired.is_set()
+        assert budget.in_use == 50
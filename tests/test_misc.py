@@ -48,3 +48,34 @@ class TestChdir(unittest.TestCase):
         assert entered is True
 
         self.mock_chdir.assert_not_called()
+
+    def test_restores_directory_when_context_raises(self) -> None:
+        self.mock_getcwd.return_value = "old/dir"
+
+        with self.assertRaises(RuntimeError):
+            with misc.chdir("new/dir"):
+                raise RuntimeError("failed")
+
+        self.mock_chdir.assert_called_with("old/dir")
+
+
+class TestGcPaused(unittest.TestCase):
+    def test_disables_garbage_collection_while_in_context(self) -> None:
+        with mock.patch("gc.isenabled", return_value=True), \
+                mock.patch("gc.disable") as mock_disable, \
+                mock.patch("gc.enable") as mock_enable:
+            with misc.gc_paused():
+                mock_disable.assert_called_once_with()
+                mock_enable.assert_not_called()
+
+            mock_enable.assert_called_once_with()
+
+    def test_leaves_garbage_collection_disabled_if_it_was_disabled(self) -> None:
+        with mock.patch("gc.isenabled", return_value=False), \
+                mock.patch("gc.disable"), \
+                mock.patch("gc.enable") as mock_enable:
+            with self.assertRaises(RuntimeError):
+                with misc.gc_paused():
+                    raise RuntimeError("failed")
+
+        mock_enable.assert_not_called()
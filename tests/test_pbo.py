@@ -1,12 +1,16 @@
 import os
 import pathlib
 import tempfile
+import typing
 import unittest
 from unittest import mock
 
 import dayz_dev_tools
+from dayz_dev_tools import config_cpp
 from dayz_dev_tools import misc
 from dayz_dev_tools import pbo
+from dayz_dev_tools import pbo_project
+from dayz_dev_tools import pbo_reader
 
 from tests import helpers
 
@@ -54,7 +58,9 @@ class TestMain(unittest.TestCase):
 
         self.mock_tools_directory.assert_called_once_with()
 
-        self.mock_pbo_writer_class.assert_called_once_with(cfgconvert=None)
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=config_cpp.NATIVE_CONVERTER, max_memory=None, compress=None,
+            compression_level=5, jobs=None, manifest=None)
 
         self.mock_pbo_writer.add_header.assert_called_once_with(
             "dayz-dev-tools",
@@ -89,14 +95,16 @@ class TestMain(unittest.TestCase):
 
         self.mock_configure_logging.assert_called_once_with(debug=False)
 
-        self.mock_pbo_writer_class.assert_called_once_with(cfgconvert=None)
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=config_cpp.NATIVE_CONVERTER, max_memory=None, compress=None,
+            compression_level=5, jobs=None, manifest=None)
 
         assert 4 == self.mock_pbo_writer.add_file.call_count
         self.mock_pbo_writer.add_file.assert_has_calls([
-            mock.call(pathlib.Path("path", "to", "file1.ext")),
-            mock.call(pathlib.Path("another", "path", "file2.ext")),
-            mock.call(pathlib.Path("another", "path", "subdir", "file3.ext")),
-            mock.call(pathlib.Path("file4.ext"))
+            mock.call(pathlib.Path("path", "to", "file1.ext"), stat=None),
+            mock.call(pathlib.Path("another", "path", "file2.ext"), stat=mock.ANY),
+            mock.call(pathlib.Path("another", "path", "subdir", "file3.ext"), stat=mock.ANY),
+            mock.call(pathlib.Path("file4.ext"), stat=None)
         ])
 
         mock_open.assert_called_once_with("output.pbo", "wb")
@@ -114,7 +122,56 @@ class TestMain(unittest.TestCase):
             ])
 
         self.mock_pbo_writer_class.assert_called_once_with(
-            cfgconvert=os.path.join("TOOLS-DIR", "bin", "CfgConvert", "CfgConvert.exe"))
+            cfgconvert=os.path.join("TOOLS-DIR", "bin", "CfgConvert", "CfgConvert.exe"),
+            max_memory=None, compress=None, compression_level=5, jobs=None, manifest=None)
+
+    def test_limits_memory_when_max_memory_option_is_specified(self) -> None:
+        with mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "--max-memory", "64M",
+                "output.pbo"
+            ])
+
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=config_cpp.NATIVE_CONVERTER, max_memory=64 * 1024 * 1024, compress=None,
+            compression_level=5, jobs=None, manifest=None)
+
+    def test_compresses_source_files_when_compress_option_is_specified(self) -> None:
+        with mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "-z",
+                "--compression-level", "9",
+                "-j", "3",
+                "output.pbo"
+            ])
+
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=config_cpp.NATIVE_CONVERTER, max_memory=None, compress=mock.ANY,
+            compression_level=9, jobs=3, manifest=None)
+
+        policy = self.mock_pbo_writer_class.call_args.kwargs["compress"]
+        assert policy.matches(os.path.join("scripts", "4_World", "file.c"))
+        assert policy.matches("stringtable.csv")
+        assert not policy.matches(os.path.join("data", "texture_co.paa"))
+        assert not policy.matches("model.p3d")
+
+    def test_compresses_matching_files_when_compress_match_option_is_specified(self) -> None:
+        with mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "--compress-match", "*.p3d",
+                "--compress-match", "*.rvmat",
+                "--compress-exclude", "*_lod.p3d",
+                "output.pbo"
+            ])
+
+        policy = self.mock_pbo_writer_class.call_args.kwargs["compress"]
+        assert policy.matches("model.p3d")
+        assert policy.matches(os.path.join("data", "model.rvmat"))
+        assert not policy.matches("model_lod.p3d")
+        assert not policy.matches("file.c")
 
     def test_does_not_convert_config_cpp_files_when_no_convert_option_is_specified(self) -> None:
         self.mock_tools_directory.return_value = "TOOLS-DIR"
@@ -126,7 +183,9 @@ class TestMain(unittest.TestCase):
                 "output.pbo"
             ])
 
-        self.mock_pbo_writer_class.assert_called_once_with(cfgconvert=None)
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=None, max_memory=None, compress=None, compression_level=5, jobs=None,
+            manifest=None)
 
     def test_changes_directory_when_specified(self) -> None:
         with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()):
@@ -165,6 +224,24 @@ class TestMain(unittest.TestCase):
 
         assert 2 == error.exception.code
 
+    def test_skips_excluded_files_in_directories(self) -> None:
+        pathlib.Path(self.indir.name, "scripts", ".git").mkdir(parents=True)
+        pathlib.Path(self.indir.name, "scripts", ".git", "HEAD").touch()
+        pathlib.Path(self.indir.name, "scripts", "file.c").touch()
+        pathlib.Path(self.indir.name, "scripts", "file.c.bak").touch()
+        pathlib.Path(self.indir.name, "scripts", "output.pbo").touch()
+
+        with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "-x", "*.bak",
+                "output.pbo",
+                "scripts"
+            ])
+
+        self.mock_pbo_writer.add_file.assert_called_once_with(
+            pathlib.Path("scripts", "file.c"), stat=mock.ANY)
+
     def test_adds_files_matching_glob_when_pattern_argument_is_specified(self) -> None:
         pathlib.Path(self.indir.name, "match1.ext").touch()
         pathlib.Path(self.indir.name, "path", "to").mkdir(parents=True)
@@ -184,10 +261,10 @@ class TestMain(unittest.TestCase):
 
         assert 4 == self.mock_pbo_writer.add_file.call_count
         self.mock_pbo_writer.add_file.assert_has_calls([
-            mock.call(pathlib.Path("match1.ext")),
-            mock.call(pathlib.Path("path", "to", "match2.ext")),
-            mock.call(pathlib.Path("another", "path", "match3.ext")),
-            mock.call(pathlib.Path("another", "path", "subdir.ext", "match4.ext")),
+            mock.call(pathlib.Path("match1.ext"), stat=mock.ANY),
+            mock.call(pathlib.Path("path", "to", "match2.ext"), stat=mock.ANY),
+            mock.call(pathlib.Path("another", "path", "match3.ext"), stat=mock.ANY),
+            mock.call(pathlib.Path("another", "path", "subdir.ext", "match4.ext"), stat=mock.ANY),
         ], any_order=True)
 
     @mock.patch("pathlib.Path.glob", autospec=True)
@@ -201,10 +278,11 @@ class TestMain(unittest.TestCase):
 
         mock_glob.assert_called_once_with(pathlib.Path("/"), os.path.join("folder", "**", "*.ext"))
 
-    @mock.patch("subprocess.run")
-    def test_signs_pbo_file_when_requested(self, mock_run: mock.Mock) -> None:
-        self.mock_tools_directory.return_value = "TOOLS-DIR"
-
+    @mock.patch("dayz_dev_tools.signatures.read_private_key")
+    @mock.patch("dayz_dev_tools.signatures.sign")
+    def test_signs_pbo_file_when_requested(
+        self, mock_sign: mock.Mock, mock_read_private_key: mock.Mock
+    ) -> None:
         with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()):
             main([
                 "ignored",
@@ -212,19 +290,131 @@ class TestMain(unittest.TestCase):
                 "output.pbo"
             ])
 
-        mock_run.assert_called_once_with(
-            [
-                os.path.join("TOOLS-DIR", "bin", "DsUtils", "DSSignFile.exe"),
-                "PRIVATE-KEY-FILENAME",
+        mock_read_private_key.assert_called_once_with("PRIVATE-KEY-FILENAME")
+        mock_sign.assert_called_once_with("output.pbo", mock_read_private_key.return_value)
+
+    @mock.patch("dayz_dev_tools.build_manifest.BuildManifest", autospec=True)
+    def test_skips_writing_pbo_file_when_incremental_build_is_up_to_date(
+        self, mock_manifest_class: mock.Mock
+    ) -> None:
+        mock_manifest = mock_manifest_class.return_value
+        mock_manifest.up_to_date.return_value = True
+        mock_open = mock.mock_open()
+
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "-i",
+                "output.pbo"
+            ])
+
+        mock_manifest_class.assert_called_once_with("output.pbo", checksums=False)
+
+        self.mock_pbo_writer_class.assert_called_once_with(
+            cfgconvert=config_cpp.NATIVE_CONVERTER, max_memory=None, compress=None,
+            compression_level=5, jobs=None, manifest=mock_manifest)
+
+        mock_manifest.up_to_date.assert_called_once_with(self.mock_pbo_writer, mock.ANY)
+
+        mock_open.assert_not_called()
+        self.mock_pbo_writer.write.assert_not_called()
+        mock_manifest.save.assert_not_called()
+
+    @mock.patch("dayz_dev_tools.build_manifest.BuildManifest", autospec=True)
+    def test_writes_pbo_file_and_saves_manifest_when_incremental_build_is_out_of_date(
+        self, mock_manifest_class: mock.Mock
+    ) -> None:
+        mock_manifest = mock_manifest_class.return_value
+        mock_manifest.up_to_date.return_value = False
+        mock_open = mock.mock_open()
+
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "--checksums",
                 "output.pbo"
-            ],
-            check=True)
+            ])
+
+        mock_manifest_class.assert_called_once_with("output.pbo", checksums=True)
+
+        self.mock_pbo_writer.write.assert_called_once_with(
+            mock_open.return_value.__enter__.return_value)
+
+        settings = mock_manifest.up_to_date.call_args.args[1]
+        mock_manifest.save.assert_called_once_with(self.mock_pbo_writer, settings)
+
+    @mock.patch("dayz_dev_tools.file_watcher.debounced")
+    @mock.patch("dayz_dev_tools.file_watcher.create_watcher")
+    @mock.patch("dayz_dev_tools.build_manifest.BuildManifest", autospec=True)
+    def test_rebuilds_pbo_file_when_watched_files_change(
+        self,
+        mock_manifest_class: mock.Mock,
+        mock_create_watcher: mock.Mock,
+        mock_debounced: mock.Mock
+    ) -> None:
+        mock_manifest_class.return_value.up_to_date.return_value = False
+        pathlib.Path(self.indir.name, "source").mkdir()
+        pathlib.Path(self.indir.name, "source", "file1.c").touch()
+        pathlib.Path(self.indir.name, "config.cpp").touch()
+
+        def changes(watcher: mock.Mock) -> typing.Iterator[tuple[set[str], float]]:
+            # Changes to the output are ignored
+            yield {"output.pbo", "output.pbo.manifest"}, 1.0
+            yield {os.path.join("source", "file1.c")}, 2.0
+            pathlib.Path(self.indir.name, "source", "file2.c").touch()
+            yield {os.path.join("source", "file2.c")}, 3.0
+
+        mock_debounced.side_effect = changes
+
+        with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "-w",
+                "-P", "source/*.c",
+                "output.pbo",
+                "config.cpp"
+            ])
 
-    @mock.patch("subprocess.run")
-    def test_refuses_to_sign_pbo_file_when_tools_directory_is_none(
+        mock_create_watcher.assert_called_once_with(
+            ["config.cpp", "source"], polling=False)
+        mock_debounced.assert_called_once_with(mock_create_watcher.return_value)
+        mock_create_watcher.return_value.close.assert_called_once_with()
+
+        mock_manifest_class.assert_called_with("output.pbo", checksums=False)
+        assert self.mock_pbo_writer.write.call_count == 3
+        added = [c.args[0].name for c in self.mock_pbo_writer.add_file.call_args_list]
+        assert added[:4] == ["file1.c", "config.cpp", "file1.c", "config.cpp"]
+        assert sorted(added[4:]) == ["config.cpp", "file1.c", "file2.c"]
+
+    @mock.patch("dayz_dev_tools.file_watcher.debounced")
+    @mock.patch("dayz_dev_tools.file_watcher.create_watcher")
+    @mock.patch("dayz_dev_tools.build_manifest.BuildManifest", autospec=True)
+    def test_keeps_watching_when_rebuilding_pbo_file_fails(
         self,
-        mock_run: mock.Mock
+        mock_manifest_class: mock.Mock,
+        mock_create_watcher: mock.Mock,
+        mock_debounced: mock.Mock
     ) -> None:
+        mock_manifest_class.return_value.up_to_date.return_value = False
+        self.mock_pbo_writer.write.side_effect = [Exception("bad"), Exception("worse"), None]
+        mock_debounced.return_value = iter([({"config.cpp"}, 1.0), ({"config.cpp"}, 2.0)])
+
+        with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()):
+            main([
+                "ignored",
+                "--poll",
+                "output.pbo",
+                "config.cpp"
+            ])
+
+        mock_create_watcher.assert_called_once_with(["config.cpp"], polling=True)
+
+        assert self.mock_pbo_writer.write.call_count == 3
+        mock_manifest_class.return_value.save.assert_called_once_with(
+            self.mock_pbo_writer, mock.ANY)
+
+    @mock.patch("dayz_dev_tools.signatures.sign")
+    def test_exits_when_private_key_cannot_be_read(self, mock_sign: mock.Mock) -> None:
         with misc.chdir(self.indir.name), mock.patch("builtins.open", mock.mock_open()), \
                 self.assertRaises(SystemExit) as error:
             main([
@@ -235,7 +425,7 @@ class TestMain(unittest.TestCase):
 
         assert 1 == error.exception.code
 
-        mock_run.assert_not_called()
+        mock_sign.assert_not_called()
 
     def test_enables_debug_logging_when_option_is_specified(self) -> None:
         with mock.patch("builtins.open", mock.mock_open()):
@@ -258,3 +448,109 @@ class TestMain(unittest.TestCase):
                 ])
 
         assert error.exception.code == 1
+
+
+class TestBuildMain(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        logging_patcher = mock.patch("dayz_dev_tools.logging_configuration.configure_logging")
+        self.mock_configure_logging = logging_patcher.start()
+        self.addCleanup(logging_patcher.stop)
+
+        tools_directory_patcher = mock.patch(
+            "dayz_dev_tools.tools_directory.tools_directory", return_value="TOOLS-DIR")
+        self.mock_tools_directory = tools_directory_patcher.start()
+        self.addCleanup(tools_directory_patcher.stop)
+
+        load_patcher = mock.patch("dayz_dev_tools.pbo_project.load")
+        self.mock_load = load_patcher.start()
+        self.addCleanup(load_patcher.stop)
+
+        build_project_patcher = mock.patch(
+            "dayz_dev_tools.pbo_project.build_project",
+            return_value=pbo_project.BuildStatistics(built=2, skipped=1))
+        self.mock_build_project = build_project_patcher.start()
+        self.addCleanup(build_project_patcher.stop)
+
+    def test_builds_all_targets_in_default_project_file(self) -> None:
+        main(["ignored", "build"])
+
+        self.mock_configure_logging.assert_called_once_with(debug=False)
+
+        self.mock_load.assert_called_once_with("pbo.toml")
+
+        self.mock_build_project.assert_called_once_with(
+            self.mock_load.return_value, None, tools_dir="TOOLS-DIR", force=False,
+            checksums=False, max_memory=None, jobs=None, debug=False)
+
+    def test_builds_specified_targets_with_options(self) -> None:
+        main([
+            "ignored", "build",
+            "-c", "other.toml",
+            "-D",
+            "-f",
+            "--checksums",
+            "-j", "4",
+            "--max-memory", "1G",
+            "scripts", "data"
+        ])
+
+        self.mock_configure_logging.assert_called_once_with(debug=True)
+
+        self.mock_load.assert_called_once_with("other.toml")
+
+        self.mock_build_project.assert_called_once_with(
+            self.mock_load.return_value, ["scripts", "data"], tools_dir="TOOLS-DIR", force=True,
+            checksums=True, max_memory=1024 * 1024 * 1024, jobs=4, debug=True)
+
+    def test_exits_with_error_when_build_fails(self) -> None:
+        self.mock_build_project.side_effect = Exception("Failed to build 1 of 3 targets")
+
+        with self.assertRaises(SystemExit) as error:
+            main(["ignored", "build"])
+
+        assert error.exception.code == 1
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        logging_patcher = mock.patch("dayz_dev_tools.logging_configuration.configure_logging")
+        logging_patcher.start()
+        self.addCleanup(logging_patcher.stop)
+
+        tools_directory_patcher = mock.patch(
+            "dayz_dev_tools.tools_directory.tools_directory", return_value=None)
+        tools_directory_patcher.start()
+        self.addCleanup(tools_directory_patcher.stop)
+
+        self.indir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.indir.cleanup)
+
+    @mock.patch("dayz_dev_tools.file_watcher.debounced")
+    @mock.patch("dayz_dev_tools.file_watcher.create_watcher")
+    def test_rebuilds_pbo_file_when_watched_file_is_edited(
+        self,
+        mock_create_watcher: mock.Mock,
+        mock_debounced: mock.Mock
+    ) -> None:
+        pathlib.Path(self.indir.name, "source").mkdir()
+        source = pathlib.Path(self.indir.name, "source", "file.c")
+        source.write_bytes(b"old")
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+
+        def changes(watcher: mock.Mock) -> typing.Iterator[tuple[set[str], float]]:
+            source.write_bytes(b"new content")
+            os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+            yield {os.path.join("source", "file.c")}, 1.0
+
+        mock_debounced.side_effect = changes
+
+        with misc.chdir(self.indir.name):
+            main(["ignored", "-w", "output.pbo", "source"])
+
+            with open("output.pbo", "rb") as pbo_file:
+                entry = pbo_reader.PBOReader(pbo_file).file(b"source\\file.c")
+
+                assert entry is not None
+                assert entry.unpack_data(entry.read_data()) == b"new content"
@@ -0,0 +1,290 @@
+import errno
+import hashlib
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import file_matcher
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_editor
+from dayz_dev_tools import pbo_reader
+from dayz_dev_tools import pbo_writer
+
+
+SCRIPT = b"class Foo\r\n{\r\n    int value;\r\n};\r\n" * 100
+
+
+class TestPBOEditor(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.path = os.path.join(self.tempdir.name, "mod.pbo")
+
+        with misc.chdir(self.tempdir.name):
+            os.makedirs("scripts")
+            self.write_file(os.path.join("scripts", "foo.c"), SCRIPT)
+            self.write_file("data.bin", b"DATA" * 64)
+            self.write_file("texture.paa", os.urandom(1000))
+
+            writer = pbo_writer.PBOWriter(
+                cfgconvert=None, compress=pbo_writer.compression_policy())
+            writer.add_header("prefix", "mymod")
+            writer.add_file(pathlib.Path("data.bin"))
+            writer.add_file(pathlib.Path("scripts", "foo.c"))
+            writer.add_file(pathlib.Path("texture.paa"))
+
+            with open(self.path, "wb") as output:
+                writer.write(output)
+
+        with open(self.path, "rb") as pbo_file:
+            self.original = pbo_file.read()
+
+    def write_file(self, name: str, data: bytes) -> None:
+        with open(name, "wb") as out_file:
+            out_file.write(data)
+
+    def read_archive(self, path: str) -> dict[bytes, tuple[bytes, bytes, bytes]]:
+        with open(path, "rb") as pbo_file:
+            data = pbo_file.read()
+            reader = pbo_reader.PBOReader(pbo_file)
+
+            assert reader.headers() == [(b"prefix", b"mymod")]
+            assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
+
+            result = {}
+            for entry in reader.files():
+                assert entry.content_reader is not None
+                stored = entry.content_reader.read(entry.data_size)
+                entry.content_reader.pos = 0
+                unpacked = io.BytesIO()
+                entry.unpack(unpacked)
+                result[entry.filename] = (entry.mime_type, stored, unpacked.getvalue())
+
+            return result
+
+    def test_saving_without_changes_reproduces_archive(self) -> None:
+        with pbo_editor.PBOEditor(self.path) as editor:
+            assert editor.filenames() == [b"data.bin", b"scripts\\foo.c", b"texture.paa"]
+            editor.save()
+
+        with open(self.path, "rb") as pbo_file:
+            assert pbo_file.read() == self.original
+
+    def test_save_replaces_adds_and_removes_files(self) -> None:
+        before = self.read_archive(self.path)
+
+        with misc.chdir(self.tempdir.name):
+            self.write_file("new.txt", b"NEW FILE")
+
+            with pbo_editor.PBOEditor(self.path) as editor:
+                editor.add_bytes("Scripts/Foo.c", b"HOTFIX", time_stamp=1234)
+                editor.add_file(pathlib.Path("new.txt"), "docs/new.txt")
+                editor.remove("TEXTURE.PAA")
+                editor.save()
+
+                assert editor.filenames() == [b"data.bin", b"Scripts\\Foo.c", b"docs\\new.txt"]
+
+        after = self.read_archive(self.path)
+
+        assert list(after.keys()) == [b"data.bin", b"Scripts\\Foo.c", b"docs\\new.txt"]
+        assert after[b"data.bin"] == before[b"data.bin"]
+        assert after[b"Scripts\\Foo.c"] == (b"\x00" * 4, b"HOTFIX", b"HOTFIX")
+        assert after[b"docs\\new.txt"] == (b"\x00" * 4, b"NEW FILE", b"NEW FILE")
+
+    def test_save_copies_compressed_contents_verbatim(self) -> None:
+        before = self.read_archive(self.path)
+        assert before[b"scripts\\foo.c"][0] != b"\x00" * 4
+
+        with pbo_editor.PBOEditor(self.path) as editor:
+            editor.remove("data.bin")
+            editor.save()
+
+        after = self.read_archive(self.path)
+
+        assert after[b"scripts\\foo.c"] == before[b"scripts\\foo.c"]
+        assert after[b"scripts\\foo.c"][2] == SCRIPT
+
+    def test_save_writes_to_output_path_without_changing_original(self) -> None:
+        output_path = os.path.join(self.tempdir.name, "edited.pbo")
+
+        with pbo_editor.PBOEditor(self.path) as editor:
+            editor.add_bytes("extra.txt", b"EXTRA")
+            editor.save(output_path)
+
+        with open(self.path, "rb") as pbo_file:
+            assert pbo_file.read() == self.original
+
+        assert self.read_archive(output_path)[b"extra.txt"][1] == b"EXTRA"
+
+    def test_save_falls_back_to_reading_when_kernel_copy_is_unsupported(self) -> None:
+        before = self.read_archive(self.path)
+
+        with mock.patch.object(
+            os, "copy_file_range", side_effect=OSError(errno.EXDEV, "Cross-device link"),
+            create=True
+        ), pbo_editor.PBOEditor(self.path) as editor:
+            editor.add_bytes("extra.txt", b"EXTRA")
+            editor.save()
+
+        after = self.read_archive(self.path)
+
+        assert after[b"texture.paa"] == before[b"texture.paa"]
+
+    def test_save_removes_incomplete_output_on_failure(self) -> None:
+        with misc.chdir(self.tempdir.name):
+            self.write_file("new.txt", b"NEW FILE")
+
+            with pbo_editor.PBOEditor(self.path) as editor:
+                editor.add_file(pathlib.Path("new.txt"))
+                self.write_file("new.txt", b"CHANGED SIZE")
+
+                with self.assertRaisesRegex(Exception, r"^File size changed: new\.txt$"):
+                    editor.save()
+
+        assert sorted(os.listdir(self.tempdir.name)) == [
+            "data.bin", "mod.pbo", "new.txt", "scripts", "texture.paa"
+        ]
+
+        with open(self.path, "rb") as pbo_file:
+            assert pbo_file.read() == self.original
+
+    def test_remove_raises_when_file_does_not_exist(self) -> None:
+        with pbo_editor.PBOEditor(self.path) as editor:
+            with self.assertRaisesRegex(Exception, r"^File not found in PBO: 'missing\.c'$"):
+                editor.remove("missing.c")
+
+
+class TestMergeAndSplit(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tempdir.name, name)
+
+    def create_archive(self, name: str, prefix: str, files: dict[str, bytes]) -> str:
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        writer.add_header("prefix", prefix)
+
+        os.makedirs(self.path(name))
+
+        with misc.chdir(self.path(name)):
+            for filename, data in files.items():
+                path = pathlib.Path(*filename.split("/"))
+                os.makedirs(path.parent, exist_ok=True)
+                path.write_bytes(data)
+                writer.add_file(path)
+
+            with open(self.path(f"{name}.pbo"), "wb") as output:
+                writer.write(output)
+
+        return self.path(f"{name}.pbo")
+
+    def read_archive(
+        self, path: str
+    ) -> tuple[list[tuple[bytes, bytes]], dict[bytes, tuple[bytes, int, int, bytes]]]:
+        with open(path, "rb") as pbo_file:
+            data = pbo_file.read()
+            reader = pbo_reader.PBOReader(pbo_file)
+
+            assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
+
+            result = {}
+            for entry in reader.files():
+                assert entry.content_reader is not None
+                result[entry.filename] = (
+                    entry.mime_type, entry.time_stamp, entry.original_size,
+                    entry.content_reader.read(entry.data_size))
+
+            return reader.headers(), result
+
+    def test_merge_copies_stored_contents_and_rebases_filenames(self) -> None:
+        first = self.create_archive("first", "mymod", {"scripts/foo.c": SCRIPT})
+        second = self.create_archive("second", "mymod\\data", {"data.bin": b"DATA" * 64})
+        output = self.path("merged.pbo")
+
+        with open(first, "rb") as first_file, open(second, "rb") as second_file:
+            pbo_editor.merge(
+                [pbo_reader.PBOReader(first_file), pbo_reader.PBOReader(second_file)], output)
+
+        headers, merged = self.read_archive(output)
+
+        assert headers == [(b"prefix", b"mymod")]
+        assert merged[b"scripts\\foo.c"] == self.read_archive(first)[1][b"scripts\\foo.c"]
+        assert merged[b"data\\data.bin"] == self.read_archive(second)[1][b"data.bin"]
+        assert merged[b"scripts\\foo.c"][0] == b"srpC"
+
+    def test_merge_uses_given_headers(self) -> None:
+        first = self.create_archive("first", "MyMod\\Scripts", {"foo.c": b"FOO"})
+        output = self.path("merged.pbo")
+
+        with open(first, "rb") as first_file:
+            pbo_editor.merge(
+                [pbo_reader.PBOReader(first_file)], output,
+                headers=[(b"prefix", b"mymod"), (b"product", b"merged")])
+
+        headers, merged = self.read_archive(output)
+
+        assert headers == [(b"prefix", b"mymod"), (b"product", b"merged")]
+        assert list(merged.keys()) == [b"Scripts\\foo.c"]
+
+    def test_merge_raises_when_file_is_outside_prefix(self) -> None:
+        first = self.create_archive("first", "othermod", {"foo.c": b"FOO"})
+
+        with open(first, "rb") as first_file, self.assertRaisesRegex(
+            Exception, r"^File is outside of the merged PBO prefix: othermod.foo\.c$"
+        ):
+            pbo_editor.merge(
+                [pbo_reader.PBOReader(first_file)], self.path("merged.pbo"),
+                headers=[(b"prefix", b"mymod")])
+
+        assert not os.path.exists(self.path("merged.pbo"))
+
+    def test_merge_raises_when_file_names_collide(self) -> None:
+        first = self.create_archive("first", "mymod", {"foo.c": b"FIRST"})
+        second = self.create_archive("second", "mymod", {"FOO.C": b"SECOND"})
+
+        with open(first, "rb") as first_file, open(second, "rb") as second_file, \
+                self.assertRaisesRegex(
+                    Exception, r"^Duplicate file in merged PBOs: mymod.FOO\.C$"):
+            pbo_editor.merge(
+                [pbo_reader.PBOReader(first_file), pbo_reader.PBOReader(second_file)],
+                self.path("merged.pbo"))
+
+    def test_split_writes_files_to_first_matching_archive(self) -> None:
+        original = self.create_archive("original", "mymod", {
+            "scripts/foo.c": SCRIPT,
+            "scripts/bar.c": b"BAR",
+            "data/texture.paa": b"PAA",
+            "readme.txt": b"README"
+        })
+        scripts = self.path("scripts.pbo")
+        data = self.path("data.pbo")
+
+        with open(original, "rb") as original_file:
+            pbo_editor.split(pbo_reader.PBOReader(original_file), [
+                (scripts, file_matcher.FileMatcher(include=["*/scripts/foo.c"])),
+                (data, file_matcher.FileMatcher(exclude=["*.txt"]))
+            ])
+
+        _, before = self.read_archive(original)
+        headers, scripts_files = self.read_archive(scripts)
+
+        assert headers == [(b"prefix", b"mymod")]
+        assert scripts_files == {b"scripts\\foo.c": before[b"scripts\\foo.c"]}
+
+        headers, data_files = self.read_archive(data)
+
+        assert headers == [(b"prefix", b"mymod")]
+        assert data_files == {
+            b"scripts\\bar.c": before[b"scripts\\bar.c"],
+            b"data\\texture.paa": before[b"data\\texture.paa"]
+        }
@@ -70,6 +70,21 @@ class TestPBOFile(unittest.TestCase):
 
         self.mock_content_reader.read.assert_called_once_with(4321)
 
+    def test_unpack_writes_uncompressed_contents_in_chunks_when_chunk_size_is_provided(
+        self
+    ) -> None:
+        self.pbofile.original_size = 0
+        self.pbofile.data_size = 10
+        self.pbofile.content_reader = pbo_file_reader.PBOFileReader(
+            io.BytesIO(b"ABCD1234XY"), 0, 10)
+        output = mock.Mock()
+
+        self.pbofile.unpack(output, chunk_size=4)
+
+        assert output.write.call_args_list == [
+            mock.call(b"ABCD"), mock.call(b"1234"), mock.call(b"XY")
+        ]
+
     def test_unpack_writes_expanded_content_to_output_file_when_compressed(self) -> None:
         self.pbofile.original_size = 8
         self.pbofile.data_size = 13
@@ -95,11 +110,77 @@ class TestPBOFile(unittest.TestCase):
 
         assert len(output.getvalue()) == 0
 
+    def test_unpack_data_compares_checksum_modulo_2_to_the_32(self) -> None:
+        self.pbofile.original_size = 16843010
+        self.pbofile.data_size = 13
+
+        with mock.patch("dayz_dev_tools.pbo_file.expand", return_value=b"\xff" * 16843010):
+            assert len(self.pbofile.unpack_data(b"COMPRESSED\xfe\0\0\0")) == 16843010
+
+    def test_read_data_returns_stored_data_without_expanding_it(self) -> None:
+        self.pbofile.original_size = 8
+        self.pbofile.data_size = 13
+        self.pbofile.content_reader = pbo_file_reader.PBOFileReader(
+            io.BytesIO(b"\xffABCDEFGH\x24\x02\0\0"), 0, 13)
+
+        assert self.pbofile.read_data() == b"\xffABCDEFGH\x24\x02\0\0"
+        assert self.pbofile.read_data() == b"\xffABCDEFGH\x24\x02\0\0"
+
+    def test_unpack_data_returns_uncompressed_data_as_is(self) -> None:
+        self.pbofile.original_size = 0
+
+        assert self.pbofile.unpack_data(b"ABCD1234") == b"ABCD1234"
+
+    def test_unpack_data_returns_expanded_data_when_compressed(self) -> None:
+        self.pbofile.original_size = 8
+        self.pbofile.data_size = 13
+
+        assert self.pbofile.unpack_data(b"\xffABCDEFGH\x24\x02\0\0") == b"ABCDEFGH"
+
+    def test_unpack_data_raises_if_checksum_of_expanded_data_does_not_match(self) -> None:
+        self.pbofile.original_size = 8
+        self.pbofile.data_size = 13
+
+        with self.assertRaises(Exception) as error:
+            self.pbofile.unpack_data(b"\xffABCDEFGH\x23\x02\0\0")
+
+        assert str(error.exception) == "Checksum mismatch (0x224 != 0x223)"
+
+    def test_unpack_data_raises_if_compressed_data_is_too_short(self) -> None:
+        self.pbofile.original_size = 8
+        self.pbofile.data_size = 3
+
+        with self.assertRaises(pbo_file_reader.InsufficientBytes):
+            self.pbofile.unpack_data(b"\xff\0\0")
+
+    def test_compressed_returns_true_when_original_size_differs_from_data_size(self) -> None:
+        assert self.pbofile.compressed() is True
+
+        self.pbofile.original_size = 0
+        assert self.pbofile.compressed() is False
+
+        self.pbofile.original_size = self.pbofile.data_size
+        assert self.pbofile.compressed() is False
+
     def test_normalized_filename_returns_filenames_with_os_style_paths(self) -> None:
         self.pbofile.filename = b"xxx\\yyy\\zzz.www"
 
         assert self.pbofile.normalized_filename() == os.path.join("PREFIX", "xxx", "yyy", "zzz.www")
 
+    def test_normalized_filename_is_updated_when_filename_changes(self) -> None:
+        self.pbofile.filename = b"xxx\\yyy.www"
+
+        assert self.pbofile.normalized_filename() == os.path.join("PREFIX", "xxx", "yyy.www")
+        assert self.pbofile.normalized_filename() == os.path.join("PREFIX", "xxx", "yyy.www")
+
+        self.pbofile.filename = b"zzz.www"
+
+        assert self.pbofile.normalized_filename() == os.path.join("PREFIX", "zzz.www")
+
+        self.pbofile.prefix = None
+
+        assert self.pbofile.normalized_filename() == "zzz.www"
+
     def test_normalized_filename_does_not_include_prefix_when_none(self) -> None:
         self.pbofile.prefix = None
         self.pbofile.filename = b"xxx\\yyy\\zzz.www"
@@ -118,6 +199,12 @@ class TestPBOFile(unittest.TestCase):
 
         assert self.pbofile.split_filename() == [b"PREFIX", b"xxx", b"yyy", b"zzz.www"]
 
+    def test_split_filename_splits_prefix_on_path_separators(self) -> None:
+        self.pbofile.prefix = b"DZ\\weapons/"
+        self.pbofile.filename = b"xxx\\zzz.www"
+
+        assert self.pbofile.split_filename() == [b"DZ", b"weapons", b"xxx", b"zzz.www"]
+
     def test_split_filename_does_not_include_prefix_when_none(self) -> None:
         self.pbofile.prefix = None
         self.pbofile.filename = b"xxx\\yyy\\zzz.www"
@@ -0,0 +1,267 @@
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+
+from dayz_dev_tools import config_bin
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_project
+from dayz_dev_tools import pbo_reader
+from dayz_dev_tools import signatures
+
+
+class ProjectTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.root = os.path.realpath(self.tempdir.name)
+
+    def write_file(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "wb") as out_file:
+            out_file.write(data)
+
+        return path
+
+
+class TestLoad(ProjectTestCase):
+    def test_loads_targets_with_defaults(self) -> None:
+        filename = self.write_file("pbo.toml", b"[target.mymod_scripts]\n")
+
+        project = pbo_project.load(filename)
+
+        assert project.targets == {
+            "mymod_scripts": pbo_project.TargetConfig(
+                name="mymod_scripts",
+                pbofile=os.path.join(self.root, ".", "mymod_scripts.pbo"),
+                files=["."],
+                directory=os.path.join(self.root, "mymod_scripts"))
+        }
+
+    def test_loads_targets_with_project_settings(self) -> None:
+        filename = self.write_file("pbo.toml", b"""
+[project]
+output = "@MyMod/addons"
+sign = "keys/mykey.biprivatekey"
+headers = { product = "mymod", prefix = "default" }
+compress = true
+compression_level = 9
+exclude = ["*.bak"]
+
+[target.scripts]
+directory = "source/scripts"
+pbofile = "mymod_scripts.pbo"
+patterns = ["**/*.c"]
+files = ["config.cpp"]
+headers = { prefix = "mymod\\\\scripts" }
+convert = false
+compress_exclude = ["*.json"]
+exclude = ["tests/"]
+
+[target.data]
+sign = "keys/other.biprivatekey"
+compress = false
+compression_level = 1
+""")
+
+        project = pbo_project.load(filename)
+
+        assert project.targets == {
+            "scripts": pbo_project.TargetConfig(
+                name="scripts",
+                pbofile=os.path.join(self.root, "@MyMod/addons", "mymod_scripts.pbo"),
+                files=["config.cpp"],
+                patterns=["**/*.c"],
+                directory=os.path.join(self.root, "source/scripts"),
+                headers=[("product", "mymod"), ("prefix", "mymod\\scripts")],
+                sign=os.path.join(self.root, "keys/mykey.biprivatekey"),
+                convert=False,
+                compress=True,
+                compress_exclude=["*.json"],
+                compression_level=9,
+                exclude=["*.bak", "tests/"]),
+            "data": pbo_project.TargetConfig(
+                name="data",
+                pbofile=os.path.join(self.root, "@MyMod/addons", "data.pbo"),
+                files=["."],
+                directory=os.path.join(self.root, "data"),
+                headers=[("product", "mymod"), ("prefix", "default")],
+                sign=os.path.join(self.root, "keys/other.biprivatekey"),
+                compress=False,
+                compression_level=1,
+                exclude=["*.bak"])
+        }
+
+    def test_raises_when_project_file_is_invalid(self) -> None:
+        filename = self.write_file("pbo.toml", b"[target.scripts]\ncompression_level = 10\n")
+
+        with self.assertRaisesRegex(
+            Exception, r"^Configuration error at target\.scripts\.compression_level: 10: "
+        ):
+            pbo_project.load(filename)
+
+    def test_raises_when_project_file_is_malformed(self) -> None:
+        filename = self.write_file("pbo.toml", b"[target.scripts\n")
+
+        with self.assertRaisesRegex(Exception, r"^Configuration error in "):
+            pbo_project.load(filename)
+
+
+class TestBuildTarget(ProjectTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.write_file("scripts/config.cpp", b"class CfgPatches {};")
+        self.write_file("scripts/4_World/file.c", b"SCRIPT")
+        self.write_file("scripts/notes.txt", b"NOTES")
+
+        self.target = pbo_project.TargetConfig(
+            name="scripts",
+            pbofile=os.path.join(self.root, "scripts.pbo"),
+            files=["config.cpp"],
+            patterns=["**/*.c"],
+            directory=os.path.join(self.root, "scripts"),
+            headers=[("prefix", "mymod\\scripts")])
+
+    def test_collect_files_finds_files_and_pattern_matches(self) -> None:
+        with misc.chdir(self.target.directory):
+            files = pbo_project.collect_files(self.target)
+
+        assert [file.path for file in files] == [
+            pathlib.Path("4_World", "file.c"), pathlib.Path("config.cpp")
+        ]
+        assert files[0].stat is not None and files[0].stat.st_size == 6
+
+    def test_collect_files_skips_excluded_files_in_directories(self) -> None:
+        self.write_file("scripts/.git/HEAD", b"HEAD")
+        self.write_file("scripts/.pboignore", b"*.txt\n")
+        self.target.files = ["."]
+        self.target.patterns = []
+        self.target.exclude = ["4_World/"]
+
+        with misc.chdir(self.target.directory):
+            files = pbo_project.collect_files(self.target)
+
+        assert [file.path for file in files] == [pathlib.Path("config.cpp")]
+
+    def test_build_target_writes_pbo_file(self) -> None:
+        with misc.chdir(self.target.directory):
+            assert pbo_project.build_target(self.target, tools_dir=None) is True
+
+        with open(self.target.pbofile, "rb") as pbo_file:
+            reader = pbo_reader.PBOReader(pbo_file)
+
+            assert reader.prefix() == b"mymod\\scripts"
+            assert sorted(f.normalized_filename() for f in reader.files()) == [
+                os.path.join("mymod", "scripts", "4_World", "file.c"),
+                os.path.join("mymod", "scripts", "config.bin")
+            ]
+
+            config = reader.file(os.path.join("mymod", "scripts", "config.bin"))
+            assert config is not None
+
+            unpacked = io.BytesIO()
+            config.unpack(unpacked)
+            assert config_bin.read(unpacked.getvalue()) == config_bin.Config(
+                [config_bin.ConfigClass("CfgPatches")])
+
+    def test_build_target_stores_config_cpp_that_cannot_be_converted_natively(self) -> None:
+        self.write_file("scripts/config.cpp", b'#include "common.hpp"\r\nclass CfgPatches {};')
+
+        with misc.chdir(self.target.directory):
+            with self.assertLogs(level="WARNING"):
+                assert pbo_project.build_target(self.target, tools_dir=None) is True
+
+        with open(self.target.pbofile, "rb") as pbo_file:
+            reader = pbo_reader.PBOReader(pbo_file)
+
+            assert sorted(f.normalized_filename() for f in reader.files()) == [
+                os.path.join("mymod", "scripts", "4_World", "file.c"),
+                os.path.join("mymod", "scripts", "config.cpp")
+            ]
+
+    def test_build_target_does_not_convert_config_cpp_when_convert_is_false(self) -> None:
+        self.target.convert = False
+
+        with misc.chdir(self.target.directory):
+            assert pbo_project.build_target(self.target, tools_dir=None) is True
+
+        with open(self.target.pbofile, "rb") as pbo_file:
+            reader = pbo_reader.PBOReader(pbo_file)
+
+            assert reader.file(os.path.join("mymod", "scripts", "config.cpp")) is not None
+
+    def test_build_target_skips_up_to_date_pbo_file_when_incremental(self) -> None:
+        with misc.chdir(self.target.directory):
+            assert pbo_project.build_target(self.target, tools_dir=None, incremental=True) is True
+            assert pbo_project.build_target(self.target, tools_dir=None, incremental=True) \
+                is False
+
+    def test_build_target_signs_pbo_file(self) -> None:
+        key = signatures.generate_private_key("mykey", bits=512)
+        signatures.write_private_key(key, os.path.join(self.root, "mykey.biprivatekey"))
+
+        self.target.sign = os.path.join(self.root, "mykey.biprivatekey")
+        self.target.convert = False
+
+        with misc.chdir(self.target.directory):
+            pbo_project.build_target(self.target, tools_dir=None)
+
+        assert signatures.verify(
+            self.target.pbofile, f"{self.target.pbofile}.mykey.bisign", key.public_key())
+
+
+class TestBuildProject(ProjectTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        for name in ["one", "two", "three"]:
+            self.write_file(f"{name}/file.c", name.encode())
+
+        self.project = pbo_project.ProjectConfig(
+            targets={
+                name: pbo_project.TargetConfig(
+                    name=name,
+                    pbofile=os.path.join(self.root, f"{name}.pbo"),
+                    files=["."],
+                    directory=os.path.join(self.root, name))
+                for name in ["one", "two", "three"]
+            })
+
+    def test_builds_all_targets_and_skips_up_to_date_targets(self) -> None:
+        statistics = pbo_project.build_project(self.project, tools_dir=None, jobs=2)
+
+        assert statistics == pbo_project.BuildStatistics(built=3, skipped=0)
+
+        for name in ["one", "two", "three"]:
+            assert os.path.exists(os.path.join(self.root, f"{name}.pbo"))
+
+        self.write_file("two/file.c", b"changed")
+
+        statistics = pbo_project.build_project(self.project, tools_dir=None, jobs=2)
+
+        assert statistics == pbo_project.BuildStatistics(built=1, skipped=2)
+
+        statistics = pbo_project.build_project(
+            self.project, ["one"], tools_dir=None, force=True, jobs=2)
+
+        assert statistics == pbo_project.BuildStatistics(built=1, skipped=0)
+
+    def test_raises_when_target_is_unknown(self) -> None:
+        with self.assertRaisesRegex(Exception, r"^Unknown target: four$"):
+            pbo_project.build_project(self.project, ["one", "four"], tools_dir=None)
+
+    def test_raises_when_targets_fail_to_build(self) -> None:
+        self.project.targets["two"].directory = os.path.join(self.root, "missing")
+
+        with self.assertRaisesRegex(Exception, r"^Failed to build 1 of 3 targets$"):
+            pbo_project.build_project(self.project, tools_dir=None, jobs=2)
+
+        assert os.path.exists(os.path.join(self.root, "one.pbo"))
+        assert os.path.exists(os.path.join(self.root, "three.pbo"))
@@ -1,9 +1,16 @@
 import io
 import hashlib
+import os
 import pathlib
+import struct
+import tempfile
+import threading
+import typing
 import unittest
 from unittest import mock
 
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_reader
 from dayz_dev_tools import pbo_writer
 
 
@@ -69,6 +76,42 @@ class TestPBOWriter(unittest.TestCase):
             b"\x78\x56\x34\x12\x0d\x00\x00\x00" + (b"\x00" * 21) + b"FILE-CONTENTS" == data[22:-21]
         assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
 
+    @mock.patch.object(pathlib.Path, "stat")
+    def test_write_copies_file_contents_in_chunks_when_memory_is_limited(
+        self, mock_stat: mock.Mock
+    ) -> None:
+        output = io.BytesIO()
+        mock_open = mock.mock_open(read_data=b"FILE-CONTENTS")
+
+        mock_stat.return_value.st_size = 13
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        with mock.patch("builtins.open", mock_open):
+            writer = pbo_writer.PBOWriter(cfgconvert=None, max_memory=55)
+            writer.add_file(pathlib.Path("FILENAME"))
+            writer.write(output)
+
+        assert mock_open.return_value.__enter__.return_value.read.call_args_list == [
+            mock.call(5), mock.call(5), mock.call(4)
+        ]
+
+        data = output.getvalue()
+
+        assert data.endswith(b"FILE-CONTENTS" + b"\x00" + hashlib.sha1(data[:-21]).digest())
+
+    @mock.patch.object(pathlib.Path, "stat")
+    def test_write_raises_if_file_size_has_changed(self, mock_stat: mock.Mock) -> None:
+        mock_stat.return_value.st_size = 10
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        for contents in [b"FILE-CONTENTS", b"SHORT"]:
+            with mock.patch("builtins.open", mock.mock_open(read_data=contents)):
+                writer = pbo_writer.PBOWriter(cfgconvert=None)
+                writer.add_file(pathlib.Path("FILENAME"))
+
+                with self.assertRaisesRegex(Exception, r"^File size mismatch \d+ != 10$"):
+                    writer.write(io.BytesIO())
+
     @mock.patch.object(pathlib.Path, "stat")
     def test_add_file_removes_anchor_from_filename(self, mock_stat: mock.Mock) -> None:
         output = io.BytesIO()
@@ -121,6 +164,55 @@ class TestPBOWriter(unittest.TestCase):
             b"\x78\x56\x34\x12\x0c\x00\x00\x00" + (b"\x00" * 21) + b"BIN-CONTENTS" == data[22:-21]
         assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
 
+    def test_add_file_converts_config_cpp_files_concurrently(self) -> None:
+        # Each conversion waits until all three are running, so they cannot run one at a time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def convert(cpp_content: bytes, executable: str) -> bytes:
+            barrier.wait()
+            return cpp_content.replace(b"CPP", b"BIN")
+
+        output = io.BytesIO()
+
+        with tempfile.TemporaryDirectory() as tempdir, misc.chdir(tempdir), \
+                mock.patch("dayz_dev_tools.config_cpp.cpp_to_bin", side_effect=convert):
+            writer = pbo_writer.PBOWriter(cfgconvert="path/to/cfgconvert.exe", jobs=3)
+
+            for name in ["one", "two", "three"]:
+                os.makedirs(name)
+                pathlib.Path(name, "config.cpp").write_bytes(f"{name.upper()}-CPP".encode())
+                writer.add_file(pathlib.Path(name, "config.cpp"))
+
+            writer.write(output)
+
+        output.seek(0)
+        reader = pbo_reader.PBOReader(output)
+
+        assert [(f.filename, f.data_size) for f in reader.files()] == [
+            (b"one\\config.bin", 7), (b"three\\config.bin", 9), (b"two\\config.bin", 7)
+        ]
+
+        contents = reader.file(os.path.join("three", "config.bin"))
+        assert contents is not None
+        assert contents.read_data() == b"THREE-BIN"
+
+    @mock.patch.object(pathlib.Path, "stat")
+    @mock.patch("dayz_dev_tools.config_cpp.cpp_to_bin", side_effect=Exception("bad config"))
+    def test_write_raises_when_config_cpp_conversion_fails(
+        self,
+        mock_cpp_to_bin: mock.Mock,
+        mock_stat: mock.Mock
+    ) -> None:
+        mock_stat.return_value.st_size = 13
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        with mock.patch("builtins.open", mock.mock_open(read_data=b"FILE-CONTENTS")):
+            writer = pbo_writer.PBOWriter(cfgconvert="path/to/cfgconvert.exe")
+            writer.add_file(pathlib.Path("config.cpp"))
+
+        with self.assertRaisesRegex(Exception, r"^bad config$"):
+            writer.write(io.BytesIO())
+
     @mock.patch.object(pathlib.Path, "stat")
     def test_add_file_does_not_convert_config_cpp_if_cfgconvert_is_none(
         self,
@@ -208,3 +300,322 @@ class TestPBOWriter(unittest.TestCase):
             writer.add_file(path)
             with self.assertRaises(Exception):
                 writer.write(output)
+
+    def test_write_streams_large_files_through_pipeline(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir:
+            contents = [os.urandom(3 * 1024 * 1024 + 17), os.urandom(1024)]
+            for index, data in enumerate(contents):
+                with open(os.path.join(tempdir, f"file{index}"), "wb") as out_file:
+                    out_file.write(data)
+
+            output = io.BytesIO()
+            writer = pbo_writer.PBOWriter(cfgconvert=None, max_memory=1024 * 1024)
+            with misc.chdir(tempdir):
+                writer.add_file(pathlib.Path("file0"))
+                writer.add_file(pathlib.Path("file1"))
+                writer.write(output)
+
+        data = output.getvalue()
+
+        assert data[-21 - len(contents[1]):-21] == contents[1]
+        assert data[-21 - len(contents[1]) - len(contents[0]):-21 - len(contents[1])] == \
+            contents[0]
+        assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
+
+    @mock.patch.object(pathlib.Path, "stat")
+    def test_write_stops_reading_when_output_fails(self, mock_stat: mock.Mock) -> None:
+        output = mock.Mock()
+        output.write.side_effect = [1] * 10 + [OSError("disk full")]
+        mock_open = mock.mock_open(read_data=b"X" * 100)
+
+        mock_stat.return_value.st_size = 100
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        # Writes are not collected into blocks, so every chunk is written to the output
+        with mock.patch("builtins.open", mock_open), \
+                mock.patch.object(pbo_writer, "_BLOCK_SIZE", 1):
+            writer = pbo_writer.PBOWriter(cfgconvert=None, max_memory=11)
+            writer.add_file(pathlib.Path("FILENAME"))
+
+            with self.assertRaisesRegex(OSError, r"^disk full$"):
+                writer.write(output)
+
+    def test_write_stops_hashing_when_compression_fails(self) -> None:
+        hash_writers: list[pbo_writer._HashWriter] = []
+        original = pbo_writer._HashWriter
+
+        def create_hash_writer(output: typing.BinaryIO) -> pbo_writer._HashWriter:
+            hash_writers.append(original(output))
+            return hash_writers[-1]
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        writer.add_bytes("script.c", b"CONTENT")
+
+        with mock.patch.object(pbo_writer, "_HashWriter", side_effect=create_hash_writer), \
+                mock.patch.object(pbo_writer, "compress", side_effect=ValueError("failed")):
+            with self.assertRaisesRegex(ValueError, r"^failed$"):
+                writer.write(io.BytesIO())
+
+        assert len(hash_writers) == 1
+        assert not hash_writers[0].thread.is_alive()
+
+    def test_write_collects_small_writes_into_blocks(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir:
+            for index in range(100):
+                with open(os.path.join(tempdir, f"file{index}.c"), "wb") as out_file:
+                    out_file.write(b"X" * 200)
+
+            output = io.BytesIO()
+            writer = pbo_writer.PBOWriter(cfgconvert=None)
+            with misc.chdir(tempdir):
+                for index in range(100):
+                    writer.add_file(pathlib.Path(f"file{index}.c"))
+
+                with mock.patch.object(output, "write", wraps=output.write) as mock_write:
+                    writer.write(output)
+
+        data = output.getvalue()
+
+        # All entries and contents are written at once, followed by the checksum
+        assert mock_write.call_count == 2
+        assert data[-21 - 100 * 200:-21] == b"X" * 100 * 200
+        assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
+
+    def test_write_compresses_files_selected_by_compression_policy(self) -> None:
+        source = b"class Foo\r\n{\r\n    int value;\r\n};\r\n" * 200
+        texture = os.urandom(2048)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            os.makedirs(os.path.join(tempdir, "scripts"))
+            for name, data in [("scripts/foo.c", source), ("texture.paa", texture)]:
+                with open(os.path.join(tempdir, name), "wb") as out_file:
+                    out_file.write(data)
+
+            output = io.BytesIO()
+            writer = pbo_writer.PBOWriter(
+                cfgconvert=None, compress=pbo_writer.compression_policy(), jobs=2)
+            with misc.chdir(tempdir):
+                writer.add_file(pathlib.Path("scripts", "foo.c"))
+                writer.add_file(pathlib.Path("texture.paa"))
+                writer.write(output)
+
+        data = output.getvalue()
+        reader = pbo_reader.PBOReader(io.BytesIO(data))
+
+        compressed = reader.file(os.path.join("scripts", "foo.c"))
+        assert compressed is not None
+        assert compressed.mime_type == struct.pack("<I", 0x43707273)
+        assert compressed.data_size < len(source)
+        assert compressed.unpacked_size() == len(source)
+
+        unpacked = io.BytesIO()
+        compressed.unpack(unpacked)
+        assert unpacked.getvalue() == source
+
+        stored = reader.file("texture.paa")
+        assert stored is not None
+        assert stored.mime_type == b"\x00" * 4
+        assert stored.data_size == len(texture)
+
+        assert b"\x00" + hashlib.sha1(data[:-21]).digest() == data[-21:]
+
+    @mock.patch.object(pathlib.Path, "stat")
+    def test_write_stores_files_that_do_not_become_smaller_when_compressed(
+        self, mock_stat: mock.Mock
+    ) -> None:
+        contents = os.urandom(100)
+        output = io.BytesIO()
+        mock_open = mock.mock_open(read_data=contents)
+
+        mock_stat.return_value.st_size = len(contents)
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        with mock.patch("builtins.open", mock_open):
+            writer = pbo_writer.PBOWriter(
+                cfgconvert=None, compress=pbo_writer.compression_policy(include=["*"]))
+            writer.add_file(pathlib.Path("FILENAME"))
+            writer.write(output)
+
+        data = output.getvalue()
+
+        assert b"FILENAME\x00" + struct.pack("<4xIIII", 100, 0, 305419896, 100) in data
+        assert data[-21 - len(contents):-21] == contents
+
+    def test_compression_policy_uses_default_patterns(self) -> None:
+        policy = pbo_writer.compression_policy()
+
+        assert policy.matches(os.path.join("scripts", "3_Game", "file.c"))
+        assert policy.matches(os.path.join("gui", "layouts", "menu.layout"))
+        assert not policy.matches(os.path.join("data", "texture_co.paa"))
+        assert not policy.matches("model.p3d")
+
+    def test_compression_policy_never_compresses_compressed_formats(self) -> None:
+        policy = pbo_writer.compression_policy(include=["*"], exclude=["*.p3d"])
+
+        assert policy.matches("config.bin")
+        assert not policy.matches("sound.ogg")
+        assert not policy.matches("model.p3d")
+
+    def test_add_bytes_includes_generated_contents(self) -> None:
+        output = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_bytes("generated/config.cpp", b"class CfgPatches {};", 305419896)
+        writer.add_bytes("\\readme.txt", b"README")
+        writer.write(output)
+
+        reader = pbo_reader.PBOReader(io.BytesIO(output.getvalue()))
+
+        assert [f.filename for f in reader.files()] == [b"generated\\config.cpp", b"readme.txt"]
+
+        generated = reader.file(os.path.join("generated", "config.cpp"))
+        assert generated is not None
+        assert generated.time_stamp == 305419896
+
+        unpacked = io.BytesIO()
+        generated.unpack(unpacked)
+        assert unpacked.getvalue() == b"class CfgPatches {};"
+
+    def test_add_bytes_raises_when_stored_path_is_empty(self) -> None:
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+
+        with self.assertRaisesRegex(Exception, r"^Invalid filename: '/'$"):
+            writer.add_bytes("/", b"DATA")
+
+    def test_add_bytes_raises_when_stored_path_is_already_used(self) -> None:
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_bytes("dir/a.txt", b"one")
+
+        with self.assertRaisesRegex(Exception, r"^Duplicate filename: 'DIR\\\\A\.txt'$"):
+            writer.add_bytes("\\DIR\\A.txt", b"two")
+
+        assert [e.contents for e in writer.entries] == [b"one"]
+
+    @mock.patch.object(pathlib.Path, "stat")
+    def test_add_file_and_add_bytes_raise_when_stored_path_is_already_used(
+        self, mock_stat: mock.Mock
+    ) -> None:
+        mock_stat.return_value.st_size = 7
+        mock_stat.return_value.st_mtime = 305419896.567
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_file(pathlib.Path("dir/a.txt"))
+
+        with self.assertRaisesRegex(Exception, r"^Duplicate filename: 'dir\\\\a\.txt'$"):
+            writer.add_bytes("dir/a.txt", b"two")
+
+        with self.assertRaisesRegex(Exception, r"^Duplicate filename: 'Dir\\\\A\.txt'$"):
+            writer.add_file(pathlib.Path("Dir/A.txt"))
+
+    def test_add_stream_reads_contents_when_writing(self) -> None:
+        source = b"class Foo\r\n{\r\n    int value;\r\n};\r\n" * 200
+        stream = io.BytesIO(b"HEADER" + source)
+        stream.seek(6)
+        output = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        writer.add_stream("scripts/foo.c", stream, len(source), 305419896)
+        stream.seek(0)
+        writer.write(output)
+
+        reader = pbo_reader.PBOReader(io.BytesIO(output.getvalue()))
+        entry = reader.file(os.path.join("scripts", "foo.c"))
+        assert entry is not None
+        assert entry.compressed()
+
+        unpacked = io.BytesIO()
+        entry.unpack(unpacked)
+        assert unpacked.getvalue() == source
+
+    def test_add_stream_reads_unseekable_streams_immediately(self) -> None:
+        stream = mock.Mock()
+        stream.seekable.return_value = False
+        stream.read.side_effect = [b"DATA", b""]
+        output = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_stream("data.bin", stream, 4, 305419896)
+        stream.read.side_effect = Exception("read after add")
+        writer.write(output)
+
+        data = output.getvalue()
+
+        assert b"data.bin\x00" + struct.pack("<4xIIII", 4, 0, 305419896, 4) in data
+        assert data[-25:-21] == b"DATA"
+
+    def test_add_stream_raises_when_stream_size_does_not_match(self) -> None:
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_stream("data.bin", io.BytesIO(b"DATA"), 5)
+
+        with self.assertRaisesRegex(Exception, r"^File size mismatch 4 != 5$"):
+            writer.write(io.BytesIO())
+
+    def test_add_from_pbo_keeps_names_that_are_not_valid_utf8(self) -> None:
+        original = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_bytes("caf\udce9.c", b"CONTENT", 1000)
+        writer.write(original)
+
+        source_reader = pbo_reader.PBOReader(io.BytesIO(original.getvalue()))
+        assert [entry.filename for entry in source_reader.files()] == [b"caf\xe9.c"]
+
+        output = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_from_pbo(source_reader.files()[0])
+        writer.write(output)
+
+        reader = pbo_reader.PBOReader(io.BytesIO(output.getvalue()))
+        assert [entry.filename for entry in reader.files()] == [b"caf\xe9.c"]
+
+    def test_add_from_pbo_locks_reads_of_each_archive_separately(self) -> None:
+        archives = []
+        for name in ["first.c", "second.c"]:
+            original = io.BytesIO()
+            writer = pbo_writer.PBOWriter(cfgconvert=None)
+            writer.add_bytes(name, b"CONTENT", 1000)
+            writer.add_bytes("other.c", b"OTHER", 1000)
+            writer.write(original)
+            archives.append(pbo_reader.PBOReader(io.BytesIO(original.getvalue())))
+
+        sources = []
+        for archive in archives:
+            for entry in archive.files():
+                assert entry.content_reader is not None
+                sources.append(pbo_writer._ArchiveSource(entry.content_reader))
+
+        assert sources[0].lock is sources[1].lock
+        assert sources[2].lock is sources[3].lock
+        assert sources[0].lock is not sources[2].lock
+
+    def test_add_from_pbo_copies_files_from_another_archive(self) -> None:
+        source = b"class Foo\r\n{\r\n    int value;\r\n};\r\n" * 200
+        original = io.BytesIO()
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        writer.add_bytes("scripts/foo.c", source, 1000)
+        writer.add_bytes("data.bin", b"DATA" * 64, 2000)
+        writer.write(original)
+
+        output = io.BytesIO()
+        source_reader = pbo_reader.PBOReader(io.BytesIO(original.getvalue()))
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        for entry in source_reader.files():
+            writer.add_from_pbo(entry)
+        writer.add_from_pbo(source_reader.files()[0], "copy/data.bin")
+        writer.write(output)
+
+        reader = pbo_reader.PBOReader(io.BytesIO(output.getvalue()))
+        contents = {}
+        for entry in reader.files():
+            unpacked = io.BytesIO()
+            entry.unpack(unpacked)
+            contents[entry.filename] = (entry.time_stamp, unpacked.getvalue())
+
+        assert contents == {
+            b"copy\\data.bin": (2000, b"DATA" * 64),
+            b"data.bin": (2000, b"DATA" * 64),
+            b"scripts\\foo.c": (1000, source)
+        }
@@ -8,6 +8,7 @@ from unittest import mock
 from dayz_dev_tools import launch_settings
 from dayz_dev_tools import run_server
 from dayz_dev_tools import server_config
+from dayz_dev_tools import signature_check
 
 from tests import helpers
 
@@ -176,6 +177,11 @@ class TestRunServer(unittest.TestCase):
         self.mock_copy_keys = copy_keys_patcher.start()
         self.addCleanup(copy_keys_patcher.stop)
 
+        check_mods_patcher = mock.patch(
+            "dayz_dev_tools.signature_check.check_mods", return_value=[])
+        self.mock_check_mods = check_mods_patcher.start()
+        self.addCleanup(check_mods_patcher.stop)
+
         newest_patcher = mock.patch("dayz_dev_tools.script_logs.newest")
         self.mock_newest = newest_patcher.start()
         self.addCleanup(newest_patcher.stop)
@@ -299,6 +305,65 @@ class TestRunServer(unittest.TestCase):
             ],
             stdout=subprocess.DEVNULL)
 
+    def test_verifies_signatures_of_mods_but_not_server_mods_when_enabled(self) -> None:
+        self.mock_stat.return_value = mock.Mock(st_mode=stat.S_IFDIR)
+        self.server_config.verify_signatures = True
+
+        settings = launch_settings.LaunchSettings(self.server_config)
+        settings.add_mod("some-mod")
+        settings.add_server_mod("server-mod")
+
+        run_server.run_server(settings, localappdata="localappdata", wait=False)
+
+        self.mock_check_mods.assert_called_once_with(["some-mod"], "keys")
+
+    def test_does_not_verify_signatures_when_only_server_mods_are_added(self) -> None:
+        self.mock_stat.return_value = mock.Mock(st_mode=stat.S_IFDIR)
+        self.server_config.verify_signatures = True
+
+        settings = launch_settings.LaunchSettings(self.server_config)
+        settings.add_server_mod("server-mod")
+
+        run_server.run_server(settings, localappdata="localappdata", wait=False)
+
+        self.mock_check_mods.assert_not_called()
+        self.mock_popen.assert_called_once()
+
+    def test_does_not_run_executable_when_signatures_are_not_verified(self) -> None:
+        self.mock_stat.return_value = mock.Mock(st_mode=stat.S_IFDIR)
+        self.server_config.verify_signatures = True
+        self.mock_check_mods.return_value = [
+            signature_check.Failure("some-mod/addons/a.pbo", "No signature found"),
+            signature_check.Failure("some-mod/addons/b.pbo", "Signature `b` does not match")
+        ]
+
+        settings = launch_settings.LaunchSettings(self.server_config)
+        settings.add_mod("some-mod")
+
+        with self.assertRaisesRegex(
+            Exception, r"^Signatures of 2 PBO files could not be verified$"
+        ), self.assertLogs(level="ERROR") as logs:
+            run_server.run_server(settings, localappdata="localappdata", wait=False)
+
+        assert logs.output == [
+            "ERROR:root:Unverified signature for `some-mod/addons/a.pbo`: No signature found",
+            "ERROR:root:Unverified signature for `some-mod/addons/b.pbo`:"
+            " Signature `b` does not match"
+        ]
+
+        self.mock_popen.assert_not_called()
+
+    def test_does_not_verify_signatures_by_default(self) -> None:
+        self.mock_stat.return_value = mock.Mock(st_mode=stat.S_IFDIR)
+
+        settings = launch_settings.LaunchSettings(self.server_config)
+        settings.add_mod("some-mod")
+
+        run_server.run_server(settings, localappdata="localappdata", wait=False)
+
+        self.mock_check_mods.assert_not_called()
+        self.mock_popen.assert_called_once()
+
     def test_raises_if_mod_directory_is_not_a_directory(self) -> None:
         self.mock_stat.return_value = mock.Mock(st_mode=stat.S_IFCHR)
 
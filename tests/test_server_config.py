@@ -77,6 +77,7 @@ profile_directory = "PROFILE"
 mission_directory = "MISSION"
 parameters = ["-opt1", "-opt2=value"]
 bundles = "BUNDLES"
+verify_signatures = true
 
 [workshop]
 directory = "WORKSHOP-DIRECTORY"
@@ -93,6 +94,7 @@ directory = "WORKSHOP-DIRECTORY"
             bundle_path="BUNDLES",
             workshop_directory="WORKSHOP-DIRECTORY",
             parameters=["-opt1", "-opt2=value"],
+            verify_signatures=True,
             bundles={})
 
     def test_returns_config_with_bundles_when_present_in_config_file(self) -> None:
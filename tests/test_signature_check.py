@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import pbo_writer
+from dayz_dev_tools import signature_check
+from dayz_dev_tools import signatures
+
+
+class TestCheckMods(unittest.TestCase):
+    key: signatures.PrivateKey
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.key = signatures.generate_private_key("mykey", bits=512)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.keys_dir = self.path("keys")
+        os.makedirs(self.keys_dir)
+        signatures.write_public_key(
+            self.key.public_key(), os.path.join(self.keys_dir, "mykey.bikey"))
+
+        self.cache_file = self.path("cache.json")
+
+        self.first = self.create_pbo("@First", "first.pbo")
+        self.second = self.create_pbo("@Second", "second.pbo")
+        signatures.sign(self.first, self.key)
+        signatures.sign(self.second, self.key)
+
+    def path(self, *names: str) -> str:
+        return os.path.join(self.tempdir.name, *names)
+
+    def create_pbo(self, mod: str, name: str) -> str:
+        os.makedirs(self.path(mod, "addons"), exist_ok=True)
+
+        writer = pbo_writer.PBOWriter(cfgconvert=None)
+        writer.add_header("prefix", name)
+
+        with open(self.path(mod, "addons", name), "wb") as output:
+            writer.write(output)
+
+        return self.path(mod, "addons", name)
+
+    def check(self) -> list[signature_check.Failure]:
+        return signature_check.check_mods(
+            [self.path("@First"), self.path("@Second")], self.keys_dir,
+            cache_file=self.cache_file, jobs=2)
+
+    def test_returns_no_failures_when_all_signatures_are_verified(self) -> None:
+        assert self.check() == []
+
+    def test_reports_missing_unknown_and_mismatched_signatures(self) -> None:
+        unsigned = self.create_pbo("@First", "unsigned.pbo")
+
+        other_key = signatures.generate_private_key("otherkey", bits=512)
+        signatures.sign(self.second, other_key)
+        os.unlink(f"{self.second}.mykey.bisign")
+
+        modified = self.create_pbo("@Second", "modified.pbo")
+        signatures.sign(modified, self.key)
+        with open(modified, "r+b") as pbo_file:
+            pbo_file.seek(30)
+            pbo_file.write(b"X")
+
+        assert sorted(self.check(), key=lambda f: f.pbofile) == [
+            signature_check.Failure(unsigned, "No signature found"),
+            signature_check.Failure(
+                modified, "Signature `modified.pbo.mykey.bisign` does not match"),
+            signature_check.Failure(
+                self.second, "No key found for signature `second.pbo.otherkey.bisign`")
+        ]
+
+    def test_skips_archives_verified_by_earlier_checks(self) -> None:
+        assert self.check() == []
+
+        with open(self.cache_file) as cache:
+            assert sorted(json.load(cache)["verified"]) == sorted([
+                os.path.abspath(self.first), os.path.abspath(self.second)
+            ])
+
+        with mock.patch("dayz_dev_tools.signatures.verify", return_value=True) as mock_verify:
+            assert self.check() == []
+
+            mock_verify.assert_not_called()
+
+            # Changing an archive invalidates its cached result
+            os.utime(self.first, ns=(1_000_000_000, 1_000_000_000))
+
+            assert self.check() == []
+
+            mock_verify.assert_called_once_with(
+                self.first, f"{self.first}.mykey.bisign", self.key.public_key())
+
+    def test_reports_all_archives_when_keys_directory_does_not_exist(self) -> None:
+        failures = signature_check.check_mods(
+            [self.path("@First")], self.path("missing"), cache_file=None)
+
+        assert failures == [
+            signature_check.Failure(
+                self.first, "No key found for signature `first.pbo.mykey.bisign`")
+        ]
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import pathlib
+import struct
+import tempfile
+import unittest
+
+from dayz_dev_tools import misc
+from dayz_dev_tools import pbo_writer
+from dayz_dev_tools import signatures
+
+
+class TestSignatures(unittest.TestCase):
+    key: signatures.PrivateKey
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.key = signatures.generate_private_key("testkey", bits=1024)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        self.pbofile = self.create_pbo("mod.pbo", {
+            "config.cpp": b"class CfgPatches {};\n",
+            "scripts/4_World/file.c": b"class Foo {};\n" * 100,
+            "data/texture.paa": b"PAA" * 100,
+            "data/empty.txt": b""
+        })
+
+    def create_pbo(self, name: str, files: dict[str, bytes]) -> str:
+        writer = pbo_writer.PBOWriter(cfgconvert=None, compress=pbo_writer.compression_policy())
+        writer.add_header("prefix", "mymod")
+        source = os.path.join(self.tempdir.name, f"{name}.source")
+
+        with misc.chdir(self.tempdir.name):
+            os.makedirs(source)
+
+            with misc.chdir(source):
+                for filename, data in files.items():
+                    path = pathlib.Path(*filename.split("/"))
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(data)
+                    writer.add_file(path)
+
+                with open(os.path.join(self.tempdir.name, name), "wb") as output:
+                    writer.write(output)
+
+        return os.path.join(self.tempdir.name, name)
+
+    def test_private_and_public_keys_round_trip(self) -> None:
+        private_path = os.path.join(self.tempdir.name, "testkey.biprivatekey")
+        public_path = os.path.join(self.tempdir.name, "testkey.bikey")
+
+        signatures.write_private_key(self.key, private_path)
+        signatures.write_public_key(self.key.public_key(), public_path)
+
+        assert signatures.read_private_key(private_path) == self.key
+        assert signatures.read_public_key(public_path) == self.key.public_key()
+
+        with open(public_path, "rb") as public_file:
+            data = public_file.read()
+
+        assert data[:8] == b"testkey\x00"
+        assert struct.unpack_from("<IBBHI4sII", data, 8) == (
+            148, 0x06, 2, 0, 0x2400, b"RSA1", 1024, 65537)
+        assert len(data) == 8 + 4 + 148
+
+    def test_read_private_key_raises_when_file_is_not_a_private_key(self) -> None:
+        public_path = os.path.join(self.tempdir.name, "testkey.bikey")
+        signatures.write_public_key(self.key.public_key(), public_path)
+
+        with self.assertRaisesRegex(Exception, r"^Invalid key file: .*testkey\.bikey$"):
+            signatures.read_private_key(public_path)
+
+    def test_sign_creates_signature_verified_by_public_key(self) -> None:
+        path = signatures.sign(self.pbofile, self.key)
+
+        assert path == f"{self.pbofile}.testkey.bisign"
+
+        signature = signatures.read_signature(path)
+
+        assert signature.key == self.key.public_key()
+        assert signature.version == 2
+        assert signatures.verify(self.pbofile, path, self.key.public_key())
+
+    def test_sign_creates_version_3_signature(self) -> None:
+        path = signatures.sign(self.pbofile, self.key, version=3)
+
+        assert signatures.read_signature(path).version == 3
+        assert signatures.verify(self.pbofile, path, self.key.public_key())
+
+    def test_signature_hashes_cover_archive_names_and_contents(self) -> None:
+        path = signatures.sign(self.pbofile, self.key)
+        signature = signatures.read_signature(path)
+
+        with open(self.pbofile, "rb") as pbo_file:
+            archive_hash = hashlib.sha1(pbo_file.read()[:-21]).digest()
+
+        # The first signature is of the archive's checksum, padded as for PKCS #1 v1.5
+        padded = pow(signature.signatures[0], self.key.e, self.key.n).to_bytes(128, "big")
+
+        assert padded.startswith(b"\x00\x01\xff")
+        assert padded.endswith(bytes.fromhex("3021300906052b0e03021a05000414") + archive_hash)
+
+        name_hash = hashlib.sha1(
+            b"config.cpp" + b"data\\texture.paa" + b"scripts\\4_world\\file.c").digest()
+        padded = pow(signature.signatures[1], self.key.e, self.key.n).to_bytes(128, "big")
+
+        assert padded.endswith(hashlib.sha1(archive_hash + name_hash + b"mymod\\").digest())
+
+        content_hash = hashlib.sha1(
+            b"class CfgPatches {};\n" + b"class Foo {};\n" * 100).digest()
+        padded = pow(signature.signatures[2], self.key.e, self.key.n).to_bytes(128, "big")
+
+        assert padded.endswith(hashlib.sha1(content_hash + name_hash + b"mymod\\").digest())
+
+    def test_verify_returns_false_when_archive_is_modified(self) -> None:
+        path = signatures.sign(self.pbofile, self.key)
+
+        other = self.create_pbo("other.pbo", {
+            "config.cpp": b"class CfgPatches {};\n",
+            "scripts/4_World/file.c": b"class Bar {};\n" * 100,
+            "data/texture.paa": b"PAA" * 100
+        })
+        os.replace(other, self.pbofile)
+
+        assert not signatures.verify(self.pbofile, path, self.key.public_key())
+
+    def test_verify_returns_false_when_archive_checksum_is_wrong(self) -> None:
+        path = signatures.sign(self.pbofile, self.key)
+
+        with open(self.pbofile, "r+b") as pbo_file:
+            pbo_file.seek(-1, os.SEEK_END)
+            last = pbo_file.read(1)
+            pbo_file.seek(-1, os.SEEK_END)
+            pbo_file.write(bytes([last[0] ^ 0xff]))
+
+        assert not signatures.verify(self.pbofile, path, self.key.public_key())
+
+    def test_verify_returns_false_for_other_keys(self) -> None:
+        path = signatures.sign(self.pbofile, self.key)
+        other_key = signatures.generate_private_key("testkey", bits=512)
+
+        assert not signatures.verify(self.pbofile, path, other_key.public_key())
+
+    def test_verify_returns_false_when_signature_is_missing(self) -> None:
+        assert not signatures.verify(
+            self.pbofile, f"{self.pbofile}.testkey.bisign", self.key.public_key())
+
+    def test_sign_all_signs_archives_in_parallel(self) -> None:
+        other = self.create_pbo("other.pbo", {"config.cpp": b"OTHER"})
+
+        paths = signatures.sign_all([self.pbofile, other], self.key, jobs=2)
+
+        assert paths == [f"{self.pbofile}.testkey.bisign", f"{other}.testkey.bisign"]
+
+        for pbofile, path in zip([self.pbofile, other], paths):
+            assert signatures.verify(pbofile, path, self.key.public_key())
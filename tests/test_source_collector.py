@@ -0,0 +1,94 @@
+import os
+import pathlib
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+from dayz_dev_tools import source_collector
+
+
+class TestWalk(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        for name in [
+            "config.cpp",
+            "scripts/4_World/file.c",
+            "scripts/4_World/file.c~",
+            "scripts/.git/HEAD",
+            "data/texture.paa",
+            "data/source/texture.psd",
+            "mymod.pbo",
+            "mymod.pbo.manifest"
+        ]:
+            self.write_file(name, name.encode())
+
+    def write_file(self, name: str, data: bytes) -> None:
+        path = pathlib.Path(self.tempdir.name, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def walk(self, **kwargs: typing.Any) -> list[str]:
+        return [
+            file.path.relative_to(self.tempdir.name).as_posix()
+            for file in source_collector.walk(self.tempdir.name, **kwargs)
+        ]
+
+    def test_finds_files_and_skips_default_ignore_patterns(self) -> None:
+        assert self.walk() == [
+            "config.cpp",
+            "data/source/texture.psd",
+            "data/texture.paa",
+            "scripts/4_World/file.c"
+        ]
+
+    def test_finds_all_files_without_default_ignore_patterns(self) -> None:
+        assert len(self.walk(default_excludes=False)) == 8
+
+    def test_returns_status_of_each_file(self) -> None:
+        files = list(source_collector.walk(self.tempdir.name))
+
+        for file in files:
+            assert file.stat == os.stat(file.path)
+
+    def test_skips_files_matching_exclude_patterns(self) -> None:
+        assert self.walk(exclude=["/config.cpp", "*.psd", "4_*/"]) == ["data/texture.paa"]
+        assert self.walk(exclude=["/config.cpp", "source/", "**/4_World/*.c"]) == [
+            "data/texture.paa"
+        ]
+
+    def test_negated_patterns_include_ignored_files(self) -> None:
+        assert self.walk(exclude=["*.paa", "!texture.*", "!*.pbo"]) == [
+            "config.cpp",
+            "data/source/texture.psd",
+            "data/texture.paa",
+            "mymod.pbo",
+            "scripts/4_World/file.c"
+        ]
+
+    def test_applies_ignore_files_to_their_directory(self) -> None:
+        self.write_file("data/.pboignore", b"# Source files\n/source/\n\n*.c\n")
+        self.write_file("data/other.c", b"OTHER")
+
+        assert self.walk() == [
+            "config.cpp",
+            "data/texture.paa",
+            "scripts/4_World/file.c"
+        ]
+
+    def test_does_not_descend_into_ignored_directories(self) -> None:
+        scanned = []
+        scandir = os.scandir
+
+        def mock_scandir(path: str) -> typing.Any:
+            scanned.append(pathlib.Path(path).relative_to(self.tempdir.name).as_posix())
+            return scandir(path)
+
+        with mock.patch("os.scandir", side_effect=mock_scandir):
+            self.walk(exclude=["data/"])
+
+        assert scanned == [".", "scripts", "scripts/4_World"]
@@ -3,6 +3,7 @@ import sys
 import unittest
 from unittest import mock
 
+from dayz_dev_tools import config_cpp
 from dayz_dev_tools import unpbo
 
 from tests import helpers
@@ -31,6 +32,12 @@ class TestMain(unittest.TestCase):
         self.mock_list_pbo = list_pbo_patcher.start()
         self.addCleanup(list_pbo_patcher.stop)
 
+        open_sink_patcher = mock.patch("dayz_dev_tools.extraction_sink.open_sink")
+        self.mock_open_sink = open_sink_patcher.start()
+        self.addCleanup(open_sink_patcher.stop)
+
+        self.mock_sink = self.mock_open_sink.return_value.__enter__.return_value
+
         pboreader_patcher = mock.patch("dayz_dev_tools.pbo_reader.PBOReader")
         self.mock_pboreader_class = pboreader_patcher.start()
         self.addCleanup(pboreader_patcher.stop)
@@ -68,8 +75,12 @@ class TestMain(unittest.TestCase):
         self.mock_tools_directory.assert_called_once_with()
 
         self.mock_extract_pbo.assert_called_once_with(
-            self.mock_pboreader, [], verbose=False, deobfuscate=False, cfgconvert=None,
-            pattern=None)
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
+
+        self.mock_open_sink.assert_called_once_with(None, atomic=False)
 
         self.mock_list_pbo.assert_not_called()
 
@@ -91,7 +102,9 @@ class TestMain(unittest.TestCase):
 
         self.mock_extract_pbo.assert_called_once_with(
             self.mock_pboreader, ["file/to/extract/1", "file/to/extract/2", "file/to/extract/3"],
-            verbose=False, deobfuscate=False, cfgconvert=None, pattern=None)
+            verbose=False, deobfuscate=False, cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
 
         self.mock_list_pbo.assert_not_called()
 
@@ -105,8 +118,37 @@ class TestMain(unittest.TestCase):
             ])
 
         self.mock_extract_pbo.assert_called_once_with(
-            self.mock_pboreader, [], verbose=False, deobfuscate=False, cfgconvert=None,
-            pattern="**/*.c")
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=mock.ANY, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
+
+        matcher = self.mock_extract_pbo.call_args.kwargs["matcher"]
+        assert matcher.matches(os.path.join("dir", "file.c")) is True
+        assert matcher.matches(os.path.join("dir", "file.h")) is False
+
+        self.mock_list_pbo.assert_not_called()
+
+    def test_extracts_files_with_multiple_patterns_when_specified_on_command_line(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "-m", "**/*.c",
+                "-m", "*.cpp",
+                "-x", "skip/*",
+                "--match-regex", "\\.xml$",
+                "--exclude-regex", "^scripts/",
+                "path/to/filename.ext"
+            ])
+
+        matcher = self.mock_extract_pbo.call_args.kwargs["matcher"]
+        assert matcher.matches(os.path.join("dir", "file.c")) is True
+        assert matcher.matches("config.cpp") is True
+        assert matcher.matches(os.path.join("dir", "layout.xml")) is True
+        assert matcher.matches(os.path.join("skip", "file.c")) is False
+        assert matcher.matches(os.path.join("scripts", "file.c")) is False
+        assert matcher.matches(os.path.join("dir", "file.h")) is False
 
         self.mock_list_pbo.assert_not_called()
 
@@ -120,7 +162,10 @@ class TestMain(unittest.TestCase):
             ])
 
         self.mock_extract_pbo.assert_called_once_with(
-            self.mock_pboreader, [], verbose=True, deobfuscate=False, cfgconvert=None, pattern=None)
+            self.mock_pboreader, [], verbose=True, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER, matcher=None,
+            sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
 
         self.mock_list_pbo.assert_not_called()
 
@@ -134,7 +179,10 @@ class TestMain(unittest.TestCase):
             ])
 
         self.mock_extract_pbo.assert_called_once_with(
-            self.mock_pboreader, [], verbose=False, deobfuscate=True, cfgconvert=None, pattern=None)
+            self.mock_pboreader, [], verbose=False, deobfuscate=True,
+            cfgconvert=config_cpp.NATIVE_CONVERTER, matcher=None,
+            sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
 
         self.mock_list_pbo.assert_not_called()
 
@@ -153,7 +201,8 @@ class TestMain(unittest.TestCase):
         self.mock_extract_pbo.assert_called_once_with(
             self.mock_pboreader, [], verbose=False, deobfuscate=False,
             cfgconvert=os.path.join("TOOLS-DIR", "bin", "CfgConvert", "CfgConvert.exe"),
-            pattern=None)
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
 
     def test_does_not_convert_config_bin_files_when_no_convert_option_is_specified(self) -> None:
         self.mock_tools_directory.return_value = "TOOLS-DIR"
@@ -170,7 +219,80 @@ class TestMain(unittest.TestCase):
 
         self.mock_extract_pbo.assert_called_once_with(
             self.mock_pboreader, [], verbose=False, deobfuscate=False, cfgconvert=None,
-            pattern=None)
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
+
+    def test_extracts_files_to_output_when_specified_on_command_line(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "-o", "output.zip",
+                "path/to/filename.ext"
+            ])
+
+        self.mock_open_sink.assert_called_once_with("output.zip", atomic=False)
+
+        self.mock_extract_pbo.assert_called_once_with(
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=None, max_memory=None)
+
+    def test_extracts_files_using_content_store_when_specified_on_command_line(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open), \
+                mock.patch("dayz_dev_tools.content_store.ContentStore") as mock_store_class:
+            main([
+                "ignored",
+                "--store", "path/to/store",
+                "path/to/filename.ext"
+            ])
+
+        mock_store_class.assert_called_once_with("path/to/store")
+
+        self.mock_extract_pbo.assert_called_once_with(
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=mock_store_class.return_value,
+            journal=None, max_memory=None)
+
+    def test_resumes_extraction_using_journal_when_specified_on_command_line(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open), \
+                mock.patch("dayz_dev_tools.extraction_journal.ExtractionJournal") \
+                as mock_journal_class:
+            main([
+                "ignored",
+                "--journal", "path/to/journal",
+                "path/to/filename.ext"
+            ])
+
+        mock_journal_class.assert_called_once_with("path/to/journal")
+
+        self.mock_open_sink.assert_called_once_with(None, atomic=True)
+
+        self.mock_extract_pbo.assert_called_once_with(
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=None,
+            journal=mock_journal_class.return_value.__enter__.return_value, max_memory=None)
+
+        mock_journal_class.return_value.__exit__.assert_called_once()
+
+    def test_limits_memory_when_max_memory_is_specified_on_command_line(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "--max-memory", "256k",
+                "path/to/filename.ext"
+            ])
+
+        self.mock_extract_pbo.assert_called_once_with(
+            self.mock_pboreader, [], verbose=False, deobfuscate=False,
+            cfgconvert=config_cpp.NATIVE_CONVERTER,
+            matcher=None, sink=self.mock_sink, store=None, journal=None, max_memory=256 * 1024)
 
     def test_lists_the_pbo_contents_when_option_is_specified(self) -> None:
         mock_open = mock.mock_open()
@@ -183,7 +305,10 @@ class TestMain(unittest.TestCase):
 
         self.mock_tools_directory.assert_not_called()
 
-        self.mock_list_pbo.assert_called_once_with(self.mock_pboreader, verbose=False)
+        self.mock_list_pbo.assert_called_once_with(
+            self.mock_pboreader, verbose=False, matcher=None)
+
+        self.mock_open_sink.assert_not_called()
 
         self.mock_extract_pbo.assert_not_called()
 
@@ -197,10 +322,28 @@ class TestMain(unittest.TestCase):
                 "INPUT.pbo"
             ])
 
-        self.mock_list_pbo.assert_called_once_with(self.mock_pboreader, verbose=True)
+        self.mock_list_pbo.assert_called_once_with(
+            self.mock_pboreader, verbose=True, matcher=None)
 
         self.mock_extract_pbo.assert_not_called()
 
+    def test_lists_the_pbo_contents_matching_pattern_when_specified(self) -> None:
+        mock_open = mock.mock_open()
+        with mock.patch("builtins.open", mock_open):
+            main([
+                "ignored",
+                "-l",
+                "-m", "*.c",
+                "INPUT.pbo"
+            ])
+
+        self.mock_list_pbo.assert_called_once_with(
+            self.mock_pboreader, verbose=False, matcher=mock.ANY)
+
+        matcher = self.mock_list_pbo.call_args.kwargs["matcher"]
+        assert matcher.matches("file.c") is True
+        assert matcher.matches("file.h") is False
+
     def test_enables_debug_logging_when_option_is_specified(self) -> None:
         mock_open = mock.mock_open()
         with mock.patch("builtins.open", mock_open):